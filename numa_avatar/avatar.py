@@ -1,9 +1,15 @@
+import os
+import socket
+import threading
 from config import Config
 from services.api_service import APIService
 from services.message_service import MessageService
 from services.git_service import GitService
+from services.log_shipper import LogShipper
+from services.task_lease import TaskLease
 from services.task_service import TaskService
 from utils.logger import Logger
+from utils.phase_timer import PhaseTimer
 
 class Avatar:
     """Avatar主类"""
@@ -14,10 +20,27 @@ class Avatar:
         self.api_service = APIService(self.config)
         self.git_service = GitService(
             username=self.config.get("git.username", ""),
-            email=self.config.get("git.email", "")
+            email=self.config.get("git.email", ""),
+            backend=self.config.get("git.backend", "subprocess")
         )
         self.message_service = MessageService(self.config, self.api_service)
-        self.task_service = TaskService(self.config, self.api_service, self.git_service)
+        # 任务日志按块压缩后异步上报到后端
+        self.log_shipper = LogShipper(
+            self.api_service,
+            max_chunk_bytes=self.config.get("task_logs.max_chunk_bytes", 64 * 1024),
+            flush_interval=self.config.get("task_logs.flush_interval", 2.0),
+            max_pending_chunks=self.config.get("task_logs.max_pending_chunks", 100)
+        )
+        self.task_service = TaskService(self.config, self.api_service, self.git_service, self.log_shipper)
+        
+        # 任务队列：领取任务时使用的 Avatar 标识与租约时长，以及领取到期重试任务的间隔
+        self.avatar_id = self.config.get("avatar.id") or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = self.config.get("queue.lease_seconds", 300)
+        self.retry_interval = self.config.get("queue.retry_interval", 30)
+        # 任务逐个执行，先取得锁再领取，避免领取后排队等待导致租约过期
+        self._task_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._claim_thread = None
         
         self.logger.info("Avatar initialized")
     
@@ -32,17 +55,64 @@ class Avatar:
         # 解析消息，获取任务ID
         if "data" in message and "task_id" in message["data"]:
             task_id = message["data"]["task_id"]
-            self.logger.info(f"Processing task {task_id}")
-            
-            # 执行任务
-            success = self.task_service.execute_task(task_id)
-            if success:
-                self.logger.info(f"Task {task_id} completed successfully")
-            else:
-                self.logger.error(f"Task {task_id} failed")
+            with self._task_lock:
+                # 通过任务队列领取，已被其他 Avatar 领取或已完成的任务直接跳过
+                if not self.api_service.claim_task(task_id, self.avatar_id, self.lease_seconds):
+                    self.logger.info(f"Task {task_id} is not available, skipping")
+                    return
+                self._run_task(task_id)
         else:
             self.logger.warning("Received message without task_id")
     
+    def _process_task(self, task_id):
+        """执行已领取的任务，执行期间心跳续期，结束后确认（ack）或报告失败（nack）
+        
+        Args:
+            task_id: 任务ID
+        """
+        self.logger.info(f"Processing task {task_id}")
+        
+        # 执行任务，各阶段耗时随确认结果一起上报
+        timer = PhaseTimer()
+        with TaskLease(self.api_service, task_id, self.avatar_id, self.lease_seconds):
+            success = self.task_service.execute_task(task_id, timer)
+        # 任务结束，确认结果前立即上报剩余的任务日志
+        if not self.log_shipper.finish_task(task_id):
+            self.logger.warning(f"Failed to ship logs of task {task_id}, will retry in background")
+        if success:
+            self.logger.info(f"Task {task_id} completed successfully")
+            result = self.api_service.ack_task(task_id, self.avatar_id, timer.as_dict())
+        else:
+            self.logger.error(f"Task {task_id} failed")
+            result = self.api_service.nack_task(task_id, self.avatar_id, "Task execution failed", timings=timer.as_dict())
+        if result is None:
+            self.logger.warning(f"Failed to report result of task {task_id}, the lease may have been lost")
+    
+    def _run_task(self, task_id):
+        """执行已领取的任务，执行过程中出现未预期的异常时 nack，由后端重新排队"""
+        try:
+            self._process_task(task_id)
+        except Exception as e:
+            self.logger.error(f"Unexpected error processing task {task_id}: {e}")
+            try:
+                self.api_service.nack_task(task_id, self.avatar_id, f"Unexpected error: {e}")
+            except Exception as nack_error:
+                self.logger.warning(f"Failed to nack task {task_id}, it will be reclaimed after the lease expires: {nack_error}")
+    
+    def _claim_pending_tasks(self):
+        """定期领取到期重试和租约过期的任务，这些任务不会再次下发消息；start() 结束时停止"""
+        while not self._stopping.wait(self.retry_interval):
+            with self._task_lock:
+                if self._stopping.is_set():
+                    break
+                try:
+                    task = self.api_service.claim_next_task(self.avatar_id, self.lease_seconds)
+                except Exception as e:
+                    self.logger.error(f"Failed to claim pending tasks: {e}")
+                    continue
+                if task:
+                    self._run_task(task["id"])
+    
     def start(self):
         """启动Avatar"""
         self.logger.info("Starting Avatar...")
@@ -52,8 +122,18 @@ class Avatar:
             self.logger.error("Failed to subscribe to tasks")
             return
         
-        # 开始轮询消息
-        self.message_service.start_polling(self._handle_message)
+        self._stopping.clear()
+        self._claim_thread = threading.Thread(target=self._claim_pending_tasks, name="claim-pending-tasks", daemon=True)
+        self._claim_thread.start()
+        
+        # 通过订阅流接收消息，后端不支持时退回到轮询；订阅结束后等待领取线程中执行的任务完成再关闭客户端
+        try:
+            self.message_service.start_streaming(self._handle_message)
+        finally:
+            self._stopping.set()
+            self._claim_thread.join()
+            self.log_shipper.close()
+            self.api_service.close()
     
     def get_status(self):
         """获取Avatar状态"""
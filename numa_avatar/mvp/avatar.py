@@ -1,15 +1,24 @@
 import os
+import socket
+import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from config import Config
+from llm.async_llm_client import AsyncLLMClient
 from llm.llm_service import LLMService
+from llm.response_cache import ResponseCache
 from services.git_service import GitService
 from services.code_service import CodeService
 from services.api_service import APIService
+from services.log_shipper import LogShipper
 from services.message_service import MessageService
+from services.progress_reporter import ProgressReporter
+from services.task_lease import TaskLease
 from utils.executor import CommandExecutor
 from utils.logger import Logger
+from utils.phase_timer import PhaseTimer
 from workspace import WorkspaceManager
 
 class Avatar:
@@ -20,34 +29,97 @@ class Avatar:
         if os.path.exists("config.local.yaml"):
             config_path = "config.local.yaml"
         self.config = Config(config_path)
+        
+        # 初始化工作区
+        workspace_path = self.config.get("avatar.workspace", "./workspace")
+        self.workspace = WorkspaceManager(workspace_path)
+        
+        # LLM 响应缓存保存在工作区的 cache 目录中，重试任务时复用之前的响应
+        llm_cache = None
+        if self.config.get("llm.cache.enabled", True):
+            llm_cache = ResponseCache(
+                self.workspace,
+                ttl_seconds=self.config.get("llm.cache.ttl_seconds", 7 * 24 * 3600),
+                max_bytes=self.config.get("llm.cache.max_bytes", 100 * 1024 * 1024),
+                max_temperature=self.config.get("llm.cache.max_temperature")
+            )
+        # 异步 LLM 客户端由所有任务线程共享，按同一份 API 配额限流
+        self.llm_client = AsyncLLMClient(
+            api_key=self.config.get("llm.api_key"),
+            requests_per_minute=self.config.get("llm.rate_limit.requests_per_minute", 500),
+            tokens_per_minute=self.config.get("llm.rate_limit.tokens_per_minute", 150000),
+            max_concurrency=self.config.get("llm.max_concurrency", 8),
+            max_retries=self.config.get("llm.max_retries", 5),
+            hedge_after=self.config.get("llm.hedge_after", 0)
+        )
         self.llm_service = LLMService(
             api_key=self.config.get("llm.api_key"),
             model=self.config.get("llm.model", "gpt-4"),
-            temperature=self.config.get("llm.temperature", 0.7)
+            temperature=self.config.get("llm.temperature", 0.7),
+            cache=llm_cache,
+            max_tokens=self.config.get("llm.max_tokens", 2000),
+            max_continuations=self.config.get("llm.max_continuations", 3),
+            async_client=self.llm_client
         )
         self.git_service = GitService(
             username=self.config.get("git.username", ""),
-            email=self.config.get("git.email", "")
+            email=self.config.get("git.email", ""),
+            backend=self.config.get("git.backend", "subprocess")
         )
         self.code_service = CodeService(self.llm_service)
         
-        # 初始化日志服务
-        log_dir = self.config.get("avatar.log_dir", "./logs")
-        self.logger = Logger("avatar", log_dir)
-        
         # 初始化API服务
         backend_url = self.config.get("backend.url", "http://localhost:7301")
         api_token = self.config.get("backend.api_token", "")
-        self.api_service = APIService(backend_url, api_token)
+        self.api_service = APIService(
+            backend_url, api_token, self.config.get("stream.read_timeout", 60),
+            http=self.config.get("backend.http", {})
+        )
         
-        # 初始化消息服务
+        # 初始化日志服务，任务日志按块压缩后异步上报到后端
+        self.log_shipper = LogShipper(
+            self.api_service,
+            max_chunk_bytes=self.config.get("task_logs.max_chunk_bytes", 64 * 1024),
+            flush_interval=self.config.get("task_logs.flush_interval", 2.0),
+            max_pending_chunks=self.config.get("task_logs.max_pending_chunks", 100)
+        )
+        log_dir = self.config.get("avatar.log_dir", "./logs")
+        self.logger = Logger("avatar", log_dir, shipper=self.log_shipper)
+        
+        # 初始化消息服务，已处理消息的偏移量保存在工作区中
         polling_interval = self.config.get("polling.interval", 5)
         topic_name = self.config.get("avatar.topic_name", "tasks")
-        self.message_service = MessageService(self.api_service, polling_interval, topic_name)
+        self.message_service = MessageService(
+            self.api_service, polling_interval, topic_name,
+            offset_file=os.path.join(self.workspace.config_path, f"{topic_name}_offset"),
+            reconnect_delay=self.config.get("stream.reconnect_delay", 1),
+            max_reconnect_delay=self.config.get("stream.max_reconnect_delay", 30)
+        )
         
-        # 初始化工作区
-        workspace_path = self.config.get("avatar.workspace", "./workspace")
-        self.workspace = WorkspaceManager(workspace_path)
+        # 任务队列：领取任务时使用的 Avatar 标识与租约时长，以及领取到期重试任务的间隔
+        self.avatar_id = self.config.get("avatar.id") or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = self.config.get("queue.lease_seconds", 300)
+        self.retry_interval = self.config.get("queue.retry_interval", 30)
+        
+        # 任务进度在本地记录，合并后异步上报；后端不可达时暂存在工作区的 spool 目录中
+        self.progress_reporter = ProgressReporter(
+            self.api_service, self.workspace.spool_path, self.avatar_id,
+            flush_interval=self.config.get("progress.flush_interval", 1.0),
+            max_batch_size=self.config.get("progress.max_batch_size", 100),
+            retry_interval=self.config.get("progress.retry_interval", 30)
+        )
+        
+        # 任务并发执行：最多同时执行 max_concurrent_tasks 个任务，每个任务在独立的工作树中开发
+        self.max_concurrent_tasks = max(int(self.config.get("avatar.max_concurrent_tasks", 4)), 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_tasks, thread_name_prefix="task-worker")
+        # 空闲的执行槽位，先占用槽位再领取任务，避免领取后排队等待导致租约过期
+        self._slots = threading.BoundedSemaphore(self.max_concurrent_tasks)
+        # 每个应用一把锁，保护该应用的仓库镜像 repos/app_{id}.git
+        self._app_locks = {}
+        self._running_tasks = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._claim_thread: Optional[threading.Thread] = None
         
         self.logger.info("Avatar MVP initialized")
         self.logger.info(f"Backend URL: {backend_url}")
@@ -79,7 +151,7 @@ class Avatar:
         return self.api_service.get_application(app_id)
     
     def update_task_status(self, task_id: int, status: str, details: Optional[Dict] = None) -> bool:
-        """更新任务状态
+        """更新任务状态，由进度上报器合并后异步上报，终态立即上报
         
         Args:
             task_id: 任务ID
@@ -87,36 +159,34 @@ class Avatar:
             details: 状态详情
             
         Returns:
-            是否成功更新
+            是否成功更新（非终态只在本地记录，总是成功）
         """
         self.logger.info(f"Updating task {task_id} status to {status}")
         if details:
             self.logger.debug(f"Status details: {details}")
         
-        result = self.api_service.update_task_status(task_id, status, details)
-        return result is not None
+        return self.progress_reporter.record(task_id, status, details)
     
     def post_task_logs(self, task_id: int, logs: str) -> bool:
-        """上报任务执行日志
+        """记录任务执行日志，由日志上报器合并压缩后异步上报
         
         Args:
             task_id: 任务ID
             logs: 日志内容
             
         Returns:
-            是否成功上报
+            是否成功记录
         """
-        self.logger.info(f"Posting logs for task {task_id}")
         self.logger.debug(f"Logs content: {logs}")
-        
-        result = self.api_service.post_task_logs(task_id, logs)
-        return result is not None
+        self.logger.task_log(str(task_id), logs)
+        return True
     
-    def execute_task(self, task_id: int) -> bool:
+    def execute_task(self, task_id: int, timer: Optional[PhaseTimer] = None) -> bool:
         """执行任务
         
         Args:
             task_id: 任务ID
+            timer: 记录各阶段耗时的计时器，为空时新建
             
         Returns:
             是否成功执行
@@ -125,10 +195,13 @@ class Avatar:
         
         # 记录任务开始时间
         start_time = time.time()
+        timer = timer or PhaseTimer()
+        repo_path = None
         
         try:
             # 1. 获取任务详情
-            task_data = self.get_task(task_id)
+            with timer.phase("task_info"):
+                task_data = self.get_task(task_id)
             if not task_data:
                 self.logger.error(f"Failed to get task {task_id}")
                 self.update_task_status(task_id, "failed", {"error": "Failed to get task info"})
@@ -141,7 +214,8 @@ class Avatar:
             self.update_task_status(task_id, "in_progress", {"step": "getting_task_info"})
             
             # 2. 获取应用信息
-            app_data = self.get_application(task_data["application_id"])
+            with timer.phase("task_info"):
+                app_data = self.get_application(task_data["application_id"])
             if not app_data:
                 self.logger.error(f"Failed to get application {task_data['application_id']}")
                 self.update_task_status(task_id, "failed", {"error": "Failed to get application info"})
@@ -152,32 +226,32 @@ class Avatar:
             # 更新任务状态
             self.update_task_status(task_id, "in_progress", {"step": "getting_application_info"})
             
-            # 3. 克隆代码仓库到工作区
-            repo_path = self.workspace.get_repo_path(f"app_{task_data['application_id']}")
-            self.logger.info(f"Repository path: {repo_path}")
-            
-            if not os.path.exists(repo_path):
-                self.logger.info("Cloning repository")
-                self.update_task_status(task_id, "in_progress", {"step": "cloning_repository"})
+            # 3. 更新应用的裸仓库镜像，为任务创建独立的工作树并切换到开发分支
+            mirror_path = self.workspace.get_mirror_path(f"app_{task_data['application_id']}")
+            worktree_path = self.workspace.get_worktree_path(str(task_id))
+            self.logger.info(f"Repository mirror: {mirror_path}, worktree: {worktree_path}")
+            
+            # 同一应用的任务共用镜像，只在更新镜像、增删工作树时持有应用锁，工作树中的开发互不影响
+            # clone 阶段包含等待应用锁的时间
+            with timer.phase("clone"), self._application_lock(task_data["application_id"]):
+                self.update_task_status(task_id, "in_progress", {"step": "syncing_repository"})
+                if not self.git_service.ensure_mirror(
+                    app_data["git_repo_url"], mirror_path, **self._sync_options(task_data["application_id"])
+                ):
+                    self.logger.error("Failed to sync repository")
+                    self.update_task_status(task_id, "failed", {"error": "Failed to sync repository"})
+                    return False
                 
-                if not self.git_service.clone_repository(app_data["git_repo_url"], repo_path):
-                    self.logger.error("Failed to clone repository")
-                    self.update_task_status(task_id, "failed", {"error": "Failed to clone repository"})
+                self.logger.info(f"Checking out branch {task_data['code_branch']}")
+                self.update_task_status(task_id, "in_progress", {"step": "checking_out_branch"})
+                # 上次执行异常退出时可能遗留同名工作树
+                if os.path.exists(worktree_path):
+                    self.git_service.remove_worktree(mirror_path, worktree_path)
+                if not self.git_service.add_worktree(mirror_path, worktree_path, task_data["code_branch"]):
+                    self.logger.error("Failed to checkout branch")
+                    self.update_task_status(task_id, "failed", {"error": "Failed to checkout branch"})
                     return False
-            else:
-                self.logger.info(f"Repository already exists at {repo_path}")
-            
-            # 更新任务状态
-            self.update_task_status(task_id, "in_progress", {"step": "repository_ready"})
-            
-            # 4. 切换到开发分支
-            self.logger.info(f"Checking out branch {task_data['code_branch']}")
-            self.update_task_status(task_id, "in_progress", {"step": "checking_out_branch"})
-            
-            if not self.git_service.checkout_branch(repo_path, task_data["code_branch"]):
-                self.logger.error("Failed to checkout branch")
-                self.update_task_status(task_id, "failed", {"error": "Failed to checkout branch"})
-                return False
+                repo_path = worktree_path
             
             # 更新任务状态
             self.update_task_status(task_id, "in_progress", {"step": "branch_checked_out"})
@@ -186,7 +260,8 @@ class Avatar:
             self.logger.info("Analyzing task")
             self.update_task_status(task_id, "in_progress", {"step": "analyzing_task"})
             
-            task_analysis = self.code_service.analyze_task(task_data["description"])
+            with timer.phase("analysis"):
+                task_analysis = self.code_service.analyze_task(task_data["description"])
             self.logger.info(f"Task analysis: {task_analysis}")
             
             # 上报任务分析日志
@@ -199,10 +274,15 @@ class Avatar:
             self.logger.info("Generating code")
             self.update_task_status(task_id, "in_progress", {"step": "generating_code"})
             
-            files = self.code_service.generate_code_files(
-                task_data["description"], 
-                f"这是一个{app_data['name']}应用程序"
-            )
+            # 按任务分析结果中的文件并发生成，或流式生成；每个文件生成后立即写入仓库（计入 file_write 阶段）
+            with timer.phase("generation"):
+                files = self.code_service.generate_code_files(
+                    task_data["description"], 
+                    f"这是一个{app_data['name']}应用程序",
+                    base_path=repo_path,
+                    plan=task_analysis,
+                    timer=timer
+                )
             
             if not files:
                 self.logger.warning("No files generated")
@@ -217,13 +297,7 @@ class Avatar:
             # 更新任务状态
             self.update_task_status(task_id, "in_progress", {"step": "code_generated"})
             
-            # 7. 写入文件到仓库
-            self.logger.info("Writing files")
-            self.update_task_status(task_id, "in_progress", {"step": "writing_files"})
-            
-            self.code_service.write_files(files, repo_path)
-            
-            # 更新任务状态
+            # 7. 文件已在生成过程中写入仓库
             self.update_task_status(task_id, "in_progress", {"step": "files_written"})
             
             # 8. 运行测试（简化处理）
@@ -231,7 +305,8 @@ class Avatar:
             self.update_task_status(task_id, "in_progress", {"step": "running_tests"})
             
             # 在实际实现中，这里会运行项目测试
-            self.post_task_logs(task_id, "Running tests...")
+            with timer.phase("tests"):
+                self.post_task_logs(task_id, "Running tests...")
             
             # 更新任务状态
             self.update_task_status(task_id, "in_progress", {"step": "tests_completed"})
@@ -241,7 +316,9 @@ class Avatar:
             self.update_task_status(task_id, "in_progress", {"step": "committing_changes"})
             
             commit_message = f"feat: Complete development task {task_id} - {task_data['title']}"
-            if not self.git_service.commit_changes(repo_path, commit_message):
+            with timer.phase("commit"):
+                committed = self.git_service.commit_changes(repo_path, commit_message)
+            if not committed:
                 self.logger.error("Failed to commit changes")
                 self.update_task_status(task_id, "failed", {"error": "Failed to commit changes"})
                 return False
@@ -249,7 +326,9 @@ class Avatar:
             self.logger.info("Pushing changes")
             self.update_task_status(task_id, "in_progress", {"step": "pushing_changes"})
             
-            if not self.git_service.push_changes(repo_path, task_data["code_branch"]):
+            with timer.phase("push"):
+                pushed = self.git_service.push_changes(repo_path, task_data["code_branch"])
+            if not pushed:
                 self.logger.error("Failed to push changes")
                 self.update_task_status(task_id, "failed", {"error": "Failed to push changes"})
                 return False
@@ -258,9 +337,9 @@ class Avatar:
             end_time = time.time()
             duration = end_time - start_time
             
-            # 更新任务状态为完成
-            self.update_task_status(task_id, "done", {"duration": duration})
-            self.logger.info(f"Task {task_id} executed successfully in {duration:.2f} seconds")
+            # 更新任务状态为完成，附带各阶段耗时
+            self.update_task_status(task_id, "done", {"duration": duration, "phases": timer.as_dict()})
+            self.logger.info(f"Task {task_id} executed successfully in {duration:.2f} seconds, phases: {timer.as_dict()}")
             
             # 记录任务到任务日志
             self.logger.task_log(str(task_id), f"Task completed successfully in {duration:.2f} seconds")
@@ -275,7 +354,8 @@ class Avatar:
             duration = end_time - start_time
             self.update_task_status(task_id, "failed", {
                 "error": str(e),
-                "duration": duration
+                "duration": duration,
+                "phases": timer.as_dict()
             })
             
             # 记录任务到任务日志
@@ -286,6 +366,36 @@ class Avatar:
             # 清理任务临时目录
             self.logger.info(f"Cleaning up temporary files for task {task_id}")
             self.workspace.cleanup_temp(str(task_id))
+            # 回收任务的工作树，提交已推送或保留在镜像的分支中
+            if repo_path is not None:
+                with timer.phase("cleanup"), self._application_lock(task_data["application_id"]):
+                    self.git_service.remove_worktree(mirror_path, repo_path)
+    
+    def _sync_options(self, application_id: int) -> Dict[str, Any]:
+        """获取应用首次同步仓库时的部分克隆 / 浅克隆选项，git.applications 中的配置覆盖 git.sync
+        
+        Args:
+            application_id: 应用ID
+            
+        Returns:
+            ensure_mirror 的 filter / depth 参数
+        """
+        options = dict(self.config.get("git.sync") or {})
+        overrides = self.config.get("git.applications") or {}
+        options.update(overrides.get(application_id) or overrides.get(str(application_id)) or {})
+        return {"filter": options.get("filter"), "depth": options.get("depth")}
+    
+    def _application_lock(self, application_id: int) -> threading.Lock:
+        """获取应用的仓库锁
+        
+        Args:
+            application_id: 应用ID
+            
+        Returns:
+            该应用专用的锁
+        """
+        with self._lock:
+            return self._app_locks.setdefault(application_id, threading.Lock())
     
     def _handle_message(self, message: Dict):
         """处理接收到的消息
@@ -298,22 +408,89 @@ class Avatar:
         # 解析消息，获取任务ID
         if "data" in message and "task_id" in message["data"]:
             task_id = message["data"]["task_id"]
-            self.logger.info(f"Processing task {task_id}")
-            
-            # 记录任务到任务日志
-            self.logger.task_log(str(task_id), f"Starting task processing")
-            
-            # 执行任务
-            success = self.execute_task(task_id)
-            if success:
-                self.logger.info(f"Task {task_id} completed successfully")
-                self.logger.task_log(str(task_id), "Task completed successfully")
-            else:
-                self.logger.error(f"Task {task_id} failed")
-                self.logger.task_log(str(task_id), "Task failed", "error")
+            # 等待空闲槽位，槽位全部占满时暂停接收消息
+            self._slots.acquire()
+            # 通过任务队列领取，已被其他 Avatar 领取或已完成的任务直接跳过
+            if not self.api_service.claim_task(task_id, self.avatar_id, self.lease_seconds):
+                self._slots.release()
+                self.logger.info(f"Task {task_id} is not available, skipping")
+                return
+            self._submit_task(task_id)
         else:
             self.logger.warning("Received message without task_id")
     
+    def _process_task(self, task_id: int):
+        """执行已领取的任务，执行期间心跳续期，结束后确认（ack）或报告失败（nack）
+        
+        Args:
+            task_id: 任务ID
+        """
+        self.logger.info(f"Processing task {task_id}")
+        
+        # 记录任务到任务日志
+        self.logger.task_log(str(task_id), f"Starting task processing")
+        
+        # 执行任务，各阶段耗时随确认结果一起上报
+        timer = PhaseTimer()
+        with TaskLease(self.api_service, task_id, self.avatar_id, self.lease_seconds):
+            success = self.execute_task(task_id, timer)
+        if success:
+            self.logger.info(f"Task {task_id} completed successfully")
+            self.logger.task_log(str(task_id), "Task completed successfully")
+        else:
+            self.logger.error(f"Task {task_id} failed")
+            self.logger.task_log(str(task_id), "Task failed", "error")
+        # 任务结束，确认结果前立即上报剩余的任务日志
+        if not self.log_shipper.finish_task(task_id):
+            self.logger.warning(f"Failed to ship logs of task {task_id}, will retry in background")
+        if success:
+            result = self.api_service.ack_task(task_id, self.avatar_id, timer.as_dict())
+        else:
+            result = self.api_service.nack_task(task_id, self.avatar_id, "Task execution failed", timings=timer.as_dict())
+        if result is None:
+            self.logger.warning(f"Failed to report result of task {task_id}, the lease may have been lost")
+    
+    def _submit_task(self, task_id: int):
+        """将已领取的任务交给工作线程执行，执行结束后释放槽位
+        
+        正在停止时不再提交，释放槽位并 nack 该任务，由后端重新排队。
+        
+        Args:
+            task_id: 任务ID
+        """
+        with self._lock:
+            # stop() 在同一把锁下设置停止标志，标志未设置时执行器一定尚未关闭
+            stopping = self._stopping.is_set()
+            if not stopping:
+                self._running_tasks.add(task_id)
+                self._executor.submit(self._run_task, task_id)
+        if stopping:
+            self._slots.release()
+            self.logger.info(f"Avatar is stopping, releasing task {task_id}")
+            if self.api_service.nack_task(task_id, self.avatar_id, "Avatar stopped before the task started") is None:
+                self.logger.warning(f"Failed to release task {task_id}, it will be reclaimed after the lease expires")
+    
+    def _run_task(self, task_id: int):
+        try:
+            self._process_task(task_id)
+        except Exception as e:
+            self.logger.error(f"Unexpected error processing task {task_id}: {e}")
+        finally:
+            with self._lock:
+                self._running_tasks.discard(task_id)
+            self._slots.release()
+    
+    def _claim_pending_tasks(self):
+        """定期领取到期重试和租约过期的任务，这些任务不会再次下发消息"""
+        while not self._stopping.wait(self.retry_interval):
+            # 有空闲槽位时持续领取，直到没有可领取的任务
+            while not self._stopping.is_set() and self._slots.acquire(blocking=False):
+                task = self.api_service.claim_next_task(self.avatar_id, self.lease_seconds)
+                if not task:
+                    self._slots.release()
+                    break
+                self._submit_task(task["id"])
+    
     def start(self):
         """启动Avatar"""
         self.logger.info("Starting Avatar...")
@@ -323,16 +500,49 @@ class Avatar:
             self.logger.error("Backend service is not available. Please check the connection.")
             return
         
+        # 回收上次异常退出时遗留的工作树
+        self.workspace.cleanup_worktrees()
+        
+        # 重发上次未送达的任务进度
+        self.progress_reporter.flush()
+        
         # 订阅任务消息
         if not self.message_service.subscribe_to_tasks():
             self.logger.error("Failed to subscribe to tasks")
             return
         
-        # 开始轮询消息
-        self.message_service.start_polling(self._handle_message)
+        self._claim_thread = threading.Thread(target=self._claim_pending_tasks, name="claim-pending-tasks", daemon=True)
+        self._claim_thread.start()
+        
+        # 通过订阅流接收消息，后端不支持时退回到轮询；订阅结束（如 Ctrl+C）后等待执行中的任务完成
+        try:
+            self.message_service.start_streaming(self._handle_message)
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """优雅退出：停止领取新任务，等待执行中的任务完成并确认"""
+        with self._lock:
+            if self._stopping.is_set():
+                return
+            self._stopping.set()
+            running = sorted(self._running_tasks)
+        if running:
+            self.logger.info(f"Waiting for running tasks to finish: {running}")
+        # 等待领取线程退出，正在进行的领取请求结束后由 _submit_task 释放
+        if self._claim_thread and self._claim_thread is not threading.current_thread():
+            self._claim_thread.join()
+        self._executor.shutdown(wait=True)
+        self.llm_client.close()
+        self.progress_reporter.close()
+        self.log_shipper.close()
+        self.api_service.close()
+        self.logger.info("Avatar stopped")
     
     def get_status(self):
         """获取Avatar状态"""
+        with self._lock:
+            running = sorted(self._running_tasks)
         return {
             "status": "running",
             "avatar_id": self.config.get("avatar.id"),
@@ -340,5 +550,12 @@ class Avatar:
             "workspace": self.config.get("avatar.workspace", "./workspace"),
             "backend_url": self.config.get("backend.url", "http://localhost:7301"),
             "topic_name": self.config.get("avatar.topic_name", "tasks"),
-            "log_dir": self.config.get("avatar.log_dir", "./logs")
+            "log_dir": self.config.get("avatar.log_dir", "./logs"),
+            "max_concurrent_tasks": self.max_concurrent_tasks,
+            "running_tasks": running,
+            "llm_cache": self.llm_service.cache.stats() if self.llm_service.cache else None,
+            "llm_client": self.llm_client.stats(),
+            "backend_circuit": self.api_service.circuit_breaker.state,
+            "progress": self.progress_reporter.stats(),
+            "task_logs": self.log_shipper.stats()
         }
\ No newline at end of file
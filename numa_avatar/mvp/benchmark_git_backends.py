@@ -0,0 +1,84 @@
+"""比较 Git 后端提交大量文件的耗时
+
+在临时仓库中生成若干文件，分别用逐个文件 git add（原实现）、subprocess 后端和 pygit2 后端
+（已安装时）切换到新分支并提交，输出各自的耗时。
+
+用法：
+    python benchmark_git_backends.py --files 500 --rounds 3
+"""
+import argparse
+import os
+import statistics
+import time
+from services.git_backend import GIT_BACKENDS, SubprocessGitBackend, create_git_backend
+from utils.executor import CommandExecutor
+
+class PerFileGitBackend(SubprocessGitBackend):
+    """原实现：每个文件执行一次 git add，切换分支前先查询分支是否存在"""
+
+    name = "per-file"
+
+    def add(self, repo_path, files=None):
+        for path in files:
+            result = CommandExecutor.run_command(["git", "add", path], cwd=repo_path)
+            if not result["success"]:
+                return result
+        return result
+
+    def checkout(self, repo_path, branch_name, create_new=True):
+        CommandExecutor.run_command(["git", "branch", "--list", branch_name], cwd=repo_path)
+        return CommandExecutor.run_command(["git", "checkout", "-b", branch_name], cwd=repo_path)
+
+def create_repo(files: int) -> tuple:
+    """创建带一次提交的仓库，并生成待提交的文件"""
+    repo_path = CommandExecutor.create_temp_dir(prefix="numa_git_benchmark_")
+    CommandExecutor.run_command(["git", "init", "-q", "-b", "main", repo_path])
+    CommandExecutor.run_command(["git", "config", "user.name", "benchmark"], cwd=repo_path)
+    CommandExecutor.run_command(["git", "config", "user.email", "benchmark@example.com"], cwd=repo_path)
+    with open(os.path.join(repo_path, "README.md"), "w") as f:
+        f.write("# benchmark\n")
+    CommandExecutor.run_command(["git", "add", "."], cwd=repo_path)
+    CommandExecutor.run_command(["git", "commit", "-q", "-m", "init"], cwd=repo_path)
+
+    paths = []
+    for i in range(files):
+        path = f"src/pkg_{i % 20}/module_{i}.py"
+        os.makedirs(os.path.join(repo_path, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(repo_path, path), "w") as f:
+            f.write(f"def handler_{i}():\n    return {i}\n")
+        paths.append(path)
+    return repo_path, paths
+
+def run(backend, files: int) -> float:
+    repo_path, paths = create_repo(files)
+    try:
+        start = time.perf_counter()
+        result = backend.checkout(repo_path, "feature")
+        if result["success"]:
+            result = backend.commit_files(repo_path, f"Add {files} files", paths)
+        elapsed = time.perf_counter() - start
+        if not result["success"]:
+            raise RuntimeError(f"{backend.name} failed: {result['stderr']}")
+        return elapsed
+    finally:
+        CommandExecutor.remove_dir(repo_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="比较 Git 后端提交大量文件的耗时")
+    parser.add_argument("--files", type=int, default=500, help="每次提交的文件数")
+    parser.add_argument("--rounds", type=int, default=3, help="每个后端的测试轮数，取中位数")
+    args = parser.parse_args()
+
+    backends = [PerFileGitBackend()]
+    for name in GIT_BACKENDS:
+        backend = create_git_backend(name)
+        if backend.name == name:
+            backends.append(backend)
+
+    print(f"Committing {args.files} files on a new branch, median of {args.rounds} rounds")
+    for backend in backends:
+        timings = [run(backend, args.files) for _ in range(args.rounds)]
+        print(f"{backend.name:>10}: {statistics.median(timings) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""异步 LLM 客户端
+
+所有任务线程共享同一个 AsyncLLMClient：请求在客户端自己的事件循环线程中以协程并发执行，
+同步代码通过 complete_sync / complete_many_sync 提交请求并等待结果（响应内容及结束原因，
+结束原因为 length 表示输出被 max_tokens 截断）；流式请求由调用方的同步客户端发起，
+通过 create_stream_sync 同样经过限流和重试。
+
+- 限流：按每分钟请求数和每分钟 token 数两个令牌桶限流，多个任务共享同一份 API 配额
+- 重试：遇到 429、超时、连接错误和 5xx 时按带抖动的指数退避重试，优先遵循 Retry-After
+- 对冲：请求超过 hedge_after 秒仍未返回时再发起一个相同的请求，取先返回的结果，降低长尾延迟
+- 并发：max_concurrency 限制同时进行的请求数，complete_many_sync 按完成顺序返回多个请求的结果
+"""
+import asyncio
+import concurrent.futures
+import json
+import random
+import threading
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+import openai
+
+# 估算 token 数时每个 token 对应的字符数
+CHARS_PER_TOKEN = 4
+
+class Completion(NamedTuple):
+    """一次对话补全的结果"""
+    content: Optional[str]
+    finish_reason: Optional[str]  # stop、length（达到 max_tokens 被截断）等
+
+class TokenBucket:
+    """每分钟补充 per_minute 个令牌的令牌桶，只在事件循环线程中使用"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """取出 amount 个令牌，不足时等待补充；按调用顺序依次获得令牌"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # 超过容量的请求按容量计，避免永远等待
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, amount: float):
+        """按实际用量修正预扣的令牌，amount 为正时归还，为负时补扣"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class AsyncLLMClient:
+    """带限流、重试和请求对冲的异步 LLM 客户端"""
+
+    # 可重试的错误：429、超时、连接错误、5xx
+    RETRYABLE_ERRORS = (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+    def __init__(self, api_key: str, requests_per_minute: int = 500, tokens_per_minute: int = 150000,
+                 max_concurrency: int = 8, max_retries: int = 5, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0, hedge_after: float = 0, client=None):
+        self.api_key = api_key
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # 请求超过该秒数未返回时发起对冲请求，为 0 时不对冲
+        self.hedge_after = hedge_after
+        # 测试时可传入替代的客户端，需提供 chat.completions.create 协程
+        self._client = client
+        self._semaphore = None
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.rate_limited = 0
+
+    def _ensure_loop(self):
+        """启动客户端的事件循环线程"""
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _get_client(self):
+        if self._client is None:
+            # 重试由本客户端处理，关闭 SDK 自带的重试
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    def estimate_tokens(self, request: dict) -> int:
+        """估算请求消耗的 token 数：输入按字符数估算，加上最大输出长度"""
+        prompt = json.dumps(request.get("messages", []), ensure_ascii=False)
+        return len(prompt) // CHARS_PER_TOKEN + request.get("max_tokens", 1000)
+
+    async def reserve(self, request: dict) -> int:
+        """按限流规则为请求预扣配额
+
+        Returns:
+            预扣的 token 数
+        """
+        tokens = self.estimate_tokens(request)
+        await self.request_bucket.acquire(1)
+        await self.token_bucket.acquire(tokens)
+        return tokens
+
+    async def _attempt(self, request: dict) -> Completion:
+        """发起一次请求"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        reserved = await self.reserve(request)
+        async with self._semaphore:
+            self.requests += 1
+            response = await self._get_client().chat.completions.create(**request)
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int):
+            self.token_bucket.adjust(reserved - total_tokens)
+        choice = response.choices[0]
+        return Completion(choice.message.content, choice.finish_reason)
+
+    async def _hedged(self, request: dict) -> Completion:
+        """发起请求，超过 hedge_after 秒未返回时再发起一个相同的请求，取先成功的结果"""
+        primary = asyncio.ensure_future(self._attempt(request))
+        if not self.hedge_after:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        pending = {primary, asyncio.ensure_future(self._attempt(request))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """第 attempt 次重试前的等待时间：带抖动的指数退避，不少于服务端要求的 Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    async def complete(self, **request) -> Completion:
+        """调用对话补全接口并返回响应内容及结束原因，失败时按退避重试
+
+        Args:
+            request: chat.completions.create 的参数（model、messages、temperature 等）
+
+        Returns:
+            Completion(响应内容, 结束原因)
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(request)
+            except self.RETRYABLE_ERRORS as e:
+                delay = self._before_retry(attempt, e)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _before_retry(self, attempt: int, error: Exception) -> float:
+        """记录一次可重试的失败，返回重试前的等待时间；已达到最大重试次数时抛出该错误"""
+        if isinstance(error, openai.RateLimitError):
+            self.rate_limited += 1
+        if attempt >= self.max_retries:
+            raise error
+        delay = self._retry_delay(attempt, error)
+        self.retries += 1
+        print(f"LLM request failed ({type(error).__name__}), retrying in {delay:.1f}s "
+              f"({attempt + 1}/{self.max_retries})")
+        return delay
+
+    def complete_sync(self, **request) -> Completion:
+        """在调用线程中等待 complete 的结果"""
+        return self._submit(self.complete(**request)).result()
+
+    def complete_many_sync(self, requests: Iterable[dict]) -> Iterator[Tuple[int, Optional[Completion], Optional[Exception]]]:
+        """并发执行多个请求，按完成顺序返回结果
+
+        Args:
+            requests: 请求参数列表
+
+        Returns:
+            (请求序号, Completion, 错误) 的迭代器，请求失败时 Completion 为 None
+        """
+        futures = {self._submit(self.complete(**request)): index for index, request in enumerate(requests)}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+    def reserve_sync(self, request: dict):
+        """在调用线程中等待限流配额，用于不经过本客户端发起的请求（如流式补全）"""
+        self._submit(self.reserve(request)).result()
+
+    def create_stream_sync(self, create: Callable, request: dict):
+        """在调用线程中发起流式请求：每次尝试前等待限流配额，建立流失败（429、超时、连接错误、5xx）时按退避重试
+
+        流建立后的读取由调用方进行，已输出部分内容后的中断不在此重试；流式请求不对冲。
+
+        Args:
+            create: 同步客户端的 chat.completions.create
+            request: 请求参数，需包含 stream=True
+
+        Returns:
+            create 返回的流
+        """
+        attempt = 0
+        while True:
+            self.reserve_sync(request)
+            self.requests += 1
+            try:
+                return create(**request)
+            except self.RETRYABLE_ERRORS as e:
+                delay = self._before_retry(attempt, e)
+                attempt += 1
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        """请求、重试、对冲及遇到 429 的次数"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "rate_limited": self.rate_limited
+        }
+
+    def close(self):
+        """关闭底层客户端并停止事件循环线程"""
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+        if loop is None:
+            return
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(close(), loop).result(timeout=5)
+            except Exception as e:
+                print(f"Failed to close LLM client: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -1,14 +1,77 @@
 from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import json
+from llm.async_llm_client import AsyncLLMClient, Completion
+from llm.response_cache import ResponseCache
+
+# 未配置API密钥时返回的模拟代码生成结果
+MOCK_CODE = """FILE: app.py
+CONTENT:
+#!/usr/bin/env python3
+
+def hello_world():
+    return "Hello, World!"
+
+if __name__ == "__main__":
+    print(hello_world())
+END_FILE"""
+
+# 并发生成时，每个请求只生成计划中的一个文件
+FILE_ONLY_PROMPT = "本次只生成文件 {filename}，本任务的全部文件为：{filenames}。只输出该文件的一个 FILE 块。"
+
+# 输出被截断后的续写提示
+CONTINUE_PROMPT = "输出因长度限制被截断，请从中断处继续输出，不要重复已输出的内容，也不要添加任何说明。"
 
 class LLMService:
     """LLM服务类"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4", temperature: float = 0.7):
+    def __init__(self, api_key: str, model: str = "gpt-4", temperature: float = 0.7,
+                 cache: Optional[ResponseCache] = None, max_tokens: int = 2000, max_continuations: int = 3,
+                 async_client: Optional[AsyncLLMClient] = None):
         self.client = OpenAI(api_key=api_key)
         self.model = model
         self.temperature = temperature
+        # 代码生成单次请求的最大输出长度，以及输出被截断后最多续写的次数
+        self.max_tokens = max_tokens
+        self.max_continuations = max_continuations
+        # 响应缓存，为空时每次都调用 API
+        self.cache = cache
+        # 异步客户端：多个任务共享限流配额、失败重试，并支持并发生成多个文件；为空时使用同步客户端
+        self.async_client = async_client
+    
+    def _is_mock(self) -> bool:
+        """是否未配置有效的API密钥，此时返回模拟结果"""
+        return not self.client.api_key or self.client.api_key == "your_openai_api_key_here"
+    
+    @property
+    def supports_parallel_generation(self) -> bool:
+        """是否可以并发生成多个文件"""
+        return self.async_client is not None and not self._is_mock()
+    
+    def _complete(self, **request) -> str:
+        """调用对话补全接口并返回响应内容，相同的请求优先使用缓存的响应；被 max_tokens 截断的响应不写入缓存
+        
+        Args:
+            request: chat.completions.create 的参数（model、messages、temperature 等）
+            
+        Returns:
+            响应内容
+        """
+        cache_key = None
+        if self.cache and self.cache.is_cacheable(request):
+            cache_key = self.cache.make_key(request)
+            content = self.cache.get(cache_key)
+            if content is not None:
+                return content
+        
+        if self.async_client:
+            content, finish_reason = self.async_client.complete_sync(**request)
+        else:
+            choice = self.client.chat.completions.create(**request).choices[0]
+            content, finish_reason = choice.message.content, choice.finish_reason
+        if cache_key and content is not None and finish_reason != "length":
+            self.cache.put(cache_key, content)
+        return content
     
     def generate_code(self, task_description: str, project_context: str = "") -> str:
         """根据任务描述生成代码
@@ -20,20 +83,92 @@ class LLMService:
         Returns:
             生成的代码
         """
+        return "".join(self.generate_code_stream(task_description, project_context))
+    
+    def generate_code_stream(self, task_description: str, project_context: str = "") -> Iterator[str]:
+        """以流式补全生成代码，逐段返回输出内容
+        
+        输出因达到 max_tokens 被截断时，带上已生成的内容发起续写请求，最多续写 max_continuations 次。
+        完整的输出写入响应缓存，相同的请求直接一次性返回缓存的内容。
+        
+        Args:
+            task_description: 任务描述
+            project_context: 项目上下文信息
+            
+        Returns:
+            输出内容片段的迭代器
+        """
         # 检查API密钥是否有效
-        if not self.client.api_key or self.client.api_key == "your_openai_api_key_here":
+        if self._is_mock():
             # 返回模拟的代码生成结果
-            return """FILE: app.py
-CONTENT:
-#!/usr/bin/env python3
-
-def hello_world():
-    return "Hello, World!"
-
-if __name__ == "__main__":
-    print(hello_world())
-END_FILE"""
+            yield MOCK_CODE
+            return
+        
+        request = self._code_request(task_description, project_context)
+        
+        cache_key = None
+        if self.cache and self.cache.is_cacheable(request):
+            cache_key = self.cache.make_key(request)
+            content = self.cache.get(cache_key)
+            if content is not None:
+                yield content
+                return
         
+        output = []
+        for attempt in range(self.max_continuations + 1):
+            finish_reason = None
+            attempt_request = self._continuation_request(request, "".join(output)) if attempt else request
+            stream_request = {**attempt_request, "stream": True}
+            if self.async_client:
+                # 流式请求由同步客户端发起，同样占用共享的限流配额，并按异步客户端的退避策略重试；
+                # 关闭 SDK 自带的重试，避免叠加
+                stream = self.async_client.create_stream_sync(
+                    self.client.with_options(max_retries=0).chat.completions.create, stream_request
+                )
+            else:
+                stream = self.client.chat.completions.create(**stream_request)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    output.append(choice.delta.content)
+                    yield choice.delta.content
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+            if finish_reason != "length":
+                break
+        
+        if finish_reason == "length":
+            # 截断的输出不写入缓存，避免重试时得到同样不完整的结果
+            print(f"Warning: code generation still truncated after {self.max_continuations} continuations")
+        elif cache_key and output:
+            self.cache.put(cache_key, "".join(output))
+    
+    def _continuation_request(self, request: dict, output: str) -> dict:
+        """续写请求：已生成的内容作为助手消息，要求从中断处继续"""
+        return {**request, "messages": request["messages"] + [
+            {"role": "assistant", "content": output},
+            {"role": "user", "content": CONTINUE_PROMPT}
+        ]}
+    
+    def _continue_truncated(self, request: dict, completion: Completion) -> Completion:
+        """输出因达到 max_tokens 被截断时续写，最多续写 max_continuations 次
+        
+        Returns:
+            拼接后的完整输出；续写后仍被截断时结束原因为 length
+        """
+        content, finish_reason = completion.content or "", completion.finish_reason
+        for _ in range(self.max_continuations):
+            if finish_reason != "length":
+                break
+            more = self.async_client.complete_sync(**self._continuation_request(request, content))
+            content += more.content or ""
+            finish_reason = more.finish_reason
+        return Completion(content, finish_reason)
+    
+    def _code_request(self, task_description: str, project_context: str) -> dict:
+        """构造代码生成请求"""
         prompt = f"""
         你是一个专业的软件开发工程师。请根据以下任务描述生成相应的代码。
 
@@ -55,17 +190,65 @@ END_FILE"""
         如果有多个文件，请重复上述格式。
         """
         
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.model,
             messages=[
                 {"role": "system", "content": "你是一个专业的软件开发工程师，擅长根据需求生成高质量代码。"},
                 {"role": "user", "content": prompt}
             ],
             temperature=self.temperature,
-            max_tokens=2000
+            max_tokens=self.max_tokens
         )
+    
+    def generate_files(self, task_description: str, project_context: str,
+                       filenames: List[str]) -> Iterator[Tuple[str, Optional[str]]]:
+        """为计划中的每个文件单独发起请求并发生成，按完成顺序返回
+        
+        与 generate_code_stream 相同，被 max_tokens 截断的输出会续写，仍不完整的输出不写入缓存。
+        
+        Args:
+            task_description: 任务描述
+            project_context: 项目上下文信息
+            filenames: 要生成的文件列表（通常来自 analyze_task 的结果）
+            
+        Returns:
+            (文件名, 输出内容) 的迭代器，输出内容为 FILE/CONTENT/END_FILE 格式，生成失败时为 None；
+            续写后仍被截断的输出原样返回，由调用方按缺少 END_FILE 处理
+        """
+        base = self._code_request(task_description, project_context)
+        requests = []
+        for filename in filenames:
+            prompt = FILE_ONLY_PROMPT.format(filename=filename, filenames="、".join(filenames))
+            requests.append({**base, "messages": base["messages"] + [{"role": "user", "content": prompt}]})
+        
+        # 先取缓存的结果，其余请求并发执行
+        pending = {}
+        for filename, request in zip(filenames, requests):
+            cache_key = self.cache.make_key(request) if self.cache and self.cache.is_cacheable(request) else None
+            content = self.cache.get(cache_key) if cache_key else None
+            if content is not None:
+                yield filename, content
+            else:
+                pending[len(pending)] = (filename, request, cache_key)
         
-        return response.choices[0].message.content
+        results = self.async_client.complete_many_sync(request for _, request, _ in pending.values())
+        for index, completion, error in results:
+            filename, request, cache_key = pending[index]
+            if error is None:
+                # 续写在当前线程中依次进行，截断的情况较少
+                try:
+                    completion = self._continue_truncated(request, completion)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                print(f"Failed to generate {filename}: {error}")
+                yield filename, None
+                continue
+            if completion.finish_reason == "length":
+                print(f"Warning: {filename} still truncated after {self.max_continuations} continuations")
+            elif cache_key and completion.content:
+                self.cache.put(cache_key, completion.content)
+            yield filename, completion.content
     
     def analyze_task(self, task_description: str) -> Dict[str, Any]:
         """分析任务描述，提取关键信息
@@ -103,7 +286,7 @@ END_FILE"""
         }}
         """
         
-        response = self.client.chat.completions.create(
+        content = self._complete(
             model=self.model,
             messages=[
                 {"role": "system", "content": "你是一个专业的软件开发工程师，擅长分析任务需求。"},
@@ -114,7 +297,7 @@ END_FILE"""
         )
         
         try:
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
         except json.JSONDecodeError:
             # 如果解析失败，返回默认结构
             return {
@@ -147,7 +330,7 @@ END_FILE"""
         请提供修复后的完整代码。
         """
         
-        response = self.client.chat.completions.create(
+        content = self._complete(
             model=self.model,
             messages=[
                 {"role": "system", "content": "你是一个专业的软件开发工程师，擅长调试和修复代码。"},
@@ -157,4 +340,4 @@ END_FILE"""
             max_tokens=1500
         )
         
-        return response.choices[0].message.content
\ No newline at end of file
+        return content
\ No newline at end of file
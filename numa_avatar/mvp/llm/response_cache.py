@@ -0,0 +1,136 @@
+"""LLM 响应缓存
+
+响应以 (模型, 温度, 消息及其他请求参数) 的哈希为键，保存在工作区的 cache 目录中（workspace/cache/llm_<hash>.cache），
+重启后仍然有效。重试失败的任务或描述相同的任务时直接返回缓存的响应，不再调用 API。
+
+- 过期：超过 ttl_seconds 的响应视为未命中并删除
+- 淘汰：缓存文件总大小超过 max_bytes 时，按最近访问时间（文件修改时间，命中时更新）删除最久未使用的响应
+- 温度：max_temperature 不为空时，只缓存温度不高于该值的请求，温度较高的请求每次都调用 API
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+from workspace import WorkspaceManager
+
+# 缓存文件名前缀，工作区 cache 目录中的其他缓存文件不参与淘汰
+KEY_PREFIX = "llm_"
+
+class ResponseCache:
+    """基于工作区 cache 目录的 LLM 响应缓存"""
+
+    def __init__(self, workspace: WorkspaceManager, ttl_seconds: int = 7 * 24 * 3600,
+                 max_bytes: int = 100 * 1024 * 1024, max_temperature: Optional[float] = None):
+        self.workspace = workspace
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def make_key(self, request: dict) -> str:
+        """根据请求参数（model、temperature、messages 等）计算缓存键"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, request: dict) -> bool:
+        """请求的温度是否允许缓存"""
+        if self.max_temperature is None:
+            return True
+        return request.get("temperature", 1.0) <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的响应，未命中或已过期时返回 None"""
+        path = self.workspace.get_cache_file(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+                self._total_bytes -= self._remove(path)
+                self.misses += 1
+                return None
+
+            # 以修改时间记录最近访问时间，用于淘汰
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return entry.get("content")
+
+    def put(self, key: str, content: str):
+        """保存响应，写入后超过总大小上限时淘汰最久未使用的响应"""
+        path = self.workspace.get_cache_file(key)
+        data = json.dumps({"created_at": time.time(), "content": content}, ensure_ascii=False)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                previous = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                # 先写临时文件再替换，并发读取时不会读到不完整的内容
+                os.replace(temp_path, path)
+                self._total_bytes += os.path.getsize(path) - previous
+            except OSError as e:
+                print(f"Failed to write LLM cache {path}: {e}")
+                self._remove(temp_path)
+                return
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        """命中、未命中、淘汰次数及当前缓存大小"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "bytes": self._total_bytes
+            }
+
+    def _entries(self):
+        """缓存文件列表：(路径, 大小, 修改时间)"""
+        entries = []
+        if not os.path.exists(self.workspace.cache_path):
+            return entries
+        for name in os.listdir(self.workspace.cache_path):
+            if not (name.startswith(KEY_PREFIX) and name.endswith(".cache")):
+                continue
+            path = os.path.join(self.workspace.cache_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """删除最久未使用的响应，直到总大小不超过上限"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for path, _, _ in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._total_bytes -= self._remove(path)
+            self.evictions += 1
+
+    def _remove(self, path: str) -> int:
+        """删除缓存文件，返回释放的字节数"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return 0
+        return size
@@ -1,13 +1,19 @@
 import sys
 import os
+import signal
 
 # 添加当前目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from avatar import Avatar
 
+def _handle_sigterm(signum, frame):
+    # 与 Ctrl+C 相同处理：停止接收任务，等待执行中的任务完成后退出
+    raise KeyboardInterrupt
+
 def main():
     """主函数"""
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     avatar = Avatar()
     avatar.start()
 
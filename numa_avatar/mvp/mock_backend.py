@@ -83,12 +83,21 @@ class MockBackendHandler(BaseHTTPRequestHandler):
         path = parsed_path.path
         
         if path.startswith("/api/tasks/") and path.endswith("/logs"):
-            # 上报任务日志
+            # 上报任务日志（JSON 或 gzip 压缩的日志块）
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
             self.send_response(200)
             self.send_header("Content-type", "application/json")
             self.end_headers()
             response_data = {"status": "success"}
             self.wfile.write(json.dumps(response_data).encode())
+        elif path.startswith("/api/tasks/") and path.endswith("/steps"):
+            # 批量上报任务步骤
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            self.send_response(200)
+            self.send_header("Content-type", "application/json")
+            self.end_headers()
+            response_data = {"task_id": int(path.split("/")[3]), "accepted": len(body.get("events", [])), "duplicate": False}
+            self.wfile.write(json.dumps(response_data).encode())
         else:
             # 404 Not Found
             self.send_response(404)
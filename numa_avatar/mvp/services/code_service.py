@@ -1,32 +1,165 @@
 import os
-import re
-from typing import List, Tuple
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
 from llm.llm_service import LLMService
 
+class FileBlockParser:
+    """增量解析 LLM 输出中的 FILE/CONTENT/END_FILE 块
+    
+    按行解析流式输出，每遇到一个 END_FILE 立即返回该文件，不必等待完整输出。
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        # 当前文件名，为 None 表示不在文件块中
+        self._filename = None
+        # 当前文件的内容行，为 None 表示尚未遇到 CONTENT:
+        self._lines = None
+    
+    @property
+    def pending(self) -> Optional[str]:
+        """尚未结束（缺少 END_FILE）的文件名"""
+        return self._filename
+    
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """输入一段输出内容
+        
+        Args:
+            text: 输出内容片段
+            
+        Returns:
+            本次结束的文件列表，每个元素为(文件名, 文件内容)的元组
+        """
+        *lines, self._buffer = (self._buffer + text).split("\n")
+        return self._feed_lines(lines)
+    
+    def close(self) -> List[Tuple[str, str]]:
+        """输出结束，解析最后一行（末尾没有换行时）"""
+        lines, self._buffer = [self._buffer], ""
+        return self._feed_lines(lines)
+    
+    def _feed_lines(self, lines: List[str]) -> List[Tuple[str, str]]:
+        files = []
+        for line in lines:
+            file = self._feed_line(line)
+            if file:
+                files.append(file)
+        return files
+    
+    def _feed_line(self, line: str) -> Optional[Tuple[str, str]]:
+        stripped = line.strip()
+        if self._filename is None:
+            if stripped.startswith("FILE:"):
+                self._filename = stripped[len("FILE:"):].strip()
+                self._lines = None
+            return None
+        
+        if self._lines is None:
+            if stripped.startswith("CONTENT:"):
+                self._lines = []
+                # 内容可能与 CONTENT: 在同一行
+                rest = stripped[len("CONTENT:"):].strip()
+                if rest:
+                    return self._feed_line(rest)
+            return None
+        
+        if stripped.endswith("END_FILE"):
+            prefix = line[:line.rindex("END_FILE")]
+            if prefix.strip():
+                self._lines.append(prefix)
+            file = (self._filename, "\n".join(self._lines).strip())
+            self._filename = None
+            self._lines = None
+            return file
+        
+        self._lines.append(line)
+        return None
+
+class IncompleteGenerationError(Exception):
+    """计划中的文件没有生成完整的内容（请求失败或输出缺少 END_FILE）"""
+    
+    def __init__(self, filenames: List[str]):
+        super().__init__(f"Incomplete generated files: {', '.join(filenames)}")
+        self.filenames = filenames
+
 class CodeService:
     """代码生成服务类"""
     
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
     
-    def generate_code_files(self, task_description: str, project_context: str = "") -> List[Tuple[str, str]]:
+    def generate_code_files(self, task_description: str, project_context: str = "",
+                            base_path: Optional[str] = None, plan: Optional[dict] = None,
+                            timer=None) -> List[Tuple[str, str]]:
         """生成代码文件
         
+        任务分析结果（plan）中列出多个文件且 LLM 服务支持并发时，每个文件单独发起请求并发生成；
+        否则以流式输出生成全部文件。指定 base_path 时每个文件生成后立即写入该目录。
+        
         Args:
             task_description: 任务描述
             project_context: 项目上下文信息
+            base_path: 写入文件的基础路径，为空时只返回文件不写入
+            plan: analyze_task 的结果，包含 files_to_create 和 files_to_modify
+            timer: PhaseTimer，写入文件的耗时计入 file_write 阶段
             
         Returns:
             文件列表，每个元素为(文件名, 文件内容)的元组
+            
+        Raises:
+            IncompleteGenerationError: 并发生成时有计划中的文件生成失败或输出不完整
         """
-        # 使用LLM生成代码
-        generated_code = self.llm_service.generate_code(task_description, project_context)
+        filenames = self._planned_files(plan)
+        if len(filenames) > 1 and self.llm_service.supports_parallel_generation:
+            return self._generate_files_in_parallel(task_description, project_context, filenames, base_path, timer)
         
-        # 解析生成的代码，提取文件名和内容
-        files = self._parse_generated_code(generated_code)
+        files = []
+        parser = FileBlockParser()
+        for text in self.llm_service.generate_code_stream(task_description, project_context):
+            completed = parser.feed(text)
+            if completed and base_path:
+                self._write_timed(completed, base_path, timer)
+            files.extend(completed)
+        
+        completed = parser.close()
+        if completed and base_path:
+            self._write_timed(completed, base_path, timer)
+        files.extend(completed)
+        
+        if parser.pending:
+            print(f"Warning: generated file {parser.pending} is incomplete and was skipped")
         
         return files
     
+    def _planned_files(self, plan: Optional[dict]) -> List[str]:
+        """任务分析结果中要创建和修改的文件（去重，保持顺序）"""
+        if not isinstance(plan, dict):
+            return []
+        filenames = []
+        for key in ("files_to_create", "files_to_modify"):
+            for filename in plan.get(key) or []:
+                if isinstance(filename, str) and filename.strip() and filename.strip() not in filenames:
+                    filenames.append(filename.strip())
+        return filenames
+    
+    def _generate_files_in_parallel(self, task_description: str, project_context: str,
+                                    filenames: List[str], base_path: Optional[str], timer=None) -> List[Tuple[str, str]]:
+        """每个文件单独生成，先完成的文件先写入；全部请求结束后，有文件不完整时任务失败"""
+        files, incomplete = [], []
+        for filename, output in self.llm_service.generate_files(task_description, project_context, filenames):
+            parser = FileBlockParser()
+            completed = parser.feed(output) + parser.close() if output else []
+            if not completed or parser.pending:
+                print(f"Warning: generated content for {filename} is incomplete")
+                incomplete.append(filename)
+                continue
+            if base_path:
+                self._write_timed(completed, base_path, timer)
+            files.extend(completed)
+        if incomplete:
+            raise IncompleteGenerationError(incomplete)
+        return files
+    
     def _parse_generated_code(self, generated_code: str) -> List[Tuple[str, str]]:
         """解析生成的代码，提取文件
         
@@ -36,18 +169,13 @@ class CodeService:
         Returns:
             文件列表，每个元素为(文件名, 文件内容)的元组
         """
-        files = []
-        
-        # 使用正则表达式匹配文件模式
-        pattern = r"FILE:\s*(.*?)\s*CONTENT:\s*(.*?)\s*END_FILE"
-        matches = re.findall(pattern, generated_code, re.DOTALL)
-        
-        for match in matches:
-            filename = match[0].strip()
-            content = match[1].strip()
-            files.append((filename, content))
-        
-        return files
+        parser = FileBlockParser()
+        return parser.feed(generated_code) + parser.close()
+    
+    def _write_timed(self, files: List[Tuple[str, str]], base_path: str, timer=None):
+        """写入文件，耗时计入计时器的 file_write 阶段"""
+        with timer.phase("file_write") if timer is not None else nullcontext():
+            self.write_files(files, base_path)
     
     def write_files(self, files: List[Tuple[str, str]], base_path: str):
         """将文件写入指定目录
@@ -0,0 +1,185 @@
+"""Git 操作后端
+
+GitService 的暂存、提交、切换分支通过后端执行：
+- subprocess（默认）：调用 git 命令，文件列表通过 --pathspec-from-file 一次传入，不再逐个文件启动进程
+- pygit2（可选）：通过 libgit2 在进程内操作仓库，没有启动子进程的开销，需要 pip install pygit2
+
+克隆、拉取、推送、工作树等涉及网络或仓库管理的操作仍由 GitService 调用 git 命令完成。
+"""
+import os
+from typing import List, Optional
+from utils.executor import CommandExecutor
+
+def _result(success: bool, stdout: str = "", stderr: str = "") -> dict:
+    """构造与 CommandExecutor.run_command 相同结构的结果"""
+    return {"success": success, "stdout": stdout, "stderr": stderr, "returncode": 0 if success else 1}
+
+class GitBackend:
+    """Git 后端接口，操作结果与 CommandExecutor.run_command 的返回值结构相同"""
+
+    name = ""
+
+    def status(self, repo_path: str) -> Optional[List[str]]:
+        """获取有变更（含未跟踪）的文件路径列表，失败时返回 None"""
+        raise NotImplementedError
+
+    def add(self, repo_path: str, files: Optional[List[str]] = None) -> dict:
+        """暂存指定文件，files 为空时暂存全部变更"""
+        raise NotImplementedError
+
+    def commit(self, repo_path: str, message: str) -> dict:
+        """提交暂存区，没有变更时返回失败且输出中包含 "nothing to commit" """
+        raise NotImplementedError
+
+    def commit_files(self, repo_path: str, message: str, files: Optional[List[str]] = None) -> dict:
+        """暂存并提交
+
+        Args:
+            repo_path: 仓库路径
+            message: 提交信息
+            files: 要提交的文件列表（默认为所有变更文件）
+
+        Returns:
+            执行结果
+        """
+        result = self.add(repo_path, files)
+        if not result["success"]:
+            return result
+        return self.commit(repo_path, message)
+
+    def checkout(self, repo_path: str, branch_name: str, create_new: bool = True) -> dict:
+        """切换到分支，create_new 为 True 时分支不存在则基于当前提交创建"""
+        raise NotImplementedError
+
+class SubprocessGitBackend(GitBackend):
+    """调用 git 命令的后端"""
+
+    name = "subprocess"
+
+    def status(self, repo_path: str) -> Optional[List[str]]:
+        result = CommandExecutor.run_command(
+            ["git", "status", "--porcelain", "-z", "--untracked-files=all"], cwd=repo_path
+        )
+        if not result["success"]:
+            return None
+        # 每项为 "XY path\0"，重命名和复制项后面还有一个原路径
+        paths = []
+        entries = result["stdout"].split("\0")
+        index = 0
+        while index < len(entries):
+            entry = entries[index]
+            index += 1
+            if not entry:
+                continue
+            paths.append(entry[3:])
+            if entry[0] in "RC":
+                index += 1
+        return paths
+
+    def add(self, repo_path: str, files: Optional[List[str]] = None) -> dict:
+        if not files:
+            return CommandExecutor.run_command(["git", "add", "."], cwd=repo_path)
+        # 文件列表通过标准输入一次传入，没有命令行长度限制
+        return CommandExecutor.run_command(
+            ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            cwd=repo_path, input="\0".join(files)
+        )
+
+    def commit(self, repo_path: str, message: str) -> dict:
+        return CommandExecutor.run_command(["git", "commit", "-m", message], cwd=repo_path)
+
+    def checkout(self, repo_path: str, branch_name: str, create_new: bool = True) -> dict:
+        if not create_new:
+            return CommandExecutor.run_command(["git", "checkout", branch_name], cwd=repo_path)
+        # 任务分支通常尚不存在，直接创建只需一次调用；已存在时再切换
+        result = CommandExecutor.run_command(["git", "checkout", "-b", branch_name], cwd=repo_path)
+        if not result["success"] and "already exists" in result["stderr"]:
+            result = CommandExecutor.run_command(["git", "checkout", branch_name], cwd=repo_path)
+        return result
+
+class Pygit2GitBackend(GitBackend):
+    """通过 pygit2（libgit2）在进程内操作仓库的后端"""
+
+    name = "pygit2"
+
+    def __init__(self):
+        import pygit2
+        self._pygit2 = pygit2
+
+    def _repository(self, repo_path: str):
+        return self._pygit2.Repository(repo_path)
+
+    def status(self, repo_path: str) -> Optional[List[str]]:
+        try:
+            return list(self._repository(repo_path).status())
+        except self._pygit2.GitError as e:
+            print(f"Failed to get status: {e}")
+            return None
+
+    def add(self, repo_path: str, files: Optional[List[str]] = None) -> dict:
+        try:
+            repo = self._repository(repo_path)
+            index = repo.index
+            if files:
+                for path in files:
+                    # 已删除的文件从暂存区移除
+                    if os.path.exists(os.path.join(repo.workdir, path)):
+                        index.add(path)
+                    else:
+                        index.remove(path)
+            else:
+                # 与 git add . 相同，同时移除工作区中已删除的文件
+                index.add_all()
+            index.write()
+            return _result(True)
+        except (self._pygit2.GitError, OSError, KeyError) as e:
+            return _result(False, stderr=str(e))
+
+    def commit(self, repo_path: str, message: str) -> dict:
+        try:
+            repo = self._repository(repo_path)
+            tree = repo.index.write_tree()
+            parents = [] if repo.head_is_unborn else [repo.head.target]
+            if parents and repo[parents[0]].tree_id == tree:
+                return _result(False, stdout="nothing to commit, working tree clean")
+            # 提交者取自 git 配置的 user.name / user.email
+            signature = repo.default_signature
+            oid = repo.create_commit("HEAD", signature, signature, message, tree, parents)
+            return _result(True, stdout=str(oid))
+        except (self._pygit2.GitError, KeyError) as e:
+            return _result(False, stderr=str(e))
+
+    def checkout(self, repo_path: str, branch_name: str, create_new: bool = True) -> dict:
+        try:
+            repo = self._repository(repo_path)
+            branch = repo.branches.local.get(branch_name)
+            if branch is None:
+                if not create_new:
+                    return _result(False, stderr=f"pathspec '{branch_name}' did not match any branch")
+                branch = repo.branches.local.create(branch_name, repo.head.peel(self._pygit2.Commit))
+            repo.checkout(branch)
+            return _result(True)
+        except (self._pygit2.GitError, KeyError, ValueError) as e:
+            return _result(False, stderr=str(e))
+
+GIT_BACKENDS = {
+    SubprocessGitBackend.name: SubprocessGitBackend,
+    Pygit2GitBackend.name: Pygit2GitBackend,
+}
+
+def create_git_backend(name: str = SubprocessGitBackend.name) -> GitBackend:
+    """按名称创建 Git 后端，可选依赖未安装时退回到 subprocess
+
+    Args:
+        name: 后端名称，subprocess 或 pygit2
+
+    Returns:
+        Git 后端实例
+    """
+    if name not in GIT_BACKENDS:
+        raise ValueError(f"Unsupported git backend: {name}")
+    try:
+        return GIT_BACKENDS[name]()
+    except ImportError as e:
+        print(f"Warning: git backend '{name}' is not available ({e}), falling back to subprocess")
+        return SubprocessGitBackend()
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from services.api_service import PermanentRequestError
+
+class ProgressReporter:
+    """任务进度上报
+
+    任务执行中的每次状态变化只记录到内存，由后台线程异步上报，不阻塞任务执行：
+    - 合并：记录步骤后等待 flush_interval 秒，期间的所有步骤按任务合并成一个批次上报
+    - 终态：done / failed 立即上报，调用方等待上报结果
+    - 暂存：可重试的失败（网络错误、5xx、429、熔断）的批次追加到 spool_dir/progress.jsonl，
+      之后每次上报前以及空闲时每隔 retry_interval 秒按原批次重发；后端按 batch_id 忽略重复的批次
+    - 死信：后端以 4xx 拒绝的批次（如任务已删除、请求体无效）重发也不会成功，写入 spool_dir/progress.rejected.jsonl，
+      不阻塞之后的批次
+    """
+
+    TERMINAL_STATUSES = ("done", "failed")
+    SPOOL_FILE = "progress.jsonl"
+    REJECTED_FILE = "progress.rejected.jsonl"
+
+    def __init__(self, api_service, spool_dir: str, avatar_id: Optional[str] = None, flush_interval: float = 1.0,
+                 max_batch_size: int = 100, retry_interval: float = 30):
+        self.api_service = api_service
+        self.spool_file = os.path.join(spool_dir, self.SPOOL_FILE)
+        self.rejected_file = os.path.join(spool_dir, self.REJECTED_FILE)
+        self.avatar_id = avatar_id
+        self.flush_interval = flush_interval
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.retry_interval = retry_interval
+        # 待上报的步骤：任务ID -> 步骤列表
+        self._pending: Dict[int, List[dict]] = {}
+        self._lock = threading.Lock()
+        # 上报与重发暂存批次互斥，同一任务的批次按记录顺序发出
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.sent_batches = 0
+        self.sent_events = 0
+        self.spooled_batches = 0
+        self.rejected_batches = 0
+
+    def _ensure_thread(self):
+        """启动后台上报线程"""
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+                self._thread.start()
+
+    def record(self, task_id: int, status: str, details: Optional[Dict] = None) -> bool:
+        """记录任务的一次状态变化
+
+        Args:
+            task_id: 任务ID
+            status: 任务状态
+            details: 状态详情，其中的 step 为步骤名称，没有时以状态作为步骤名称
+
+        Returns:
+            终态是否已送达后端；非终态只记录，总是返回 True
+        """
+        details = dict(details or {})
+        event = {
+            "step": details.pop("step", None) or status,
+            "status": status,
+            "details": details or None,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self._pending.setdefault(task_id, []).append(event)
+
+        if status in self.TERMINAL_STATUSES:
+            return self.flush(task_id)
+        self._ensure_thread()
+        self._wakeup.set()
+        return True
+
+    def flush(self, task_id: Optional[int] = None) -> bool:
+        """立即上报待上报的步骤
+
+        Args:
+            task_id: 只上报该任务的步骤，为空时上报所有任务
+
+        Returns:
+            是否全部送达，可重试的批次已暂存到磁盘，被拒绝的批次已写入死信文件
+        """
+        with self._lock:
+            if task_id is None:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {task_id: self._pending.pop(task_id)} if task_id in self._pending else {}
+
+        batches = []
+        for pending_task_id, events in pending.items():
+            for start in range(0, len(events), self.max_batch_size):
+                batches.append({
+                    "task_id": pending_task_id,
+                    "batch_id": uuid.uuid4().hex,
+                    "events": events[start:start + self.max_batch_size]
+                })
+
+        with self._send_lock:
+            self._replay_spool()
+            delivered = True
+            for batch in batches:
+                sent = self._send(batch)
+                if sent is False:
+                    self._spool(batch)
+                if not sent:
+                    delivered = False
+            return delivered
+
+    def _send(self, batch: dict) -> Optional[bool]:
+        """上报一个批次
+
+        Returns:
+            True 已送达；False 可重试的失败；None 后端拒绝了该批次，已写入死信文件
+        """
+        try:
+            result = self.api_service.post_task_steps(batch["task_id"], batch["events"], self.avatar_id, batch["batch_id"])
+        except PermanentRequestError as e:
+            print(f"Backend rejected progress of task {batch['task_id']} ({e}), moving it to {self.rejected_file}")
+            self._append(self.rejected_file, {**batch, "error": str(e)})
+            self.rejected_batches += 1
+            return None
+        if result is None:
+            return False
+        self.sent_batches += 1
+        self.sent_events += len(batch["events"])
+        return True
+
+    def _spool(self, batch: dict):
+        """把未送达的批次追加到暂存文件"""
+        if self._append(self.spool_file, batch):
+            self.spooled_batches += 1
+
+    def _append(self, path: str, batch: dict) -> bool:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a") as f:
+                f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+            return True
+        except OSError as e:
+            print(f"Failed to write progress of task {batch['task_id']} to {path}: {e}")
+            return False
+
+    def _replay_spool(self):
+        """按暂存顺序重发未送达的批次，遇到可重试的失败时保留该批次及之后的批次；被拒绝的批次转入死信文件"""
+        if not os.path.exists(self.spool_file):
+            return
+        try:
+            with open(self.spool_file) as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            print(f"Failed to read progress spool: {e}")
+            return
+
+        remaining = []
+        for index, line in enumerate(lines):
+            try:
+                batch = json.loads(line)
+            except json.JSONDecodeError:
+                print("Skipping malformed line in progress spool")
+                continue
+            if self._send(batch) is False:
+                remaining = lines[index:]
+                break
+
+        if remaining:
+            temp_file = f"{self.spool_file}.tmp"
+            with open(temp_file, "w") as f:
+                f.writelines(remaining)
+            os.replace(temp_file, self.spool_file)
+        else:
+            os.remove(self.spool_file)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # 有新步骤时再等待 flush_interval 秒合并突发的步骤；空闲时定期重发暂存的批次
+            if self._wakeup.wait(self.retry_interval):
+                self._stop.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to report progress: {e}")
+
+    def stats(self) -> dict:
+        """待上报的步骤数，已上报的批次与步骤数，暂存到磁盘的批次数，被后端拒绝的批次数"""
+        with self._lock:
+            pending = sum(len(events) for events in self._pending.values())
+        return {
+            "pending": pending,
+            "sent_batches": self.sent_batches,
+            "sent_events": self.sent_events,
+            "spooled_batches": self.spooled_batches,
+            "rejected_batches": self.rejected_batches
+        }
+
+    def close(self):
+        """停止后台线程并上报剩余的步骤，未送达的步骤保留在暂存文件中，下次启动后重发"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
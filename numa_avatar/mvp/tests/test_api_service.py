@@ -1,6 +1,8 @@
 import unittest
+import httpx
 from unittest.mock import patch, MagicMock
-from services.api_service import APIService
+from services.api_service import APIService, PermanentRequestError, parse_sse
+from services.circuit_breaker import CircuitBreaker
 
 class TestAPIService(unittest.TestCase):
     """测试API服务"""
@@ -17,15 +19,16 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": 1, "name": "tasks"}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        mock_client.return_value.get.return_value = mock_response
         
         # 执行测试
         result = self.api_service.get_task_topic()
         
         # 验证结果
         self.assertEqual(result, {"id": 1, "name": "tasks"})
-        mock_client.return_value.__enter__.return_value.get.assert_called_once_with(
+        mock_client.return_value.get.assert_called_once_with(
             f"{self.base_url}/api/topics/tasks",
             headers=self.api_service.headers
         )
@@ -36,15 +39,16 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"data": [{"id": 1, "data": {"task_id": 123}}]}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        mock_client.return_value.get.return_value = mock_response
         
         # 执行测试
         result = self.api_service.get_messages(1)
         
         # 验证结果
         self.assertEqual(result, {"data": [{"id": 1, "data": {"task_id": 123}}]})
-        mock_client.return_value.__enter__.return_value.get.assert_called_once_with(
+        mock_client.return_value.get.assert_called_once_with(
             f"{self.base_url}/api/topics/1/messages",
             headers=self.api_service.headers
         )
@@ -55,15 +59,16 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": 123, "title": "Test Task"}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        mock_client.return_value.get.return_value = mock_response
         
         # 执行测试
         result = self.api_service.get_task(123)
         
         # 验证结果
         self.assertEqual(result, {"id": 123, "title": "Test Task"})
-        mock_client.return_value.__enter__.return_value.get.assert_called_once_with(
+        mock_client.return_value.get.assert_called_once_with(
             f"{self.base_url}/api/tasks/123",
             headers=self.api_service.headers
         )
@@ -74,15 +79,16 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": 123, "status": "done"}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.put.return_value = mock_response
+        mock_client.return_value.put.return_value = mock_response
         
         # 执行测试
         result = self.api_service.update_task_status(123, "done")
         
         # 验证结果
         self.assertEqual(result, {"id": 123, "status": "done"})
-        mock_client.return_value.__enter__.return_value.put.assert_called_once_with(
+        mock_client.return_value.put.assert_called_once_with(
             f"{self.base_url}/api/tasks/123/status",
             headers=self.api_service.headers,
             json={"status": "done"}
@@ -94,35 +100,74 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"success": True}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.post.return_value = mock_response
+        mock_client.return_value.post.return_value = mock_response
         
         # 执行测试
         result = self.api_service.post_task_logs(123, "Test log message")
         
         # 验证结果
         self.assertEqual(result, {"success": True})
-        mock_client.return_value.__enter__.return_value.post.assert_called_once_with(
+        mock_client.return_value.post.assert_called_once_with(
             f"{self.base_url}/api/tasks/123/logs",
             headers=self.api_service.headers,
             json={"logs": "Test log message"}
         )
-    
+
+    @patch('services.api_service.httpx.Client')
+    def test_post_task_steps(self, mock_client):
+        """测试批量上报任务步骤"""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"task_id": 123, "accepted": 1, "duplicate": False}
+        mock_response.status_code = 200
+        mock_client.return_value.post.return_value = mock_response
+
+        events = [{"step": "analyzing_task", "status": "in_progress", "details": None, "timestamp": "2025-08-03T10:00:00+00:00"}]
+        result = self.api_service.post_task_steps(123, events, "avatar-1", "batch-1")
+
+        self.assertEqual(result["accepted"], 1)
+        mock_client.return_value.post.assert_called_once_with(
+            f"{self.base_url}/api/tasks/123/steps",
+            headers=self.api_service.headers,
+            json={"events": events, "avatar_id": "avatar-1", "batch_id": "batch-1"}
+        )
+
+    @patch('services.api_service.httpx.Client')
+    def test_post_task_steps_distinguishes_permanent_failures(self, mock_client):
+        """测试后端以 4xx 拒绝批次时抛出 PermanentRequestError，限流和 5xx 返回 None 以便稍后重发"""
+        self.api_service.http["retry_backoff"] = 0
+        for status_code, permanent in ((404, True), (422, True), (429, False), (500, False)):
+            mock_response = MagicMock()
+            mock_response.status_code = status_code
+            mock_response.text = "error"
+            mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+                "error", request=MagicMock(), response=mock_response
+            )
+            mock_client.return_value.post.return_value = mock_response
+            if permanent:
+                with self.assertRaises(PermanentRequestError) as context:
+                    self.api_service.post_task_steps(123, [], "avatar-1", "batch-1")
+                self.assertEqual(context.exception.status_code, status_code)
+            else:
+                self.assertIsNone(self.api_service.post_task_steps(123, [], "avatar-1", "batch-1"))
+
     @patch('services.api_service.httpx.Client')
     def test_get_application(self, mock_client):
         """测试获取应用信息"""
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.json.return_value = {"id": 1, "name": "Test App"}
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
-        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        mock_client.return_value.get.return_value = mock_response
         
         # 执行测试
         result = self.api_service.get_application(1)
         
         # 验证结果
         self.assertEqual(result, {"id": 1, "name": "Test App"})
-        mock_client.return_value.__enter__.return_value.get.assert_called_once_with(
+        mock_client.return_value.get.assert_called_once_with(
             f"{self.base_url}/api/applications/1",
             headers=self.api_service.headers
         )
@@ -133,14 +178,14 @@ class TestAPIService(unittest.TestCase):
         # 设置模拟响应
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        mock_client.return_value.get.return_value = mock_response
         
         # 执行测试
         result = self.api_service.health_check()
         
         # 验证结果
         self.assertTrue(result)
-        mock_client.return_value.__enter__.return_value.get.assert_called_once_with(
+        mock_client.return_value.get.assert_called_once_with(
             f"{self.base_url}/docs"
         )
     
@@ -148,7 +193,7 @@ class TestAPIService(unittest.TestCase):
     def test_health_check_failure(self, mock_client):
         """测试健康检查失败"""
         # 设置模拟异常
-        mock_client.return_value.__enter__.return_value.get.side_effect = Exception("Connection failed")
+        mock_client.return_value.get.side_effect = Exception("Connection failed")
         
         # 执行测试
         result = self.api_service.health_check()
@@ -156,5 +201,99 @@ class TestAPIService(unittest.TestCase):
         # 验证结果
         self.assertFalse(result)
 
+    def test_parse_sse(self):
+        """测试解析SSE消息，忽略心跳和非data字段"""
+        lines = [
+            "retry: 3000",
+            "",
+            ": keep-alive",
+            "",
+            "id: 5",
+            "event: message",
+            'data: {"id": 5, "data": {"task_id": 123}}',
+            "",
+        ]
+        
+        messages = list(parse_sse(lines))
+        
+        self.assertEqual(messages, [{"id": 5, "data": {"task_id": 123}}])
+
+def make_response(status_code, body=None):
+    """构造 httpx 响应"""
+    return httpx.Response(status_code, json=body or {}, request=httpx.Request("GET", "http://localhost:7301"))
+
+class TestAPIServiceConnection(unittest.TestCase):
+    """测试连接池、重试与熔断"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.api_service = APIService("http://localhost:7301", http={
+            "retry_backoff": 0, "circuit_failure_threshold": 3, "circuit_recovery_timeout": 60
+        })
+    
+    @patch('services.api_service.httpx.Client')
+    def test_client_is_reused(self, mock_client):
+        """测试多次请求共用同一个连接池"""
+        mock_client.return_value.get.return_value = make_response(200, {"id": 1})
+        self.api_service.get_task(1)
+        self.api_service.get_application(1)
+        
+        mock_client.assert_called_once()
+        limits = mock_client.call_args.kwargs["limits"]
+        self.assertEqual(limits.max_connections, 20)
+        self.api_service.close()
+        mock_client.return_value.close.assert_called_once()
+    
+    @patch('services.api_service.httpx.Client')
+    def test_idempotent_request_is_retried(self, mock_client):
+        """测试幂等请求遇到网关错误和连接错误时重试"""
+        mock_client.return_value.get.side_effect = [
+            make_response(503), httpx.ConnectError("refused"), make_response(200, {"id": 1})
+        ]
+        self.assertEqual(self.api_service.get_task(1), {"id": 1})
+        self.assertEqual(mock_client.return_value.get.call_count, 3)
+        self.assertEqual(self.api_service.circuit_breaker.state, CircuitBreaker.CLOSED)
+    
+    @patch('services.api_service.httpx.Client')
+    def test_non_idempotent_post_is_not_retried(self, mock_client):
+        """测试非幂等的 POST 请求不重试，可安全重试的 POST 请求重试"""
+        mock_client.return_value.post.return_value = make_response(503)
+        self.assertIsNone(self.api_service.post_task_logs(1, "log"))
+        self.assertEqual(mock_client.return_value.post.call_count, 1)
+        
+        mock_client.return_value.post.side_effect = [make_response(503), make_response(200, {"id": 1})]
+        self.assertEqual(self.api_service.heartbeat_task(1, "avatar-1"), {"id": 1})
+    
+    @patch('services.api_service.httpx.Client')
+    def test_circuit_opens_when_backend_is_down(self, mock_client):
+        """测试后端连续失败后熔断，请求直接返回 None"""
+        mock_client.return_value.get.side_effect = httpx.ConnectError("refused")
+        self.assertIsNone(self.api_service.get_task(1))
+        self.assertEqual(self.api_service.circuit_breaker.state, CircuitBreaker.OPEN)
+        calls = mock_client.return_value.get.call_count
+        
+        self.assertIsNone(self.api_service.get_task(1))
+        self.assertEqual(mock_client.return_value.get.call_count, calls)
+
+class TestCircuitBreaker(unittest.TestCase):
+    """测试熔断器"""
+    
+    def test_half_open_probe(self):
+        """测试熔断后只放行一个探测请求，成功后恢复"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        
+        # 恢复时间为 0，立即进入半开状态
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
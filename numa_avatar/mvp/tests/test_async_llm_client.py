@@ -0,0 +1,170 @@
+import unittest
+import asyncio
+import time
+import httpx
+import openai
+from unittest.mock import MagicMock
+from llm.async_llm_client import AsyncLLMClient, TokenBucket
+
+def make_response(content, total_tokens=10):
+    """构造对话补全的响应"""
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.choices[0].finish_reason = "stop"
+    response.usage.total_tokens = total_tokens
+    return response
+
+def rate_limit_error(retry_after=None):
+    """构造 429 错误"""
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.RateLimitError("Rate limit exceeded", response=response, body=None)
+
+class FakeCompletions:
+    """按预设的延迟和结果依次响应请求"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, **request):
+        self.calls += 1
+        delay, outcome = self.outcomes.pop(0) if self.outcomes else (0, None)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.active -= 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(outcome if outcome is not None else request["messages"][-1]["content"])
+
+def make_client(outcomes, **kwargs):
+    completions = FakeCompletions(outcomes)
+    fake = MagicMock()
+    fake.chat.completions = completions
+    fake.close = None
+    client = AsyncLLMClient(api_key="test-key", backoff_base=0.01, client=fake, **kwargs)
+    return client, completions
+
+class TestTokenBucket(unittest.TestCase):
+    """测试令牌桶"""
+
+    def test_waits_for_refill(self):
+        """测试令牌不足时等待补充"""
+        async def run():
+            bucket = TokenBucket(per_minute=600)  # 每秒补充 10 个
+            await bucket.acquire(600)
+            start = time.monotonic()
+            await bucket.acquire(2)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertLess(elapsed, 1)
+
+    def test_adjust_returns_unused_tokens(self):
+        """测试按实际用量归还多扣的令牌"""
+        async def run():
+            bucket = TokenBucket(per_minute=100)
+            await bucket.acquire(80)
+            bucket.adjust(50)
+            return bucket.tokens
+
+        self.assertGreaterEqual(asyncio.run(run()), 70)
+
+class TestAsyncLLMClient(unittest.TestCase):
+    """测试异步LLM客户端"""
+
+    def setUp(self):
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+
+    def client(self, outcomes, **kwargs):
+        client, completions = make_client(outcomes, **kwargs)
+        self.clients.append(client)
+        return client, completions
+
+    def request(self, content="hello"):
+        return {"model": "gpt-4", "messages": [{"role": "user", "content": content}], "max_tokens": 10}
+
+    def test_retries_rate_limit(self):
+        """测试遇到 429 时退避重试"""
+        client, completions = self.client([(0, rate_limit_error()), (0, rate_limit_error("0.05")), (0, "ok")])
+        self.assertEqual(client.complete_sync(**self.request()), ("ok", "stop"))
+        self.assertEqual(completions.calls, 3)
+        self.assertEqual(client.stats()["retries"], 2)
+        self.assertEqual(client.stats()["rate_limited"], 2)
+
+    def test_gives_up_after_max_retries(self):
+        """测试超过最大重试次数后抛出错误"""
+        client, completions = self.client([(0, rate_limit_error())] * 3, max_retries=1)
+        with self.assertRaises(openai.RateLimitError):
+            client.complete_sync(**self.request())
+        self.assertEqual(completions.calls, 2)
+
+    def test_create_stream_retries_rate_limit(self):
+        """测试建立流式请求遇到 429 时按退避重试，每次尝试都占用限流配额"""
+        client, _ = self.client([])
+        create = MagicMock(side_effect=[rate_limit_error(), iter(["chunk"])])
+        request = {**self.request(), "stream": True}
+        self.assertEqual(list(client.create_stream_sync(create, request)), ["chunk"])
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(create.call_args.kwargs, request)
+        self.assertEqual(client.stats()["requests"], 2)
+        self.assertEqual(client.stats()["retries"], 1)
+        self.assertEqual(client.stats()["rate_limited"], 1)
+
+    def test_create_stream_gives_up_after_max_retries(self):
+        """测试建立流式请求超过最大重试次数后抛出错误"""
+        client, _ = self.client([], max_retries=1)
+        create = MagicMock(side_effect=[rate_limit_error()] * 3)
+        with self.assertRaises(openai.RateLimitError):
+            client.create_stream_sync(create, {**self.request(), "stream": True})
+        self.assertEqual(create.call_count, 2)
+
+    def test_retry_delay_respects_retry_after(self):
+        """测试退避时间不少于 Retry-After"""
+        client, _ = self.client([])
+        self.assertGreaterEqual(client._retry_delay(0, rate_limit_error("3")), 3)
+        self.assertLessEqual(client._retry_delay(10, rate_limit_error()), client.backoff_max)
+
+    def test_hedged_request_returns_faster_response(self):
+        """测试主请求超时未返回时发起对冲请求，取先返回的结果"""
+        client, completions = self.client([(1, "slow"), (0, "fast")], hedge_after=0.05)
+        start = time.monotonic()
+        self.assertEqual(client.complete_sync(**self.request()).content, "fast")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(completions.calls, 2)
+        self.assertEqual(client.stats()["hedges"], 1)
+
+    def test_complete_many_runs_concurrently(self):
+        """测试多个请求并发执行，并发数受 max_concurrency 限制，按完成顺序返回"""
+        client, completions = self.client([(0.2, None), (0.05, None), (0.1, None), (0.1, None)], max_concurrency=3)
+        requests = [self.request(f"file {i}") for i in range(4)]
+        start = time.monotonic()
+        results = list(client.complete_many_sync(requests))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(index for index, _, _ in results), [0, 1, 2, 3])
+        self.assertEqual((results[0][0], results[0][1].content), (1, "file 1"))
+        self.assertTrue(all(error is None for _, _, error in results))
+        self.assertEqual(completions.max_active, 3)
+        self.assertLess(elapsed, 0.45)
+
+    def test_requests_share_rate_limit(self):
+        """测试请求数超过每分钟配额时等待"""
+        client, _ = self.client([], requests_per_minute=600)
+        client.request_bucket.tokens = 0
+        start = time.monotonic()
+        client.complete_sync(**self.request())
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import os
 import tempfile
-from unittest.mock import patch, MagicMock
+import threading
+from unittest.mock import patch, MagicMock, ANY
 from avatar import Avatar
 
 class TestAvatar(unittest.TestCase):
@@ -108,6 +109,114 @@ polling:
         self.assertEqual(app_data["id"], 1)
         self.assertIn("name", app_data)
         self.assertIn("git_repo_url", app_data)
+    
+    @patch('avatar.LLMService')
+    @patch('avatar.GitService')
+    @patch('avatar.CodeService')
+    def test_handle_message_skips_unclaimed_task(self, mock_code_service, mock_git_service, mock_llm_service):
+        """测试任务已被其他Avatar领取时跳过"""
+        avatar = Avatar(config_path=self.temp_config.name)
+        avatar.api_service = MagicMock()
+        avatar.api_service.claim_task.return_value = None
+        avatar.execute_task = MagicMock()
+        
+        avatar._handle_message({"data": {"task_id": 1}})
+        
+        avatar.api_service.claim_task.assert_called_once_with(1, avatar.avatar_id, avatar.lease_seconds)
+        avatar.execute_task.assert_not_called()
+        avatar.api_service.ack_task.assert_not_called()
+    
+    @patch('avatar.LLMService')
+    @patch('avatar.GitService')
+    @patch('avatar.CodeService')
+    def test_handle_message_acks_or_nacks(self, mock_code_service, mock_git_service, mock_llm_service):
+        """测试领取任务后按执行结果确认或报告失败"""
+        avatar = Avatar(config_path=self.temp_config.name)
+        avatar.api_service = MagicMock()
+        avatar.api_service.claim_task.return_value = {"id": 1, "status": "in_progress"}
+        
+        def execute_task(task_id, timer):
+            with timer.phase("clone"):
+                pass
+            return task_id == 1
+        avatar.execute_task = MagicMock(side_effect=execute_task)
+        avatar._handle_message({"data": {"task_id": 1}})
+        avatar._handle_message({"data": {"task_id": 2}})
+        avatar.stop()
+        
+        # 各阶段耗时随确认结果一起上报
+        avatar.api_service.ack_task.assert_called_once_with(1, avatar.avatar_id, ANY)
+        self.assertEqual(list(avatar.api_service.ack_task.call_args[0][2]), ["clone"])
+        avatar.api_service.nack_task.assert_called_once_with(2, avatar.avatar_id, "Task execution failed", timings=ANY)
+    
+    @patch('avatar.LLMService')
+    @patch('avatar.GitService')
+    @patch('avatar.CodeService')
+    def test_tasks_run_concurrently_and_drain_on_stop(self, mock_code_service, mock_git_service, mock_llm_service):
+        """测试多个任务并发执行，停止时等待执行中的任务完成"""
+        avatar = Avatar(config_path=self.temp_config.name)
+        avatar.api_service = MagicMock()
+        avatar.api_service.claim_task.side_effect = lambda task_id, *args: {"id": task_id}
+        
+        started = threading.Barrier(3)
+        release = threading.Event()
+        def execute_task(task_id, timer):
+            started.wait(timeout=5)
+            return release.wait(timeout=5)
+        avatar.execute_task = MagicMock(side_effect=execute_task)
+        
+        avatar._handle_message({"data": {"task_id": 1}})
+        avatar._handle_message({"data": {"task_id": 2}})
+        # 两个任务同时处于执行中
+        started.wait(timeout=5)
+        self.assertEqual(avatar.get_status()["running_tasks"], [1, 2])
+        
+        release.set()
+        avatar.stop()
+        self.assertEqual(avatar.get_status()["running_tasks"], [])
+        self.assertEqual(avatar.api_service.ack_task.call_count, 2)
+    
+    @patch('avatar.LLMService')
+    @patch('avatar.GitService')
+    @patch('avatar.CodeService')
+    def test_task_claimed_during_stop_is_released(self, mock_code_service, mock_git_service, mock_llm_service):
+        """测试停止过程中领取到的任务不再执行，nack 交还后端并释放槽位"""
+        avatar = Avatar(config_path=self.temp_config.name)
+        avatar.api_service = MagicMock()
+        avatar.retry_interval = 0.01
+        avatar.execute_task = MagicMock(return_value=True)
+        
+        # 领取线程的请求进行中时调用 stop()
+        claiming = threading.Event()
+        def claim_next_task(*args):
+            claiming.set()
+            avatar._stopping.wait(timeout=5)
+            return {"id": 7}
+        avatar.api_service.claim_next_task.side_effect = claim_next_task
+        stop_thread = threading.Thread(target=avatar.stop)
+        avatar._claim_thread = threading.Thread(target=avatar._claim_pending_tasks, daemon=True)
+        avatar._claim_thread.start()
+        claiming.wait(timeout=5)
+        stop_thread.start()
+        stop_thread.join(timeout=5)
+        
+        self.assertFalse(stop_thread.is_alive())
+        self.assertFalse(avatar._claim_thread.is_alive())
+        avatar.execute_task.assert_not_called()
+        avatar.api_service.nack_task.assert_called_once_with(7, avatar.avatar_id, ANY)
+        self.assertEqual(avatar.get_status()["running_tasks"], [])
+        # 槽位全部释放
+        for _ in range(avatar.max_concurrent_tasks):
+            self.assertTrue(avatar._slots.acquire(blocking=False))
+    
+    @patch('avatar.LLMService')
+    @patch('avatar.GitService')
+    @patch('avatar.CodeService')
+    def test_application_lock(self, mock_code_service, mock_git_service, mock_llm_service):
+        """测试同一应用的任务共用一把仓库锁"""
+        avatar = Avatar(config_path=self.temp_config.name)
+        self.assertIs(avatar._application_lock(1), avatar._application_lock(1))
+        self.assertIsNot(avatar._application_lock(1), avatar._application_lock(2))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -2,7 +2,7 @@ import unittest
 import os
 import tempfile
 from unittest.mock import patch, MagicMock
-from services.code_service import CodeService
+from services.code_service import CodeService, FileBlockParser, IncompleteGenerationError
 from llm.llm_service import LLMService
 
 class TestCodeService(unittest.TestCase):
@@ -44,6 +44,73 @@ END_FILE
         self.assertEqual(files[1][0], "src/utils.js")
         self.assertIn("validateEmail", files[1][1])
     
+    def test_parse_streamed_chunks(self):
+        """测试按任意分段输入时，每个文件在 END_FILE 出现时立即返回"""
+        output = "说明\nFILE: a.py\nCONTENT:\nprint('a')\n\nEND_FILE\nFILE: b.py\nCONTENT: x = 1\nEND_FILE"
+        parser = FileBlockParser()
+        files = []
+        for index, char in enumerate(output):
+            completed = parser.feed(char)
+            if completed:
+                files.extend((index, file) for file in completed)
+        files.extend((len(output), file) for file in parser.close())
+        
+        self.assertEqual([file for _, file in files], [("a.py", "print('a')"), ("b.py", "x = 1")])
+        # 第一个文件在输出到第一个 END_FILE 之后的换行时即返回
+        self.assertEqual(files[0][0], output.index("END_FILE") + len("END_FILE"))
+        self.assertIsNone(parser.pending)
+    
+    def test_generate_code_files_writes_as_files_close(self):
+        """测试流式生成时文件结束即写入，未结束的文件被跳过"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first_file = os.path.join(temp_dir, "src/a.py")
+            
+            def stream(*args):
+                yield "FILE: src/a.py\nCONTENT:\nprint('a')\nEND_FILE\n"
+                # 下一段输出到达时，第一个文件已经写入
+                self.assertTrue(os.path.exists(first_file))
+                yield "FILE: src/b.py\nCONTENT:\nprint('b')\n"
+            
+            self.mock_llm_service.generate_code_stream.side_effect = stream
+            files = self.code_service.generate_code_files("任务", base_path=temp_dir)
+            
+            self.assertEqual(files, [("src/a.py", "print('a')")])
+            self.assertFalse(os.path.exists(os.path.join(temp_dir, "src/b.py")))
+    
+    def test_generate_code_files_in_parallel(self):
+        """测试任务分析列出多个文件时并发生成，先完成的文件先写入"""
+        self.mock_llm_service.supports_parallel_generation = True
+        self.mock_llm_service.generate_files.return_value = iter([
+            ("b.py", "FILE: b.py\nCONTENT:\nb = 2\nEND_FILE"),
+            ("a.py", "FILE: a.py\nCONTENT:\na = 1\nEND_FILE"),
+            ("c.py", "FILE: c.py\nCONTENT:\nc = 3\nEND_FILE")
+        ])
+        plan = {"files_to_create": ["a.py", "b.py"], "files_to_modify": ["c.py", "a.py"]}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = self.code_service.generate_code_files("任务", "上下文", base_path=temp_dir, plan=plan)
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, "a.py")))
+        
+        self.assertEqual(files, [("b.py", "b = 2"), ("a.py", "a = 1"), ("c.py", "c = 3")])
+        self.mock_llm_service.generate_files.assert_called_once_with("任务", "上下文", ["a.py", "b.py", "c.py"])
+        self.mock_llm_service.generate_code_stream.assert_not_called()
+    
+    def test_incomplete_planned_file_fails_generation(self):
+        """测试并发生成时计划中的文件生成失败或缺少 END_FILE，等全部请求结束后报错"""
+        self.mock_llm_service.supports_parallel_generation = True
+        self.mock_llm_service.generate_files.return_value = iter([
+            ("a.py", "FILE: a.py\nCONTENT:\na = 1\nEND_FILE"),
+            ("b.py", "FILE: b.py\nCONTENT:\nb = "),
+            ("c.py", None)
+        ])
+        plan = {"files_to_create": ["a.py", "b.py", "c.py"]}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(IncompleteGenerationError) as context:
+                self.code_service.generate_code_files("任务", "上下文", base_path=temp_dir, plan=plan)
+            self.assertFalse(os.path.exists(os.path.join(temp_dir, "b.py")))
+        self.assertEqual(context.exception.filenames, ["b.py", "c.py"])
+    
     def test_write_files(self):
         """测试文件写入功能"""
         # 准备测试数据
@@ -3,8 +3,14 @@ import os
 import tempfile
 from unittest.mock import patch, MagicMock
 from services.git_service import GitService
+from services.git_backend import GIT_BACKENDS, SubprocessGitBackend, create_git_backend
 from utils.executor import CommandExecutor
 
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
 class TestGitService(unittest.TestCase):
     """测试Git服务"""
     
@@ -25,7 +31,7 @@ class TestGitService(unittest.TestCase):
         self.assertTrue(result)
         mock_executor.run_command.assert_called_once_with(["git", "clone", "https://github.com/test/repo.git", "/tmp/test_repo"])
     
-    @patch('services.git_service.CommandExecutor')
+    @patch('services.git_backend.CommandExecutor')
     def test_checkout_branch_create_new(self, mock_executor):
         """测试创建并切换分支功能"""
         # 设置模拟执行器返回值
@@ -38,7 +44,7 @@ class TestGitService(unittest.TestCase):
         self.assertTrue(result)
         mock_executor.run_command.assert_called_once_with(["git", "checkout", "-b", "feature-branch"], cwd="/tmp/test_repo")
     
-    @patch('services.git_service.CommandExecutor')
+    @patch('services.git_backend.CommandExecutor')
     def test_checkout_branch_existing(self, mock_executor):
         """测试切换到现有分支功能"""
         # 设置模拟执行器返回值
@@ -51,7 +57,7 @@ class TestGitService(unittest.TestCase):
         self.assertTrue(result)
         mock_executor.run_command.assert_called_once_with(["git", "checkout", "existing-branch"], cwd="/tmp/test_repo")
     
-    @patch('services.git_service.CommandExecutor')
+    @patch('services.git_backend.CommandExecutor')
     def test_commit_changes_all_files(self, mock_executor):
         """测试提交所有文件变更"""
         # 设置模拟执行器返回值
@@ -70,7 +76,7 @@ class TestGitService(unittest.TestCase):
         self.assertEqual(calls[1][0], (["git", "commit", "-m", "Test commit message"],))
         self.assertEqual(calls[1][1], {"cwd": "/tmp/test_repo"})
     
-    @patch('services.git_service.CommandExecutor')
+    @patch('services.git_backend.CommandExecutor')
     def test_commit_changes_specific_files(self, mock_executor):
         """测试提交特定文件"""
         # 设置模拟执行器返回值
@@ -83,13 +89,12 @@ class TestGitService(unittest.TestCase):
         self.assertTrue(result)
         # 验证调用顺序
         calls = mock_executor.run_command.call_args_list
-        self.assertEqual(len(calls), 3)
-        self.assertEqual(calls[0][0], (["git", "add", "file1.txt"],))
-        self.assertEqual(calls[0][1], {"cwd": "/tmp/test_repo"})
-        self.assertEqual(calls[1][0], (["git", "add", "file2.txt"],))
+        # 文件列表通过标准输入一次暂存
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0][0], (["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],))
+        self.assertEqual(calls[0][1], {"cwd": "/tmp/test_repo", "input": "file1.txt\0file2.txt"})
+        self.assertEqual(calls[1][0], (["git", "commit", "-m", "Test commit message"],))
         self.assertEqual(calls[1][1], {"cwd": "/tmp/test_repo"})
-        self.assertEqual(calls[2][0], (["git", "commit", "-m", "Test commit message"],))
-        self.assertEqual(calls[2][1], {"cwd": "/tmp/test_repo"})
     
     @patch('services.git_service.CommandExecutor')
     def test_push_changes(self, mock_executor):
@@ -104,5 +109,185 @@ class TestGitService(unittest.TestCase):
         self.assertTrue(result)
         mock_executor.run_command.assert_called_once_with(["git", "push", "origin", "feature-branch"], cwd="/tmp/test_repo")
 
+class TestGitWorktrees(unittest.TestCase):
+    """测试基于裸仓库镜像的任务工作树（使用本地Git仓库）"""
+    
+    def setUp(self):
+        """测试前准备：创建带一次提交的源仓库"""
+        self.temp_dir = tempfile.mkdtemp(prefix="git_worktree_test_")
+        self.origin_path = os.path.join(self.temp_dir, "origin")
+        self.mirror_path = os.path.join(self.temp_dir, "repos", "app_1.git")
+        self.git_service = GitService()
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        CommandExecutor.run_command(["git", "init", "-b", "main", self.origin_path])
+        with open(os.path.join(self.origin_path, "README.md"), "w") as f:
+            f.write("# origin\n")
+        CommandExecutor.run_command(["git", "add", "."], cwd=self.origin_path)
+        CommandExecutor.run_command(git + ["commit", "-m", "init"], cwd=self.origin_path)
+    
+    def tearDown(self):
+        """测试后清理"""
+        CommandExecutor.remove_dir(self.temp_dir)
+    
+    def test_worktrees_share_one_mirror(self):
+        """测试每个任务获得独立的工作树，回收后分支保留在镜像中"""
+        self.assertTrue(self.git_service.ensure_mirror(self.origin_path, self.mirror_path))
+        # 再次调用只拉取增量
+        self.assertTrue(self.git_service.ensure_mirror(self.origin_path, self.mirror_path))
+        
+        worktree_1 = os.path.join(self.temp_dir, "worktrees", "task_1")
+        worktree_2 = os.path.join(self.temp_dir, "worktrees", "task_2")
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree_1, "dev-1"))
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree_2, "dev-2"))
+        self.assertTrue(os.path.exists(os.path.join(worktree_1, "README.md")))
+        
+        # 一个工作树中的修改不影响另一个
+        with open(os.path.join(worktree_1, "feature.txt"), "w") as f:
+            f.write("feature\n")
+        self.assertFalse(os.path.exists(os.path.join(worktree_2, "feature.txt")))
+        branch = CommandExecutor.run_command(["git", "branch", "--show-current"], cwd=worktree_2)
+        self.assertEqual(branch["stdout"].strip(), "dev-2")
+        
+        self.assertTrue(self.git_service.remove_worktree(self.mirror_path, worktree_1))
+        self.assertFalse(os.path.exists(worktree_1))
+        # 分支保留在镜像中，再次创建工作树时直接检出
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree_1, "dev-1"))
+    
+    def test_add_worktree_after_directory_removed(self):
+        """测试工作树目录被直接删除后，仍可在同一分支上重新创建"""
+        self.assertTrue(self.git_service.ensure_mirror(self.origin_path, self.mirror_path))
+        worktree = os.path.join(self.temp_dir, "worktrees", "task_1")
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree, "dev-1"))
+        CommandExecutor.remove_dir(worktree)
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree, "dev-1"))
+    
+    def _origin_commit(self, message: str):
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        CommandExecutor.run_command(git + ["commit", "--allow-empty", "-m", message], cwd=self.origin_path)
+        return CommandExecutor.run_command(["git", "rev-parse", "HEAD"], cwd=self.origin_path)["stdout"].strip()
+    
+    def test_partial_and_shallow_mirror(self):
+        """测试首次同步使用部分克隆和浅克隆，检出时按需下载文件内容"""
+        self._origin_commit("second")
+        # 本地路径会跳过过滤器和深度，使用 file:// 协议
+        origin_url = f"file://{self.origin_path}"
+        self.assertTrue(self.git_service.ensure_mirror(origin_url, self.mirror_path, filter="blob:none", depth=1))
+        
+        filter_config = CommandExecutor.run_command(
+            ["git", "config", "remote.origin.partialclonefilter"], cwd=self.mirror_path
+        )
+        self.assertEqual(filter_config["stdout"].strip(), "blob:none")
+        shallow = CommandExecutor.run_command(["git", "rev-parse", "--is-shallow-repository"], cwd=self.mirror_path)
+        self.assertEqual(shallow["stdout"].strip(), "true")
+        
+        worktree = os.path.join(self.temp_dir, "worktrees", "task_1")
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree, "dev-1"))
+        with open(os.path.join(worktree, "README.md")) as f:
+            self.assertEqual(f.read(), "# origin\n")
+    
+    def test_sync_prunes_and_resets_to_origin(self):
+        """测试再次同步时清理远程已删除的分支，并将任务分支重置到远程最新提交"""
+        CommandExecutor.run_command(["git", "branch", "dev-1"], cwd=self.origin_path)
+        CommandExecutor.run_command(["git", "branch", "stale"], cwd=self.origin_path)
+        self.assertTrue(self.git_service.ensure_mirror(self.origin_path, self.mirror_path))
+        worktree = os.path.join(self.temp_dir, "worktrees", "task_1")
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree, "dev-1"))
+        self.assertTrue(self.git_service.remove_worktree(self.mirror_path, worktree))
+        
+        # 远程分支前进、另一个分支被删除
+        CommandExecutor.run_command(["git", "checkout", "-q", "dev-1"], cwd=self.origin_path)
+        head = self._origin_commit("remote change")
+        CommandExecutor.run_command(["git", "branch", "-D", "stale"], cwd=self.origin_path)
+        
+        self.assertTrue(self.git_service.ensure_mirror(self.origin_path, self.mirror_path))
+        self.assertFalse(self.git_service._ref_exists(self.mirror_path, "refs/remotes/origin/stale"))
+        self.assertTrue(self.git_service.add_worktree(self.mirror_path, worktree, "dev-1"))
+        result = CommandExecutor.run_command(["git", "rev-parse", "HEAD"], cwd=worktree)
+        self.assertEqual(result["stdout"].strip(), head)
+    
+    def test_ensure_mirror_invalid_url(self):
+        """测试仓库地址无效时不留下镜像目录"""
+        missing = os.path.join(self.temp_dir, "missing")
+        self.assertFalse(self.git_service.ensure_mirror(missing, self.mirror_path))
+        self.assertFalse(os.path.exists(self.mirror_path))
+
+class TestGitBackends(unittest.TestCase):
+    """测试 Git 后端的暂存、提交、切换分支（使用本地Git仓库）"""
+    
+    def setUp(self):
+        """测试前准备：创建带一次提交的仓库"""
+        self.repo_path = tempfile.mkdtemp(prefix="git_backend_test_")
+        CommandExecutor.run_command(["git", "init", "-b", "main", self.repo_path])
+        CommandExecutor.run_command(["git", "config", "user.name", "test"], cwd=self.repo_path)
+        CommandExecutor.run_command(["git", "config", "user.email", "test@example.com"], cwd=self.repo_path)
+        self._write("README.md", "# repo\n")
+        self._write("old.txt", "old\n")
+        CommandExecutor.run_command(["git", "add", "."], cwd=self.repo_path)
+        CommandExecutor.run_command(["git", "commit", "-m", "init"], cwd=self.repo_path)
+    
+    def tearDown(self):
+        """测试后清理"""
+        CommandExecutor.remove_dir(self.repo_path)
+    
+    def _write(self, path: str, content: str):
+        full_path = os.path.join(self.repo_path, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    
+    def _committed_files(self):
+        result = CommandExecutor.run_command(["git", "ls-tree", "-r", "--name-only", "HEAD"], cwd=self.repo_path)
+        return set(result["stdout"].splitlines())
+    
+    def _check_backend(self, backend):
+        git_service = GitService()
+        git_service.backend = backend
+        
+        # 新建分支后再次切换到已存在的分支
+        self.assertTrue(git_service.checkout_branch(self.repo_path, "dev-1"))
+        self.assertTrue(git_service.checkout_branch(self.repo_path, "main"))
+        self.assertTrue(git_service.checkout_branch(self.repo_path, "dev-1"))
+        self.assertFalse(git_service.checkout_branch(self.repo_path, "missing", create_new=False))
+        
+        # 指定文件（含删除的文件和带空格的路径）一次提交，其余变更不提交
+        files = [f"src/module_{i}.py" for i in range(50)] + ["docs/with space.md"]
+        for path in files:
+            self._write(path, f"# {path}\n")
+        self._write("untracked.txt", "skip\n")
+        os.remove(os.path.join(self.repo_path, "old.txt"))
+        self.assertEqual(set(backend.status(self.repo_path)), set(files) | {"untracked.txt", "old.txt"})
+        
+        self.assertTrue(git_service.commit_changes(self.repo_path, "add modules", files + ["old.txt"]))
+        self.assertEqual(self._committed_files(), set(files) | {"README.md"})
+        self.assertEqual(backend.status(self.repo_path), ["untracked.txt"])
+        branch = CommandExecutor.run_command(["git", "branch", "--show-current"], cwd=self.repo_path)
+        self.assertEqual(branch["stdout"].strip(), "dev-1")
+        
+        # 提交全部变更，之后没有变更也视为成功
+        self.assertTrue(git_service.commit_changes(self.repo_path, "add rest"))
+        self.assertIn("untracked.txt", self._committed_files())
+        self.assertEqual(backend.status(self.repo_path), [])
+        self.assertTrue(git_service.commit_changes(self.repo_path, "empty"))
+        log = CommandExecutor.run_command(["git", "log", "--format=%s"], cwd=self.repo_path)
+        self.assertEqual(log["stdout"].split("\n")[:3], ["add rest", "add modules", "init"])
+    
+    def test_subprocess_backend(self):
+        """测试 subprocess 后端"""
+        self._check_backend(SubprocessGitBackend())
+    
+    @unittest.skipUnless(pygit2, "pygit2 is not installed")
+    def test_pygit2_backend(self):
+        """测试 pygit2 后端"""
+        self._check_backend(create_git_backend("pygit2"))
+    
+    def test_create_git_backend(self):
+        """测试按名称创建后端"""
+        self.assertIsInstance(create_git_backend(), SubprocessGitBackend)
+        self.assertEqual(set(GIT_BACKENDS), {"subprocess", "pygit2"})
+        with self.assertRaises(ValueError):
+            create_git_backend("unknown")
+        with patch.dict("sys.modules", {"pygit2": None}):
+            self.assertIsInstance(create_git_backend("pygit2"), SubprocessGitBackend)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
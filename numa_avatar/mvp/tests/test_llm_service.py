@@ -1,7 +1,12 @@
 import unittest
 import os
+import tempfile
+import shutil
 from unittest.mock import patch, MagicMock
+from llm.async_llm_client import Completion
 from llm.llm_service import LLMService
+from llm.response_cache import ResponseCache
+from workspace import WorkspaceManager
 
 class TestLLMService(unittest.TestCase):
     """测试LLM服务"""
@@ -60,6 +65,122 @@ class TestLLMService(unittest.TestCase):
         # 验证结果
         self.assertIsInstance(result, str)
         self.assertGreater(len(result), 0)
+    
+    @patch('llm.llm_service.OpenAI')
+    def test_generate_code_uses_cache(self, mock_openai):
+        """测试相同请求第二次直接返回缓存的响应"""
+        create = mock_openai.return_value.chat.completions.create
+        create.side_effect = lambda **request: stream_chunks(["FILE: src/login.js\n", "CONTENT:\nok\nEND_FILE"])
+        
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = ResponseCache(WorkspaceManager(temp_dir))
+            llm_service = LLMService(api_key="test-key", model="gpt-4", temperature=0.7, cache=cache)
+            first = llm_service.generate_code("实现用户登录功能")
+            second = llm_service.generate_code("实现用户登录功能")
+            llm_service.generate_code("实现用户注册功能")
+            
+            self.assertEqual(first, second)
+            self.assertEqual(create.call_count, 2)
+            self.assertEqual(cache.stats()["hits"], 1)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    @patch('llm.llm_service.OpenAI')
+    def test_generate_files_uses_async_client(self, mock_openai):
+        """测试每个文件单独请求并发生成，已缓存的文件不再请求"""
+        async_client = MagicMock()
+        async_client.complete_many_sync.side_effect = lambda requests: iter(
+            [(index, Completion(f"FILE: {index}", "stop"), None) for index, _ in enumerate(list(requests))]
+        )
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = ResponseCache(WorkspaceManager(temp_dir))
+            llm_service = LLMService(api_key="test-key", cache=cache, async_client=async_client)
+            self.assertTrue(llm_service.supports_parallel_generation)
+            
+            results = list(llm_service.generate_files("任务", "上下文", ["a.py", "b.py"]))
+            self.assertEqual(results, [("a.py", "FILE: 0"), ("b.py", "FILE: 1")])
+            results = list(llm_service.generate_files("任务", "上下文", ["a.py", "b.py"]))
+            self.assertEqual(results, [("a.py", "FILE: 0"), ("b.py", "FILE: 1")])
+            self.assertEqual(cache.stats()["hits"], 2)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    @patch('llm.llm_service.OpenAI')
+    def test_generate_files_continues_truncated_output(self, mock_openai):
+        """测试并发生成的文件被截断时续写，仍被截断的输出不写入缓存"""
+        async_client = MagicMock()
+        async_client.complete_many_sync.side_effect = lambda requests: iter([
+            (0, Completion("FILE: a.py\nCONTENT:\nprint(", "length"), None),
+            (1, Completion("FILE: b.py\nCONTENT:\nb = ", "length"), None),
+        ])
+        # a.py 续写一次后完整，b.py 续写后仍被截断
+        continuations = {"print(": Completion("'a')\nEND_FILE", "stop"), "b = ": Completion("2", "length")}
+        async_client.complete_sync.side_effect = lambda **request: next(
+            completion for tail, completion in continuations.items() if request["messages"][-2]["content"].endswith(tail)
+        )
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = ResponseCache(WorkspaceManager(temp_dir))
+            llm_service = LLMService(api_key="test-key", cache=cache, async_client=async_client, max_continuations=1)
+            
+            results = dict(llm_service.generate_files("任务", "上下文", ["a.py", "b.py"]))
+            
+            self.assertEqual(results["a.py"], "FILE: a.py\nCONTENT:\nprint('a')\nEND_FILE")
+            self.assertEqual(results["b.py"], "FILE: b.py\nCONTENT:\nb = 2")
+            self.assertEqual(async_client.complete_sync.call_count, 2)
+            continuation = async_client.complete_sync.call_args_list[0].kwargs
+            self.assertEqual(continuation["messages"][-1]["role"], "user")
+            # 只有完整的 a.py 写入缓存
+            self.assertEqual(len([name for name in os.listdir(cache.workspace.cache_path) if name.startswith("llm_")]), 1)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    @patch('llm.llm_service.OpenAI')
+    def test_generate_code_stream_continues_truncated_output(self, mock_openai):
+        """测试输出达到 max_tokens 被截断时发起续写请求"""
+        create = mock_openai.return_value.chat.completions.create
+        create.side_effect = [
+            stream_chunks(["FILE: a.py\nCONTENT:\n", "print("], finish_reason="length"),
+            stream_chunks(["'a')\nEND_FILE"])
+        ]
+        llm_service = LLMService(api_key="test-key", max_tokens=10, max_continuations=1)
+        
+        chunks = list(llm_service.generate_code_stream("任务"))
+        
+        self.assertEqual("".join(chunks), "FILE: a.py\nCONTENT:\nprint('a')\nEND_FILE")
+        self.assertEqual(len(chunks), 3)
+        first_request, second_request = [call.kwargs for call in create.call_args_list]
+        self.assertTrue(first_request["stream"])
+        self.assertEqual(first_request["max_tokens"], 10)
+        # 续写请求带上已生成的内容
+        self.assertEqual(second_request["messages"][-2], {"role": "assistant", "content": "FILE: a.py\nCONTENT:\nprint("})
+
+    @patch('llm.llm_service.OpenAI')
+    def test_generate_code_stream_retries_through_async_client(self, mock_openai):
+        """测试配置了异步客户端时流式请求经由其限流与重试发起，并关闭 SDK 自带的重试"""
+        async_client = MagicMock()
+        async_client.create_stream_sync.side_effect = lambda create, request: stream_chunks(["FILE: a.py\nCONTENT:\nok\nEND_FILE"])
+        llm_service = LLMService(api_key="test-key", async_client=async_client)
+        
+        chunks = list(llm_service.generate_code_stream("任务"))
+        
+        self.assertEqual(chunks, ["FILE: a.py\nCONTENT:\nok\nEND_FILE"])
+        create, request = async_client.create_stream_sync.call_args.args
+        self.assertTrue(request["stream"])
+        mock_openai.return_value.with_options.assert_called_once_with(max_retries=0)
+        self.assertIs(create, mock_openai.return_value.with_options.return_value.chat.completions.create)
+
+def stream_chunks(contents, finish_reason="stop"):
+    """构造流式补全的响应片段"""
+    chunks = []
+    for index, content in enumerate(contents):
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = content
+        chunk.choices[0].finish_reason = finish_reason if index == len(contents) - 1 else None
+        chunks.append(chunk)
+    return iter(chunks)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
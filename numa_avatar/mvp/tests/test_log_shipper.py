@@ -0,0 +1,151 @@
+import unittest
+import gzip
+import time
+import tempfile
+import shutil
+import threading
+from services.api_service import PermanentRequestError
+from services.log_shipper import LogShipper
+from utils.logger import Logger
+
+class FakeAPIService:
+    """按（日志流标识, 序号）记录收到的块，failures 为剩余的失败次数，rejected_tasks 中的任务被后端拒绝（404）"""
+
+    def __init__(self):
+        self.failures = 0
+        self.rejected_tasks = set()
+        self.chunks = {}
+        self.lock = threading.Lock()
+
+    def post_task_log_chunk(self, task_id, stream, seq, data):
+        if task_id in self.rejected_tasks:
+            raise PermanentRequestError(404, "开发任务未找到")
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                return None
+            self.chunks.setdefault((task_id, stream, seq), data)
+        return {"task_id": task_id, "seq": seq}
+
+    def text(self, task_id):
+        """按序号拼接任务收到的日志"""
+        keys = sorted(key for key in self.chunks if key[0] == task_id)
+        return "".join(gzip.decompress(self.chunks[key]).decode("utf-8") for key in keys)
+
+class TestLogShipper(unittest.TestCase):
+    """测试任务日志上报"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.api_service = FakeAPIService()
+        self.shippers = []
+
+    def tearDown(self):
+        """测试后清理"""
+        for shipper in self.shippers:
+            shipper.close()
+
+    def shipper(self, **kwargs):
+        shipper = LogShipper(self.api_service, **kwargs)
+        self.shippers.append(shipper)
+        return shipper
+
+    def test_batches_lines_into_compressed_chunks(self):
+        """测试日志行合并成块并压缩，任务结束时上报剩余的日志"""
+        shipper = self.shipper(max_chunk_bytes=1024, flush_interval=10)
+        lines = [f"2025-08-03 10:00:00 - INFO - build step {i} ok" for i in range(200)]
+        for line in lines:
+            shipper.write(1, line)
+        self.assertTrue(shipper.finish_task(1))
+
+        self.assertEqual(self.api_service.text(1), "".join(line + "\n" for line in lines))
+        # 按大小分块，序号从 0 连续递增
+        seqs = sorted(seq for _, _, seq in self.api_service.chunks)
+        self.assertGreater(len(seqs), 1)
+        self.assertEqual(seqs, list(range(len(seqs))))
+        self.assertLess(len(seqs), len(lines) // 10)
+        stats = shipper.stats()
+        self.assertLess(stats["sent_bytes"], stats["raw_bytes"])
+        self.assertEqual(stats["pending_chunks"], 0)
+
+    def test_ships_in_background_after_interval(self):
+        """测试未写满的缓存每隔 flush_interval 秒上报"""
+        shipper = self.shipper(flush_interval=0.05)
+        shipper.write(1, "Task analysis: {}")
+        deadline = time.monotonic() + 2
+        while not self.api_service.chunks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.api_service.text(1), "Task analysis: {}\n")
+
+    def test_failed_chunk_is_resent_with_same_sequence(self):
+        """测试上报失败的块按原序号重发，之后的块不会先送达"""
+        shipper = self.shipper(max_chunk_bytes=10, flush_interval=10)
+        self.api_service.failures = 100
+        shipper.write(1, "first line")
+        shipper.write(1, "second line")
+        self.assertFalse(shipper.flush(1))
+        self.assertEqual(self.api_service.chunks, {})
+        self.assertEqual(shipper.stats()["pending_chunks"], 2)
+
+        self.api_service.failures = 0
+        self.assertTrue(shipper.finish_task(1))
+        self.assertEqual(sorted(seq for _, _, seq in self.api_service.chunks), [0, 1])
+        self.assertEqual(self.api_service.text(1), "first line\nsecond line\n")
+        # 全部送达后结束日志流，再次执行任务时使用新的日志流
+        shipper.write(1, "retry")
+        shipper.flush(1)
+        self.assertEqual(len({stream for _, stream, _ in self.api_service.chunks}), 2)
+
+    def test_rejected_chunks_are_dropped(self):
+        """测试被后端拒绝的块直接丢弃，不阻塞之后的块，任务结束后移除日志流"""
+        shipper = self.shipper(max_chunk_bytes=1, flush_interval=10)
+        self.api_service.rejected_tasks.add(9)
+        shipper.write(9, "line for a deleted task")
+        shipper.write(1, "line for a live task")
+        self.assertTrue(shipper.finish_task(9))
+        self.assertTrue(shipper.finish_task(1))
+        self.assertEqual(self.api_service.text(1), "line for a live task\n")
+        stats = shipper.stats()
+        self.assertEqual((stats["rejected_chunks"], stats["pending_chunks"], stats["streams"]), (1, 0, 0))
+
+    def test_finished_stream_is_removed_after_retry(self):
+        """测试任务结束时未送达的块稍后送达后移除日志流"""
+        shipper = self.shipper(flush_interval=10)
+        self.api_service.failures = 100
+        shipper.write(1, "pushed")
+        self.assertFalse(shipper.finish_task(1))
+        self.assertEqual(shipper.stats()["streams"], 1)
+
+        self.api_service.failures = 0
+        self.assertTrue(shipper.flush())
+        self.assertEqual(self.api_service.text(1), "pushed\n")
+        self.assertEqual(shipper.stats()["streams"], 0)
+
+    def test_drops_oldest_chunks_when_backlog_is_full(self):
+        """测试未送达的块超过上限时丢弃最早的块"""
+        shipper = self.shipper(max_chunk_bytes=1, flush_interval=10, max_pending_chunks=2)
+        self.api_service.failures = 100
+        for i in range(4):
+            shipper.write(1, f"line {i}")
+        self.assertEqual(shipper.stats()["dropped_chunks"], 2)
+        self.api_service.failures = 0
+        shipper.flush(1)
+        self.assertEqual(self.api_service.text(1), "line 2\nline 3\n")
+
+    def test_logger_feeds_shipper(self):
+        """测试 Logger.task_log 同时写入本地文件并交给上报器"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            shipper = self.shipper(flush_interval=10)
+            logger = Logger("test_log_shipper", temp_dir, shipper=shipper)
+            logger.task_log("7", "Generated 3 files")
+            logger.task_log("7", "Push failed", "error")
+            shipper.finish_task(7)
+            text = self.api_service.text(7)
+            self.assertIn("INFO - Generated 3 files\n", text)
+            self.assertIn("ERROR - Push failed\n", text)
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+import httpx
 from unittest.mock import patch, MagicMock, call
 from services.message_service import MessageService
 from services.api_service import APIService
@@ -124,5 +127,85 @@ class TestMessageService(unittest.TestCase):
         # 验证回调函数没有被调用
         callback.assert_not_called()
 
+    @patch('services.message_service.time.sleep')
+    def test_start_streaming_resumes_from_offset(self, mock_sleep):
+        """测试订阅流断开后从已处理的偏移量重连"""
+        self.message_service.subscribed = True
+        self.message_service.topic_id = 1
+        
+        def stream(topic_id, after):
+            if after == 0:
+                yield {"id": 1, "data": {"task_id": 123}}
+                yield {"id": 2, "data": {"task_id": 456}}
+                raise httpx.ReadTimeout("stream timed out")
+            # 第二次连接从偏移量2续传，随后结束测试
+            self.assertEqual(after, 2)
+            raise KeyboardInterrupt()
+            yield
+        
+        self.api_service.stream_messages.side_effect = stream
+        callback = MagicMock()
+        
+        self.message_service.start_streaming(callback)
+        
+        callback.assert_has_calls([
+            call({"id": 1, "data": {"task_id": 123}}),
+            call({"id": 2, "data": {"task_id": 456}})
+        ])
+        self.assertEqual(self.api_service.stream_messages.call_count, 2)
+        mock_sleep.assert_called_once_with(1)
+    
+    @patch('services.message_service.time.sleep')
+    def test_start_streaming_backs_off_on_errors(self, mock_sleep):
+        """测试连接失败时按指数退避重连"""
+        self.message_service.subscribed = True
+        self.message_service.topic_id = 1
+        self.api_service.stream_messages.side_effect = httpx.ConnectError("connection refused")
+        mock_sleep.side_effect = [None, None, None, KeyboardInterrupt()]
+        
+        self.message_service.start_streaming(MagicMock())
+        
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 2, 4, 8])
+    
+    @patch('services.message_service.time.sleep')
+    def test_start_streaming_backs_off_on_empty_streams(self, mock_sleep):
+        """测试订阅流不返回消息即正常关闭时同样按指数退避重连，收到消息后退避时间重置"""
+        self.message_service.subscribed = True
+        self.message_service.topic_id = 1
+        streams = iter([[], [], [{"id": 1, "data": {"task_id": 123}}], []])
+        self.api_service.stream_messages.side_effect = lambda topic_id, after: iter(next(streams))
+        mock_sleep.side_effect = [None, None, None, KeyboardInterrupt()]
+        
+        self.message_service.start_streaming(MagicMock())
+        
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 2, 1, 2])
+    
+    def test_start_streaming_falls_back_to_polling(self):
+        """测试后端不支持订阅流时退回到轮询"""
+        self.message_service.subscribed = True
+        self.message_service.topic_id = 1
+        response = httpx.Response(404, request=httpx.Request("GET", "http://localhost/api/topics/1/stream"))
+        self.api_service.stream_messages.side_effect = httpx.HTTPStatusError(
+            "not found", request=response.request, response=response
+        )
+        callback = MagicMock()
+        
+        with patch.object(self.message_service, 'start_polling') as mock_polling:
+            self.message_service.start_streaming(callback)
+        
+        mock_polling.assert_called_once_with(callback)
+    
+    def test_offset_is_persisted(self):
+        """测试已处理消息的偏移量在重启后恢复"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            offset_file = os.path.join(temp_dir, "tasks_offset")
+            service = MessageService(self.api_service, offset_file=offset_file)
+            self.assertEqual(service.offset, 0)
+            
+            service._save_offset(42)
+            
+            restarted = MessageService(self.api_service, offset_file=offset_file)
+            self.assertEqual(restarted.offset, 42)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import unittest
+import time
+from utils.phase_timer import PhaseTimer
+
+class TestPhaseTimer(unittest.TestCase):
+    """测试任务阶段计时"""
+    
+    def test_repeated_phases_accumulate(self):
+        """测试同名阶段的耗时累加，按首次执行的顺序返回"""
+        timer = PhaseTimer()
+        for name in ("clone", "analysis", "clone"):
+            with timer.phase(name):
+                time.sleep(0.02)
+        timings = timer.as_dict()
+        self.assertEqual(list(timings), ["clone", "analysis"])
+        self.assertGreaterEqual(timings["clone"], 0.04)
+        self.assertLessEqual(sum(timings.values()), timer.total)
+    
+    def test_nested_phase_is_excluded_from_outer(self):
+        """测试嵌套阶段的耗时只计入内层阶段"""
+        timer = PhaseTimer()
+        with timer.phase("generation"):
+            time.sleep(0.02)
+            with timer.phase("file_write"):
+                time.sleep(0.05)
+        timings = timer.as_dict()
+        self.assertGreaterEqual(timings["file_write"], 0.05)
+        self.assertLess(timings["generation"], 0.05)
+    
+    def test_failed_phase_is_recorded(self):
+        """测试阶段内抛出异常时同样记录耗时"""
+        timer = PhaseTimer()
+        with self.assertRaises(RuntimeError):
+            with timer.phase("push"):
+                raise RuntimeError("push rejected")
+        self.assertIn("push", timer.as_dict())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import json
+import os
+import time
+import tempfile
+import shutil
+import threading
+from services.api_service import PermanentRequestError
+from services.progress_reporter import ProgressReporter
+
+class FakeAPIService:
+    """记录上报的批次，available 为 False 时模拟后端不可达，rejected_tasks 中的任务被后端拒绝（404）"""
+
+    def __init__(self):
+        self.available = True
+        self.rejected_tasks = set()
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def post_task_steps(self, task_id, events, avatar_id=None, batch_id=None):
+        if not self.available:
+            return None
+        if task_id in self.rejected_tasks:
+            raise PermanentRequestError(404, "开发任务未找到")
+        with self.lock:
+            self.batches.append({"task_id": task_id, "events": events, "avatar_id": avatar_id, "batch_id": batch_id})
+        return {"task_id": task_id, "accepted": len(events), "duplicate": False}
+
+    def steps(self, task_id):
+        return [event["step"] for batch in self.batches if batch["task_id"] == task_id for event in batch["events"]]
+
+class TestProgressReporter(unittest.TestCase):
+    """测试任务进度上报"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.api_service = FakeAPIService()
+        self.reporters = []
+
+    def tearDown(self):
+        """测试后清理"""
+        for reporter in self.reporters:
+            reporter.close()
+        shutil.rmtree(self.temp_dir)
+
+    def reporter(self, **kwargs):
+        reporter = ProgressReporter(self.api_service, self.temp_dir, "avatar-1", **kwargs)
+        self.reporters.append(reporter)
+        return reporter
+
+    def wait_for(self, condition, timeout=2):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_coalesces_steps_into_one_batch(self):
+        """测试合并时间窗口内的步骤，异步上报为一个批次"""
+        reporter = self.reporter(flush_interval=0.1)
+        for step in ["getting_task_info", "getting_application_info", "syncing_repository"]:
+            self.assertTrue(reporter.record(1, "in_progress", {"step": step}))
+        self.assertEqual(self.api_service.batches, [])
+
+        self.assertTrue(self.wait_for(lambda: self.api_service.batches))
+        self.assertEqual(len(self.api_service.batches), 1)
+        batch = self.api_service.batches[0]
+        self.assertEqual(batch["avatar_id"], "avatar-1")
+        self.assertEqual(self.api_service.steps(1), ["getting_task_info", "getting_application_info", "syncing_repository"])
+        self.assertIsNone(batch["events"][0]["details"])
+        self.assertEqual(reporter.stats()["sent_events"], 3)
+
+    def test_terminal_status_flushes_immediately(self):
+        """测试终态立即上报，并带上该任务尚未上报的步骤"""
+        reporter = self.reporter(flush_interval=10)
+        reporter.record(1, "in_progress", {"step": "pushing_changes"})
+        reporter.record(2, "in_progress", {"step": "analyzing_task"})
+        self.assertTrue(reporter.record(1, "failed", {"error": "Failed to push changes"}))
+
+        self.assertEqual(self.api_service.steps(1), ["pushing_changes", "failed"])
+        self.assertEqual(self.api_service.batches[0]["events"][-1]["details"], {"error": "Failed to push changes"})
+        # 其他任务的步骤仍等待合并
+        self.assertEqual(self.api_service.steps(2), [])
+        self.assertEqual(reporter.stats()["pending"], 1)
+
+    def test_splits_large_batches(self):
+        """测试超过批次上限时拆分为多个批次"""
+        reporter = self.reporter(max_batch_size=2)
+        for index in range(5):
+            reporter.record(1, "in_progress", {"step": f"step_{index}"})
+        reporter.flush()
+        self.assertEqual([len(batch["events"]) for batch in self.api_service.batches], [2, 2, 1])
+        self.assertEqual(len({batch["batch_id"] for batch in self.api_service.batches}), 3)
+
+    def test_spools_when_backend_unreachable(self):
+        """测试后端不可达时暂存到磁盘，恢复后按原批次重发，重启后仍会重发"""
+        self.api_service.available = False
+        reporter = self.reporter()
+        reporter.record(1, "in_progress", {"step": "committing_changes"})
+        self.assertFalse(reporter.record(1, "done", {"duration": 1.5}))
+        reporter.record(2, "failed", {"error": "No files generated"})
+        self.assertTrue(os.path.exists(reporter.spool_file))
+        self.assertEqual(reporter.stats()["spooled_batches"], 2)
+
+        # 模拟重启：新的上报器重发上次暂存的批次
+        self.api_service.available = True
+        restarted = self.reporter()
+        self.assertTrue(restarted.flush())
+        self.assertEqual(self.api_service.steps(1), ["committing_changes", "done"])
+        self.assertEqual(self.api_service.steps(2), ["failed"])
+        self.assertFalse(os.path.exists(reporter.spool_file))
+
+    def test_rejected_batch_does_not_block_spool(self):
+        """测试被后端拒绝的批次转入死信文件，不阻塞之后暂存的批次"""
+        self.api_service.available = False
+        reporter = self.reporter()
+        reporter.record(9, "failed", {"error": "Task deleted"})
+        reporter.record(1, "done", {"duration": 1.5})
+        self.assertEqual(reporter.stats()["spooled_batches"], 2)
+
+        self.api_service.available = True
+        self.api_service.rejected_tasks.add(9)
+        self.assertTrue(reporter.flush())
+        self.assertEqual(self.api_service.steps(1), ["done"])
+        self.assertFalse(os.path.exists(reporter.spool_file))
+        self.assertEqual(reporter.stats()["rejected_batches"], 1)
+        with open(reporter.rejected_file) as f:
+            rejected = [json.loads(line) for line in f]
+        self.assertEqual([batch["task_id"] for batch in rejected], [9])
+        self.assertIn("404", rejected[0]["error"])
+
+        # 新记录的批次被拒绝时不暂存，也不计为送达
+        self.assertFalse(reporter.record(9, "done"))
+        self.assertFalse(os.path.exists(reporter.spool_file))
+
+    def test_close_flushes_pending_steps(self):
+        """测试关闭时上报剩余的步骤"""
+        reporter = self.reporter(flush_interval=10)
+        reporter.record(1, "in_progress", {"step": "running_tests"})
+        reporter.close()
+        self.assertEqual(self.api_service.steps(1), ["running_tests"])
+
+if __name__ == '__main__':
+    unittest.main()
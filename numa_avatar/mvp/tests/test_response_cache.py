@@ -0,0 +1,98 @@
+import unittest
+import os
+import time
+import tempfile
+import shutil
+from llm.response_cache import ResponseCache
+from workspace import WorkspaceManager
+
+class TestResponseCache(unittest.TestCase):
+    """测试LLM响应缓存"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.workspace = WorkspaceManager(os.path.join(self.temp_dir, "workspace"))
+        self.request = {
+            "model": "gpt-4",
+            "temperature": 0.7,
+            "messages": [{"role": "user", "content": "实现用户登录功能"}]
+        }
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_depends_on_request(self):
+        """测试缓存键由模型、温度和消息决定"""
+        cache = ResponseCache(self.workspace)
+        key = cache.make_key(self.request)
+        self.assertEqual(key, cache.make_key(dict(reversed(list(self.request.items())))))
+        self.assertNotEqual(key, cache.make_key({**self.request, "temperature": 0.3}))
+        self.assertNotEqual(key, cache.make_key({**self.request, "model": "gpt-4o"}))
+        self.assertTrue(key.startswith("llm_"))
+
+    def test_get_and_put(self):
+        """测试写入后命中，重启后仍然有效"""
+        cache = ResponseCache(self.workspace)
+        key = cache.make_key(self.request)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "FILE: app.py")
+        self.assertEqual(cache.get(key), "FILE: app.py")
+        self.assertTrue(os.path.exists(self.workspace.get_cache_file(key)))
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreater(stats["bytes"], 0)
+
+        reopened = ResponseCache(self.workspace)
+        self.assertEqual(reopened.get(key), "FILE: app.py")
+        self.assertEqual(reopened.stats()["bytes"], stats["bytes"])
+
+    def test_expired_entry_is_removed(self):
+        """测试过期的响应视为未命中并删除"""
+        cache = ResponseCache(self.workspace, ttl_seconds=60)
+        key = cache.make_key(self.request)
+        cache.put(key, "old")
+        cache.ttl_seconds = -1
+        self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(self.workspace.get_cache_file(key)))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_evicts_least_recently_used(self):
+        """测试超过总大小上限时淘汰最久未使用的响应"""
+        cache = ResponseCache(self.workspace, max_bytes=10 ** 6)
+        keys = [cache.make_key({**self.request, "messages": [{"role": "user", "content": str(i)}]}) for i in range(3)]
+        for index, key in enumerate(keys):
+            cache.put(key, "x" * 100)
+            # 固定访问时间，避免依赖文件系统的时间精度
+            path = self.workspace.get_cache_file(key)
+            os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+        # 访问第一个响应后，最久未使用的是第二个
+        self.assertIsNotNone(cache.get(keys[0]))
+
+        # 重新写入的响应中 created_at 的位数可能不同，留出余量保证需要淘汰一个响应
+        cache.max_bytes = cache.stats()["bytes"] - 50
+        cache.put(keys[2], "x" * 100)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        # 其他缓存文件不参与淘汰
+        with open(self.workspace.get_cache_file("other"), "w") as f:
+            f.write("y" * 1000)
+        cache.max_bytes = 0
+        cache.put(keys[1], "x")
+        self.assertTrue(os.path.exists(self.workspace.get_cache_file("other")))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_max_temperature(self):
+        """测试只缓存温度不高于上限的请求"""
+        self.assertTrue(ResponseCache(self.workspace).is_cacheable(self.request))
+        cache = ResponseCache(self.workspace, max_temperature=0.3)
+        self.assertFalse(cache.is_cacheable(self.request))
+        self.assertTrue(cache.is_cacheable({**self.request, "temperature": 0.3}))
+
+if __name__ == '__main__':
+    unittest.main()
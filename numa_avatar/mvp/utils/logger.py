@@ -6,10 +6,12 @@ from typing import Optional
 class Logger:
     """增强的日志服务类"""
     
-    def __init__(self, name: str = "avatar", log_dir: str = "./logs", level: int = logging.INFO):
+    def __init__(self, name: str = "avatar", log_dir: str = "./logs", level: int = logging.INFO, shipper=None):
         self.name = name
         self.log_dir = log_dir
         self.level = level
+        # 任务日志上报器（services.log_shipper.LogShipper），task_log 写入的日志同时交给它上报到后端
+        self.shipper = shipper
         
         # 确保日志目录存在
         if not os.path.exists(log_dir):
@@ -99,6 +101,11 @@ class Logger:
             task_logger.critical(message)
         else:
             task_logger.info(message)
+        
+        # 同时交给上报器，按块压缩后上报到后端
+        if self.shipper is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.shipper.write(task_id, f"{timestamp} - {level.upper()} - {message}")
     
     def get_log_file_path(self, task_id: Optional[str] = None) -> str:
         """获取日志文件路径"""
@@ -10,10 +10,13 @@ class WorkspaceManager:
     def __init__(self, workspace_path: str):
         self.workspace_path = workspace_path
         self.repos_path = os.path.join(workspace_path, "repos")
+        self.worktrees_path = os.path.join(workspace_path, "worktrees")
         self.temp_path = os.path.join(workspace_path, "temp")
         self.logs_path = os.path.join(workspace_path, "logs")
         self.cache_path = os.path.join(workspace_path, "cache")
         self.config_path = os.path.join(workspace_path, "config")
+        # 后端不可达时暂存待上报的数据
+        self.spool_path = os.path.join(workspace_path, "spool")
         
         # 初始化工作区目录
         self._init_workspace()
@@ -23,10 +26,12 @@ class WorkspaceManager:
         dirs = [
             self.workspace_path,
             self.repos_path,
+            self.worktrees_path,
             self.temp_path,
             self.logs_path,
             self.cache_path,
-            self.config_path
+            self.config_path,
+            self.spool_path
         ]
         
         for dir_path in dirs:
@@ -48,6 +53,14 @@ class WorkspaceManager:
         """获取仓库路径"""
         return os.path.join(self.repos_path, repo_id)
     
+    def get_mirror_path(self, repo_id: str) -> str:
+        """获取应用裸仓库镜像的路径，各任务的工作树共享其中的对象"""
+        return os.path.join(self.repos_path, f"{repo_id}.git")
+    
+    def get_worktree_path(self, task_id: str) -> str:
+        """获取任务工作树的路径"""
+        return os.path.join(self.worktrees_path, f"task_{task_id}")
+    
     def get_temp_path(self, task_id: str) -> str:
         """获取任务临时路径"""
         task_temp_path = os.path.join(self.temp_path, f"task_{task_id}")
@@ -83,6 +96,14 @@ class WorkspaceManager:
                     if os.path.isdir(item_path):
                         shutil.rmtree(item_path)
     
+    def cleanup_worktrees(self):
+        """删除所有任务工作树目录，镜像中的记录在下次创建工作树时清理"""
+        if os.path.exists(self.worktrees_path):
+            for item in os.listdir(self.worktrees_path):
+                item_path = os.path.join(self.worktrees_path, item)
+                if os.path.isdir(item_path):
+                    shutil.rmtree(item_path)
+    
     def get_workspace_info(self) -> dict:
         """获取工作区信息"""
         workspace_info_file = os.path.join(self.workspace_path, "workspace.json")
@@ -1,10 +1,46 @@
+import json
+import random
+import threading
+import time
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from config import Config
+from services.circuit_breaker import CircuitBreaker
 from utils.logger import Logger
 
+# 连接池与重试的默认配置，可通过 backend.http 覆盖
+HTTP_DEFAULTS = {
+    "timeout": 10.0,  # 读写超时（秒）
+    "connect_timeout": 5.0,  # 建立连接超时（秒）
+    "max_connections": 20,  # 连接池最大连接数
+    "max_keepalive_connections": 10,  # 保持空闲的长连接数
+    "keepalive_expiry": 30.0,  # 空闲长连接的保留时间（秒）
+    "http2": False,  # 是否启用 HTTP/2，需要 pip install httpx[http2]
+    "max_retries": 3,  # 幂等请求遇到连接错误或 502/503/504 时的重试次数
+    "retry_backoff": 0.5,  # 重试退避的初始间隔（秒），指数增长并带抖动
+    "circuit_failure_threshold": 5,  # 连续失败多少次后熔断
+    "circuit_recovery_timeout": 30.0,  # 熔断后多少秒放行探测请求
+}
+
+# 可重试的响应状态码：后端暂时不可用
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+# 不表示请求本身有误的 4xx：请求超时、限流，稍后重发可能成功
+TRANSIENT_CLIENT_STATUS_CODES = {408, 429}
+
+class PermanentRequestError(Exception):
+    """后端以 4xx 拒绝了请求（如任务不存在、请求体无效），原样重发不会成功"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"HTTP {status_code} - {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
 class APIService:
-    """API服务类，用于与后端通信"""
+    """API服务类，用于与后端通信
+    
+    所有请求共用一个带连接池的 httpx.Client，长连接在请求之间复用；
+    幂等请求遇到连接错误或网关错误时退避重试，后端连续失败时熔断，请求直接返回 None。
+    """
     
     def __init__(self, config: Config):
         self.config = config
@@ -15,38 +51,127 @@ class APIService:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        # 订阅流的读超时（秒），应大于后端心跳间隔，超时视为连接已失效
+        self.stream_read_timeout = config.get("stream.read_timeout", 60)
+        self.http = {**HTTP_DEFAULTS, **(config.get("backend.http") or {})}
+        self.circuit_breaker = CircuitBreaker(
+            self.http["circuit_failure_threshold"], self.http["circuit_recovery_timeout"]
+        )
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    def _get_client(self) -> httpx.Client:
+        """获取共用的 HTTP 客户端，首次使用时创建"""
+        with self._client_lock:
+            if self._client is None:
+                options = dict(
+                    timeout=httpx.Timeout(self.http["timeout"], connect=self.http["connect_timeout"]),
+                    limits=httpx.Limits(
+                        max_connections=self.http["max_connections"],
+                        max_keepalive_connections=self.http["max_keepalive_connections"],
+                        keepalive_expiry=self.http["keepalive_expiry"]
+                    )
+                )
+                try:
+                    self._client = httpx.Client(http2=self.http["http2"], **options)
+                except ImportError:
+                    self.logger.warning("HTTP/2 requires the h2 package (pip install httpx[http2]), using HTTP/1.1")
+                    self._client = httpx.Client(**options)
+            return self._client
+    
+    def close(self):
+        """关闭连接池"""
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+    
+    def _send(self, method: str, url: str, data: Optional[Dict[Any, Any]] = None,
+              content: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        client = self._get_client()
+        if method == "get":
+            return client.get(url, headers=self.headers)
+        elif method == "post" and content is not None:
+            return client.post(url, headers={**self.headers, **(headers or {})}, content=content)
+        elif method == "post":
+            return client.post(url, headers=self.headers, json=data)
+        elif method == "put":
+            return client.put(url, headers=self.headers, json=data)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict[Any, Any]] = None) -> Optional[Dict[Any, Any]]:
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict[Any, Any]] = None,
+                      idempotent: Optional[bool] = None, content: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None, raise_permanent: bool = False) -> Optional[Dict[Any, Any]]:
         """发送HTTP请求
         
         Args:
             method: HTTP方法
             endpoint: API端点
             data: 请求数据
+            idempotent: 请求是否可以安全重试，默认 GET/PUT 可以重试，POST 不重试
+            content: 非 JSON 的请求体（仅 POST），此时忽略 data
+            headers: 随 content 发送的额外请求头
+            raise_permanent: 后端以 4xx（408、429 除外）拒绝请求时抛出 PermanentRequestError，
+                而不是返回 None，供需要区分可重试失败的调用方使用
             
         Returns:
             响应数据或None
+        Raises:
+            PermanentRequestError: raise_permanent 为 True 且请求被后端拒绝
         """
         url = f"{self.base_url}{endpoint}"
-        try:
-            with httpx.Client() as client:
-                if method.lower() == "get":
-                    response = client.get(url, headers=self.headers)
-                elif method.lower() == "post":
-                    response = client.post(url, headers=self.headers, json=data)
-                elif method.lower() == "put":
-                    response = client.put(url, headers=self.headers, json=data)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
+        method = method.lower()
+        if idempotent is None:
+            idempotent = method in ("get", "put")
+        retries = self.http["max_retries"] if idempotent else 0
+        
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                self.logger.error(f"Backend unavailable (circuit open), skipping request to {url}")
+                return None
+            try:
+                response = self._send(method, url, data, content, headers)
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if attempt < retries:
+                    attempt = self._backoff(attempt, e)
+                    continue
+                self.logger.error(f"HTTP error occurred: {e}")
+                return None
+            except Exception as e:
+                self.circuit_breaker.record_failure()
+                self.logger.error(f"Error making request to {url}: {e}")
+                return None
+            
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < retries:
+                    attempt = self._backoff(attempt, f"HTTP {response.status_code}")
+                    continue
+            else:
+                self.circuit_breaker.record_success()
+            
+            if (raise_permanent and 400 <= response.status_code < 500
+                    and response.status_code not in TRANSIENT_CLIENT_STATUS_CODES):
+                raise PermanentRequestError(response.status_code, response.text)
+            try:
                 response.raise_for_status()
                 return response.json()
-        except httpx.HTTPError as e:
-            self.logger.error(f"HTTP error occurred: {e}")
-            return None
-        except Exception as e:
-            self.logger.error(f"Error making request to {url}: {e}")
-            return None
+            except httpx.HTTPError as e:
+                self.logger.error(f"HTTP error occurred: {e}")
+                return None
+            except Exception as e:
+                self.logger.error(f"Error making request to {url}: {e}")
+                return None
+    
+    def _backoff(self, attempt: int, error) -> int:
+        """等待带抖动的指数退避间隔，返回下一次的重试序号"""
+        delay = self.http["retry_backoff"] * 2 ** attempt * random.uniform(0.5, 1.5)
+        self.logger.warning(f"Request failed ({error}), retrying in {delay:.2f}s ({attempt + 1}/{self.http['max_retries']})")
+        time.sleep(delay)
+        return attempt + 1
     
     def get_task_topic(self) -> Optional[Dict[Any, Any]]:
         """获取任务消息topic
@@ -67,6 +192,25 @@ class APIService:
         """
         return self._make_request("get", f"/api/topics/{topic_id}/messages")
     
+    def stream_messages(self, topic_id: int, after: int = 0) -> Iterator[Dict[Any, Any]]:
+        """通过 Server-Sent Events 订阅topic，逐条产出偏移量之后的消息
+        
+        连接断开或出错时抛出 httpx 异常，由调用方负责重连。
+        
+        Args:
+            topic_id: topic ID
+            after: 偏移量，只接收ID大于该值的消息
+            
+        Returns:
+            消息迭代器
+        """
+        url = f"{self.base_url}/api/topics/{topic_id}/stream"
+        headers = {**self.headers, "Accept": "text/event-stream", "Last-Event-ID": str(after)}
+        timeout = httpx.Timeout(self.http["timeout"], connect=self.http["connect_timeout"], read=self.stream_read_timeout)
+        with self._get_client().stream("GET", url, headers=headers, params={"after": after}, timeout=timeout) as response:
+            response.raise_for_status()
+            yield from parse_sse(response.iter_lines())
+    
     def get_task(self, task_id: int) -> Optional[Dict[Any, Any]]:
         """获取任务详情
         
@@ -78,6 +222,84 @@ class APIService:
         """
         return self._make_request("get", f"/api/tasks/{task_id}")
     
+    def claim_task(self, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None) -> Optional[Dict[Any, Any]]:
+        """通过任务队列领取任务
+        
+        Args:
+            task_id: 任务ID
+            avatar_id: Avatar标识
+            lease_seconds: 租约时长（秒）
+            
+        Returns:
+            领取到的任务，已被其他Avatar领取、已完成或请求失败时为None
+        """
+        data = {"avatar_id": avatar_id, "lease_seconds": lease_seconds}
+        # 同一 Avatar 重复领取只续期租约，可以安全重试
+        return self._make_request("post", f"/api/tasks/{task_id}/claim", data, idempotent=True)
+    
+    def claim_next_task(self, avatar_id: str, lease_seconds: Optional[int] = None) -> Optional[Dict[Any, Any]]:
+        """领取下一个可领取的任务（到期的重试、租约过期的任务）
+        
+        Args:
+            avatar_id: Avatar标识
+            lease_seconds: 租约时长（秒）
+            
+        Returns:
+            领取到的任务，没有可领取的任务或请求失败时为None
+        """
+        data = {"avatar_id": avatar_id, "lease_seconds": lease_seconds}
+        return self._make_request("post", "/api/tasks/claim", data)
+    
+    def heartbeat_task(self, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None) -> Optional[Dict[Any, Any]]:
+        """续期任务租约
+        
+        Args:
+            task_id: 任务ID
+            avatar_id: Avatar标识
+            lease_seconds: 租约时长（秒）
+            
+        Returns:
+            续期后的任务，租约已失效或请求失败时为None
+        """
+        data = {"avatar_id": avatar_id, "lease_seconds": lease_seconds}
+        return self._make_request("post", f"/api/tasks/{task_id}/heartbeat", data, idempotent=True)
+    
+    def ack_task(self, task_id: int, avatar_id: str, timings: Optional[Dict[str, float]] = None) -> Optional[Dict[Any, Any]]:
+        """确认任务完成
+        
+        Args:
+            task_id: 任务ID
+            avatar_id: Avatar标识
+            timings: 各阶段耗时（秒），保存在任务上
+            
+        Returns:
+            完成的任务，租约已失效或请求失败时为None
+        """
+        data = {"avatar_id": avatar_id}
+        if timings:
+            data["timings"] = timings
+        # 重复确认已由该 Avatar 完成的任务直接返回，可以安全重试
+        return self._make_request("post", f"/api/tasks/{task_id}/ack", data, idempotent=True)
+    
+    def nack_task(self, task_id: int, avatar_id: str, error: Optional[str] = None, retry: bool = True,
+                  timings: Optional[Dict[str, float]] = None) -> Optional[Dict[Any, Any]]:
+        """报告任务执行失败，由后端按退避重新排队或转入死信状态
+        
+        Args:
+            task_id: 任务ID
+            avatar_id: Avatar标识
+            error: 失败原因
+            retry: 是否允许重试
+            timings: 本次执行各阶段的耗时（秒）
+            
+        Returns:
+            更新后的任务，租约已失效或请求失败时为None
+        """
+        data = {"avatar_id": avatar_id, "error": error, "retry": retry}
+        if timings:
+            data["timings"] = timings
+        return self._make_request("post", f"/api/tasks/{task_id}/nack", data)
+    
     def update_task_status(self, task_id: int, status: str) -> Optional[Dict[Any, Any]]:
         """更新任务状态
         
@@ -104,6 +326,27 @@ class APIService:
         data = {"logs": logs}
         return self._make_request("post", f"/api/tasks/{task_id}/logs", data)
     
+    def post_task_log_chunk(self, task_id: int, stream: str, seq: int, data: bytes) -> Optional[Dict[Any, Any]]:
+        """上报一块 gzip 压缩的任务日志
+        
+        Args:
+            task_id: 任务ID
+            stream: 日志流标识，每次执行任务时生成
+            seq: 块在日志流中的序号
+            data: gzip 压缩的 UTF-8 日志文本
+            
+        Returns:
+            上报结果，可重试的失败（网络错误、5xx、429、熔断）时为None
+        Raises:
+            PermanentRequestError: 后端拒绝了该块（如任务不存在、请求体无效），重发不会成功
+        """
+        headers = {"Content-Type": "text/plain; charset=utf-8", "Content-Encoding": "gzip"}
+        # 后端按（日志流标识, 序号）忽略重复的块，可以安全重试
+        return self._make_request(
+            "post", f"/api/tasks/{task_id}/logs?stream={stream}&seq={seq}", idempotent=True, content=data, headers=headers,
+            raise_permanent=True
+        )
+    
     def get_application(self, app_id: int) -> Optional[Dict[Any, Any]]:
         """获取应用信息
         
@@ -113,4 +356,20 @@ class APIService:
         Returns:
             应用信息或None
         """
-        return self._make_request("get", f"/api/applications/{app_id}")
\ No newline at end of file
+        return self._make_request("get", f"/api/applications/{app_id}")
+
+def parse_sse(lines) -> Iterator[Dict[Any, Any]]:
+    """解析 SSE 文本行，产出每个事件 data 字段中的 JSON，忽略注释（心跳）和其他字段"""
+    data_lines = []
+    for line in lines:
+        line = line.rstrip("\r")
+        if not line:
+            if data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
@@ -3,13 +3,16 @@ import subprocess
 from typing import Optional
 from utils.executor import CommandExecutor
 from utils.logger import Logger
+from services.git_backend import create_git_backend
 
 class GitService:
     """Git操作服务类"""
     
-    def __init__(self, username: str = "", email: str = ""):
+    def __init__(self, username: str = "", email: str = "", backend: str = "subprocess"):
         self.username = username
         self.email = email
+        # 暂存、提交、切换分支使用的后端：subprocess 或 pygit2
+        self.backend = create_git_backend(backend)
         self.logger = Logger("git_service")
         
         # 配置Git用户信息
@@ -29,18 +32,23 @@ class GitService:
         if not result["success"]:
             self.logger.warning(f"Failed to set git config {key}: {result['stderr']}")
     
-    def clone_repository(self, repo_url: str, local_path: str) -> bool:
+    def clone_repository(self, repo_url: str, local_path: str, filter: Optional[str] = None,
+                         depth: Optional[int] = None) -> bool:
         """克隆代码仓库
         
         Args:
             repo_url: 仓库URL
             local_path: 本地路径
+            filter: 部分克隆过滤器，如 "blob:none" 只下载提交和目录，文件内容在检出时按需下载
+            depth: 浅克隆深度，只下载最近的若干个提交
             
         Returns:
             是否成功
         """
         self.logger.info(f"Cloning repository {repo_url} to {local_path}")
-        result = CommandExecutor.run_command(["git", "clone", repo_url, local_path])
+        result = CommandExecutor.run_command(
+            ["git", "clone", *self._sync_args(filter, depth), repo_url, local_path]
+        )
         
         if result["success"]:
             self.logger.info("Repository cloned successfully")
@@ -49,26 +57,140 @@ class GitService:
             self.logger.error(f"Failed to clone repository: {result['stderr']}")
             return False
     
+    def ensure_mirror(self, repo_url: str, mirror_path: str, filter: Optional[str] = None,
+                      depth: Optional[int] = None) -> bool:
+        """创建或同步应用的裸仓库镜像
+        
+        镜像只保存对象和远程分支（refs/remotes/origin/*），由各任务的工作树共享。
+        首次创建时可使用部分克隆（filter）或浅克隆（depth）；之后只执行 git fetch --prune 拉取增量，
+        并清理远程已删除的分支，部分克隆的过滤器在后续拉取中保持生效。
+        
+        Args:
+            repo_url: 仓库URL
+            mirror_path: 镜像路径
+            filter: 部分克隆过滤器，如 "blob:none"
+            depth: 浅克隆深度
+            
+        Returns:
+            是否成功
+        """
+        created = not os.path.exists(mirror_path)
+        if created:
+            self.logger.info(f"Creating mirror of {repo_url} at {mirror_path}")
+            commands = [["git", "remote", "add", "origin", repo_url]]
+            if filter:
+                # 将 origin 设为 promisor，检出时按需下载缺失的对象
+                commands.append(["git", "config", "remote.origin.promisor", "true"])
+                commands.append(["git", "config", "remote.origin.partialclonefilter", filter])
+            result = CommandExecutor.run_command(["git", "init", "--bare", mirror_path])
+            for command in commands:
+                if not result["success"]:
+                    break
+                result = CommandExecutor.run_command(command, cwd=mirror_path)
+            if not result["success"]:
+                self.logger.error(f"Failed to create mirror: {result['stderr']}")
+                CommandExecutor.remove_dir(mirror_path)
+                return False
+        
+        self.logger.info(f"Fetching {repo_url} into {mirror_path}")
+        command = ["git", "fetch", "--prune"]
+        if created:
+            command += self._sync_args(filter, depth)
+        result = CommandExecutor.run_command(command + ["origin"], cwd=mirror_path)
+        if not result["success"]:
+            self.logger.error(f"Failed to fetch repository: {result['stderr']}")
+            # 首次拉取失败时删除空镜像，下次重新创建
+            if created:
+                CommandExecutor.remove_dir(mirror_path)
+            return False
+        
+        if created:
+            # 记录远程默认分支（origin/HEAD），作为新分支的起点
+            CommandExecutor.run_command(["git", "remote", "set-head", "origin", "--auto"], cwd=mirror_path)
+        return True
+    
+    def _sync_args(self, filter: Optional[str], depth: Optional[int]) -> list:
+        args = []
+        if filter:
+            args.append(f"--filter={filter}")
+        if depth:
+            args.append(f"--depth={depth}")
+        return args
+    
+    def add_worktree(self, mirror_path: str, worktree_path: str, branch_name: str) -> bool:
+        """在镜像上为任务创建独立的工作树，并切换到任务分支
+        
+        远程已有该分支时，本地分支重置到 origin/<branch> 再检出，保证基于最新代码开发；
+        仅本地有该分支时（尚未推送）直接检出；否则基于远程默认分支创建新分支。
+        
+        Args:
+            mirror_path: 镜像路径
+            worktree_path: 工作树路径
+            branch_name: 分支名称
+            
+        Returns:
+            是否成功
+        """
+        self.logger.info(f"Adding worktree {worktree_path} on branch {branch_name}")
+        
+        # 清理目录已被删除的工作树记录，避免分支仍被视为已检出
+        CommandExecutor.run_command(["git", "worktree", "prune"], cwd=mirror_path)
+        
+        if self._ref_exists(mirror_path, f"refs/remotes/origin/{branch_name}"):
+            command = ["git", "worktree", "add", "--track", "-B", branch_name, worktree_path, f"origin/{branch_name}"]
+        elif self._ref_exists(mirror_path, f"refs/heads/{branch_name}"):
+            command = ["git", "worktree", "add", worktree_path, branch_name]
+        else:
+            start_point = "origin/HEAD" if self._ref_exists(mirror_path, "refs/remotes/origin/HEAD") else "HEAD"
+            command = ["git", "worktree", "add", "--no-track", "-b", branch_name, worktree_path, start_point]
+        
+        result = CommandExecutor.run_command(command, cwd=mirror_path)
+        if result["success"]:
+            self.logger.info(f"Worktree ready at {worktree_path}")
+            return True
+        else:
+            self.logger.error(f"Failed to add worktree: {result['stderr']}")
+            return False
+    
+    def remove_worktree(self, mirror_path: str, worktree_path: str) -> bool:
+        """删除任务的工作树，分支和提交保留在镜像中
+        
+        Args:
+            mirror_path: 镜像路径
+            worktree_path: 工作树路径
+            
+        Returns:
+            是否成功
+        """
+        self.logger.info(f"Removing worktree {worktree_path}")
+        result = CommandExecutor.run_command(["git", "worktree", "remove", "--force", worktree_path], cwd=mirror_path)
+        if not result["success"]:
+            # 工作树已损坏或不完整时直接删除目录，再清理记录
+            CommandExecutor.remove_dir(worktree_path)
+            result = CommandExecutor.run_command(["git", "worktree", "prune"], cwd=mirror_path)
+        if result["success"]:
+            return True
+        self.logger.error(f"Failed to remove worktree: {result['stderr']}")
+        return False
+    
+    def _ref_exists(self, repo_path: str, ref: str) -> bool:
+        result = CommandExecutor.run_command(["git", "rev-parse", "--verify", "--quiet", ref], cwd=repo_path)
+        return result["success"]
+    
     def checkout_branch(self, local_path: str, branch_name: str, create_new: bool = True) -> bool:
         """切换到指定分支
         
         Args:
             local_path: 本地仓库路径
             branch_name: 分支名称
-            create_new: 是否创建新分支
+            create_new: 是否创建新分支（分支已存在时直接切换）
             
         Returns:
             是否成功
         """
         self.logger.info(f"Checking out branch {branch_name} in {local_path}")
         
-        if create_new:
-            # 创建并切换到新分支
-            result = CommandExecutor.run_command(["git", "checkout", "-b", branch_name], cwd=local_path)
-        else:
-            # 切换到现有分支
-            result = CommandExecutor.run_command(["git", "checkout", branch_name], cwd=local_path)
-        
+        result = self.backend.checkout(local_path, branch_name, create_new)
         if result["success"]:
             self.logger.info(f"Successfully checked out branch {branch_name}")
             return True
@@ -79,6 +201,8 @@ class GitService:
     def commit_changes(self, local_path: str, message: str, files: Optional[list] = None) -> bool:
         """提交代码变更
         
+        指定的文件一次性暂存，不再逐个文件执行 git add。
+        
         Args:
             local_path: 本地仓库路径
             message: 提交信息
@@ -90,29 +214,14 @@ class GitService:
         self.logger.info(f"Committing changes in {local_path}")
         
         try:
-            # 添加文件到暂存区
-            if files:
-                for file in files:
-                    result = CommandExecutor.run_command(["git", "add", file], cwd=local_path)
-                    if not result["success"]:
-                        self.logger.error(f"Failed to add file {file}: {result['stderr']}")
-                        return False
-            else:
-                # 添加所有变更文件
-                result = CommandExecutor.run_command(["git", "add", "."], cwd=local_path)
-                if not result["success"]:
-                    self.logger.error(f"Failed to add files: {result['stderr']}")
-                    return False
-            
-            # 提交更改
-            result = CommandExecutor.run_command(["git", "commit", "-m", message], cwd=local_path)
+            result = self.backend.commit_files(local_path, message, files)
             
             if result["success"]:
                 self.logger.info("Changes committed successfully")
                 return True
             else:
                 # 如果没有变更需要提交，这也被认为是成功的
-                if "nothing to commit" in result["stderr"]:
+                if "nothing to commit" in result["stdout"] + result["stderr"]:
                     self.logger.info("No changes to commit")
                     return True
                 self.logger.error(f"Failed to commit changes: {result['stderr']}")
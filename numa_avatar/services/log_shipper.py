@@ -0,0 +1,199 @@
+import gzip
+import threading
+import uuid
+from collections import deque
+from typing import Dict
+from services.api_service import PermanentRequestError
+from utils.logger import Logger
+
+class LogShipper:
+    """任务日志上报
+
+    Logger.task_log 写入的日志行先缓存在内存中，按任务合并成块后由后台线程上报，不再每行请求一次后端：
+    - 分块：缓存超过 max_chunk_bytes 或距上次上报超过 flush_interval 秒时封装成一块，gzip 压缩后上报
+    - 序号：每次执行任务时生成一个日志流标识，块按 0、1、2…编号；重发同一块时后端按（流标识, 序号）忽略，
+      可重试的失败（网络错误、5xx、429）的块留在队列中按原序号重发，同一任务的块按顺序送达；
+      后端以 4xx 拒绝的块（如任务不存在）重发也不会成功，直接丢弃，不阻塞之后的块
+    - 任务结束时调用 finish_task 立即上报剩余的日志，全部送达或丢弃后移除该任务的日志流
+    每个任务最多保留 max_pending_chunks 个未送达的块，超过时丢弃最早的块（本地日志文件中仍有完整日志）。
+    """
+
+    def __init__(self, api_service, max_chunk_bytes: int = 64 * 1024, flush_interval: float = 2.0,
+                 max_pending_chunks: int = 100, compress_level: int = 6):
+        self.api_service = api_service
+        self.max_chunk_bytes = max_chunk_bytes
+        self.flush_interval = flush_interval
+        self.max_pending_chunks = max(int(max_pending_chunks), 1)
+        self.compress_level = compress_level
+        self.logger = Logger("log_shipper")
+        # 每个任务的日志流：流标识、下一个块的序号、未封装的日志行及其字节数、待上报的块
+        self._streams: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # 同一时间只有一个线程上报，保证同一任务的块按序号送达
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.sent_chunks = 0
+        self.sent_bytes = 0
+        self.raw_bytes = 0
+        self.dropped_chunks = 0
+        self.rejected_chunks = 0
+
+    def _ensure_thread(self):
+        """启动后台上报线程"""
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+                self._thread.start()
+
+    def _stream(self, task_id: str) -> dict:
+        stream = self._streams.get(task_id)
+        if stream is None:
+            stream = {"id": uuid.uuid4().hex, "next_seq": 0, "lines": [], "size": 0, "chunks": deque(), "finished": False}
+            self._streams[task_id] = stream
+        return stream
+
+    def write(self, task_id, line: str):
+        """缓存一行任务日志
+
+        Args:
+            task_id: 任务ID
+            line: 日志行
+        """
+        if not line.endswith("\n"):
+            line += "\n"
+        with self._lock:
+            stream = self._stream(str(task_id))
+            stream["finished"] = False
+            stream["lines"].append(line)
+            stream["size"] += len(line.encode("utf-8"))
+            full = stream["size"] >= self.max_chunk_bytes
+            if full:
+                self._seal(str(task_id), stream)
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def _seal(self, task_id: str, stream: dict):
+        """把缓存的日志行压缩成一个块，放入待上报队列（调用方持有 _lock）"""
+        if not stream["lines"]:
+            return
+        raw = "".join(stream["lines"]).encode("utf-8")
+        stream["chunks"].append({
+            "seq": stream["next_seq"],
+            "data": gzip.compress(raw, compresslevel=self.compress_level),
+            "raw_bytes": len(raw)
+        })
+        stream["next_seq"] += 1
+        stream["lines"] = []
+        stream["size"] = 0
+        while len(stream["chunks"]) > self.max_pending_chunks:
+            dropped = stream["chunks"].popleft()
+            self.dropped_chunks += 1
+            self.logger.warning(f"Dropping log chunk {dropped['seq']} of task {task_id}, too many chunks pending")
+
+    def flush(self, task_id=None) -> bool:
+        """立即封装并上报缓存的日志
+
+        Args:
+            task_id: 只上报该任务的日志，为空时上报所有任务
+
+        Returns:
+            是否全部处理完（送达，或被后端拒绝而丢弃），可重试的块留在队列中稍后重发
+        """
+        with self._lock:
+            task_ids = list(self._streams) if task_id is None else [str(task_id)]
+            for pending_task_id in task_ids:
+                if pending_task_id in self._streams:
+                    self._seal(pending_task_id, self._streams[pending_task_id])
+
+        delivered = True
+        with self._send_lock:
+            for pending_task_id in task_ids:
+                delivered = self._send_chunks(pending_task_id) and delivered
+        return delivered
+
+    def _send_chunks(self, task_id: str) -> bool:
+        """按序号上报任务的块，遇到可重试的失败时停止，保留该块及之后的块；被拒绝的块直接丢弃"""
+        while True:
+            with self._lock:
+                stream = self._streams.get(task_id)
+                if stream is None:
+                    return True
+                if not stream["chunks"]:
+                    # 已结束的任务的块全部处理完，移除日志流
+                    if stream["finished"] and not stream["lines"]:
+                        del self._streams[task_id]
+                    return True
+                stream_id, chunk = stream["id"], stream["chunks"][0]
+            try:
+                result = self.api_service.post_task_log_chunk(int(task_id), stream_id, chunk["seq"], chunk["data"])
+            except PermanentRequestError as e:
+                self.logger.warning(f"Dropping log chunk {chunk['seq']} of task {task_id}, rejected by backend: {e}")
+                with self._lock:
+                    if stream["chunks"] and stream["chunks"][0] is chunk:
+                        stream["chunks"].popleft()
+                    self.rejected_chunks += 1
+                continue
+            if result is None:
+                return False
+            with self._lock:
+                if stream["chunks"] and stream["chunks"][0] is chunk:
+                    stream["chunks"].popleft()
+                self.sent_chunks += 1
+                self.sent_bytes += len(chunk["data"])
+                self.raw_bytes += chunk["raw_bytes"]
+
+    def finish_task(self, task_id) -> bool:
+        """任务结束：上报剩余的日志，全部送达后结束该任务的日志流；
+        未送达的块由后台线程继续重发，处理完后移除日志流
+
+        Returns:
+            是否全部处理完，没有待重发的块
+        """
+        with self._lock:
+            stream = self._streams.get(str(task_id))
+            if stream is not None:
+                stream["finished"] = True
+        delivered = self.flush(task_id)
+        with self._lock:
+            stream = self._streams.get(str(task_id))
+            if stream is not None and stream["finished"] and not stream["lines"] and not stream["chunks"]:
+                del self._streams[str(task_id)]
+        return delivered
+
+    def _run(self):
+        while not self._stop.is_set():
+            # 缓存写满时立即上报，否则每隔 flush_interval 秒上报一次
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Failed to ship task logs: {e}")
+
+    def stats(self) -> dict:
+        """待上报的块数，已上报的块数、压缩后与压缩前的字节数，因积压丢弃的块数，被后端拒绝的块数，保留中的日志流数"""
+        with self._lock:
+            pending = sum(len(stream["chunks"]) for stream in self._streams.values())
+            streams = len(self._streams)
+        return {
+            "pending_chunks": pending,
+            "sent_chunks": self.sent_chunks,
+            "sent_bytes": self.sent_bytes,
+            "raw_bytes": self.raw_bytes,
+            "dropped_chunks": self.dropped_chunks,
+            "rejected_chunks": self.rejected_chunks,
+            "streams": streams
+        }
+
+    def close(self):
+        """停止后台线程并上报剩余的日志"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
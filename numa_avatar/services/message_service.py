@@ -1,5 +1,7 @@
+import os
 import time
 import json
+import httpx
 from typing import Optional, Dict, Any
 from config import Config
 from services.api_service import APIService
@@ -14,6 +16,12 @@ class MessageService:
         self.logger = Logger("message_service")
         self.polling_interval = config.get("polling.interval", 5)
         self.topic_id = None
+        # 订阅流断开后的重连间隔（秒），指数退避，连接成功后重置
+        self.reconnect_delay = config.get("stream.reconnect_delay", 1)
+        self.max_reconnect_delay = config.get("stream.max_reconnect_delay", 30)
+        # 已处理消息的偏移量保存在文件中，重启后从该偏移量续传
+        self.offset_file = config.get("stream.offset_file", "./.topic_offset")
+        self.offset = self._load_offset()
     
     def subscribe_to_tasks(self) -> bool:
         """订阅任务消息
@@ -66,4 +74,72 @@ class MessageService:
                 break
             except Exception as e:
                 self.logger.error(f"Error during polling: {e}")
-                time.sleep(self.polling_interval)
\ No newline at end of file
+                time.sleep(self.polling_interval)
+    
+    def _load_offset(self) -> int:
+        """读取已处理消息的偏移量"""
+        if not self.offset_file or not os.path.exists(self.offset_file):
+            return 0
+        try:
+            with open(self.offset_file, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load topic offset: {e}")
+            return 0
+    
+    def _save_offset(self, offset: int):
+        """记录已处理消息的偏移量"""
+        self.offset = offset
+        if not self.offset_file:
+            return
+        try:
+            tmp_file = f"{self.offset_file}.tmp"
+            with open(tmp_file, "w") as f:
+                f.write(str(offset))
+            os.replace(tmp_file, self.offset_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to save topic offset: {e}")
+    
+    def start_streaming(self, callback):
+        """通过订阅流接收消息，断线后从上次的偏移量重连续传
+        
+        后端不支持订阅流时退回到轮询。
+        
+        Args:
+            callback: 处理消息的回调函数
+        """
+        if not self.topic_id:
+            self.logger.error("Not subscribed to any topic, cannot start streaming")
+            return
+        
+        self.logger.info(f"Starting message stream from offset {self.offset}...")
+        delay = self.reconnect_delay
+        while True:
+            try:
+                for message in self.api_service.stream_messages(self.topic_id, self.offset):
+                    delay = self.reconnect_delay
+                    try:
+                        callback(message)
+                    except Exception as e:
+                        self.logger.error(f"Error handling message {message.get('id')}: {e}")
+                    self._save_offset(message["id"])
+                # 正常关闭同样退避后重连：代理直接结束响应时不会形成紧密的重连循环；收到过消息时 delay 已重置
+                self.logger.info(f"Message stream closed by server, reconnecting in {delay}s...")
+            except KeyboardInterrupt:
+                self.logger.info("Streaming interrupted by user")
+                break
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    self.logger.warning("Backend does not support message stream, falling back to polling")
+                    self.start_polling(callback)
+                    return
+                self.logger.error(f"Message stream error: {e}")
+            except Exception as e:
+                self.logger.error(f"Message stream error: {e}")
+            
+            try:
+                time.sleep(delay)
+            except KeyboardInterrupt:
+                self.logger.info("Streaming interrupted by user")
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
@@ -0,0 +1,41 @@
+import threading
+from typing import Optional
+
+class TaskLease:
+    """任务租约的心跳续期
+    
+    领取任务后在后台线程中每隔租约时长的三分之一续期一次，任务执行结束（退出 with 块）时停止。
+    续期失败不会中断任务：租约过期后后端会把任务交给其他 Avatar，本次结果的确认将被拒绝。
+    """
+    
+    def __init__(self, api_service, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None):
+        self.api_service = api_service
+        self.task_id = task_id
+        self.avatar_id = avatar_id
+        self.lease_seconds = lease_seconds
+        self.interval = max((lease_seconds or 300) / 3, 1)
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def start(self):
+        """启动心跳线程"""
+        self._thread = threading.Thread(target=self._run, name=f"task-lease-{self.task_id}", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止心跳线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.api_service.heartbeat_task(self.task_id, self.avatar_id, self.lease_seconds)
@@ -1,34 +1,55 @@
+import os
 from typing import Optional
 from config import Config
 from models.task import Task
 from models.application import Application
 from services.api_service import APIService
 from services.git_service import GitService
-from utils.executor import CommandExecutor
 from utils.logger import Logger
+from utils.phase_timer import PhaseTimer
 
 class TaskService:
     """任务执行服务类"""
     
-    def __init__(self, config: Config, api_service: APIService, git_service: GitService):
+    def __init__(self, config: Config, api_service: APIService, git_service: GitService, log_shipper=None):
         self.config = config
         self.api_service = api_service
         self.git_service = git_service
-        self.logger = Logger("task_service")
+        # 任务执行过程中的日志通过 task_log 记录，并由 log_shipper 上报到后端
+        self.logger = Logger("task_service", shipper=log_shipper)
+        # 应用的裸仓库镜像保存在 repos/ 下，任务的工作树保存在 worktrees/ 下
+        self.workspace_path = config.get("avatar.workspace", "./workspace")
     
-    def execute_task(self, task_id: int) -> bool:
+    def _sync_options(self, application_id: int) -> dict:
+        """获取应用首次同步仓库时的部分克隆 / 浅克隆选项，git.applications 中的配置覆盖 git.sync
+        
+        Args:
+            application_id: 应用ID
+            
+        Returns:
+            ensure_mirror 的 filter / depth 参数
+        """
+        options = dict(self.config.get("git.sync") or {})
+        overrides = self.config.get("git.applications") or {}
+        options.update(overrides.get(application_id) or overrides.get(str(application_id)) or {})
+        return {"filter": options.get("filter"), "depth": options.get("depth")}
+    
+    def execute_task(self, task_id: int, timer: Optional[PhaseTimer] = None) -> bool:
         """执行任务
         
         Args:
             task_id: 任务ID
+            timer: 记录各阶段耗时的计时器，为空时新建
             
         Returns:
             是否成功执行
         """
-        self.logger.info(f"Starting execution of task {task_id}")
+        timer = timer or PhaseTimer()
+        self.logger.task_log(task_id, "Starting execution")
         
         # 1. 获取任务详情
-        task_data = self.api_service.get_task(task_id)
+        with timer.phase("task_info"):
+            task_data = self.api_service.get_task(task_id)
         if not task_data:
             self.logger.error(f"Failed to get task {task_id}")
             return False
@@ -36,58 +57,65 @@ class TaskService:
         task = Task(**task_data)
         
         # 2. 获取应用信息
-        app_data = self.api_service.get_application(task.application_id)
+        with timer.phase("task_info"):
+            app_data = self.api_service.get_application(task.application_id)
         if not app_data:
-            self.logger.error(f"Failed to get application {task.application_id}")
+            self.logger.task_log(task_id, f"Failed to get application {task.application_id}", "error")
             return False
         
         application = Application(**app_data)
         
-        # 3. 克隆代码仓库
-        local_path = CommandExecutor.create_temp_dir(f"numa_repo_{task.application_id}_")
-        if not self.git_service.clone_repository(application.git_repo_url, local_path):
-            self.logger.error("Failed to clone repository")
-            CommandExecutor.remove_dir(local_path)
+        # 3. 更新应用的裸仓库镜像，为任务创建独立的工作树并切换到开发分支
+        mirror_path = os.path.join(self.workspace_path, "repos", f"app_{task.application_id}.git")
+        local_path = os.path.join(self.workspace_path, "worktrees", f"task_{task_id}")
+        with timer.phase("clone"):
+            synced = self.git_service.ensure_mirror(application.git_repo_url, mirror_path, **self._sync_options(task.application_id))
+        if not synced:
+            self.logger.task_log(task_id, "Failed to sync repository", "error")
+            return False
+        with timer.phase("clone"):
+            if os.path.exists(local_path):
+                self.git_service.remove_worktree(mirror_path, local_path)
+            checked_out = self.git_service.add_worktree(mirror_path, local_path, task.code_branch or f"dev-{task_id}")
+        if not checked_out:
+            self.logger.task_log(task_id, "Failed to checkout branch", "error")
             return False
         
         try:
-            # 4. 切换到开发分支
-            if not self.git_service.checkout_branch(local_path, task.code_branch or f"dev-{task_id}"):
-                self.logger.error("Failed to checkout branch")
-                return False
-            
-            # 5. 执行开发任务（这里简化处理，实际可能需要LLM参与）
-            self.logger.info("Executing development task...")
+            # 4. 执行开发任务（这里简化处理，实际可能需要LLM参与）
+            self.logger.task_log(task_id, "Executing development task...")
             # 这里应该根据task.description执行具体的开发工作
             # 暂时模拟创建一个文件
             dev_file_path = f"{local_path}/development_task_{task_id}.md"
-            with open(dev_file_path, "w") as f:
+            with timer.phase("file_write"), open(dev_file_path, "w") as f:
                 f.write(f"# Development Task {task_id}\n\n")
                 f.write(f"Task: {task.title}\n\n")
                 f.write(f"Description: {task.description}\n\n")
                 f.write("This is a placeholder file created by Numa Avatar.\n")
             
-            # 6. 运行测试（简化处理）
-            self.logger.info("Running tests...")
-            # 这里应该运行项目测试，暂时跳过
+            # 5. 运行测试（简化处理）
+            with timer.phase("tests"):
+                self.logger.task_log(task_id, "Running tests...")
+                # 这里应该运行项目测试，暂时跳过
             
-            # 7. 提交代码
+            # 6. 提交代码
             commit_message = f"feat: Complete development task {task_id} - {task.title}"
-            if not self.git_service.commit_changes(local_path, commit_message):
-                self.logger.error("Failed to commit changes")
-                return False
-            
-            if not self.git_service.push_changes(local_path, task.code_branch or f"dev-{task_id}"):
-                self.logger.error("Failed to push changes")
+            with timer.phase("commit"):
+                committed = self.git_service.commit_changes(local_path, commit_message)
+            if not committed:
+                self.logger.task_log(task_id, "Failed to commit changes", "error")
                 return False
             
-            # 8. 更新任务状态
-            if not self.api_service.update_task_status(task_id, "done"):
-                self.logger.error("Failed to update task status")
+            with timer.phase("push"):
+                pushed = self.git_service.push_changes(local_path, task.code_branch or f"dev-{task_id}")
+            if not pushed:
+                self.logger.task_log(task_id, "Failed to push changes", "error")
                 return False
             
-            self.logger.info(f"Task {task_id} executed successfully")
+            # 任务完成状态由 Avatar 通过任务队列确认（ack）
+            self.logger.task_log(task_id, f"Executed successfully, phases: {timer.as_dict()}")
             return True
         finally:
-            # 清理临时目录
-            CommandExecutor.remove_dir(local_path)
\ No newline at end of file
+            # 回收任务的工作树，分支保留在镜像中
+            with timer.phase("cleanup"):
+                self.git_service.remove_worktree(mirror_path, local_path)
\ No newline at end of file
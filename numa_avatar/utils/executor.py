@@ -8,13 +8,15 @@ class CommandExecutor:
     """命令执行工具类"""
     
     @staticmethod
-    def run_command(command: List[str], cwd: Optional[str] = None, timeout: int = 300) -> dict:
+    def run_command(command: List[str], cwd: Optional[str] = None, timeout: int = 300,
+                    input: Optional[str] = None) -> dict:
         """执行命令
         
         Args:
             command: 命令列表
             cwd: 工作目录
             timeout: 超时时间（秒）
+            input: 写入命令标准输入的内容
             
         Returns:
             包含执行结果的字典
@@ -25,7 +27,8 @@ class CommandExecutor:
                 cwd=cwd,
                 capture_output=True,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                input=input
             )
             return {
                 "success": result.returncode == 0,
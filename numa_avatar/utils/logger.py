@@ -5,8 +5,10 @@ from datetime import datetime
 class Logger:
     """日志工具类"""
     
-    def __init__(self, name: str = "numa_avatar", log_file: str = "avatar.log"):
+    def __init__(self, name: str = "numa_avatar", log_file: str = "avatar.log", shipper=None):
         self.logger = logging.getLogger(name)
+        # 任务日志上报器（services.log_shipper.LogShipper），task_log 写入的日志同时交给它上报到后端
+        self.shipper = shipper
         self.logger.setLevel(logging.INFO)
         
         # 创建文件处理器
@@ -37,4 +39,12 @@ class Logger:
     
     def debug(self, message: str):
         """记录调试日志"""
-        self.logger.debug(message)
\ No newline at end of file
+        self.logger.debug(message)
+    
+    def task_log(self, task_id, message: str, level: str = "info"):
+        """记录任务日志，并交给上报器上报到后端"""
+        log = getattr(self.logger, level.lower(), self.logger.info)
+        log(f"[task {task_id}] {message}")
+        if self.shipper is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.shipper.write(task_id, f"{timestamp} - {level.upper()} - {message}")
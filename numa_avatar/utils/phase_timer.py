@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+class PhaseTimer:
+    """任务执行各阶段的耗时统计
+
+    用 with timer.phase("clone"): 包住每个阶段，同名阶段多次执行时累加。阶段可以嵌套，
+    嵌套阶段的耗时只计入内层阶段（如生成代码期间的写文件只计入 file_write），各阶段之和不超过总耗时。
+    同一个计时器只在执行任务的线程中使用。
+    """
+
+    def __init__(self):
+        self._durations: Dict[str, float] = {}
+        # 正在计时的阶段：[阶段名称, 开始时间, 嵌套阶段的耗时]
+        self._stack: List[list] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """统计一个阶段的耗时，阶段内抛出异常时同样计入"""
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self._durations[name] = self._durations.get(name, 0.0) + elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    @property
+    def total(self) -> float:
+        """计时器创建以来的总耗时（秒）"""
+        return time.perf_counter() - self._started
+
+    def as_dict(self) -> Dict[str, float]:
+        """各阶段的耗时（秒），按阶段首次执行的顺序"""
+        return {name: round(duration, 3) for name, duration in self._durations.items()}
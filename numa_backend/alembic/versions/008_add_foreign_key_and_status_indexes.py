@@ -0,0 +1,53 @@
+"""add foreign key and status indexes
+
+Revision ID: 008_add_foreign_key_and_status_indexes
+Revises: 007_add_code_branch_to_development_tasks
+Create Date: 2025-08-10 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008_add_foreign_key_and_status_indexes'
+down_revision = '007_add_code_branch_to_development_tasks'
+branch_labels = None
+depends_on = None
+
+
+# (索引名, 表名, 列) —— 与模型中的 index=True / __table_args__ 保持一致
+INDEXES = [
+    # 外键
+    ('ix_requirements_application_id', 'requirements', ['application_id']),
+    ('ix_requirements_assigned_to', 'requirements', ['assigned_to']),
+    ('ix_solutions_requirement_id', 'solutions', ['requirement_id']),
+    ('ix_solutions_application_id', 'solutions', ['application_id']),
+    ('ix_development_tasks_solution_id', 'development_tasks', ['solution_id']),
+    ('ix_development_tasks_requirement_id', 'development_tasks', ['requirement_id']),
+    ('ix_development_tasks_application_id', 'development_tasks', ['application_id']),
+    ('ix_development_tasks_assigned_to', 'development_tasks', ['assigned_to']),
+    ('ix_deployments_development_task_id', 'deployments', ['development_task_id']),
+    ('ix_event_logs_user_id', 'event_logs', ['user_id']),
+    ('ix_event_logs_question_id', 'event_logs', ['question_id']),
+    # 未澄清问题检查：WHERE requirement_id / solution_id = ? AND clarified IS NOT 1
+    ('ix_questions_requirement_id_clarified', 'questions', ['requirement_id', 'clarified']),
+    ('ix_solution_questions_solution_id_clarified', 'solution_questions', ['solution_id', 'clarified']),
+    # 事件时间线与事件列表分页
+    ('ix_event_logs_requirement_id_created_at', 'event_logs', ['requirement_id', 'created_at']),
+    ('ix_event_logs_created_at_id', 'event_logs', ['created_at', 'id']),
+    # 按状态筛选、按创建时间排序的列表
+    ('ix_requirements_status_created_at', 'requirements', ['status', 'created_at']),
+    ('ix_solutions_status_created_at', 'solutions', ['status', 'created_at']),
+    ('ix_development_tasks_status_created_at', 'development_tasks', ['status', 'created_at']),
+    ('ix_deployments_status_created_at', 'deployments', ['status', 'created_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
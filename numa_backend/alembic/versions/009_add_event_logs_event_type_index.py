@@ -0,0 +1,24 @@
+"""add event_logs event_type index
+
+Revision ID: 009_add_event_logs_event_type_index
+Revises: 008_add_foreign_key_and_status_indexes
+Create Date: 2025-08-12 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '009_add_event_logs_event_type_index'
+down_revision = '008_add_foreign_key_and_status_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 按事件类型筛选的时间线与按天统计
+    op.create_index('ix_event_logs_event_type_created_at', 'event_logs', ['event_type', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_event_logs_event_type_created_at', table_name='event_logs')
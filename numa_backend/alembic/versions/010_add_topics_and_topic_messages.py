@@ -0,0 +1,49 @@
+"""add topics and topic_messages
+
+Revision ID: 010_add_topics_and_topic_messages
+Revises: 009_add_event_logs_event_type_index
+Create Date: 2025-08-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_topics_and_topic_messages'
+down_revision = '009_add_event_logs_event_type_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('topics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_topics_id'), 'topics', ['id'], unique=False)
+
+    op.create_table('topic_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('topic_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_topic_messages_id'), 'topic_messages', ['id'], unique=False)
+    op.create_index('ix_topic_messages_topic_id_id', 'topic_messages', ['topic_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_topic_messages_topic_id_id', table_name='topic_messages')
+    op.drop_index(op.f('ix_topic_messages_id'), table_name='topic_messages')
+    op.drop_table('topic_messages')
+    op.drop_index(op.f('ix_topics_id'), table_name='topics')
+    op.drop_table('topics')
@@ -0,0 +1,39 @@
+"""add task queue columns to development_tasks
+
+Revision ID: 011_add_task_queue_columns_to_development_tasks
+Revises: 010_add_topics_and_topic_messages
+Create Date: 2025-08-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_add_task_queue_columns_to_development_tasks'
+down_revision = '010_add_topics_and_topic_messages'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('development_tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('available_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('last_error', sa.Text(), nullable=True))
+    # 查找租约过期的任务：WHERE status = 'in_progress' AND lease_expires_at < ?
+    op.create_index(
+        'ix_development_tasks_status_lease_expires_at', 'development_tasks', ['status', 'lease_expires_at'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_development_tasks_status_lease_expires_at', table_name='development_tasks')
+    with op.batch_alter_table('development_tasks', schema=None) as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('available_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
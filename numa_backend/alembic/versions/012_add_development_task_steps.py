@@ -0,0 +1,49 @@
+"""add development_task_steps
+
+Revision ID: 012_add_development_task_steps
+Revises: 011_add_task_queue_columns_to_development_tasks
+Create Date: 2025-08-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_add_development_task_steps'
+down_revision = '011_add_task_queue_columns_to_development_tasks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('development_task_steps',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('step', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('avatar_id', sa.String(), nullable=True),
+        sa.Column('batch_id', sa.String(), nullable=True),
+        sa.Column('batch_seq', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['development_tasks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_development_task_steps_id'), 'development_task_steps', ['id'], unique=False)
+    op.create_index(
+        'ix_development_task_steps_task_id_occurred_at', 'development_task_steps', ['task_id', 'occurred_at'], unique=False
+    )
+    op.create_index(
+        'ux_development_task_steps_task_id_batch_id_batch_seq', 'development_task_steps',
+        ['task_id', 'batch_id', 'batch_seq'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ux_development_task_steps_task_id_batch_id_batch_seq', table_name='development_task_steps')
+    op.drop_index('ix_development_task_steps_task_id_occurred_at', table_name='development_task_steps')
+    op.drop_index(op.f('ix_development_task_steps_id'), table_name='development_task_steps')
+    op.drop_table('development_task_steps')
@@ -0,0 +1,47 @@
+"""add development_task_log_chunks
+
+Revision ID: 013_add_development_task_log_chunks
+Revises: 012_add_development_task_steps
+Create Date: 2025-08-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_add_development_task_log_chunks'
+down_revision = '012_add_development_task_steps'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('development_task_log_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('stream', sa.String(), nullable=True),
+        sa.Column('seq', sa.Integer(), nullable=True),
+        sa.Column('byte_offset', sa.BigInteger(), nullable=False),
+        sa.Column('byte_length', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['development_tasks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_development_task_log_chunks_id'), 'development_task_log_chunks', ['id'], unique=False)
+    op.create_index(
+        'ix_development_task_log_chunks_task_id_byte_offset', 'development_task_log_chunks',
+        ['task_id', 'byte_offset'], unique=False
+    )
+    op.create_index(
+        'ux_development_task_log_chunks_task_id_stream_seq', 'development_task_log_chunks',
+        ['task_id', 'stream', 'seq'], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('ux_development_task_log_chunks_task_id_stream_seq', table_name='development_task_log_chunks')
+    op.drop_index('ix_development_task_log_chunks_task_id_byte_offset', table_name='development_task_log_chunks')
+    op.drop_index(op.f('ix_development_task_log_chunks_id'), table_name='development_task_log_chunks')
+    op.drop_table('development_task_log_chunks')
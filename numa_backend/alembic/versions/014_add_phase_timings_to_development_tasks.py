@@ -0,0 +1,26 @@
+"""add phase_timings to development_tasks
+
+Revision ID: 014_add_phase_timings_to_development_tasks
+Revises: 013_add_development_task_log_chunks
+Create Date: 2025-08-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014_add_phase_timings_to_development_tasks'
+down_revision = '013_add_development_task_log_chunks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('development_tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('phase_timings', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('development_tasks', schema=None) as batch_op:
+        batch_op.drop_column('phase_timings')
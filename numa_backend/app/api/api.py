@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import requirements, solutions, development, deployment, users, applications, questions, event_logs
+from app.api.v1 import requirements, solutions, development, deployment, users, applications, questions, event_logs, topics
 
 api_router = APIRouter()
 api_router.include_router(requirements.router, prefix="/v1/requirements", tags=["requirements"])
@@ -10,4 +10,9 @@ api_router.include_router(deployment.router, prefix="/v1/deployment", tags=["dep
 api_router.include_router(users.router, prefix="/v1/users", tags=["users"])
 api_router.include_router(applications.router, prefix="/v1/applications", tags=["applications"])
 api_router.include_router(questions.router, prefix="/v1/questions", tags=["questions"])
-api_router.include_router(event_logs.router, prefix="/v1/event_logs", tags=["event_logs"])
\ No newline at end of file
+api_router.include_router(event_logs.router, prefix="/v1/event_logs", tags=["event_logs"])
+api_router.include_router(topics.router, prefix="/v1/topics", tags=["topics"])
+# Avatar 按 numa_avatar/api.md 约定访问 /api/topics
+api_router.include_router(topics.router, prefix="/topics", include_in_schema=False)
+# Avatar 按 numa_avatar/api.md 约定通过 /api/tasks 领取和确认任务
+api_router.include_router(development.router, prefix="/tasks", include_in_schema=False)
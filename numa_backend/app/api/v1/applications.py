@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.schemas.application import Application, ApplicationCreate, ApplicationInDB
 from app.services.application_service import create_application, get_application, get_applications, get_application_by_app_id
 from app.core.dependencies import get_db
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -29,5 +31,24 @@ def read_application_by_app_id(app_id: str, db: Session = Depends(get_db)):
     return db_application
 
 @router.get("/", response_model=List[Application])
-def read_applications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_applications(db, skip=skip, limit=limit)
\ No newline at end of file
+def read_applications(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        items = get_applications(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            status=status,
+            created_after=created_after, created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, items, limit, sort)
+    return items
\ No newline at end of file
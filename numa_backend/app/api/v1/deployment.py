@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.schemas.deployment import Deployment, DeploymentCreate
 from app.services.deployment_service import create_deployment, get_deployment, get_deployments
 from app.core.dependencies import get_db
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -22,5 +24,25 @@ def read_deployment(deployment_id: int, db: Session = Depends(get_db)):
     return db_deployment
 
 @router.get("/", response_model=List[Deployment])
-def read_deployments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_deployments(db, skip=skip, limit=limit)
\ No newline at end of file
+def read_deployments(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    status: Optional[str] = None,
+    development_task_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        items = get_deployments(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            status=status, development_task_id=development_task_id,
+            created_after=created_after, created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, items, limit, sort)
+    return items
\ No newline at end of file
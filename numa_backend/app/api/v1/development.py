@@ -1,37 +1,197 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from app.schemas.development import DevelopmentTask, DevelopmentTaskCreate, DevelopmentTaskUpdate
-from app.services.development_service import (
-    create_development_task, get_development_task, get_development_tasks,
-    get_development_task_with_relations, get_development_tasks_with_relations,
-    update_development_task
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request, Response
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.bulk import BulkCreateResult
+from app.schemas.development import (
+    DevelopmentTask, DevelopmentTaskCreate, DevelopmentTaskUpdate, PhaseTimingStats, TaskAckRequest, TaskClaimRequest,
+    TaskLeaseRequest, TaskLogChunkResult, TaskNackRequest, TaskStep, TaskStepBatch, TaskStepBatchResult
 )
-from app.core.dependencies import get_db
+from app.services.async_development_service import (
+    ack_task, append_task_log, bulk_create_development_tasks, claim_next_task, claim_task, create_development_task,
+    get_development_task_with_relations, get_development_tasks_with_relations, get_phase_timing_stats, get_task_steps,
+    heartbeat_task, nack_task, record_task_steps, requeue_task, update_development_task
+)
+from app.services.async_task_log_service import TASK_LOG_READ_LIMIT, read_task_log
+from app.services.task_log_service import compact_task_log, decode_log_body
+from app.services.task_queue_service import LeaseConflictError
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.core.dependencies import get_async_db
+from app.core.fieldsets import is_sparse, parse_fields, parse_include, sparse_response
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
 @router.post("/", response_model=DevelopmentTask)
-def create_task(task: DevelopmentTaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: DevelopmentTaskCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        return await create_development_task(db, task)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_tasks_bulk(tasks: List[dict], db: AsyncSession = Depends(get_async_db)):
+    """批量创建开发任务，每条记录单独校验，无效的记录在结果中给出原因"""
+    try:
+        return await bulk_create_development_tasks(db, tasks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/claim", response_model=Optional[DevelopmentTask])
+async def claim_next(request: TaskClaimRequest, db: AsyncSession = Depends(get_async_db)):
+    """领取下一个可领取的任务，没有时返回 null"""
+    try:
+        return await claim_next_task(db, request.avatar_id, request.lease_seconds, request.application_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/timings", response_model=PhaseTimingStats)
+async def read_timings(limit: int = 100, status: Optional[str] = "done", application_id: Optional[int] = None,
+                       db: AsyncSession = Depends(get_async_db)):
+    """最近 limit 个任务各阶段耗时的分布（平均值、p50、p95、最大值，单位秒）"""
+    try:
+        return await get_phase_timing_stats(db, limit, status, application_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _lease_call(call, *args):
+    """执行任务队列操作：任务不存在返回 404，租约冲突返回 409"""
+    try:
+        db_task = await call(*args)
+    except LeaseConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="开发任务未找到")
+    return db_task
+
+@router.post("/{task_id}/claim", response_model=DevelopmentTask)
+async def claim(task_id: int, request: TaskLeaseRequest, db: AsyncSession = Depends(get_async_db)):
+    return await _lease_call(claim_task, db, task_id, request.avatar_id, request.lease_seconds)
+
+@router.post("/{task_id}/heartbeat", response_model=DevelopmentTask)
+async def heartbeat(task_id: int, request: TaskLeaseRequest, db: AsyncSession = Depends(get_async_db)):
+    return await _lease_call(heartbeat_task, db, task_id, request.avatar_id, request.lease_seconds)
+
+@router.post("/{task_id}/ack", response_model=DevelopmentTask)
+async def ack(task_id: int, request: TaskAckRequest, background_tasks: BackgroundTasks,
+              db: AsyncSession = Depends(get_async_db)):
+    db_task = await _lease_call(ack_task, db, task_id, request.avatar_id, request.timings)
+    # 任务完成，关闭并压缩任务日志的最后一段
+    background_tasks.add_task(compact_task_log, task_id, True)
+    return db_task
+
+@router.post("/{task_id}/nack", response_model=DevelopmentTask)
+async def nack(task_id: int, request: TaskNackRequest, db: AsyncSession = Depends(get_async_db)):
+    return await _lease_call(nack_task, db, task_id, request.avatar_id, request.error, request.retry, request.timings)
+
+@router.post("/{task_id}/requeue", response_model=DevelopmentTask)
+async def requeue(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """将死信任务重新排队"""
+    return await _lease_call(requeue_task, db, task_id)
+
+@router.post("/{task_id}/steps", response_model=TaskStepBatchResult)
+async def post_steps(task_id: int, batch: TaskStepBatch, db: AsyncSession = Depends(get_async_db)):
+    """记录 Avatar 批量上报的任务步骤，重发的批次按 batch_id 忽略"""
+    try:
+        result = await record_task_steps(db, task_id, batch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="开发任务未找到")
+    return result
+
+@router.get("/{task_id}/steps", response_model=List[TaskStep])
+async def read_steps(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    """任务的步骤时间线"""
+    steps = await get_task_steps(db, task_id)
+    if steps is None:
+        raise HTTPException(status_code=404, detail="开发任务未找到")
+    return steps
+
+@router.post("/{task_id}/logs", response_model=TaskLogChunkResult)
+async def post_logs(task_id: int, request: Request, background_tasks: BackgroundTasks, stream: Optional[str] = None,
+                    seq: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """追加一块任务日志：gzip 压缩的文本（Content-Encoding: gzip）或 {"logs": "..."}；
+    带 stream / seq 时重发的块直接忽略"""
+    try:
+        data = decode_log_body(
+            await request.body(), request.headers.get("content-type"), request.headers.get("content-encoding")
+        )
+        result = await append_task_log(db, task_id, data, stream, seq)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="开发任务未找到")
+    # 压缩写满后关闭的段
+    background_tasks.add_task(compact_task_log, task_id)
+    return result
+
+@router.get("/{task_id}/logs")
+async def read_logs(task_id: int, offset: int = 0, limit: int = TASK_LOG_READ_LIMIT, wait: float = 0,
+                    db: AsyncSession = Depends(get_async_db)):
+    """按字节范围读取任务日志；offset 已到末尾时最多等待 wait 秒的新日志（长轮询）
+
+    响应头 X-Log-Next-Offset 为下一次读取的偏移量，X-Log-Size 为当前日志大小。
+    """
+    if await db.get(DevelopmentTaskModel, task_id) is None:
+        raise HTTPException(status_code=404, detail="开发任务未找到")
+    # 结束只读事务，等待期间不占用连接
+    await db.rollback()
     try:
-        return create_development_task(db, task)
+        data, size = await read_task_log(task_id, offset, limit, wait)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=data, media_type="text/plain; charset=utf-8", headers={
+        "X-Log-Offset": str(offset),
+        "X-Log-Next-Offset": str(offset + len(data)),
+        "X-Log-Size": str(size),
+    })
 
 @router.get("/{task_id}", response_model=DevelopmentTask)
-def read_task(task_id: int, db: Session = Depends(get_db)):
-    db_task = get_development_task_with_relations(db, task_id)
+async def read_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_task = await get_development_task_with_relations(db, task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="开发任务未找到")
     return db_task
 
 @router.get("/", response_model=List[DevelopmentTask])
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_development_tasks_with_relations(db, skip=skip, limit=limit)
+async def read_tasks(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    status: Optional[str] = None,
+    application_id: Optional[int] = None,
+    assigned_to: Optional[int] = None,
+    requirement_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        field_list = parse_fields(fields, DevelopmentTask, DevelopmentTaskModel)
+        include_list = parse_include(include, DevelopmentTask)
+        items = await get_development_tasks_with_relations(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            status=status, application_id=application_id, assigned_to=assigned_to, requirement_id=requirement_id,
+            created_after=created_after, created_before=created_before,
+            fields=field_list, include=include_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if is_sparse(field_list, include_list):
+        return sparse_response(items, DevelopmentTask, DevelopmentTaskModel, field_list, include_list, limit, sort)
+    set_next_cursor(response, items, limit, sort)
+    return items
 
 @router.put("/{task_id}", response_model=DevelopmentTask)
-def update_task(task_id: int, task_update: DevelopmentTaskUpdate, db: Session = Depends(get_db)):
-    db_task = update_development_task(db, task_id, task_update)
+async def update_task(task_id: int, task_update: DevelopmentTaskUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_task = await update_development_task(db, task_id, task_update)
     if db_task is None:
         raise HTTPException(status_code=404, detail="开发任务未找到")
-    return db_task
\ No newline at end of file
+    return db_task
@@ -1,15 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.schemas.event_log import EventLog
-from app.services.event_log_service import get_event_logs, get_event_logs_by_requirement, get_event_logs_by_question
+from app.schemas.event_log import EventLog, EventLogDailyCount, RequirementTimeToClarify
+from app.services.event_log_service import (
+    get_event_logs, get_event_logs_by_requirement, get_event_logs_by_question,
+    get_event_log_daily_counts, get_time_to_clarify
+)
 from app.core.dependencies import get_db
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EventLog])
-def read_event_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_event_logs(db, skip=skip, limit=limit)
+def read_event_logs(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    requirement_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        items = get_event_logs(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            requirement_id=requirement_id, user_id=user_id, event_type=event_type,
+            created_after=created_after, created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, items, limit, sort)
+    return items
 
 @router.get("/requirement/{requirement_id}", response_model=List[EventLog])
 def read_event_logs_by_requirement(requirement_id: int, db: Session = Depends(get_db)):
@@ -17,4 +43,32 @@ def read_event_logs_by_requirement(requirement_id: int, db: Session = Depends(ge
 
 @router.get("/question/{question_id}", response_model=List[EventLog])
 def read_event_logs_by_question(question_id: int, db: Session = Depends(get_db)):
-    return get_event_logs_by_question(db, question_id)
\ No newline at end of file
+    return get_event_logs_by_question(db, question_id)
+
+@router.get("/stats/daily", response_model=List[EventLogDailyCount])
+def read_event_log_daily_counts(
+    event_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    requirement_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    return get_event_log_daily_counts(
+        db, event_type=event_type, user_id=user_id, requirement_id=requirement_id,
+        created_after=created_after, created_before=created_before
+    )
+
+@router.get("/stats/time-to-clarify", response_model=List[RequirementTimeToClarify])
+def read_time_to_clarify(
+    skip: int = 0,
+    limit: int = 100,
+    requirement_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    return get_time_to_clarify(
+        db, requirement_id=requirement_id, created_after=created_after, created_before=created_before,
+        skip=skip, limit=limit
+    )
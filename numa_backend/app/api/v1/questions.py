@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from sqlalchemy.orm import Session
+from app.schemas.bulk import BulkCreateResult
 from app.schemas.question import Question, QuestionCreate, QuestionUpdate
-from app.services.question_service import create_question, get_question, get_questions_by_requirement, answer_question, clarify_question
+from app.services.question_service import bulk_create_questions, create_question, get_question, get_questions_by_requirement, answer_question, clarify_question
 from app.core.dependencies import get_db
 
 router = APIRouter()
@@ -14,6 +15,14 @@ def create_new_question(question: QuestionCreate, current_user_id: int, db: Sess
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=BulkCreateResult)
+def create_questions_bulk(questions: List[dict], current_user_id: int, db: Session = Depends(get_db)):
+    """批量创建问题，每条记录单独校验，无效的记录在结果中给出原因"""
+    try:
+        return bulk_create_questions(db, questions, current_user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{question_id}", response_model=Question)
 def read_question(question_id: int, db: Session = Depends(get_db)):
     db_question = get_question(db, question_id)
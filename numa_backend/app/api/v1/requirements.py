@@ -1,96 +1,118 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.bulk import BulkCreateResult
 from app.schemas.requirement import Requirement, RequirementCreate, RequirementUpdate
-from app.services.requirement_service import (
-    create_requirement, get_requirement, get_requirements, 
-    update_requirement, update_requirement_status, assign_requirement,
-    confirm_requirement, complete_requirement, generate_branch_name, generate_spec_document, clarify_requirement,
+from app.services.async_requirement_service import (
+    bulk_create_requirements, create_requirement, update_requirement, update_requirement_status, assign_requirement,
+    confirm_requirement, complete_requirement, clarify_requirement,
     get_requirement_with_relations, get_requirements_with_relations
 )
-from app.core.dependencies import get_db
+from app.models.requirement import Requirement as RequirementModel
+from app.core.dependencies import get_async_db
+from app.core.fieldsets import is_sparse, parse_fields, parse_include, sparse_response
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
 @router.post("/", response_model=Requirement)
-def create_new_requirement(requirement: RequirementCreate, db: Session = Depends(get_db)):
+async def create_new_requirement(requirement: RequirementCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        return create_requirement(db, requirement)
+        return await create_requirement(db, requirement)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=BulkCreateResult)
+async def create_requirements_bulk(requirements: List[dict], db: AsyncSession = Depends(get_async_db)):
+    """批量创建需求，每条记录单独校验，无效的记录在结果中给出原因"""
+    try:
+        return await bulk_create_requirements(db, requirements)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{requirement_id}", response_model=Requirement)
-def read_requirement(requirement_id: int, db: Session = Depends(get_db)):
-    db_requirement = get_requirement_with_relations(db, requirement_id)
+async def read_requirement(requirement_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_requirement = await get_requirement_with_relations(db, requirement_id)
     if db_requirement is None:
         raise HTTPException(status_code=404, detail="Requirement not found")
     return db_requirement
 
 @router.get("/", response_model=List[Requirement])
-def read_requirements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_requirements_with_relations(db, skip=skip, limit=limit)
+async def read_requirements(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    status: Optional[str] = None,
+    application_id: Optional[int] = None,
+    assigned_to: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        field_list = parse_fields(fields, Requirement, RequirementModel)
+        include_list = parse_include(include, Requirement)
+        items = await get_requirements_with_relations(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            status=status, application_id=application_id, assigned_to=assigned_to,
+            created_after=created_after, created_before=created_before,
+            fields=field_list, include=include_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if is_sparse(field_list, include_list):
+        return sparse_response(items, Requirement, RequirementModel, field_list, include_list, limit, sort)
+    set_next_cursor(response, items, limit, sort)
+    return items
 
 @router.put("/{requirement_id}", response_model=Requirement)
-def update_requirement_endpoint(requirement_id: int, requirement_update: RequirementUpdate, db: Session = Depends(get_db)):
-    db_requirement = update_requirement(db, requirement_id, requirement_update)
+async def update_requirement_endpoint(requirement_id: int, requirement_update: RequirementUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_requirement = await update_requirement(db, requirement_id, requirement_update)
     if db_requirement is None:
         raise HTTPException(status_code=404, detail="Requirement not found")
     return db_requirement
 
 @router.patch("/{requirement_id}/status", response_model=Requirement)
-def update_requirement_status_endpoint(requirement_id: int, status: str, db: Session = Depends(get_db)):
-    db_requirement = update_requirement_status(db, requirement_id, status)
+async def update_requirement_status_endpoint(requirement_id: int, status: str, db: AsyncSession = Depends(get_async_db)):
+    db_requirement = await update_requirement_status(db, requirement_id, status)
     if db_requirement is None:
         raise HTTPException(status_code=404, detail="Requirement not found")
     return db_requirement
 
 @router.post("/{requirement_id}/assign", response_model=Requirement)
-def assign_requirement_endpoint(requirement_id: int, assigned_to: int, db: Session = Depends(get_db)):
+async def assign_requirement_endpoint(requirement_id: int, assigned_to: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        # 生成分支名称
-        requirement = get_requirement(db, requirement_id)
-        if not requirement:
-            raise HTTPException(status_code=404, detail="Requirement not found")
-        
-        branch_name = generate_branch_name(requirement_id, requirement.title)
-        
-        # 生成需求规范文档
-        spec_document = generate_spec_document(db, requirement_id)
-        
-        # 分配需求并更新相关信息
-        db_requirement = assign_requirement(db, requirement_id, assigned_to)
+        # 分配需求，同时生成分支名称和需求规范文档
+        db_requirement = await assign_requirement(db, requirement_id, assigned_to)
         if db_requirement is None:
             raise HTTPException(status_code=404, detail="Requirement not found")
-        
-        # 更新分支名称和规范文档
-        db_requirement = update_requirement(
-            db, 
-            requirement_id, 
-            RequirementUpdate(branch_name=branch_name, spec_document=spec_document)
-        )
-        
         return db_requirement
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{requirement_id}/confirm", response_model=Requirement)
-def confirm_requirement_endpoint(requirement_id: int, db: Session = Depends(get_db)):
-    db_requirement = confirm_requirement(db, requirement_id)
+async def confirm_requirement_endpoint(requirement_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_requirement = await confirm_requirement(db, requirement_id)
     if db_requirement is None:
         raise HTTPException(status_code=404, detail="Requirement not found")
     return db_requirement
 
 @router.post("/{requirement_id}/complete", response_model=Requirement)
-def complete_requirement_endpoint(requirement_id: int, db: Session = Depends(get_db)):
-    db_requirement = complete_requirement(db, requirement_id)
+async def complete_requirement_endpoint(requirement_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_requirement = await complete_requirement(db, requirement_id)
     if db_requirement is None:
         raise HTTPException(status_code=404, detail="Requirement not found")
     return db_requirement
 
 @router.patch("/{requirement_id}/clarify", response_model=Requirement)
-def clarify_requirement_endpoint(requirement_id: int, clarified: bool = True, db: Session = Depends(get_db)):
+async def clarify_requirement_endpoint(requirement_id: int, clarified: bool = True, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_requirement = clarify_requirement(db, requirement_id, clarified)
+        db_requirement = await clarify_requirement(db, requirement_id, clarified)
         return db_requirement
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.schemas.topic import Topic, TopicCreate, TopicList, TopicMessage, TopicMessageCreate, TopicMessageList
+from app.services.topic_service import (
+    TASKS_TOPIC, create_topic, get_messages, get_or_create_topic, get_topic, get_topics, message_to_dict,
+    publish_message
+)
+from app.services import async_topic_service
+from app.core.dependencies import get_db, get_async_db
+
+router = APIRouter()
+
+@router.get("/", response_model=TopicList)
+def read_topics(db: Session = Depends(get_db)):
+    return {"data": get_topics(db)}
+
+@router.post("/", response_model=Topic)
+def create_new_topic(topic: TopicCreate, db: Session = Depends(get_db)):
+    try:
+        return create_topic(db, topic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/tasks", response_model=Topic)
+def read_task_topic(db: Session = Depends(get_db)):
+    """开发任务下发使用的 topic，不存在时自动创建"""
+    return get_or_create_topic(db, TASKS_TOPIC, "Development tasks topic")
+
+@router.get("/{topic_id}", response_model=Topic)
+def read_topic(topic_id: int, db: Session = Depends(get_db)):
+    db_topic = get_topic(db, topic_id)
+    if db_topic is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    return db_topic
+
+@router.post("/{topic_id}/messages", response_model=TopicMessage)
+def publish_topic_message(topic_id: int, message: TopicMessageCreate, db: Session = Depends(get_db)):
+    try:
+        return message_to_dict(publish_message(db, topic_id, message.data))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{topic_id}/messages", response_model=TopicMessageList)
+def read_topic_messages(topic_id: int, after: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """读取偏移量（消息ID）之后的消息"""
+    if get_topic(db, topic_id) is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    return {"data": [message_to_dict(db_message) for db_message in get_messages(db, topic_id, after, limit)]}
+
+@router.get("/{topic_id}/stream")
+async def stream_topic_messages(
+    topic_id: int,
+    request: Request,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """以 Server-Sent Events 推送偏移量之后的消息
+
+    重连时从 Last-Event-ID 请求头或 after 参数中较大的偏移量续传。
+    """
+    if await async_topic_service.get_topic(db, topic_id) is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+    await db.rollback()
+    return StreamingResponse(
+        async_topic_service.iter_topic_events(db, topic_id, after, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
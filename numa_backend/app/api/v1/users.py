@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.schemas.user import User, UserCreate
 from app.services.user_service import create_user, get_user, get_users
 from app.core.dependencies import get_db
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -22,5 +24,22 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     return db_user
 
 @router.get("/", response_model=List[User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_users(db, skip=skip, limit=limit)
\ No newline at end of file
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        items = get_users(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort,
+            created_after=created_after, created_before=created_before
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, items, limit, sort)
+    return items
\ No newline at end of file
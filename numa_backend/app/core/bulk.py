@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, Set, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.schemas.bulk import BulkCreateResult, BulkItemResult
+
+# 单次批量请求允许的最大条数
+BULK_MAX_ITEMS = 5000
+
+# IN 查询每次携带的参数个数，避免超出 SQLite 的绑定参数上限
+IN_QUERY_CHUNK_SIZE = 500
+
+def check_bulk_size(items: List):
+    if len(items) > BULK_MAX_ITEMS:
+        raise ValueError(f"Too many items: {len(items)} > {BULK_MAX_ITEMS}")
+
+def validate_items(schema: Type[BaseModel], items: List[dict]) -> Tuple[List[tuple], Dict[int, str]]:
+    """逐条按 schema 校验请求中的记录，无效的记录单独报错，不影响其他记录
+
+    Returns:
+        ((请求中的位置, 校验后的记录) 列表, 按位置索引的错误原因)
+    """
+    valid, errors = [], {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.parse_obj(item)))
+        except ValidationError as e:
+            errors[index] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+    return valid, errors
+
+def rows_by_id(db: Session, model, ids: Iterable[int], *columns) -> Dict[int, tuple]:
+    """用 IN 查询一次性取出引用的记录（按块拆分），返回主键到所查列的映射"""
+    wanted = sorted({i for i in ids if i is not None})
+    found = {}
+    for start in range(0, len(wanted), IN_QUERY_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_QUERY_CHUNK_SIZE]
+        for row in db.query(model.id, *columns).filter(model.id.in_(chunk)):
+            found[row[0]] = tuple(row[1:])
+    return found
+
+def existing_ids(db: Session, model, ids: Iterable[int]) -> Set[int]:
+    """引用的主键中实际存在的部分"""
+    return set(rows_by_id(db, model, ids))
+
+def bulk_insert(db: Session, model, rows: List[tuple]):
+    """批量插入校验通过的记录，所有记录通过一次 executemany 写入
+
+    bulk_insert_mappings(return_defaults=True) 为取回主键会逐行执行 INSERT，这里改为：
+    PostgreSQL 先从主键序列一次取出所需个数的值，带着主键写入；SQLite 写入后在同一事务中按主键倒序取回最新的
+    N 条，事务持有数据库写锁，新记录的主键连续且排在最后。
+
+    Args:
+        rows: (请求中的位置, 字段映射) 列表，插入后映射中会带上生成的主键
+    Returns:
+        按位置索引的主键
+    """
+    if not rows:
+        return {}
+    table = model.__table__
+    mappings = [mapping for _, mapping in rows]
+    if db.get_bind().dialect.name == "postgresql":
+        ids = [row[0] for row in db.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": table.name, "count": len(mappings)}
+        )]
+        for mapping, id_ in zip(mappings, ids):
+            mapping["id"] = id_
+        db.execute(table.insert(), mappings)
+    else:
+        db.execute(table.insert(), mappings)
+        ids = [row[0] for row in db.query(model.id).order_by(model.id.desc()).limit(len(mappings))]
+        for mapping, id_ in zip(mappings, reversed(ids)):
+            mapping["id"] = id_
+    return {index: mapping["id"] for index, mapping in rows}
+
+def build_result(count: int, ids: dict, errors: dict) -> BulkCreateResult:
+    """按请求顺序汇总每条记录的处理结果"""
+    results = [
+        BulkItemResult(index=index, id=ids.get(index), error=errors.get(index))
+        for index in range(count)
+    ]
+    return BulkCreateResult(created=len(ids), failed=len(errors), results=results)
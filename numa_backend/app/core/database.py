@@ -1,12 +1,100 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./numa.db"
+# 数据库连接地址，生产环境可通过 DATABASE_URL 指向 PostgreSQL
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./numa.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# SQLite 参数
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# 连接池参数（PostgreSQL 等服务端数据库）
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """为每个新的 SQLite 连接开启 WAL 等参数，使读写可以并发进行"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+def create_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, tuned: bool = True):
+    """根据数据库地址创建引擎
+
+    Args:
+        database_url: 数据库连接地址
+        tuned: 是否启用 SQLite pragma / 连接池调优，关闭时等同于默认配置
+    """
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        )
+        if tuned:
+            event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    if not tuned:
+        return create_engine(database_url)
+    return create_engine(
+        database_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+# 同步驱动到异步驱动的映射
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> str:
+    """将数据库地址转换为对应异步驱动的地址"""
+    scheme, rest = database_url.split("://", 1)
+    backend = scheme.split("+")[0]
+    if backend in ASYNC_DRIVERS:
+        return f"{ASYNC_DRIVERS[backend]}://{rest}"
+    return database_url
+
+def create_async_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, tuned: bool = True):
+    """创建异步引擎，参数与 create_db_engine 保持一致"""
+    async_url = to_async_url(database_url)
+    if async_url.startswith("sqlite"):
+        engine = create_async_engine(
+            async_url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        )
+        if tuned:
+            event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    if not tuned:
+        return create_async_engine(async_url)
+    return create_async_engine(
+        async_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+# 异步会话提交后不过期对象，响应序列化时无需再次访问数据库
+async_engine = create_async_db_engine()
+AsyncSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+Base = declarative_base()
@@ -1,8 +1,12 @@
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
+
+# 稀疏字段集下始终查询的列：id 用于标识记录，created_at 用于默认排序与游标
+REQUIRED_COLUMNS = ("id", "created_at")
+
+def relation_fields(schema) -> List[str]:
+    """响应模型中嵌套的关联对象字段"""
+    return [
+        name for name, field in schema.__fields__.items()
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel)
+    ]
+
+def column_fields(schema, model) -> List[str]:
+    """响应模型中对应数据库列的字段"""
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    return [name for name in schema.__fields__ if name in columns]
+
+def _parse(value: Optional[str], allowed: List[str], kind: str) -> Optional[List[str]]:
+    if value is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unsupported {kind}: {', '.join(unknown)}")
+    return names
+
+def parse_fields(value: Optional[str], schema, model) -> Optional[List[str]]:
+    """解析 fields 参数（逗号分隔的列名），未指定时返回 None"""
+    return _parse(value, column_fields(schema, model), "field")
+
+def parse_include(value: Optional[str], schema) -> Optional[List[str]]:
+    """解析 include 参数（逗号分隔的关联对象名），未指定时返回 None"""
+    return _parse(value, relation_fields(schema), "include")
+
+def sparse_options(model, relation_options: Dict[str, tuple], fields: Optional[List[str]] = None,
+                   include: Optional[List[str]] = None, sort: Optional[str] = None):
+    """根据 fields / include 生成查询选项
+
+    Args:
+        model: 被查询的模型
+        relation_options: 关联对象名到其预加载选项的映射
+        fields: 需要查询的列，None 表示全部列
+        include: 需要预加载的关联对象；未指定时，若同时未指定 fields 则加载全部关联，否则不加载
+        sort: 排序参数，排序字段会被一并查询以生成游标
+    """
+    options = []
+    if fields is not None:
+        columns = dict.fromkeys([*REQUIRED_COLUMNS, *fields])
+        sort_field = (sort or "created_at").lstrip("-")
+        # 非法排序字段交由分页校验报错
+        if sort_field in inspect(model).column_attrs:
+            columns[sort_field] = None
+        options.append(load_only(*(getattr(model, name) for name in columns)))
+
+    if include is None:
+        include = [] if fields is not None else list(relation_options)
+    for name in include:
+        options.extend(relation_options[name])
+    return options
+
+def is_sparse(fields: Optional[List[str]], include: Optional[List[str]]) -> bool:
+    return fields is not None or include is not None
+
+def serialize_sparse(item, schema, model, fields: Optional[List[str]], include: Optional[List[str]]):
+    """只序列化请求的列和关联对象，不会访问未加载的属性"""
+    row = {"id": item.id}
+    for name in fields if fields is not None else column_fields(schema, model):
+        row[name] = getattr(item, name)
+    for name in include or []:
+        related = getattr(item, name)
+        row[name] = schema.__fields__[name].type_.from_orm(related) if related is not None else None
+    return row
+
+def sparse_response(items, schema, model, fields: Optional[List[str]], include: Optional[List[str]],
+                    limit: int, sort: Optional[str] = None):
+    """构造稀疏字段集的列表响应，并带上下一页游标"""
+    rows = [serialize_sparse(item, schema, model, fields, include) for item in items]
+    response = JSONResponse(content=jsonable_encoder(rows))
+    cursor = next_cursor(items, limit, sort)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response
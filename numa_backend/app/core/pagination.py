@@ -0,0 +1,117 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, and_, func, or_, select
+
+# 下一页游标通过响应头返回，响应体保持列表格式不变
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 未指定 sort 时的默认排序
+DEFAULT_SORT = "created_at"
+
+def parse_sort(sort: Optional[str], allowed=(DEFAULT_SORT,)):
+    """解析排序参数，返回 (字段名, 是否降序)
+
+    Args:
+        sort: 排序字段，前缀 "-" 表示降序，例如 "-created_at"
+        allowed: 允许排序的字段白名单
+    """
+    sort = sort or DEFAULT_SORT
+    descending = sort.startswith("-")
+    field = sort[1:] if descending else sort
+    if field not in allowed:
+        raise ValueError(f"Unsupported sort field: {field}")
+    return field, descending
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def encode_cursor(item, sort: Optional[str] = None) -> str:
+    """将列表最后一行的 (排序字段值, id) 编码为不透明游标"""
+    sort = sort or DEFAULT_SORT
+    payload = {
+        "sort": sort,
+        "value": _serialize(getattr(item, sort.lstrip("-"))),
+        "id": item.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_cursor(cursor: str):
+    """解析游标，返回 (排序参数, 排序字段值, id)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return payload["sort"], payload["value"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def apply_filters(query, model, created_after: Optional[datetime] = None,
+                  created_before: Optional[datetime] = None, **equals):
+    """按字段相等与创建时间范围过滤，值为 None 的条件忽略
+
+    Args:
+        query: Query 或 select() 语句
+        model: 被查询的模型
+        created_after: 只返回该时间（含）之后创建的记录
+        created_before: 只返回该时间之前创建的记录
+        equals: 字段名到取值的相等条件，例如 status="pending"
+    """
+    for field, value in equals.items():
+        if value is not None:
+            query = query.filter(getattr(model, field) == value)
+    if created_after is not None:
+        query = query.filter(model.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(model.created_at < created_before)
+    return query
+
+def apply_pagination(query, model, cursor: Optional[str] = None, skip: int = 0, limit: int = 100,
+                     sort: Optional[str] = None, sort_fields=(DEFAULT_SORT,)):
+    """按 (排序字段, id) 排序分页，Query 与 select() 语句均适用
+
+    提供游标时使用键集分页（从游标之后开始），否则退回到 offset 分页以兼容旧调用方。
+    """
+    field, descending = parse_sort(sort, sort_fields)
+    column = getattr(model, field)
+    if descending:
+        query = query.order_by(column.desc(), model.id.desc())
+    else:
+        query = query.order_by(column, model.id)
+
+    if cursor:
+        cursor_sort, value, last_id = decode_cursor(cursor)
+        if cursor_sort != (sort or DEFAULT_SORT):
+            raise ValueError("Cursor does not match sort order")
+        if isinstance(value, str) and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        # 锚点行的排序字段值直接从数据库读取，避免时间格式与存储格式不一致
+        anchor = func.coalesce(
+            select(column).where(model.id == last_id).scalar_subquery(),
+            value,
+        )
+        if descending:
+            query = query.filter(or_(column < anchor, and_(column == anchor, model.id < last_id)))
+        else:
+            query = query.filter(or_(column > anchor, and_(column == anchor, model.id > last_id)))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def paginate(query, model, cursor: Optional[str] = None, skip: int = 0, limit: int = 100,
+             sort: Optional[str] = None, sort_fields=(DEFAULT_SORT,)):
+    """对 Query 分页并返回结果列表"""
+    return apply_pagination(
+        query, model, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=sort_fields
+    ).all()
+
+def next_cursor(items, limit: int, sort: Optional[str] = None) -> Optional[str]:
+    """满页时返回下一页游标，否则说明已到末页"""
+    if limit and len(items) == limit:
+        return encode_cursor(items[-1], sort)
+    return None
+
+def set_next_cursor(response, items, limit: int, sort: Optional[str] = None):
+    """在响应头中写入下一页游标"""
+    cursor = next_cursor(items, limit, sort)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,191 @@
+"""开发任务日志的分段文件存储
+
+每个任务的日志保存在 TASK_LOG_DIR/task_{id}/ 下，只追加写入，按字节偏移量读取，偏移量跨段连续：
+- 当前段 {start}.log：追加写入，超过 TASK_LOG_SEGMENT_BYTES 后关闭
+- 已关闭的段 {start}-{end}.log：等待压缩
+- 已压缩的段 {start}-{end}.log.gz：读取时流式解压到目标偏移量，不整段载入内存
+start / end 为段在整个日志中的起止偏移量，日志大小由文件名和当前段的大小得出，不需要读取内容。
+同一任务同时只有一个写入方（持有租约的 Avatar），进程内按任务加锁。
+"""
+import gzip
+import os
+import re
+import shutil
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from app.core.topic_broker import TopicBroker
+
+TASK_LOG_DIR = os.getenv("TASK_LOG_DIR", "./task_logs")
+# 单个段的大小上限（字节），超过后关闭当前段并压缩
+TASK_LOG_SEGMENT_BYTES = int(os.getenv("TASK_LOG_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+
+_SEGMENT_PATTERN = re.compile(r"^(\d{16})(?:-(\d{16}))?\.log(\.gz)?$")
+
+class Segment(NamedTuple):
+    start: int
+    end: Optional[int]  # 当前段为 None
+    path: str
+    compressed: bool
+
+class TaskLogStore:
+    """按任务追加写入的分段日志文件"""
+
+    def __init__(self, root: str, segment_bytes: int = TASK_LOG_SEGMENT_BYTES):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self._locks: Dict[int, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._compress_lock = threading.Lock()
+
+    def _lock(self, task_id: int) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(task_id, threading.Lock())
+
+    def _task_dir(self, task_id: int) -> str:
+        return os.path.join(self.root, f"task_{task_id}")
+
+    def segments(self, task_id: int) -> List[Segment]:
+        """按起始偏移量排序的段，同一段同时存在压缩和未压缩的文件时使用压缩的文件"""
+        task_dir = self._task_dir(task_id)
+        if not os.path.isdir(task_dir):
+            return []
+        segments = {}
+        for name in os.listdir(task_dir):
+            match = _SEGMENT_PATTERN.match(name)
+            if not match:
+                continue
+            start, end, compressed = int(match.group(1)), match.group(2), bool(match.group(3))
+            segment = Segment(start, int(end) if end else None, os.path.join(task_dir, name), compressed)
+            if start not in segments or compressed:
+                segments[start] = segment
+        return [segments[start] for start in sorted(segments)]
+
+    def _segment_end(self, segment: Segment) -> int:
+        if segment.end is not None:
+            return segment.end
+        return segment.start + os.path.getsize(segment.path)
+
+    def size(self, task_id: int) -> int:
+        """日志的总字节数"""
+        for attempt in range(2):
+            segments = self.segments(task_id)
+            try:
+                return self._segment_end(segments[-1]) if segments else 0
+            except FileNotFoundError:
+                # 当前段刚被关闭，重新列出段
+                if attempt:
+                    raise
+
+    def append(self, task_id: int, data: bytes) -> int:
+        """追加写入日志
+
+        Returns:
+            写入位置的偏移量
+        """
+        with self._lock(task_id):
+            segments = self.segments(task_id)
+            if segments and segments[-1].end is None:
+                active = segments[-1]
+            else:
+                start = self._segment_end(segments[-1]) if segments else 0
+                os.makedirs(self._task_dir(task_id), exist_ok=True)
+                active = Segment(start, None, os.path.join(self._task_dir(task_id), f"{start:016d}.log"), False)
+            with open(active.path, "ab") as f:
+                offset = active.start + f.tell()
+                f.write(data)
+            if offset + len(data) - active.start >= self.segment_bytes:
+                self._close_active(active)
+            return offset
+
+    def undo_append(self, task_id: int, offset: int, length: int) -> bool:
+        """撤销 append 写入的 [offset, offset + length)，用于写入后记录索引失败的情况
+
+        只有这段内容仍在日志末尾、所在的段未被压缩时才能撤销；写入时关闭的段重新作为当前段。
+
+        Returns:
+            是否已撤销
+        """
+        with self._lock(task_id):
+            segments = self.segments(task_id)
+            if not segments:
+                return False
+            last = segments[-1]
+            if last.compressed or offset < last.start or self._segment_end(last) != offset + length:
+                return False
+            if last.end is None:
+                os.truncate(last.path, offset - last.start)
+                return True
+            # 压缩在任务锁之外进行，持有压缩锁防止该段同时被压缩
+            with self._compress_lock:
+                if not os.path.exists(last.path):
+                    return False
+                os.truncate(last.path, offset - last.start)
+                os.replace(last.path, os.path.join(os.path.dirname(last.path), f"{last.start:016d}.log"))
+            return True
+
+    def _close_active(self, active: Segment):
+        end = self._segment_end(active)
+        os.replace(active.path, os.path.join(os.path.dirname(active.path), f"{active.start:016d}-{end:016d}.log"))
+
+    def close(self, task_id: int):
+        """关闭当前段（如任务完成时），之后写入的日志从新的段开始"""
+        with self._lock(task_id):
+            segments = self.segments(task_id)
+            if segments and segments[-1].end is None and os.path.getsize(segments[-1].path):
+                self._close_active(segments[-1])
+
+    def compress_closed(self, task_id: int) -> int:
+        """压缩已关闭但未压缩的段
+
+        Returns:
+            压缩的段数
+        """
+        task_dir = self._task_dir(task_id)
+        if not os.path.isdir(task_dir):
+            return 0
+        compressed = 0
+        with self._compress_lock:
+            for name in sorted(os.listdir(task_dir)):
+                match = _SEGMENT_PATTERN.match(name)
+                if not match or not match.group(2) or match.group(3):
+                    continue
+                path = os.path.join(task_dir, name)
+                if not os.path.exists(f"{path}.gz"):
+                    # 先写入临时文件，压缩完成后再替换，读取方不会看到不完整的压缩文件
+                    with open(path, "rb") as source, gzip.open(f"{path}.gz.tmp", "wb") as target:
+                        shutil.copyfileobj(source, target)
+                    os.replace(f"{path}.gz.tmp", f"{path}.gz")
+                    compressed += 1
+                os.remove(path)
+        return compressed
+
+    def read(self, task_id: int, offset: int, limit: int) -> bytes:
+        """读取从 offset 开始的至多 limit 个字节，可能跨越多个段"""
+        try:
+            return self._read(task_id, offset, limit)
+        except FileNotFoundError:
+            # 读取期间段被关闭或压缩，重新列出段后再读一次
+            return self._read(task_id, offset, limit)
+
+    def _read(self, task_id: int, offset: int, limit: int) -> bytes:
+        chunks = []
+        for segment in self.segments(task_id):
+            if limit <= 0:
+                break
+            end = self._segment_end(segment)
+            if end <= offset:
+                continue
+            opener = gzip.open if segment.compressed else open
+            with opener(segment.path, "rb") as f:
+                # 压缩的段 seek 时流式解压，内存占用与段大小无关
+                f.seek(offset - segment.start)
+                data = f.read(min(limit, end - offset))
+            chunks.append(data)
+            offset += len(data)
+            limit -= len(data)
+        return b"".join(chunks)
+
+task_log_store = TaskLogStore(TASK_LOG_DIR)
+
+# 任务日志有新内容时唤醒同一进程中等待该任务日志的读取请求（按任务ID）
+task_log_broker = TopicBroker()
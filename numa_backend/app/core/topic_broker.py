@@ -0,0 +1,37 @@
+import asyncio
+import threading
+from typing import Dict, Set, Tuple
+
+class TopicBroker:
+    """进程内的 topic 新消息通知
+
+    消息提交后调用 notify 唤醒同一进程中该 topic 的全部订阅流；
+    notify 可以在任意线程中调用（同步接口运行在线程池中）。
+    """
+
+    def __init__(self):
+        self._waiters: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic_id: int) -> asyncio.Event:
+        """在当前事件循环中订阅 topic，有新消息时返回的 Event 被置位"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(topic_id, set()).add(waiter)
+        return waiter[1]
+
+    def unsubscribe(self, topic_id: int, event: asyncio.Event):
+        with self._lock:
+            waiters = self._waiters.get(topic_id, set())
+            waiters.difference_update({waiter for waiter in waiters if waiter[1] is event})
+            if not waiters:
+                self._waiters.pop(topic_id, None)
+
+    def notify(self, topic_id: int):
+        with self._lock:
+            waiters = list(self._waiters.get(topic_id, ()))
+        for loop, event in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+topic_broker = TopicBroker()
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from functools import wraps
+from sqlalchemy.orm import Session
+
+# 记录在 Session.info 中的嵌套深度
+_DEPTH_KEY = "unit_of_work_depth"
+
+def in_unit_of_work(db: Session) -> bool:
+    return db.info.get(_DEPTH_KEY, 0) > 0
+
+@contextmanager
+def unit_of_work(db: Session):
+    """在一个事务中执行一次完整的流程流转
+
+    块内的服务调用只 flush 不提交，由最外层的 unit_of_work 在结束时统一提交一次；
+    出现异常时整个流转回滚。可以嵌套使用，内层不会提前提交。
+    """
+    depth = db.info.get(_DEPTH_KEY, 0)
+    db.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except Exception:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH_KEY] = depth
+
+def transactional(func):
+    """将服务函数作为一次完整流转执行，函数内（含其调用的其他服务）的修改一次提交"""
+    @wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        with unit_of_work(db):
+            return func(db, *args, **kwargs)
+    return wrapper
+
+def commit(db: Session, *instances):
+    """提交服务层的修改
+
+    处于 unit_of_work 中时只 flush（分配主键、让后续查询可见），由最外层统一提交；
+    否则立即提交并刷新传入的对象。
+    """
+    if in_unit_of_work(db):
+        db.flush()
+        return
+    db.commit()
+    for instance in instances:
+        db.refresh(instance)
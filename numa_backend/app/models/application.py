@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -14,6 +15,11 @@ class Application(BaseModel):
     app_id = Column(String, unique=True)  # 应用唯一标识符
     built_at = Column(DateTime(timezone=True), nullable=True)
     
+    # 关联对象
+    requirements = relationship("Requirement", back_populates="application")
+    solutions = relationship("Solution", back_populates="application")
+    development_tasks = relationship("DevelopmentTask", back_populates="application")
+    
     # 添加唯一性约束
     __table_args__ = (
         UniqueConstraint('name', name='uq_application_name'),
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -7,7 +7,12 @@ class Deployment(BaseModel):
     
     name = Column(String, index=True)
     description = Column(Text)
-    development_task_id = Column(Integer, ForeignKey("development_tasks.id"))
+    development_task_id = Column(Integer, ForeignKey("development_tasks.id"), index=True)
     status = Column(String, default="pending")  # pending, in_progress, success, failed
     deployed_at = Column(DateTime(timezone=True), nullable=True)
-    deployed_by = Column(Integer, ForeignKey("users.id"))
\ No newline at end of file
+    deployed_by = Column(Integer, ForeignKey("users.id"))
+
+    # 按状态筛选并按创建时间排序的列表
+    __table_args__ = (
+        Index('ix_deployments_status_created_at', 'status', 'created_at'),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -7,11 +8,65 @@ class DevelopmentTask(BaseModel):
     
     title = Column(String, index=True)
     description = Column(Text)
-    solution_id = Column(Integer, ForeignKey("solutions.id"))
-    requirement_id = Column(Integer, ForeignKey("requirements.id"))
-    application_id = Column(Integer, ForeignKey("applications.id"))
-    status = Column(String, default="todo")  # todo, in_progress, done
-    assigned_to = Column(Integer, ForeignKey("users.id"))
+    solution_id = Column(Integer, ForeignKey("solutions.id"), index=True)
+    requirement_id = Column(Integer, ForeignKey("requirements.id"), index=True)
+    application_id = Column(Integer, ForeignKey("applications.id"), index=True)
+    status = Column(String, default="todo")  # todo, in_progress, done, dead_letter
+    assigned_to = Column(Integer, ForeignKey("users.id"), index=True)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    code_branch = Column(String, nullable=True)  # 代码分支名称
\ No newline at end of file
+    code_branch = Column(String, nullable=True)  # 代码分支名称
+    # 任务队列：领取任务的 Avatar 及其租约到期时间，重试次数与下次可领取时间
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    # JSON 格式的各阶段耗时（秒），如 {"clone": 1.2, "generation": 30.5}，由 Avatar 确认或报告失败时上报
+    phase_timings = Column(Text, nullable=True)
+    
+    # 关联对象
+    solution = relationship("Solution", back_populates="development_tasks")
+    requirement = relationship("Requirement", back_populates="development_tasks")
+    application = relationship("Application", back_populates="development_tasks")
+
+    # 按状态筛选并按创建时间排序的列表；查找租约过期的任务
+    __table_args__ = (
+        Index('ix_development_tasks_status_created_at', 'status', 'created_at'),
+        Index('ix_development_tasks_status_lease_expires_at', 'status', 'lease_expires_at'),
+    )
+
+class DevelopmentTaskStep(BaseModel):
+    """Avatar 上报的任务执行步骤，按发生时间组成任务的步骤时间线"""
+    __tablename__ = "development_task_steps"
+
+    task_id = Column(Integer, ForeignKey("development_tasks.id"), nullable=False)
+    step = Column(String, nullable=False)  # 步骤名称，如 syncing_repository、generating_code
+    status = Column(String, nullable=True)  # 上报时的任务状态：in_progress、done、failed
+    details = Column(Text, nullable=True)  # JSON 格式的步骤详情（如错误信息、耗时），没有时为空
+    occurred_at = Column(DateTime(timezone=True), nullable=False)  # 步骤在 Avatar 上发生的时间
+    avatar_id = Column(String, nullable=True)
+    batch_id = Column(String, nullable=True)  # 上报批次标识，重发的批次按它去重
+    batch_seq = Column(Integer, nullable=True)  # 步骤在上报批次中的序号
+
+    # 按时间读取任务的步骤时间线；同一批次的步骤只记录一次，并发重发的批次由唯一索引拒绝
+    __table_args__ = (
+        Index('ix_development_task_steps_task_id_occurred_at', 'task_id', 'occurred_at'),
+        Index('ux_development_task_steps_task_id_batch_id_batch_seq', 'task_id', 'batch_id', 'batch_seq', unique=True),
+    )
+
+class DevelopmentTaskLogChunk(BaseModel):
+    """任务日志块的索引：每次上报的日志在任务日志中的字节偏移量和长度，内容保存在分段日志文件中"""
+    __tablename__ = "development_task_log_chunks"
+
+    task_id = Column(Integer, ForeignKey("development_tasks.id"), nullable=False)
+    stream = Column(String, nullable=True)  # Avatar 执行任务时生成的日志流标识
+    seq = Column(Integer, nullable=True)  # 块在日志流中的序号，重发的块按（stream, seq）忽略
+    byte_offset = Column(BigInteger, nullable=False)
+    byte_length = Column(Integer, nullable=False)
+
+    # 按偏移量定位日志块；同一日志流的块只记录一次
+    __table_args__ = (
+        Index('ix_development_task_log_chunks_task_id_byte_offset', 'task_id', 'byte_offset'),
+        Index('ux_development_task_log_chunks_task_id_stream_seq', 'task_id', 'stream', 'seq', unique=True),
+    )
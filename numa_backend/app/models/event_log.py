@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -7,6 +7,14 @@ class EventLog(BaseModel):
     
     event_type = Column(String, nullable=False)  # 事件类型：question_created, question_answered, question_clarified
     description = Column(Text, nullable=False)  # 事件描述
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # 操作用户
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # 操作用户
     requirement_id = Column(Integer, ForeignKey("requirements.id"), nullable=True)  # 关联的需求（可选）
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=True)  # 关联的问题（可选）
\ No newline at end of file
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=True, index=True)  # 关联的问题（可选）
+
+    # 需求时间线与按时间分页的事件列表
+    __table_args__ = (
+        Index('ix_event_logs_requirement_id_created_at', 'requirement_id', 'created_at'),
+        Index('ix_event_logs_created_at_id', 'created_at', 'id'),
+        # 按事件类型筛选的时间线与按天统计
+        Index('ix_event_logs_event_type_created_at', 'event_type', 'created_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -11,4 +11,9 @@ class Question(BaseModel):
     answered_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 回答人
     answer = Column(Text, nullable=True)  # 回答内容
     clarified = Column(Boolean, default=False)  # 是否已澄清
-    clarified_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 澄清人（必须是需求接受人）
\ No newline at end of file
+    clarified_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 澄清人（必须是需求接受人）
+
+    # 按需求检查未澄清问题
+    __table_args__ = (
+        Index('ix_questions_requirement_id_clarified', 'requirement_id', 'clarified'),
+    )
\ No newline at end of file
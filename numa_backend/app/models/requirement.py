@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -9,8 +10,18 @@ class Requirement(BaseModel):
     description = Column(Text)
     status = Column(String, default="pending")  # pending, clarifying, confirmed, in_progress, completed
     user_id = Column(Integer, ForeignKey("users.id"))  # 需求提出人
-    application_id = Column(Integer, ForeignKey("applications.id"), nullable=True)  # 可选的应用关联
-    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)  # 需求接手人
+    application_id = Column(Integer, ForeignKey("applications.id"), nullable=True, index=True)  # 可选的应用关联
+    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # 需求接手人
     branch_name = Column(String, nullable=True)  # 自动生成的分支名称
     spec_document = Column(Text, nullable=True)  # 自动生成的需求规范文档
-    clarified = Column(Boolean, default=False)  # 是否已澄清完毕
\ No newline at end of file
+    clarified = Column(Boolean, default=False)  # 是否已澄清完毕
+    
+    # 关联对象
+    application = relationship("Application", back_populates="requirements")
+    solutions = relationship("Solution", back_populates="requirement")
+    development_tasks = relationship("DevelopmentTask", back_populates="requirement")
+
+    # 按状态筛选并按创建时间排序的列表
+    __table_args__ = (
+        Index('ix_requirements_status_created_at', 'status', 'created_at'),
+    )
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class Solution(BaseModel):
@@ -6,8 +7,18 @@ class Solution(BaseModel):
     
     title = Column(String, index=True)
     description = Column(Text)
-    requirement_id = Column(Integer, ForeignKey("requirements.id"))
-    application_id = Column(Integer, ForeignKey("applications.id"))  # 新增：与应用的关联关系
+    requirement_id = Column(Integer, ForeignKey("requirements.id"), index=True)
+    application_id = Column(Integer, ForeignKey("applications.id"), index=True)  # 新增：与应用的关联关系
     status = Column(String, default="clarifying")  # clarifying, confirmed, implemented
     created_by = Column(Integer, ForeignKey("users.id"))  # 方案负责人（即需求接受人）
-    clarified = Column(Boolean, default=False)  # 是否已澄清
\ No newline at end of file
+    clarified = Column(Boolean, default=False)  # 是否已澄清
+    
+    # 关联对象
+    requirement = relationship("Requirement", back_populates="solutions")
+    application = relationship("Application", back_populates="solutions")
+    development_tasks = relationship("DevelopmentTask", back_populates="solution")
+
+    # 按状态筛选并按创建时间排序的列表
+    __table_args__ = (
+        Index('ix_solutions_status_created_at', 'status', 'created_at'),
+    )
\ No newline at end of file
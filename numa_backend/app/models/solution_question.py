@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.models.base import BaseModel
 
@@ -11,4 +11,9 @@ class SolutionQuestion(BaseModel):
     answered_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 回答人
     answer = Column(Text, nullable=True)  # 回答内容
     clarified = Column(Boolean, default=False)  # 是否已澄清
-    clarified_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 澄清人（必须是方案负责人）
\ No newline at end of file
+    clarified_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 澄清人（必须是方案负责人）
+
+    # 确认方案前检查未澄清问题
+    __table_args__ = (
+        Index('ix_solution_questions_solution_id_clarified', 'solution_id', 'clarified'),
+    )
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from app.models.base import BaseModel
+
+class Topic(BaseModel):
+    __tablename__ = "topics"
+
+    name = Column(String, nullable=False, unique=True)  # topic名称，如 tasks
+    description = Column(Text, nullable=True)
+
+class TopicMessage(BaseModel):
+    __tablename__ = "topic_messages"
+
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    data = Column(Text, nullable=False)  # JSON 格式的消息内容
+
+    # 订阅方按 (topic_id, id) 从偏移量之后读取消息，消息ID即偏移量
+    __table_args__ = (
+        Index('ix_topic_messages_topic_id_id', 'topic_id', 'id'),
+    )
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BulkItemResult(BaseModel):
+    index: int  # 在请求列表中的位置
+    id: Optional[int] = None  # 创建成功时的记录ID
+    error: Optional[str] = None  # 创建失败的原因
+
+class BulkCreateResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
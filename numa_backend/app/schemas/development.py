@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+import json
+from pydantic import BaseModel, validator
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.schemas.base import BaseSchema
 from app.schemas.solution import Solution
@@ -27,7 +28,88 @@ class DevelopmentTask(DevelopmentTaskBase, BaseSchema):
     application_id: int
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    # 任务队列
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    attempts: Optional[int] = 0
+    available_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # 最近一次执行各阶段的耗时（秒）
+    phase_timings: Optional[Dict[str, float]] = None
     # 关联对象
     solution: Optional[Solution] = None
     requirement: Optional[Requirement] = None
-    application: Optional[Application] = None
\ No newline at end of file
+    application: Optional[Application] = None
+
+    @validator("phase_timings", pre=True)
+    def parse_phase_timings(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+class TaskLeaseRequest(BaseModel):
+    """领取、续期、确认任务的请求体"""
+    avatar_id: str
+    # 租约时长（秒），不传时使用服务端默认值
+    lease_seconds: Optional[int] = None
+
+class TaskAckRequest(TaskLeaseRequest):
+    """确认任务完成，可附带本次执行各阶段的耗时（秒）"""
+    timings: Optional[Dict[str, float]] = None
+
+class TaskClaimRequest(TaskLeaseRequest):
+    """领取下一个可用任务，可限定应用"""
+    application_id: Optional[int] = None
+
+class TaskNackRequest(BaseModel):
+    """任务执行失败；retry 为 False 时直接进入死信状态"""
+    avatar_id: str
+    error: Optional[str] = None
+    retry: bool = True
+    timings: Optional[Dict[str, float]] = None
+
+class TaskStepEvent(BaseModel):
+    """任务执行中的一个步骤"""
+    step: str
+    status: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    timestamp: datetime  # 步骤在 Avatar 上发生的时间
+
+class TaskStepBatch(BaseModel):
+    """一次上报的多个步骤；batch_id 由 Avatar 生成，重发同一批次时不会重复记录"""
+    events: List[TaskStepEvent]
+    avatar_id: Optional[str] = None
+    batch_id: Optional[str] = None
+
+class TaskStepBatchResult(BaseModel):
+    task_id: int
+    accepted: int  # 本次记录的步骤数
+    duplicate: bool = False  # 该批次此前已记录
+
+class TaskStep(BaseModel):
+    """步骤时间线中的一项"""
+    step: str
+    status: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    occurred_at: datetime
+    avatar_id: Optional[str] = None
+
+class TaskLogChunkResult(BaseModel):
+    """上报一块任务日志的结果"""
+    task_id: int
+    offset: int  # 该块在任务日志中的字节偏移量
+    length: int
+    duplicate: bool = False  # 该块此前已记录
+
+class PhaseTimingSummary(BaseModel):
+    """一个阶段在多个任务中的耗时分布（秒）"""
+    phase: str
+    count: int  # 包含该阶段的任务数
+    mean: float
+    p50: float
+    p95: float
+    max: float
+
+class PhaseTimingStats(BaseModel):
+    """最近任务的阶段耗时统计"""
+    tasks: int  # 参与统计的任务数
+    total: Optional[PhaseTimingSummary] = None  # 各阶段耗时之和
+    phases: List[PhaseTimingSummary] = []
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from app.schemas.base import BaseSchema
 
 class EventLogBase(BaseModel):
@@ -14,4 +14,19 @@ class EventLogCreate(EventLogBase):
     pass
 
 class EventLog(EventLogBase, BaseSchema):
-    pass
\ No newline at end of file
+    pass
+
+class EventLogDailyCount(BaseModel):
+    day: date
+    event_type: str
+    count: int
+
+    class Config:
+        orm_mode = True
+
+class RequirementTimeToClarify(BaseModel):
+    requirement_id: int
+    questions: int  # 需求下提出的问题数
+    first_question_at: datetime  # 首个问题的提出时间
+    last_clarified_at: datetime  # 最后一个问题的澄清时间
+    seconds: float  # 澄清耗时（秒）
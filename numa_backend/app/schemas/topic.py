@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from app.schemas.base import BaseSchema
+
+class TopicBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+class TopicCreate(TopicBase):
+    pass
+
+class Topic(TopicBase, BaseSchema):
+    pass
+
+class TopicList(BaseModel):
+    data: List[Topic]
+
+class TopicMessageCreate(BaseModel):
+    data: Dict[str, Any]
+
+class TopicMessage(BaseSchema):
+    topic_id: int
+    data: Dict[str, Any]
+
+class TopicMessageList(BaseModel):
+    data: List[TopicMessage]
@@ -1,11 +1,18 @@
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit
+from app.core.pagination import apply_filters, paginate
 from app.models.application import Application as ApplicationModel
 from app.schemas.application import ApplicationCreate
 from app.models.user import User as UserModel
 
+# 列表接口允许的排序字段
+APPLICATION_SORT_FIELDS = ("created_at", "id", "name", "status")
+
 def create_application(db: Session, application: ApplicationCreate):
     # Check if the creating user exists
-    user = db.query(UserModel).filter(UserModel.id == application.created_by).first()
+    user = db.get(UserModel, application.created_by)
     if not user:
         raise ValueError("Creating user not found")
     
@@ -39,23 +46,29 @@ def create_application(db: Session, application: ApplicationCreate):
     
     db_application = ApplicationModel(**application.dict())
     db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    commit(db, db_application)
     return db_application
 
 def get_application(db: Session, application_id: int):
-    return db.query(ApplicationModel).filter(ApplicationModel.id == application_id).first()
+    return db.get(ApplicationModel, application_id)
 
 def get_application_by_app_id(db: Session, app_id: str):
     return db.query(ApplicationModel).filter(ApplicationModel.app_id == app_id).first()
 
-def get_applications(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ApplicationModel).offset(skip).limit(limit).all()
+def get_applications(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                     sort: Optional[str] = None, status: Optional[str] = None,
+                     created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    query = apply_filters(
+        db.query(ApplicationModel), ApplicationModel,
+        created_after=created_after, created_before=created_before, status=status
+    )
+    return paginate(
+        query, ApplicationModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=APPLICATION_SORT_FIELDS
+    )
 
 def update_application_status(db: Session, application_id: int, status: str):
     db_application = get_application(db, application_id)
     if db_application:
         db_application.status = status
-        db.commit()
-        db.refresh(db_application)
+        commit(db, db_application)
     return db_application
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""开发任务服务的异步版本"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, apply_pagination
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.schemas.development import DevelopmentTaskCreate, DevelopmentTaskUpdate, TaskStepBatch
+from app.services import development_service, task_log_service, task_queue_service, task_step_service, task_timing_service
+from app.services.development_service import (
+    DEVELOPMENT_TASK_RELATIONS, DEVELOPMENT_TASK_RELATION_OPTIONS, DEVELOPMENT_TASK_SORT_FIELDS
+)
+
+async def get_development_task_with_relations(db: AsyncSession, task_id: int):
+    """获取开发任务及其关联信息"""
+    result = await db.execute(
+        select(DevelopmentTaskModel)
+        .options(*DEVELOPMENT_TASK_RELATIONS)
+        .filter(DevelopmentTaskModel.id == task_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.unique().scalars().first()
+
+async def get_development_tasks_with_relations(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                               sort: Optional[str] = None, status: Optional[str] = None,
+                                               application_id: Optional[int] = None, assigned_to: Optional[int] = None,
+                                               requirement_id: Optional[int] = None,
+                                               created_after: Optional[datetime] = None,
+                                               created_before: Optional[datetime] = None,
+                                               fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取开发任务列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(DevelopmentTaskModel, DEVELOPMENT_TASK_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        select(DevelopmentTaskModel).options(*options), DevelopmentTaskModel,
+        created_after=created_after, created_before=created_before,
+        status=status, application_id=application_id, assigned_to=assigned_to, requirement_id=requirement_id
+    )
+    result = await db.execute(apply_pagination(
+        query, DevelopmentTaskModel, cursor=cursor, skip=skip, limit=limit,
+        sort=sort, sort_fields=DEVELOPMENT_TASK_SORT_FIELDS
+    ))
+    return result.unique().scalars().all()
+
+async def _reload(db: AsyncSession, db_task):
+    if db_task is None:
+        return None
+    return await get_development_task_with_relations(db, db_task.id)
+
+async def create_development_task(db: AsyncSession, task: DevelopmentTaskCreate):
+    db_task = await db.run_sync(development_service.create_development_task, task)
+    return await _reload(db, db_task)
+
+async def bulk_create_development_tasks(db: AsyncSession, tasks: List[dict]):
+    """批量创建开发任务，返回每条记录的处理结果"""
+    return await db.run_sync(development_service.bulk_create_development_tasks, tasks)
+
+async def update_development_task(db: AsyncSession, task_id: int, task_update: DevelopmentTaskUpdate):
+    """更新开发任务"""
+    db_task = await db.run_sync(development_service.update_development_task, task_id, task_update)
+    return await _reload(db, db_task)
+
+async def claim_task(db: AsyncSession, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None):
+    """领取指定任务"""
+    db_task = await db.run_sync(task_queue_service.claim_task, task_id, avatar_id, lease_seconds)
+    return await _reload(db, db_task)
+
+async def claim_next_task(db: AsyncSession, avatar_id: str, lease_seconds: Optional[int] = None,
+                          application_id: Optional[int] = None):
+    """领取下一个可领取的任务"""
+    db_task = await db.run_sync(task_queue_service.claim_next_task, avatar_id, lease_seconds, application_id)
+    return await _reload(db, db_task)
+
+async def heartbeat_task(db: AsyncSession, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None):
+    """续期任务租约"""
+    db_task = await db.run_sync(task_queue_service.heartbeat_task, task_id, avatar_id, lease_seconds)
+    return await _reload(db, db_task)
+
+async def ack_task(db: AsyncSession, task_id: int, avatar_id: str, timings: Optional[Dict[str, float]] = None):
+    """确认任务完成"""
+    db_task = await db.run_sync(task_queue_service.ack_task, task_id, avatar_id, timings)
+    return await _reload(db, db_task)
+
+async def nack_task(db: AsyncSession, task_id: int, avatar_id: str, error: Optional[str] = None, retry: bool = True,
+                    timings: Optional[Dict[str, float]] = None):
+    """任务执行失败，重新排队或进入死信状态"""
+    db_task = await db.run_sync(task_queue_service.nack_task, task_id, avatar_id, error, retry, timings)
+    return await _reload(db, db_task)
+
+async def requeue_task(db: AsyncSession, task_id: int):
+    """将死信任务重新排队"""
+    db_task = await db.run_sync(task_queue_service.requeue_task, task_id)
+    return await _reload(db, db_task)
+
+async def record_task_steps(db: AsyncSession, task_id: int, batch: TaskStepBatch):
+    """记录 Avatar 上报的一批步骤"""
+    return await db.run_sync(task_step_service.record_task_steps, task_id, batch)
+
+async def get_task_steps(db: AsyncSession, task_id: int):
+    """读取任务的步骤时间线"""
+    return await db.run_sync(task_step_service.get_task_steps, task_id)
+
+async def append_task_log(db: AsyncSession, task_id: int, data: bytes, stream: Optional[str] = None,
+                          seq: Optional[int] = None):
+    """追加一块任务日志"""
+    return await db.run_sync(task_log_service.append_task_log, task_id, data, stream, seq)
+
+async def get_phase_timing_stats(db: AsyncSession, limit: int = 100, status: Optional[str] = "done",
+                                 application_id: Optional[int] = None):
+    """统计最近任务各阶段耗时的分布"""
+    return await db.run_sync(task_timing_service.get_phase_timing_stats, limit, status, application_id)
@@ -0,0 +1,103 @@
+"""需求服务的异步版本
+
+读取路径直接在事件循环上执行异步查询；写入路径通过 run_sync 复用同步服务中的业务规则，
+完成后重新加载需求及其关联对象，保证响应序列化时不再触发懒加载。
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, apply_pagination
+from app.core.unit_of_work import transactional
+from app.models.requirement import Requirement as RequirementModel
+from app.schemas.requirement import RequirementCreate, RequirementUpdate
+from app.services import requirement_service
+from app.services.requirement_service import (
+    REQUIREMENT_RELATIONS, REQUIREMENT_RELATION_OPTIONS, REQUIREMENT_SORT_FIELDS
+)
+
+async def get_requirement_with_relations(db: AsyncSession, requirement_id: int):
+    """获取需求及其关联信息"""
+    result = await db.execute(
+        select(RequirementModel)
+        .options(*REQUIREMENT_RELATIONS)
+        .filter(RequirementModel.id == requirement_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_requirements_with_relations(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                          sort: Optional[str] = None, status: Optional[str] = None,
+                                          application_id: Optional[int] = None, assigned_to: Optional[int] = None,
+                                          created_after: Optional[datetime] = None,
+                                          created_before: Optional[datetime] = None,
+                                          fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取需求列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(RequirementModel, REQUIREMENT_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        select(RequirementModel).options(*options), RequirementModel,
+        created_after=created_after, created_before=created_before,
+        status=status, application_id=application_id, assigned_to=assigned_to
+    )
+    result = await db.execute(apply_pagination(
+        query, RequirementModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=REQUIREMENT_SORT_FIELDS
+    ))
+    return result.scalars().all()
+
+async def _reload(db: AsyncSession, db_requirement):
+    if db_requirement is None:
+        return None
+    return await get_requirement_with_relations(db, db_requirement.id)
+
+async def create_requirement(db: AsyncSession, requirement: RequirementCreate):
+    db_requirement = await db.run_sync(requirement_service.create_requirement, requirement)
+    return await _reload(db, db_requirement)
+
+async def bulk_create_requirements(db: AsyncSession, requirements: List[dict]):
+    """批量创建需求，返回每条记录的处理结果"""
+    return await db.run_sync(requirement_service.bulk_create_requirements, requirements)
+
+async def update_requirement(db: AsyncSession, requirement_id: int, requirement_update: RequirementUpdate):
+    db_requirement = await db.run_sync(requirement_service.update_requirement, requirement_id, requirement_update)
+    return await _reload(db, db_requirement)
+
+async def update_requirement_status(db: AsyncSession, requirement_id: int, status: str):
+    db_requirement = await db.run_sync(requirement_service.update_requirement_status, requirement_id, status)
+    return await _reload(db, db_requirement)
+
+@transactional
+def _assign_with_branch(db, requirement_id: int, assigned_to: int):
+    """分配需求，并生成分支名称和需求规范文档，在同一事务中提交"""
+    requirement = requirement_service.get_requirement(db, requirement_id)
+    if not requirement:
+        return None
+
+    branch_name = requirement_service.generate_branch_name(requirement_id, requirement.title)
+    spec_document = requirement_service.generate_spec_document(db, requirement_id)
+
+    if requirement_service.assign_requirement(db, requirement_id, assigned_to) is None:
+        return None
+
+    return requirement_service.update_requirement(
+        db,
+        requirement_id,
+        RequirementUpdate(branch_name=branch_name, spec_document=spec_document)
+    )
+
+async def assign_requirement(db: AsyncSession, requirement_id: int, assigned_to: int):
+    """分配需求并更新分支名称和规范文档"""
+    db_requirement = await db.run_sync(_assign_with_branch, requirement_id, assigned_to)
+    return await _reload(db, db_requirement)
+
+async def confirm_requirement(db: AsyncSession, requirement_id: int):
+    db_requirement = await db.run_sync(requirement_service.confirm_requirement, requirement_id)
+    return await _reload(db, db_requirement)
+
+async def complete_requirement(db: AsyncSession, requirement_id: int):
+    db_requirement = await db.run_sync(requirement_service.complete_requirement, requirement_id)
+    return await _reload(db, db_requirement)
+
+async def clarify_requirement(db: AsyncSession, requirement_id: int, clarified: bool = True):
+    db_requirement = await db.run_sync(requirement_service.clarify_requirement, requirement_id, clarified)
+    return await _reload(db, db_requirement)
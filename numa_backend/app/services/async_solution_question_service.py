@@ -0,0 +1,28 @@
+"""方案问题服务的异步版本"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.solution_question import SolutionQuestion as SolutionQuestionModel
+from app.schemas.solution_question import SolutionQuestionCreate
+from app.services import solution_question_service
+
+async def get_solution_question(db: AsyncSession, question_id: int):
+    result = await db.execute(select(SolutionQuestionModel).filter(SolutionQuestionModel.id == question_id))
+    return result.scalars().first()
+
+async def get_solution_questions_by_solution(db: AsyncSession, solution_id: int):
+    result = await db.execute(select(SolutionQuestionModel).filter(SolutionQuestionModel.solution_id == solution_id))
+    return result.scalars().all()
+
+# 方案问题没有需要序列化的关联对象，写入后直接返回同步服务刷新过的对象
+async def create_solution_question(db: AsyncSession, question: SolutionQuestionCreate, current_user_id: int):
+    return await db.run_sync(solution_question_service.create_solution_question, question, current_user_id)
+
+async def answer_solution_question(db: AsyncSession, question_id: int, answer: str, answered_by: int, current_user_id: int):
+    return await db.run_sync(
+        solution_question_service.answer_solution_question, question_id, answer, answered_by, current_user_id
+    )
+
+async def clarify_solution_question(db: AsyncSession, question_id: int, clarified_by: int, current_user_id: int):
+    return await db.run_sync(
+        solution_question_service.clarify_solution_question, question_id, clarified_by, current_user_id
+    )
@@ -0,0 +1,68 @@
+"""方案服务的异步版本，写入路径通过 run_sync 复用同步服务的校验与事件记录"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, apply_pagination
+from app.models.solution import Solution as SolutionModel
+from app.schemas.solution import SolutionCreate, SolutionUpdate
+from app.services import solution_service
+from app.services.solution_service import (
+    SOLUTION_RELATIONS, SOLUTION_RELATION_OPTIONS, SOLUTION_SORT_FIELDS
+)
+
+async def get_solution_with_relations(db: AsyncSession, solution_id: int):
+    """获取方案及其关联信息"""
+    result = await db.execute(
+        select(SolutionModel)
+        .options(*SOLUTION_RELATIONS)
+        .filter(SolutionModel.id == solution_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_solutions_with_relations(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                       sort: Optional[str] = None, status: Optional[str] = None,
+                                       requirement_id: Optional[int] = None, application_id: Optional[int] = None,
+                                       created_after: Optional[datetime] = None,
+                                       created_before: Optional[datetime] = None,
+                                       fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取方案列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(SolutionModel, SOLUTION_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        select(SolutionModel).options(*options), SolutionModel,
+        created_after=created_after, created_before=created_before,
+        status=status, requirement_id=requirement_id, application_id=application_id
+    )
+    result = await db.execute(apply_pagination(
+        query, SolutionModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=SOLUTION_SORT_FIELDS
+    ))
+    return result.scalars().all()
+
+async def get_solutions_by_requirement_with_relations(db: AsyncSession, requirement_id: int):
+    """获取需求下的方案列表及其关联信息"""
+    result = await db.execute(
+        select(SolutionModel)
+        .options(*SOLUTION_RELATIONS)
+        .filter(SolutionModel.requirement_id == requirement_id)
+    )
+    return result.scalars().all()
+
+async def _reload(db: AsyncSession, db_solution):
+    if db_solution is None:
+        return None
+    return await get_solution_with_relations(db, db_solution.id)
+
+async def create_solution(db: AsyncSession, solution: SolutionCreate):
+    db_solution = await db.run_sync(solution_service.create_solution, solution)
+    return await _reload(db, db_solution)
+
+async def update_solution(db: AsyncSession, solution_id: int, solution_update: SolutionUpdate):
+    db_solution = await db.run_sync(solution_service.update_solution, solution_id, solution_update)
+    return await _reload(db, db_solution)
+
+async def confirm_solution(db: AsyncSession, solution_id: int, confirmed: bool = True):
+    """确认方案，确认后创建开发任务"""
+    db_solution = await db.run_sync(solution_service.confirm_solution, solution_id, confirmed)
+    return await _reload(db, db_solution)
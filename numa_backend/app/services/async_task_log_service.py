@@ -0,0 +1,59 @@
+"""任务日志的范围读取与长轮询
+
+读取请求在偏移量已到日志末尾时可以等待新日志（wait 秒）：同一进程内追加的日志通过 task_log_broker 立即唤醒，
+其他进程追加的日志由定期检查日志大小兜底。文件读取在线程池中执行，不阻塞事件循环。
+"""
+import asyncio
+import os
+from typing import Tuple
+from starlette.concurrency import run_in_threadpool
+from app.core.task_log_store import task_log_broker, task_log_store
+
+# 单次读取的默认 / 最大字节数
+TASK_LOG_READ_LIMIT = 64 * 1024
+TASK_LOG_MAX_READ_BYTES = 1024 * 1024
+# 长轮询的最长等待时间（秒）
+TASK_LOG_MAX_WAIT_SECONDS = 60
+# 兜底检查间隔（秒），用于发现其他进程追加的日志
+TASK_LOG_POLL_SECONDS = float(os.getenv("TASK_LOG_POLL_SECONDS", "2"))
+
+async def read_task_log(task_id: int, offset: int = 0, limit: int = TASK_LOG_READ_LIMIT,
+                        wait: float = 0) -> Tuple[bytes, int]:
+    """读取任务日志中从 offset 开始的至多 limit 个字节
+
+    Args:
+        offset: 起始偏移量（字节）
+        limit: 最多读取的字节数
+        wait: 没有新日志时最多等待的秒数，0 表示立即返回
+
+    Returns:
+        (日志内容, 当前日志大小)
+    """
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    if limit <= 0 or limit > TASK_LOG_MAX_READ_BYTES:
+        raise ValueError(f"limit must be between 1 and {TASK_LOG_MAX_READ_BYTES}")
+    wait = min(max(wait, 0), TASK_LOG_MAX_WAIT_SECONDS)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    wakeup = task_log_broker.subscribe(task_id)
+    try:
+        while True:
+            # 先清除通知再检查大小，检查期间追加的日志会在下一轮被发现
+            wakeup.clear()
+            size = await run_in_threadpool(task_log_store.size, task_id)
+            if offset > size:
+                raise ValueError(f"offset is beyond the end of the log ({size} bytes)")
+            remaining = deadline - loop.time()
+            if offset < size or remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(wakeup.wait(), min(remaining, TASK_LOG_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        task_log_broker.unsubscribe(task_id, wakeup)
+
+    data = await run_in_threadpool(task_log_store.read, task_id, offset, limit) if offset < size else b""
+    return data, size
@@ -0,0 +1,83 @@
+"""topic 消息的异步读取与 SSE 推送
+
+订阅流在事件循环上等待新消息：同一进程内发布的消息通过 TopicBroker 立即唤醒，
+其他进程发布的消息由定期查询兜底。
+"""
+import asyncio
+import json
+import os
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.topic_broker import topic_broker
+from app.models.topic import Topic as TopicModel, TopicMessage as TopicMessageModel
+from app.services.topic_service import message_to_dict
+
+# 没有消息时发送心跳的间隔（秒），防止代理断开空闲连接
+TOPIC_STREAM_HEARTBEAT_SECONDS = float(os.getenv("TOPIC_STREAM_HEARTBEAT_SECONDS", "15"))
+# 兜底查询间隔（秒），用于发现其他进程发布的消息
+TOPIC_STREAM_POLL_SECONDS = float(os.getenv("TOPIC_STREAM_POLL_SECONDS", "5"))
+# 每次查询推送的最大消息数
+TOPIC_STREAM_BATCH_SIZE = 100
+
+async def get_topic(db: AsyncSession, topic_id: int):
+    return await db.get(TopicModel, topic_id)
+
+async def get_messages(db: AsyncSession, topic_id: int, after: int = 0, limit: int = 100):
+    """读取偏移量（消息ID）之后的消息"""
+    result = await db.execute(
+        select(TopicMessageModel)
+        .filter(TopicMessageModel.topic_id == topic_id, TopicMessageModel.id > after)
+        .order_by(TopicMessageModel.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+def format_event(message: dict) -> str:
+    """SSE 消息格式，id 即偏移量，客户端重连时通过 Last-Event-ID 或 after 参数续传"""
+    data = json.dumps(jsonable_encoder(message), ensure_ascii=False)
+    return f"id: {message['id']}\nevent: message\ndata: {data}\n\n"
+
+async def iter_topic_events(db: AsyncSession, topic_id: int, after: int, is_disconnected,
+                            heartbeat: float = TOPIC_STREAM_HEARTBEAT_SECONDS,
+                            poll_interval: float = TOPIC_STREAM_POLL_SECONDS):
+    """产出 topic 中偏移量之后的消息，直到客户端断开
+
+    Args:
+        after: 起始偏移量，只推送ID大于该值的消息
+        is_disconnected: 返回客户端是否已断开的协程函数
+    """
+    wakeup = topic_broker.subscribe(topic_id)
+    try:
+        # 告知客户端断线后的重连间隔（毫秒）
+        yield "retry: 3000\n\n"
+        idle = 0.0
+        while not await is_disconnected():
+            # 先清除通知再查询，查询期间提交的消息会在下一轮被发现
+            wakeup.clear()
+            messages = [
+                message_to_dict(db_message)
+                for db_message in await get_messages(db, topic_id, after, TOPIC_STREAM_BATCH_SIZE)
+            ]
+            # 结束只读事务，空闲时不占用连接
+            await db.rollback()
+            for message in messages:
+                yield format_event(message)
+                after = message["id"]
+            if len(messages) == TOPIC_STREAM_BATCH_SIZE:
+                continue
+            if messages:
+                idle = 0.0
+
+            timeout = min(poll_interval, heartbeat - idle)
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                idle += timeout
+                if idle >= heartbeat:
+                    yield ": keep-alive\n\n"
+                    idle = 0.0
+            else:
+                idle = 0.0
+    finally:
+        topic_broker.unsubscribe(topic_id, wakeup)
@@ -1,29 +1,45 @@
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit
+from app.core.pagination import apply_filters, paginate
 from app.models.deployment import Deployment as DeploymentModel
 from app.schemas.deployment import DeploymentCreate
 from app.models.development import DevelopmentTask as DevelopmentTaskModel
 from app.models.user import User as UserModel
 
+# 列表接口允许的排序字段
+DEPLOYMENT_SORT_FIELDS = ("created_at", "id", "name", "status")
+
 def create_deployment(db: Session, deployment: DeploymentCreate):
     # Check if the development task exists
-    task = db.query(DevelopmentTaskModel).filter(DevelopmentTaskModel.id == deployment.development_task_id).first()
+    task = db.get(DevelopmentTaskModel, deployment.development_task_id)
     if not task:
         raise ValueError("Development task not found")
     
     # Check if the deploying user exists (if provided)
     if deployment.deployed_by:
-        user = db.query(UserModel).filter(UserModel.id == deployment.deployed_by).first()
+        user = db.get(UserModel, deployment.deployed_by)
         if not user:
             raise ValueError("Deploying user not found")
     
     db_deployment = DeploymentModel(**deployment.dict())
     db.add(db_deployment)
-    db.commit()
-    db.refresh(db_deployment)
+    commit(db, db_deployment)
     return db_deployment
 
 def get_deployment(db: Session, deployment_id: int):
-    return db.query(DeploymentModel).filter(DeploymentModel.id == deployment_id).first()
+    return db.get(DeploymentModel, deployment_id)
 
-def get_deployments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(DeploymentModel).offset(skip).limit(limit).all()
\ No newline at end of file
+def get_deployments(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                    sort: Optional[str] = None, status: Optional[str] = None,
+                    development_task_id: Optional[int] = None,
+                    created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    query = apply_filters(
+        db.query(DeploymentModel), DeploymentModel,
+        created_after=created_after, created_before=created_before,
+        status=status, development_task_id=development_task_id
+    )
+    return paginate(
+        query, DeploymentModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=DEPLOYMENT_SORT_FIELDS
+    )
\ No newline at end of file
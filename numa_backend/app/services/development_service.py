@@ -1,70 +1,123 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from app.core.bulk import build_result, bulk_insert, check_bulk_size, existing_ids, validate_items
+from app.core.unit_of_work import commit, transactional
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, paginate
 from app.models.development import DevelopmentTask as DevelopmentTaskModel
 from app.schemas.development import DevelopmentTaskCreate, DevelopmentTaskUpdate
 from app.models.solution import Solution as SolutionModel
 from app.models.requirement import Requirement as RequirementModel
 from app.models.application import Application as ApplicationModel
 from app.models.user import User as UserModel
+from app.services.topic_service import TASKS_TOPIC, get_or_create_topic, publish_messages
 
+# 开发任务的关联对象图（方案、需求、应用及其嵌套关联），默认随列表一次性加载，避免逐行查询；
+# 按关联名分组，可通过 include 参数只加载需要的部分
+DEVELOPMENT_TASK_RELATION_OPTIONS = {
+    "solution": (
+        joinedload(DevelopmentTaskModel.solution).joinedload(SolutionModel.requirement).joinedload(RequirementModel.application),
+        joinedload(DevelopmentTaskModel.solution).joinedload(SolutionModel.application),
+    ),
+    "requirement": (joinedload(DevelopmentTaskModel.requirement).joinedload(RequirementModel.application),),
+    "application": (joinedload(DevelopmentTaskModel.application),),
+}
+DEVELOPMENT_TASK_RELATIONS = tuple(
+    option for options in DEVELOPMENT_TASK_RELATION_OPTIONS.values() for option in options
+)
+
+# 列表接口允许的排序字段
+DEVELOPMENT_TASK_SORT_FIELDS = ("created_at", "id", "title", "status")
+
+def dispatch_development_tasks(db: Session, task_ids: List[int]):
+    """将开发任务下发到 tasks topic，由订阅的 Avatar 领取"""
+    topic = get_or_create_topic(db, TASKS_TOPIC, "Development tasks topic")
+    publish_messages(db, topic.id, [{"task_id": task_id} for task_id in task_ids])
+
+@transactional
 def create_development_task(db: Session, task: DevelopmentTaskCreate):
     # Check if the solution exists
-    solution = db.query(SolutionModel).filter(SolutionModel.id == task.solution_id).first()
+    solution = db.get(SolutionModel, task.solution_id)
     if not solution:
         raise ValueError("Solution not found")
     
     # Check if the assigned user exists (if provided)
     if task.assigned_to:
-        user = db.query(UserModel).filter(UserModel.id == task.assigned_to).first()
+        user = db.get(UserModel, task.assigned_to)
         if not user:
             raise ValueError("Assigned user not found")
     
     db_task = DevelopmentTaskModel(**task.dict())
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    commit(db, db_task)
+    dispatch_development_tasks(db, [db_task.id])
     return db_task
 
+def bulk_create_development_tasks(db: Session, tasks: List[dict]):
+    """批量创建开发任务
+
+    每条记录单独按 DevelopmentTaskCreate 校验，引用的方案和接手人各用一次 IN 查询校验，校验通过的记录一次写入，
+    校验失败的记录不影响其他记录。
+
+    Args:
+        tasks: 待创建的开发任务列表（未校验的请求数据）
+    Returns:
+        BulkCreateResult，按请求顺序给出每条记录的ID或错误原因
+    """
+    check_bulk_size(tasks)
+    valid, errors = validate_items(DevelopmentTaskCreate, tasks)
+    solution_ids = existing_ids(db, SolutionModel, (item.solution_id for _, item in valid))
+    user_ids = existing_ids(db, UserModel, (item.assigned_to for _, item in valid))
+
+    rows = []
+    for index, item in valid:
+        if item.solution_id not in solution_ids:
+            errors[index] = "Solution not found"
+        elif item.assigned_to and item.assigned_to not in user_ids:
+            errors[index] = "Assigned user not found"
+        else:
+            rows.append((index, item.dict()))
+
+    ids = bulk_insert(db, DevelopmentTaskModel, rows)
+    if ids:
+        dispatch_development_tasks(db, list(ids.values()))
+    commit(db)
+    return build_result(len(tasks), ids, errors)
+
 def get_development_task(db: Session, task_id: int):
-    return db.query(DevelopmentTaskModel).filter(DevelopmentTaskModel.id == task_id).first()
+    return db.get(DevelopmentTaskModel, task_id)
 
-def get_development_tasks(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(DevelopmentTaskModel).offset(skip).limit(limit).all()
+def get_development_tasks(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(DevelopmentTaskModel), DevelopmentTaskModel, cursor=cursor, skip=skip, limit=limit)
 
 def get_development_task_with_relations(db: Session, task_id: int):
     """获取开发任务及其关联信息"""
-    db_task = db.query(DevelopmentTaskModel).filter(DevelopmentTaskModel.id == task_id).first()
-    if db_task:
-        # 获取关联的方案
-        solution = db.query(SolutionModel).filter(SolutionModel.id == db_task.solution_id).first()
-        db_task.solution = solution
-        
-        # 获取关联的需求
-        requirement = db.query(RequirementModel).filter(RequirementModel.id == db_task.requirement_id).first()
-        db_task.requirement = requirement
-        
-        # 获取关联的应用
-        application = db.query(ApplicationModel).filter(ApplicationModel.id == db_task.application_id).first()
-        db_task.application = application
-            
-    return db_task
+    return (
+        db.query(DevelopmentTaskModel)
+        .options(*DEVELOPMENT_TASK_RELATIONS)
+        .filter(DevelopmentTaskModel.id == task_id)
+        .first()
+    )
 
-def get_development_tasks_with_relations(db: Session, skip: int = 0, limit: int = 100):
-    """获取开发任务列表及其关联信息"""
-    tasks = db.query(DevelopmentTaskModel).offset(skip).limit(limit).all()
-    for task in tasks:
-        # 获取关联的方案
-        solution = db.query(SolutionModel).filter(SolutionModel.id == task.solution_id).first()
-        task.solution = solution
-        
-        # 获取关联的需求
-        requirement = db.query(RequirementModel).filter(RequirementModel.id == task.requirement_id).first()
-        task.requirement = requirement
-        
-        # 获取关联的应用
-        application = db.query(ApplicationModel).filter(ApplicationModel.id == task.application_id).first()
-        task.application = application
-            
-    return tasks
+def get_development_tasks_with_relations(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                         sort: Optional[str] = None, status: Optional[str] = None,
+                                         application_id: Optional[int] = None, assigned_to: Optional[int] = None,
+                                         requirement_id: Optional[int] = None,
+                                         created_after: Optional[datetime] = None,
+                                         created_before: Optional[datetime] = None,
+                                         fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取开发任务列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(DevelopmentTaskModel, DEVELOPMENT_TASK_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        db.query(DevelopmentTaskModel).options(*options), DevelopmentTaskModel,
+        created_after=created_after, created_before=created_before,
+        status=status, application_id=application_id, assigned_to=assigned_to, requirement_id=requirement_id
+    )
+    return paginate(
+        query, DevelopmentTaskModel, cursor=cursor, skip=skip, limit=limit,
+        sort=sort, sort_fields=DEVELOPMENT_TASK_SORT_FIELDS
+    )
 
 def update_development_task(db: Session, task_id: int, task_update: DevelopmentTaskUpdate):
     """更新开发任务"""
@@ -73,15 +126,14 @@ def update_development_task(db: Session, task_id: int, task_update: DevelopmentT
         update_data = task_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_task, key, value)
-        db.commit()
-        db.refresh(db_task)
+        commit(db, db_task)
     return db_task
 
 def create_development_task_from_solution(db: Session, solution: SolutionModel):
     """从方案创建开发任务"""
     # 获取方案关联的需求和应用
-    requirement = db.query(RequirementModel).filter(RequirementModel.id == solution.requirement_id).first()
-    application = db.query(ApplicationModel).filter(ApplicationModel.id == solution.application_id).first()
+    requirement = db.get(RequirementModel, solution.requirement_id)
+    application = db.get(ApplicationModel, solution.application_id)
     
     if not requirement or not application:
         raise ValueError("关联的需求或应用未找到")
@@ -103,6 +155,6 @@ def create_development_task_from_solution(db: Session, solution: SolutionModel):
     
     db_task = DevelopmentTaskModel(**task_data.dict())
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    commit(db, db_task)
+    dispatch_development_tasks(db, [db_task.id])
     return db_task
\ No newline at end of file
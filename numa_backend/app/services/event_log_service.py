@@ -1,28 +1,61 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
+from app.core.bulk import IN_QUERY_CHUNK_SIZE
+from app.core.unit_of_work import commit
+from app.core.pagination import apply_filters, paginate
 from app.models.event_log import EventLog as EventLogModel
 from app.models.user import User as UserModel
 from app.models.requirement import Requirement as RequirementModel
 from app.models.question import Question as QuestionModel
 from app.schemas.event_log import EventLogCreate
+from app.services.event_log_writer import defer_event_logs, is_deferred
+
+# 列表接口允许的排序字段
+EVENT_LOG_SORT_FIELDS = ("created_at", "id")
+
+# 计算澄清耗时所用的事件：需求下首个问题的提出到最后一个问题的澄清
+QUESTION_CREATED = "question_created"
+QUESTION_CLARIFIED = "question_clarified"
+
+# 归档文件目录，每月一个 gzip 压缩的 JSONL 文件
+EVENT_LOG_ARCHIVE_DIR = os.getenv("EVENT_LOG_ARCHIVE_DIR", "./archive/event_logs")
+# 归档时每批搬移的事件数
+ARCHIVE_BATCH_SIZE = 5000
 
 def create_event_log(db: Session, event_type: str, description: str, user_id: int, 
-                     requirement_id: int = None, question_id: int = None):
+                     requirement_id: int = None, question_id: int = None,
+                     user_verified: bool = False, references_verified: bool = False):
+    """记录事件
+
+    Args:
+        user_verified: 调用方已确认操作用户存在，跳过用户检查
+        references_verified: 调用方已持有关联的需求和问题，跳过需求 / 问题检查
+    Returns:
+        同步写入时返回事件记录；异步写入时事件在调用方事务提交后才入队写入，返回 None
+    """
     # 检查用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise ValueError("用户未找到")
+    if not user_verified:
+        user = db.get(UserModel, user_id)
+        if not user:
+            raise ValueError("用户未找到")
     
-    # 检查需求是否存在（如果提供了需求ID）
-    if requirement_id:
-        requirement = db.query(RequirementModel).filter(RequirementModel.id == requirement_id).first()
-        if not requirement:
-            raise ValueError("需求未找到")
-    
-    # 检查问题是否存在（如果提供了问题ID）
-    if question_id:
-        question = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
-        if not question:
-            raise ValueError("问题未找到")
+    if not references_verified:
+        # 检查需求是否存在（如果提供了需求ID）
+        if requirement_id:
+            requirement = db.get(RequirementModel, requirement_id)
+            if not requirement:
+                raise ValueError("需求未找到")
+        
+        # 检查问题是否存在（如果提供了问题ID）
+        if question_id:
+            question = db.get(QuestionModel, question_id)
+            if not question:
+                raise ValueError("问题未找到")
     
     # 创建事件记录
     event_log = EventLogCreate(
@@ -32,19 +65,171 @@ def create_event_log(db: Session, event_type: str, description: str, user_id: in
         requirement_id=requirement_id,
         question_id=question_id
     )
+
+    if is_deferred():
+        defer_event_logs(db, [event_log.dict()])
+        commit(db)
+        return None
     
     db_event_log = EventLogModel(**event_log.dict())
     db.add(db_event_log)
-    db.commit()
-    db.refresh(db_event_log)
+    commit(db, db_event_log)
     
     return db_event_log
 
-def get_event_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(EventLogModel).offset(skip).limit(limit).all()
+def create_event_logs(db: Session, event_logs: List[dict]):
+    """批量记录调用方已校验过的事件，随调用方事务提交或交由后台线程写入"""
+    if is_deferred():
+        defer_event_logs(db, event_logs)
+    else:
+        db.bulk_insert_mappings(EventLogModel, event_logs)
+    commit(db)
+
+def get_event_logs(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                   sort: Optional[str] = None, requirement_id: Optional[int] = None, user_id: Optional[int] = None,
+                   created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                   event_type: Optional[str] = None):
+    query = apply_filters(
+        db.query(EventLogModel), EventLogModel,
+        created_after=created_after, created_before=created_before,
+        requirement_id=requirement_id, user_id=user_id, event_type=event_type
+    )
+    return paginate(
+        query, EventLogModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=EVENT_LOG_SORT_FIELDS
+    )
 
 def get_event_logs_by_requirement(db: Session, requirement_id: int):
-    return db.query(EventLogModel).filter(EventLogModel.requirement_id == requirement_id).all()
+    return (
+        db.query(EventLogModel)
+        .filter(EventLogModel.requirement_id == requirement_id)
+        .order_by(EventLogModel.created_at, EventLogModel.id)
+        .all()
+    )
 
 def get_event_logs_by_question(db: Session, question_id: int):
-    return db.query(EventLogModel).filter(EventLogModel.question_id == question_id).all()
\ No newline at end of file
+    return db.query(EventLogModel).filter(EventLogModel.question_id == question_id).all()
+
+def get_event_log_daily_counts(db: Session, event_type: Optional[str] = None, user_id: Optional[int] = None,
+                               requirement_id: Optional[int] = None, created_after: Optional[datetime] = None,
+                               created_before: Optional[datetime] = None):
+    """按天、按事件类型统计事件数，在数据库中 GROUP BY 完成
+
+    Returns:
+        (day, event_type, count) 列表，按日期和事件类型排序
+    """
+    day = func.date(EventLogModel.created_at).label("day")
+    query = apply_filters(
+        db.query(day, EventLogModel.event_type, func.count(EventLogModel.id).label("count")), EventLogModel,
+        created_after=created_after, created_before=created_before,
+        event_type=event_type, user_id=user_id, requirement_id=requirement_id
+    )
+    return query.group_by(day, EventLogModel.event_type).order_by(day, EventLogModel.event_type).all()
+
+def get_time_to_clarify(db: Session, requirement_id: Optional[int] = None, created_after: Optional[datetime] = None,
+                        created_before: Optional[datetime] = None, skip: int = 0, limit: int = 100):
+    """统计每个需求从首个问题提出到最后一个问题澄清的耗时
+
+    聚合在数据库中按需求 GROUP BY 完成，只返回已有问题被澄清的需求。
+
+    Returns:
+        字典列表，包含 requirement_id、questions、first_question_at、last_clarified_at、seconds
+    """
+    created_at_type = EventLogModel.created_at.type
+    first_question_at = func.min(
+        case((EventLogModel.event_type == QUESTION_CREATED, EventLogModel.created_at)), type_=created_at_type
+    )
+    last_clarified_at = func.max(
+        case((EventLogModel.event_type == QUESTION_CLARIFIED, EventLogModel.created_at)), type_=created_at_type
+    )
+    questions = func.count(case((EventLogModel.event_type == QUESTION_CREATED, EventLogModel.id)))
+
+    query = apply_filters(
+        db.query(
+            EventLogModel.requirement_id,
+            questions.label("questions"),
+            first_question_at.label("first_question_at"),
+            last_clarified_at.label("last_clarified_at"),
+        ).filter(
+            EventLogModel.requirement_id.isnot(None),
+            EventLogModel.event_type.in_((QUESTION_CREATED, QUESTION_CLARIFIED))
+        ),
+        EventLogModel,
+        created_after=created_after, created_before=created_before, requirement_id=requirement_id
+    )
+    rows = (
+        query.group_by(EventLogModel.requirement_id)
+        .having(and_(first_question_at.isnot(None), last_clarified_at.isnot(None)))
+        .order_by(EventLogModel.requirement_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "requirement_id": row.requirement_id,
+            "questions": row.questions,
+            "first_question_at": row.first_question_at,
+            "last_clarified_at": row.last_clarified_at,
+            "seconds": (row.last_clarified_at - row.first_question_at).total_seconds(),
+        }
+        for row in rows
+    ]
+
+def _archive_row(event_log: EventLogModel):
+    return {
+        "id": event_log.id,
+        "event_type": event_log.event_type,
+        "description": event_log.description,
+        "user_id": event_log.user_id,
+        "requirement_id": event_log.requirement_id,
+        "question_id": event_log.question_id,
+        "created_at": event_log.created_at.isoformat() if event_log.created_at else None,
+    }
+
+def archive_event_logs(db: Session, before: datetime, archive_dir: str = EVENT_LOG_ARCHIVE_DIR,
+                       batch_size: int = ARCHIVE_BATCH_SIZE):
+    """将早于指定时间的事件移出 event_logs 表，按月写入 gzip 压缩的 JSONL 文件
+
+    每批事件先追加写入归档文件（每次追加一个 gzip 成员）并落盘，再从表中删除并提交，
+    中途失败时已归档的批次不会丢失，最多重复归档最后一批。
+
+    Args:
+        before: 归档该时间之前创建的事件
+        archive_dir: 归档目录，文件名为 event_logs-YYYY-MM.jsonl.gz
+        batch_size: 每批搬移的事件数
+    Returns:
+        归档的事件数
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    while True:
+        batch = (
+            db.query(EventLogModel)
+            .filter(EventLogModel.created_at < before)
+            .order_by(EventLogModel.created_at, EventLogModel.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return archived
+
+        by_month = {}
+        for event_log in batch:
+            by_month.setdefault(event_log.created_at.strftime("%Y-%m"), []).append(_archive_row(event_log))
+        for month, rows in by_month.items():
+            path = os.path.join(archive_dir, f"event_logs-{month}.jsonl.gz")
+            with open(path, "ab") as f:
+                with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                    for row in rows:
+                        gz.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+        ids = [event_log.id for event_log in batch]
+        for start in range(0, len(ids), IN_QUERY_CHUNK_SIZE):
+            chunk = ids[start:start + IN_QUERY_CHUNK_SIZE]
+            db.query(EventLogModel).filter(EventLogModel.id.in_(chunk)).delete(synchronize_session=False)
+        db.commit()
+        for event_log in batch:
+            db.expunge(event_log)
+        archived += len(batch)
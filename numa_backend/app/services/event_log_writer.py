@@ -0,0 +1,166 @@
+"""事件日志的后台批量写入
+
+EVENT_LOG_DURABILITY=sync（默认）时事件随调用方事务一起提交；
+EVENT_LOG_DURABILITY=async 时事件在调用方事务提交后进入进程内队列，由后台线程按条数 / 时间
+批量写入，请求路径上不再有事件写入的开销，代价是进程异常退出时可能丢失尚未写入的事件。
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.database import create_db_engine
+from app.models.event_log import EventLog as EventLogModel
+
+logger = logging.getLogger(__name__)
+
+SYNC_DURABILITY = "sync"
+ASYNC_DURABILITY = "async"
+
+# 事件写入方式：sync 随调用方事务提交，async 由后台线程批量写入
+EVENT_LOG_DURABILITY = os.getenv("EVENT_LOG_DURABILITY", SYNC_DURABILITY).lower()
+if EVENT_LOG_DURABILITY not in (SYNC_DURABILITY, ASYNC_DURABILITY):
+    raise ValueError(f"Unsupported EVENT_LOG_DURABILITY: {EVENT_LOG_DURABILITY}")
+
+# 攒够多少条或等待多久（毫秒）写入一批
+EVENT_LOG_BATCH_SIZE = int(os.getenv("EVENT_LOG_BATCH_SIZE", "200"))
+EVENT_LOG_FLUSH_INTERVAL_MS = int(os.getenv("EVENT_LOG_FLUSH_INTERVAL_MS", "200"))
+# 队列满时入队会阻塞，防止写入跟不上时内存无限增长
+EVENT_LOG_QUEUE_SIZE = int(os.getenv("EVENT_LOG_QUEUE_SIZE", "10000"))
+# 一批写入失败后的重试次数，仍失败则丢弃并记录错误日志
+EVENT_LOG_MAX_RETRIES = 3
+
+# 记录在 Session.info 中、等待事务提交后入队的事件
+_PENDING_KEY = "pending_event_logs"
+
+_STOP = object()
+
+def is_deferred() -> bool:
+    """事件是否由后台线程异步写入"""
+    return EVENT_LOG_DURABILITY == ASYNC_DURABILITY
+
+class EventLogWriter:
+    """进程内的事件队列及其后台写入线程"""
+
+    def __init__(self, batch_size: int = EVENT_LOG_BATCH_SIZE,
+                 flush_interval_ms: int = EVENT_LOG_FLUSH_INTERVAL_MS, queue_size: int = EVENT_LOG_QUEUE_SIZE):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        # 异步引擎对应的同步引擎，后台线程中不能使用异步驱动
+        self._sync_engines = {}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+                self._thread.start()
+
+    def put(self, bind, mappings: List[Dict]):
+        """将事件放入队列
+
+        Args:
+            bind: 事件要写入的数据库引擎
+            mappings: EventLog 的字段映射列表
+        """
+        self.start()
+        for mapping in mappings:
+            self._queue.put((bind, mapping))
+
+    def flush(self):
+        """阻塞直到已入队的事件全部写入"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def shutdown(self):
+        """写完队列中剩余的事件后停止后台线程"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            # 以第一条事件入队的时间为起点，攒够一批或超时即写入
+            batch, stop = [item], False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _write(self, batch):
+        by_bind = {}
+        for bind, mapping in batch:
+            by_bind.setdefault(bind, []).append(mapping)
+
+        for bind, mappings in by_bind.items():
+            for attempt in range(1, EVENT_LOG_MAX_RETRIES + 1):
+                try:
+                    with Session(bind=self._engine_for(bind)) as db:
+                        db.bulk_insert_mappings(EventLogModel, mappings)
+                        db.commit()
+                    break
+                except Exception:
+                    logger.exception("写入事件日志失败（第 %d 次）", attempt)
+                    if attempt == EVENT_LOG_MAX_RETRIES:
+                        logger.error("放弃写入 %d 条事件日志", len(mappings))
+                    else:
+                        time.sleep(0.1 * attempt)
+
+    def _engine_for(self, bind):
+        if not bind.dialect.is_async:
+            return bind
+        if bind not in self._sync_engines:
+            sync_url = bind.url.set(drivername=bind.url.get_backend_name())
+            self._sync_engines[bind] = create_db_engine(sync_url.render_as_string(hide_password=False))
+        return self._sync_engines[bind]
+
+event_log_writer = EventLogWriter()
+
+def defer_event_logs(db: Session, mappings: List[Dict]):
+    """登记事件，在调用方事务提交后入队；事务回滚时一并丢弃
+
+    创建时间取登记时刻，保证批量写入后事件的先后顺序不变。
+    """
+    created_at = datetime.now(timezone.utc)
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    pending.extend({"created_at": created_at, **mapping} for mapping in mappings)
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        event_log_writer.put(session.get_bind(), pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,26 +1,29 @@
+from typing import List
 from sqlalchemy.orm import Session
+from app.core.bulk import build_result, bulk_insert, check_bulk_size, existing_ids, rows_by_id, validate_items
+from app.core.unit_of_work import commit, transactional
 from app.models.question import Question as QuestionModel
 from app.models.requirement import Requirement as RequirementModel
 from app.models.user import User as UserModel
 from app.schemas.question import QuestionCreate, QuestionUpdate
-from app.services.event_log_service import create_event_log
+from app.services.event_log_service import create_event_log, create_event_logs
 
+@transactional
 def create_question(db: Session, question: QuestionCreate, current_user_id: int):
     # 检查需求是否存在
-    requirement = db.query(RequirementModel).filter(RequirementModel.id == question.requirement_id).first()
+    requirement = db.get(RequirementModel, question.requirement_id)
     if not requirement:
         raise ValueError("需求未找到")
     
     # 检查用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == question.created_by).first()
+    user = db.get(UserModel, question.created_by)
     if not user:
         raise ValueError("用户未找到")
     
     # 创建问题
     db_question = QuestionModel(**question.dict())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -29,17 +32,64 @@ def create_question(db: Session, question: QuestionCreate, current_user_id: int)
         description=f"用户 {user.name} 提出了问题: {question.content}",
         user_id=current_user_id,
         requirement_id=question.requirement_id,
-        question_id=db_question.id
+        question_id=db_question.id,
+        user_verified=current_user_id == user.id,
+        references_verified=True
     )
     
     return db_question
 
+@transactional
+def bulk_create_questions(db: Session, questions: List[dict], current_user_id: int):
+    """批量创建问题并记录对应的 question_created 事件
+
+    每条记录单独按 QuestionCreate 校验，引用的需求和用户各用一次 IN 查询校验，问题和事件分别批量写入，
+    整批在一个事务中提交；校验失败的记录不影响其他记录。
+
+    Args:
+        questions: 待创建的问题列表（未校验的请求数据）
+        current_user_id: 当前操作用户，记录为事件的操作人
+    Returns:
+        BulkCreateResult，按请求顺序给出每条记录的ID或错误原因
+    """
+    check_bulk_size(questions)
+    if not db.get(UserModel, current_user_id):
+        raise ValueError("用户未找到")
+
+    valid, errors = validate_items(QuestionCreate, questions)
+    requirement_ids = existing_ids(db, RequirementModel, (item.requirement_id for _, item in valid))
+    users = rows_by_id(db, UserModel, (item.created_by for _, item in valid), UserModel.name)
+
+    rows = []
+    for index, item in valid:
+        if item.requirement_id not in requirement_ids:
+            errors[index] = "需求未找到"
+        elif item.created_by not in users:
+            errors[index] = "用户未找到"
+        else:
+            rows.append((index, item.dict()))
+
+    ids = bulk_insert(db, QuestionModel, rows)
+    # 事件不需要回填主键，按 executemany 一次写入
+    create_event_logs(db, [
+        {
+            "event_type": "question_created",
+            "description": f"用户 {users[mapping['created_by']][0]} 提出了问题: {mapping['content']}",
+            "user_id": current_user_id,
+            "requirement_id": mapping["requirement_id"],
+            "question_id": mapping["id"],
+        }
+        for _, mapping in rows
+    ])
+    return build_result(len(questions), ids, errors)
+
 def get_question(db: Session, question_id: int):
-    return db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+    return db.get(QuestionModel, question_id)
 
 def get_questions_by_requirement(db: Session, requirement_id: int):
     return db.query(QuestionModel).filter(QuestionModel.requirement_id == requirement_id).all()
 
+@transactional
 def answer_question(db: Session, question_id: int, answer: str, answered_by: int, current_user_id: int):
     # 检查问题是否存在
     db_question = get_question(db, question_id)
@@ -47,15 +97,14 @@ def answer_question(db: Session, question_id: int, answer: str, answered_by: int
         raise ValueError("问题未找到")
     
     # 检查回答用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == answered_by).first()
+    user = db.get(UserModel, answered_by)
     if not user:
         raise ValueError("回答用户未找到")
     
     # 更新问题
     db_question.answer = answer
     db_question.answered_by = answered_by
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -64,11 +113,14 @@ def answer_question(db: Session, question_id: int, answer: str, answered_by: int
         description=f"用户 {user.name} 回答了问题: {answer}",
         user_id=current_user_id,
         requirement_id=db_question.requirement_id,
-        question_id=question_id
+        question_id=question_id,
+        user_verified=current_user_id == user.id,
+        references_verified=True
     )
     
     return db_question
 
+@transactional
 def clarify_question(db: Session, question_id: int, clarified_by: int, current_user_id: int):
     # 检查问题是否存在
     db_question = get_question(db, question_id)
@@ -76,20 +128,19 @@ def clarify_question(db: Session, question_id: int, clarified_by: int, current_u
         raise ValueError("问题未找到")
     
     # 检查澄清用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == clarified_by).first()
+    user = db.get(UserModel, clarified_by)
     if not user:
         raise ValueError("澄清用户未找到")
     
     # 检查澄清用户是否为需求接手人
-    requirement = db.query(RequirementModel).filter(RequirementModel.id == db_question.requirement_id).first()
+    requirement = db.get(RequirementModel, db_question.requirement_id)
     if not requirement or requirement.assigned_to != clarified_by:
         raise ValueError("只有需求接手人才能标记问题为已澄清")
     
     # 更新问题
     db_question.clarified = True
     db_question.clarified_by = clarified_by
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -98,12 +149,18 @@ def clarify_question(db: Session, question_id: int, clarified_by: int, current_u
         description=f"用户 {user.name} 标记问题为已澄清",
         user_id=current_user_id,
         requirement_id=db_question.requirement_id,
-        question_id=question_id
+        question_id=question_id,
+        user_verified=current_user_id == user.id,
+        references_verified=True
     )
     
     return db_question
 
 def check_all_questions_clarified(db: Session, requirement_id: int):
     """检查需求的所有问题是否都已澄清"""
-    questions = get_questions_by_requirement(db, requirement_id)
-    return all(question.clarified for question in questions) if questions else True
\ No newline at end of file
+    # 只判断是否存在未澄清的问题，可直接命中 (requirement_id, clarified) 索引
+    unclarified = db.query(QuestionModel.id).filter(
+        QuestionModel.requirement_id == requirement_id,
+        QuestionModel.clarified.isnot(True)
+    )
+    return not db.query(unclarified.exists()).scalar()
\ No newline at end of file
@@ -1,4 +1,10 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from app.core.bulk import build_result, bulk_insert, check_bulk_size, existing_ids, validate_items
+from app.core.unit_of_work import commit, transactional
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, paginate
 from app.models.requirement import Requirement as RequirementModel
 from app.models.user import User as UserModel
 from app.models.application import Application as ApplicationModel
@@ -14,48 +20,91 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 需求的关联对象（应用），按关联名分组，可通过 include 参数按需加载
+REQUIREMENT_RELATION_OPTIONS = {
+    "application": (joinedload(RequirementModel.application),),
+}
+REQUIREMENT_RELATIONS = tuple(option for options in REQUIREMENT_RELATION_OPTIONS.values() for option in options)
+
+# 列表接口允许的排序字段
+REQUIREMENT_SORT_FIELDS = ("created_at", "id", "title", "status")
+
 def create_requirement(db: Session, requirement: RequirementCreate):
     # Check if the user exists
-    user = db.query(UserModel).filter(UserModel.id == requirement.user_id).first()
+    user = db.get(UserModel, requirement.user_id)
     if not user:
         raise ValueError("User not found")
     
     # Check if application exists (if provided)
     if requirement.application_id:
-        application = db.query(ApplicationModel).filter(ApplicationModel.id == requirement.application_id).first()
+        application = db.get(ApplicationModel, requirement.application_id)
         if not application:
             raise ValueError("Application not found")
     
     db_requirement = RequirementModel(**requirement.dict())
     db.add(db_requirement)
-    db.commit()
-    db.refresh(db_requirement)
+    commit(db, db_requirement)
     return db_requirement
 
+def bulk_create_requirements(db: Session, requirements: List[dict]):
+    """批量创建需求
+
+    每条记录单独按 RequirementCreate 校验，引用的用户和应用各用一次 IN 查询校验，校验通过的记录一次写入，
+    校验失败的记录不影响其他记录。
+
+    Args:
+        requirements: 待创建的需求列表（未校验的请求数据）
+    Returns:
+        BulkCreateResult，按请求顺序给出每条记录的ID或错误原因
+    """
+    check_bulk_size(requirements)
+    valid, errors = validate_items(RequirementCreate, requirements)
+    user_ids = existing_ids(db, UserModel, (item.user_id for _, item in valid))
+    application_ids = existing_ids(db, ApplicationModel, (item.application_id for _, item in valid))
+
+    rows = []
+    for index, item in valid:
+        if item.user_id not in user_ids:
+            errors[index] = "User not found"
+        elif item.application_id and item.application_id not in application_ids:
+            errors[index] = "Application not found"
+        else:
+            rows.append((index, item.dict()))
+
+    ids = bulk_insert(db, RequirementModel, rows)
+    commit(db)
+    return build_result(len(requirements), ids, errors)
+
 def get_requirement(db: Session, requirement_id: int):
-    return db.query(RequirementModel).filter(RequirementModel.id == requirement_id).first()
+    return db.get(RequirementModel, requirement_id)
 
-def get_requirements(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(RequirementModel).offset(skip).limit(limit).all()
+def get_requirements(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(RequirementModel), RequirementModel, cursor=cursor, skip=skip, limit=limit)
 
 def get_requirement_with_relations(db: Session, requirement_id: int):
     """获取需求及其关联信息"""
-    db_requirement = db.query(RequirementModel).filter(RequirementModel.id == requirement_id).first()
-    if db_requirement and db_requirement.application_id:
-        # 获取关联的应用
-        application = db.query(ApplicationModel).filter(ApplicationModel.id == db_requirement.application_id).first()
-        db_requirement.application = application
-    return db_requirement
+    return (
+        db.query(RequirementModel)
+        .options(*REQUIREMENT_RELATIONS)
+        .filter(RequirementModel.id == requirement_id)
+        .first()
+    )
 
-def get_requirements_with_relations(db: Session, skip: int = 0, limit: int = 100):
-    """获取需求列表及其关联信息"""
-    requirements = db.query(RequirementModel).offset(skip).limit(limit).all()
-    for requirement in requirements:
-        if requirement.application_id:
-            # 获取关联的应用
-            application = db.query(ApplicationModel).filter(ApplicationModel.id == requirement.application_id).first()
-            requirement.application = application
-    return requirements
+def get_requirements_with_relations(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                    sort: Optional[str] = None, status: Optional[str] = None,
+                                    application_id: Optional[int] = None, assigned_to: Optional[int] = None,
+                                    created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                                    fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取需求列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(RequirementModel, REQUIREMENT_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        db.query(RequirementModel).options(*options), RequirementModel,
+        created_after=created_after, created_before=created_before,
+        status=status, application_id=application_id, assigned_to=assigned_to
+    )
+    return paginate(
+        query, RequirementModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=REQUIREMENT_SORT_FIELDS
+    )
 
 def update_requirement(db: Session, requirement_id: int, requirement_update: RequirementUpdate):
     db_requirement = get_requirement(db, requirement_id)
@@ -67,8 +116,7 @@ def update_requirement(db: Session, requirement_id: int, requirement_update: Req
         update_data = requirement_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_requirement, key, value)
-        db.commit()
-        db.refresh(db_requirement)
+        commit(db, db_requirement)
     return db_requirement
 
 def update_requirement_status(db: Session, requirement_id: int, status: str):
@@ -76,7 +124,7 @@ def update_requirement_status(db: Session, requirement_id: int, status: str):
 
 def assign_requirement(db: Session, requirement_id: int, assigned_to: int):
     # Check if the assigned user exists
-    user = db.query(UserModel).filter(UserModel.id == assigned_to).first()
+    user = db.get(UserModel, assigned_to)
     if not user:
         raise ValueError("Assigned user not found")
     
@@ -87,6 +135,7 @@ def assign_requirement(db: Session, requirement_id: int, assigned_to: int):
         RequirementUpdate(status="clarifying", assigned_to=assigned_to)
     )
 
+@transactional
 def confirm_requirement(db: Session, requirement_id: int):
     """确认需求澄清完毕，进入开发阶段，并自动创建方案"""
     db_requirement = get_requirement(db, requirement_id)
@@ -116,6 +165,7 @@ def complete_requirement(db: Session, requirement_id: int):
     # 完成需求
     return update_requirement_status(db, requirement_id, "completed")
 
+@transactional
 def clarify_requirement(db: Session, requirement_id: int, clarified: bool = True):
     """标记需求为已澄清，并自动创建方案"""
     logger.info(f"开始处理需求澄清，需求ID: {requirement_id}, 澄清状态: {clarified}")
@@ -139,8 +189,7 @@ def clarify_requirement(db: Session, requirement_id: int, clarified: bool = True
         db_requirement.status = "confirmed"
         logger.info("已将需求状态更新为: confirmed")
     
-    db.commit()
-    db.refresh(db_requirement)
+    commit(db, db_requirement)
     logger.info(f"需求更新完成，当前状态: {db_requirement.status}, 澄清状态: {db_requirement.clarified}")
     
     # 如果标记为已澄清，则自动创建方案
@@ -1,26 +1,27 @@
 from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit, transactional
 from app.models.solution_question import SolutionQuestion as SolutionQuestionModel
 from app.models.solution import Solution as SolutionModel
 from app.models.user import User as UserModel
 from app.schemas.solution_question import SolutionQuestionCreate, SolutionQuestionUpdate
 from app.services.event_log_service import create_event_log
 
+@transactional
 def create_solution_question(db: Session, question: SolutionQuestionCreate, current_user_id: int):
     # 检查方案是否存在
-    solution = db.query(SolutionModel).filter(SolutionModel.id == question.solution_id).first()
+    solution = db.get(SolutionModel, question.solution_id)
     if not solution:
         raise ValueError("方案未找到")
     
     # 检查用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == question.created_by).first()
+    user = db.get(UserModel, question.created_by)
     if not user:
         raise ValueError("用户未找到")
     
     # 创建问题
     db_question = SolutionQuestionModel(**question.dict())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -29,17 +30,19 @@ def create_solution_question(db: Session, question: SolutionQuestionCreate, curr
         description=f"用户 {user.name} 提出了问题: {question.content}",
         user_id=current_user_id,
         requirement_id=solution.requirement_id,
-        question_id=db_question.id
+        question_id=db_question.id,
+        user_verified=current_user_id == user.id
     )
     
     return db_question
 
 def get_solution_question(db: Session, question_id: int):
-    return db.query(SolutionQuestionModel).filter(SolutionQuestionModel.id == question_id).first()
+    return db.get(SolutionQuestionModel, question_id)
 
 def get_solution_questions_by_solution(db: Session, solution_id: int):
     return db.query(SolutionQuestionModel).filter(SolutionQuestionModel.solution_id == solution_id).all()
 
+@transactional
 def answer_solution_question(db: Session, question_id: int, answer: str, answered_by: int, current_user_id: int):
     # 检查问题是否存在
     db_question = get_solution_question(db, question_id)
@@ -47,15 +50,14 @@ def answer_solution_question(db: Session, question_id: int, answer: str, answere
         raise ValueError("问题未找到")
     
     # 检查回答用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == answered_by).first()
+    user = db.get(UserModel, answered_by)
     if not user:
         raise ValueError("回答用户未找到")
     
     # 更新问题
     db_question.answer = answer
     db_question.answered_by = answered_by
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -63,12 +65,14 @@ def answer_solution_question(db: Session, question_id: int, answer: str, answere
         event_type="solution_question_answered",
         description=f"用户 {user.name} 回答了问题: {answer}",
         user_id=current_user_id,
-        requirement_id=db.query(SolutionModel).filter(SolutionModel.id == db_question.solution_id).first().requirement_id,
-        question_id=question_id
+        requirement_id=db.get(SolutionModel, db_question.solution_id).requirement_id,
+        question_id=question_id,
+        user_verified=current_user_id == user.id
     )
     
     return db_question
 
+@transactional
 def clarify_solution_question(db: Session, question_id: int, clarified_by: int, current_user_id: int):
     # 检查问题是否存在
     db_question = get_solution_question(db, question_id)
@@ -76,20 +80,19 @@ def clarify_solution_question(db: Session, question_id: int, clarified_by: int,
         raise ValueError("问题未找到")
     
     # 检查澄清用户是否存在
-    user = db.query(UserModel).filter(UserModel.id == clarified_by).first()
+    user = db.get(UserModel, clarified_by)
     if not user:
         raise ValueError("澄清用户未找到")
     
     # 检查澄清用户是否为方案负责人
-    solution = db.query(SolutionModel).filter(SolutionModel.id == db_question.solution_id).first()
+    solution = db.get(SolutionModel, db_question.solution_id)
     if not solution or solution.created_by != clarified_by:
         raise ValueError("只有方案负责人才能标记问题为已澄清")
     
     # 更新问题
     db_question.clarified = True
     db_question.clarified_by = clarified_by
-    db.commit()
-    db.refresh(db_question)
+    commit(db, db_question)
     
     # 记录事件
     create_event_log(
@@ -98,7 +101,8 @@ def clarify_solution_question(db: Session, question_id: int, clarified_by: int,
         description=f"用户 {user.name} 标记问题为已澄清",
         user_id=current_user_id,
         requirement_id=solution.requirement_id,
-        question_id=question_id
+        question_id=question_id,
+        user_verified=current_user_id == user.id
     )
     
     return db_question
\ No newline at end of file
@@ -1,4 +1,9 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from app.core.unit_of_work import commit, transactional
+from app.core.fieldsets import sparse_options
+from app.core.pagination import apply_filters, paginate
 from app.models.solution import Solution as SolutionModel
 from app.models.solution_question import SolutionQuestion as SolutionQuestionModel
 from app.schemas.solution import SolutionCreate, SolutionUpdate
@@ -7,26 +12,36 @@ from app.models.application import Application as ApplicationModel
 from app.models.user import User as UserModel
 from app.services.event_log_service import create_event_log
 
+# 方案的关联对象图（需求及其应用、应用），按关联名分组，可通过 include 参数按需加载
+SOLUTION_RELATION_OPTIONS = {
+    "requirement": (joinedload(SolutionModel.requirement).joinedload(RequirementModel.application),),
+    "application": (joinedload(SolutionModel.application),),
+}
+SOLUTION_RELATIONS = tuple(option for options in SOLUTION_RELATION_OPTIONS.values() for option in options)
+
+# 列表接口允许的排序字段
+SOLUTION_SORT_FIELDS = ("created_at", "id", "title", "status")
+
+@transactional
 def create_solution(db: Session, solution: SolutionCreate):
     # Check if the requirement exists
-    requirement = db.query(RequirementModel).filter(RequirementModel.id == solution.requirement_id).first()
+    requirement = db.get(RequirementModel, solution.requirement_id)
     if not requirement:
         raise ValueError("Requirement not found")
     
     # Check if the application exists
-    application = db.query(ApplicationModel).filter(ApplicationModel.id == solution.application_id).first()
+    application = db.get(ApplicationModel, solution.application_id)
     if not application:
         raise ValueError("Application not found")
     
     # Check if the user exists
-    user = db.query(UserModel).filter(UserModel.id == solution.created_by).first()
+    user = db.get(UserModel, solution.created_by)
     if not user:
         raise ValueError("User not found")
     
     db_solution = SolutionModel(**solution.dict())
     db.add(db_solution)
-    db.commit()
-    db.refresh(db_solution)
+    commit(db, db_solution)
     
     # 记录事件
     create_event_log(
@@ -34,16 +49,18 @@ def create_solution(db: Session, solution: SolutionCreate):
         event_type="solution_created",
         description=f"用户 {user.name} 创建了方案: {solution.title}",
         user_id=solution.created_by,
-        requirement_id=solution.requirement_id
+        requirement_id=solution.requirement_id,
+        user_verified=True,
+        references_verified=True
     )
     
     return db_solution
 
 def get_solution(db: Session, solution_id: int):
-    return db.query(SolutionModel).filter(SolutionModel.id == solution_id).first()
+    return db.get(SolutionModel, solution_id)
 
-def get_solutions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(SolutionModel).offset(skip).limit(limit).all()
+def get_solutions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(SolutionModel), SolutionModel, cursor=cursor, skip=skip, limit=limit)
 
 def get_solutions_by_requirement(db: Session, requirement_id: int):
     return db.query(SolutionModel).filter(SolutionModel.requirement_id == requirement_id).all()
@@ -54,10 +71,10 @@ def update_solution(db: Session, solution_id: int, solution_update: SolutionUpda
         update_data = solution_update.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_solution, key, value)
-        db.commit()
-        db.refresh(db_solution)
+        commit(db, db_solution)
     return db_solution
 
+@transactional
 def confirm_solution(db: Session, solution_id: int, confirmed: bool = True):
     """确认方案"""
     db_solution = get_solution(db, solution_id)
@@ -65,15 +82,17 @@ def confirm_solution(db: Session, solution_id: int, confirmed: bool = True):
         raise ValueError("方案未找到")
     
     # 检查是否所有问题都已澄清
-    questions = db.query(SolutionQuestionModel).filter(SolutionQuestionModel.solution_id == solution_id).all()
-    if confirmed and not all(question.clarified for question in questions):
+    unclarified = db.query(SolutionQuestionModel.id).filter(
+        SolutionQuestionModel.solution_id == solution_id,
+        SolutionQuestionModel.clarified.isnot(True)
+    )
+    if confirmed and db.query(unclarified.exists()).scalar():
         raise ValueError("还有未澄清的问题，请先澄清所有问题")
     
     # 更新方案
     db_solution.status = "confirmed" if confirmed else "clarifying"
     db_solution.clarified = confirmed
-    db.commit()
-    db.refresh(db_solution)
+    commit(db, db_solution)
     
     # 如果方案被确认，创建开发任务
     if confirmed:
@@ -84,30 +103,34 @@ def confirm_solution(db: Session, solution_id: int, confirmed: bool = True):
 
 def get_solution_with_relations(db: Session, solution_id: int):
     """获取方案及其关联信息"""
-    db_solution = db.query(SolutionModel).filter(SolutionModel.id == solution_id).first()
-    if db_solution:
-        # 获取关联的需求
-        requirement = db.query(RequirementModel).filter(RequirementModel.id == db_solution.requirement_id).first()
-        db_solution.requirement = requirement
-        
-        # 获取关联的应用
-        if db_solution.application_id:
-            application = db.query(ApplicationModel).filter(ApplicationModel.id == db_solution.application_id).first()
-            db_solution.application = application
-            
-    return db_solution
+    return (
+        db.query(SolutionModel)
+        .options(*SOLUTION_RELATIONS)
+        .filter(SolutionModel.id == solution_id)
+        .first()
+    )
+
+def get_solutions_with_relations(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                                 sort: Optional[str] = None, status: Optional[str] = None,
+                                 requirement_id: Optional[int] = None, application_id: Optional[int] = None,
+                                 created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                                 fields: Optional[List[str]] = None, include: Optional[List[str]] = None):
+    """获取方案列表及其关联信息，筛选条件在数据库中执行，fields / include 控制查询的列和关联"""
+    options = sparse_options(SolutionModel, SOLUTION_RELATION_OPTIONS, fields, include, sort)
+    query = apply_filters(
+        db.query(SolutionModel).options(*options), SolutionModel,
+        created_after=created_after, created_before=created_before,
+        status=status, requirement_id=requirement_id, application_id=application_id
+    )
+    return paginate(
+        query, SolutionModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=SOLUTION_SORT_FIELDS
+    )
 
-def get_solutions_with_relations(db: Session, skip: int = 0, limit: int = 100):
-    """获取方案列表及其关联信息"""
-    solutions = db.query(SolutionModel).offset(skip).limit(limit).all()
-    for solution in solutions:
-        # 获取关联的需求
-        requirement = db.query(RequirementModel).filter(RequirementModel.id == solution.requirement_id).first()
-        solution.requirement = requirement
-        
-        # 获取关联的应用
-        if solution.application_id:
-            application = db.query(ApplicationModel).filter(ApplicationModel.id == solution.application_id).first()
-            solution.application = application
-            
-    return solutions
\ No newline at end of file
+def get_solutions_by_requirement_with_relations(db: Session, requirement_id: int):
+    """获取需求下的方案列表及其关联信息"""
+    return (
+        db.query(SolutionModel)
+        .options(*SOLUTION_RELATIONS)
+        .filter(SolutionModel.requirement_id == requirement_id)
+        .all()
+    )
\ No newline at end of file
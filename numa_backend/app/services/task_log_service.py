@@ -0,0 +1,119 @@
+"""开发任务日志
+
+Avatar 把任务日志按块上报（gzip 压缩，带日志流标识和序号），日志内容追加写入分段日志文件
+（app.core.task_log_store），数据库中只记录每块的偏移量和长度，用于去重和按偏移量定位。
+每块先在数据库中占位（唯一索引 task_id, stream, seq），占位成功后才写入文件，并发重发的块不会重复写入。
+写入文件后提交失败时撤销写入的内容；其间同一任务又有其他块写入时无法撤销，这段内容留在日志中
+（没有索引行），重发时会再写入一次，即这种情况下日志块至少写入一次。
+"""
+import json
+import zlib
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.task_log_store import task_log_broker, task_log_store
+from app.core.unit_of_work import commit
+from app.models.development import DevelopmentTask as DevelopmentTaskModel, DevelopmentTaskLogChunk as DevelopmentTaskLogChunkModel
+
+# 单个日志块解压后的大小上限（字节）
+MAX_LOG_CHUNK_BYTES = 8 * 1024 * 1024
+
+def decode_log_body(body: bytes, content_type: Optional[str], content_encoding: Optional[str]) -> bytes:
+    """解析上报的请求体，返回日志文本
+
+    支持 gzip 压缩（Content-Encoding: gzip）的文本，以及 {"logs": "..."} 格式的 JSON。
+    """
+    if content_encoding and content_encoding.lower() == "gzip":
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(body, MAX_LOG_CHUNK_BYTES)
+        except zlib.error:
+            raise ValueError("Invalid gzip body")
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"A log chunk may not exceed {MAX_LOG_CHUNK_BYTES} bytes")
+    elif len(body) > MAX_LOG_CHUNK_BYTES:
+        raise ValueError(f"A log chunk may not exceed {MAX_LOG_CHUNK_BYTES} bytes")
+
+    if content_type and content_type.startswith("application/json"):
+        try:
+            logs = json.loads(body).get("logs")
+        except (ValueError, AttributeError):
+            raise ValueError("Invalid JSON body")
+        if not isinstance(logs, str):
+            raise ValueError("logs must be a string")
+        body = logs.encode("utf-8")
+        if body and not body.endswith(b"\n"):
+            body += b"\n"
+    return body
+
+def append_task_log(db: Session, task_id: int, data: bytes, stream: Optional[str] = None,
+                    seq: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """追加一块任务日志，同一日志流中已记录的序号直接忽略
+
+    Returns:
+        记录结果，任务不存在时为 None
+    """
+    if (stream is None) != (seq is None):
+        raise ValueError("stream and seq must be given together")
+    if seq is not None and seq < 0:
+        raise ValueError("seq must not be negative")
+    if db.get(DevelopmentTaskModel, task_id) is None:
+        return None
+
+    if stream is not None:
+        db_chunk = _get_chunk(db, task_id, stream, seq)
+        if db_chunk is not None:
+            return _chunk_result(db_chunk, duplicate=True)
+    if not data:
+        return {"task_id": task_id, "offset": task_log_store.size(task_id), "length": 0, "duplicate": False}
+
+    # 先写入索引行占位（偏移量待定），唯一索引拒绝同一块的并发重发；
+    # 占位的事务在提交前持有该行，其他重发的请求要等它提交或回滚后才能判断是否重复
+    db_chunk = DevelopmentTaskLogChunkModel(
+        task_id=task_id, stream=stream, seq=seq, byte_offset=-1, byte_length=len(data)
+    )
+    db.add(db_chunk)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return _chunk_result(_get_chunk(db, task_id, stream, seq), duplicate=True)
+    try:
+        offset = task_log_store.append(task_id, data)
+    except OSError:
+        db.rollback()
+        raise
+    db_chunk.byte_offset = offset
+    try:
+        commit(db, db_chunk)
+    except Exception:
+        db.rollback()
+        task_log_store.undo_append(task_id, offset, len(data))
+        raise
+    task_log_broker.notify(task_id)
+    return _chunk_result(db_chunk)
+
+def _get_chunk(db: Session, task_id: int, stream: str, seq: int):
+    return db.query(DevelopmentTaskLogChunkModel).filter(
+        DevelopmentTaskLogChunkModel.task_id == task_id,
+        DevelopmentTaskLogChunkModel.stream == stream,
+        DevelopmentTaskLogChunkModel.seq == seq
+    ).first()
+
+def _chunk_result(db_chunk: DevelopmentTaskLogChunkModel, duplicate: bool = False) -> Dict[str, Any]:
+    return {
+        "task_id": db_chunk.task_id,
+        "offset": db_chunk.byte_offset,
+        "length": db_chunk.byte_length,
+        "duplicate": duplicate,
+    }
+
+def compact_task_log(task_id: int, close: bool = False) -> int:
+    """压缩任务日志中已关闭的段，close 为 True 时先关闭当前段（如任务完成时）
+
+    Returns:
+        压缩的段数
+    """
+    if close:
+        task_log_store.close(task_id)
+    return task_log_store.compress_closed(task_id)
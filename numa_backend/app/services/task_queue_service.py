@@ -0,0 +1,300 @@
+"""开发任务队列
+
+任务状态保存在 development_tasks 表中，SQLite 与 PostgreSQL 均可使用：
+- 领取：带条件的 UPDATE（仍为待办且已到可领取时间）作为比较并交换，同一任务只有一个 Avatar 能领取成功；
+  PostgreSQL 上候选任务通过 FOR UPDATE SKIP LOCKED 选取，并发领取时互不等待
+- 租约：领取后在 lease_expires_at 之前有效，由 Avatar 心跳续期；租约过期的任务重新排队
+- 确认：ack 标记完成；nack 按指数退避重新排队，达到最大尝试次数后进入死信状态，需人工 requeue
+"""
+import json
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.services.development_service import dispatch_development_tasks
+
+# 默认租约时长（秒），Avatar 应在租约到期前心跳续期
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "300"))
+# 最大尝试次数（含租约过期），超过后进入死信状态
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+# 重试退避：TASK_RETRY_BASE_SECONDS * 2^(attempts-1)，不超过 TASK_RETRY_MAX_SECONDS
+TASK_RETRY_BASE_SECONDS = int(os.getenv("TASK_RETRY_BASE_SECONDS", "30"))
+TASK_RETRY_MAX_SECONDS = int(os.getenv("TASK_RETRY_MAX_SECONDS", "3600"))
+# 领取下一个任务时一次取出的候选任务数，被其他 Avatar 抢先时依次尝试
+CLAIM_CANDIDATES = 10
+
+TODO = "todo"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+DEAD_LETTER = "dead_letter"
+
+class LeaseConflictError(ValueError):
+    """任务已被其他 Avatar 领取，或调用方的租约已失效"""
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _lease_seconds(lease_seconds: Optional[int]) -> int:
+    if lease_seconds is None:
+        return TASK_LEASE_SECONDS
+    if lease_seconds <= 0:
+        raise ValueError("lease_seconds must be positive")
+    return lease_seconds
+
+def retry_delay(attempts: int) -> int:
+    """第 attempts 次尝试失败后，距下次可领取的秒数"""
+    return min(TASK_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), TASK_RETRY_MAX_SECONDS)
+
+def _available(now: datetime):
+    return and_(
+        DevelopmentTaskModel.status == TODO,
+        or_(DevelopmentTaskModel.available_at.is_(None), DevelopmentTaskModel.available_at <= now)
+    )
+
+def _owned_by(task_id: int, avatar_id: str):
+    return and_(
+        DevelopmentTaskModel.id == task_id,
+        DevelopmentTaskModel.status == IN_PROGRESS,
+        DevelopmentTaskModel.lease_owner == avatar_id
+    )
+
+def _lease_lost(db: Session, task_id: int):
+    """租约操作未命中：任务不存在时返回 None，否则抛出 LeaseConflictError"""
+    exists = db.query(DevelopmentTaskModel.id).filter(DevelopmentTaskModel.id == task_id).first() is not None
+    commit(db)
+    if exists:
+        raise LeaseConflictError("Lease lost")
+    return None
+
+def expire_leases(db: Session) -> int:
+    """处理租约过期的任务：已达最大尝试次数的进入死信状态，其余立即重新排队
+
+    Returns:
+        处理的任务数
+    """
+    now = _now()
+    expired = and_(
+        DevelopmentTaskModel.status == IN_PROGRESS,
+        DevelopmentTaskModel.lease_expires_at.isnot(None),
+        DevelopmentTaskModel.lease_expires_at < now
+    )
+    dead = db.query(DevelopmentTaskModel).filter(
+        expired, DevelopmentTaskModel.attempts >= TASK_MAX_ATTEMPTS
+    ).update({
+        DevelopmentTaskModel.status: DEAD_LETTER,
+        DevelopmentTaskModel.lease_expires_at: None,
+        DevelopmentTaskModel.last_error: "Lease expired",
+    }, synchronize_session=False)
+    requeued = db.query(DevelopmentTaskModel).filter(expired).update({
+        DevelopmentTaskModel.status: TODO,
+        DevelopmentTaskModel.lease_owner: None,
+        DevelopmentTaskModel.lease_expires_at: None,
+        DevelopmentTaskModel.available_at: now,
+        DevelopmentTaskModel.last_error: "Lease expired",
+    }, synchronize_session=False)
+    return dead + requeued
+
+def _try_claim(db: Session, task_id: int, avatar_id: str, lease_seconds: int):
+    """以条件 UPDATE 领取任务，任务已不可领取时返回 None"""
+    now = _now()
+    updated = db.query(DevelopmentTaskModel).filter(
+        DevelopmentTaskModel.id == task_id, _available(now)
+    ).update({
+        DevelopmentTaskModel.status: IN_PROGRESS,
+        DevelopmentTaskModel.lease_owner: avatar_id,
+        DevelopmentTaskModel.lease_expires_at: now + timedelta(seconds=lease_seconds),
+        DevelopmentTaskModel.attempts: DevelopmentTaskModel.attempts + 1,
+        DevelopmentTaskModel.started_at: func.coalesce(DevelopmentTaskModel.started_at, now),
+    }, synchronize_session=False)
+    if updated != 1:
+        return None
+    return _refreshed(db, task_id)
+
+def _refreshed(db: Session, task_id: int):
+    commit(db)
+    db_task = db.get(DevelopmentTaskModel, task_id)
+    db.refresh(db_task)
+    return db_task
+
+def claim_task(db: Session, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None):
+    """领取指定任务
+
+    同一 Avatar 重复领取（如重连后再次收到同一条消息）时只续期租约。
+
+    Args:
+        task_id: 任务ID
+        avatar_id: 领取任务的 Avatar 标识
+        lease_seconds: 租约时长（秒）
+    Returns:
+        领取到的任务，任务不存在时返回 None
+    Raises:
+        LeaseConflictError: 任务已被其他 Avatar 领取、已完成或尚未到重试时间
+    """
+    lease_seconds = _lease_seconds(lease_seconds)
+    expire_leases(db)
+    db_task = _try_claim(db, task_id, avatar_id, lease_seconds)
+    if db_task:
+        return db_task
+
+    db_task = db.get(DevelopmentTaskModel, task_id)
+    if db_task is None:
+        commit(db)
+        return None
+    db.refresh(db_task)
+    if db_task.status == IN_PROGRESS and db_task.lease_owner == avatar_id:
+        return heartbeat_task(db, task_id, avatar_id, lease_seconds)
+    commit(db)
+    if db_task.status == TODO:
+        raise LeaseConflictError(f"Task is not available until {db_task.available_at}")
+    raise LeaseConflictError(f"Task is {db_task.status}")
+
+def claim_next_task(db: Session, avatar_id: str, lease_seconds: Optional[int] = None,
+                    application_id: Optional[int] = None):
+    """按创建顺序领取下一个可领取的任务（含到期的重试与租约过期的任务）
+
+    Args:
+        avatar_id: 领取任务的 Avatar 标识
+        lease_seconds: 租约时长（秒）
+        application_id: 只领取该应用的任务
+    Returns:
+        领取到的任务，没有可领取的任务时返回 None
+    """
+    lease_seconds = _lease_seconds(lease_seconds)
+    expire_leases(db)
+    query = db.query(DevelopmentTaskModel.id).filter(_available(_now()))
+    if application_id is not None:
+        query = query.filter(DevelopmentTaskModel.application_id == application_id)
+    query = query.order_by(DevelopmentTaskModel.created_at, DevelopmentTaskModel.id).limit(CLAIM_CANDIDATES)
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    for (task_id,) in query.all():
+        db_task = _try_claim(db, task_id, avatar_id, lease_seconds)
+        if db_task:
+            return db_task
+    commit(db)
+    return None
+
+def heartbeat_task(db: Session, task_id: int, avatar_id: str, lease_seconds: Optional[int] = None):
+    """续期租约
+
+    Returns:
+        续期后的任务，任务不存在时返回 None
+    Raises:
+        LeaseConflictError: 任务不在该 Avatar 名下（租约已过期并被重新排队或已被其他 Avatar 领取）
+    """
+    lease_seconds = _lease_seconds(lease_seconds)
+    updated = db.query(DevelopmentTaskModel).filter(_owned_by(task_id, avatar_id)).update({
+        DevelopmentTaskModel.lease_expires_at: _now() + timedelta(seconds=lease_seconds),
+    }, synchronize_session=False)
+    if updated != 1:
+        return _lease_lost(db, task_id)
+    return _refreshed(db, task_id)
+
+def _timings_json(timings: Optional[Dict[str, float]]) -> Optional[str]:
+    """校验并序列化 Avatar 上报的各阶段耗时（秒）"""
+    if not timings:
+        return None
+    for phase, seconds in timings.items():
+        if not phase or not math.isfinite(seconds) or seconds < 0:
+            raise ValueError(f"Invalid timing for phase {phase!r}")
+    return json.dumps(timings)
+
+def ack_task(db: Session, task_id: int, avatar_id: str, timings: Optional[Dict[str, float]] = None):
+    """确认任务完成；重复确认已由该 Avatar 完成的任务时直接返回
+
+    Args:
+        timings: 本次执行各阶段的耗时（秒），保存在任务上
+
+    Returns:
+        完成的任务，任务不存在时返回 None
+    Raises:
+        LeaseConflictError: 任务不在该 Avatar 名下
+    """
+    now = _now()
+    values = {
+        DevelopmentTaskModel.status: DONE,
+        DevelopmentTaskModel.completed_at: now,
+        DevelopmentTaskModel.lease_expires_at: None,
+        DevelopmentTaskModel.last_error: None,
+    }
+    if timings:
+        values[DevelopmentTaskModel.phase_timings] = _timings_json(timings)
+    updated = db.query(DevelopmentTaskModel).filter(_owned_by(task_id, avatar_id)).update(
+        values, synchronize_session=False
+    )
+    if updated == 1:
+        return _refreshed(db, task_id)
+
+    db_task = db.get(DevelopmentTaskModel, task_id)
+    if db_task is None:
+        return _lease_lost(db, task_id)
+    db.refresh(db_task)
+    commit(db)
+    if db_task.status == DONE and db_task.lease_owner == avatar_id:
+        return db_task
+    raise LeaseConflictError("Lease lost")
+
+def nack_task(db: Session, task_id: int, avatar_id: str, error: Optional[str] = None, retry: bool = True,
+              timings: Optional[Dict[str, float]] = None):
+    """任务执行失败：按指数退避重新排队，达到最大尝试次数或 retry 为 False 时进入死信状态
+
+    Args:
+        timings: 本次执行各阶段的耗时（秒），保存在任务上，便于定位耗时的阶段
+
+    Returns:
+        更新后的任务，任务不存在时返回 None
+    Raises:
+        LeaseConflictError: 任务不在该 Avatar 名下
+    """
+    db_task = db.query(DevelopmentTaskModel).filter(_owned_by(task_id, avatar_id)).first()
+    if db_task is None:
+        return _lease_lost(db, task_id)
+
+    now = _now()
+    if retry and db_task.attempts < TASK_MAX_ATTEMPTS:
+        values = {
+            DevelopmentTaskModel.status: TODO,
+            DevelopmentTaskModel.lease_owner: None,
+            DevelopmentTaskModel.available_at: now + timedelta(seconds=retry_delay(db_task.attempts)),
+        }
+    else:
+        values = {DevelopmentTaskModel.status: DEAD_LETTER}
+    values[DevelopmentTaskModel.lease_expires_at] = None
+    values[DevelopmentTaskModel.last_error] = error
+    if timings:
+        values[DevelopmentTaskModel.phase_timings] = _timings_json(timings)
+
+    # 以租约归属为条件更新，防止与租约过期处理并发时覆盖其他 Avatar 的领取
+    updated = db.query(DevelopmentTaskModel).filter(_owned_by(task_id, avatar_id)).update(
+        values, synchronize_session=False
+    )
+    if updated != 1:
+        return _lease_lost(db, task_id)
+    return _refreshed(db, task_id)
+
+def requeue_task(db: Session, task_id: int):
+    """将死信任务重新排队，清零尝试次数并重新下发
+
+    Returns:
+        重新排队的任务，任务不存在时返回 None
+    Raises:
+        ValueError: 任务不处于死信状态
+    """
+    db_task = db.get(DevelopmentTaskModel, task_id)
+    if db_task is None:
+        return None
+    if db_task.status != DEAD_LETTER:
+        raise ValueError("Only dead-letter tasks can be requeued")
+    db_task.status = TODO
+    db_task.attempts = 0
+    db_task.lease_owner = None
+    db_task.lease_expires_at = None
+    db_task.available_at = None
+    dispatch_development_tasks(db, [db_task.id])
+    commit(db, db_task)
+    return db_task
@@ -0,0 +1,75 @@
+"""开发任务的步骤时间线
+
+Avatar 在本地记录任务执行的步骤，合并成批次异步上报，每个步骤在 development_task_steps 中占一行。
+批次带有 Avatar 生成的 batch_id：后端不可达时 Avatar 把批次暂存到磁盘，之后原样重发，
+已记录过的批次直接忽略，重发不会产生重复的步骤。步骤按 (task_id, batch_id, batch_seq) 唯一，
+同一批次的并发重发由唯一索引拒绝。
+"""
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit
+from app.models.development import DevelopmentTask as DevelopmentTaskModel, DevelopmentTaskStep as DevelopmentTaskStepModel
+from app.schemas.development import TaskStepBatch
+
+# 单个批次最多包含的步骤数
+MAX_STEPS_PER_BATCH = 500
+
+def record_task_steps(db: Session, task_id: int, batch: TaskStepBatch) -> Optional[Dict[str, Any]]:
+    """记录一批步骤
+
+    Returns:
+        记录结果，任务不存在时为 None
+    """
+    if len(batch.events) > MAX_STEPS_PER_BATCH:
+        raise ValueError(f"A batch may contain at most {MAX_STEPS_PER_BATCH} steps")
+    if db.get(DevelopmentTaskModel, task_id) is None:
+        return None
+    if batch.batch_id and db.query(DevelopmentTaskStepModel.id).filter(
+        DevelopmentTaskStepModel.task_id == task_id, DevelopmentTaskStepModel.batch_id == batch.batch_id
+    ).first():
+        return {"task_id": task_id, "accepted": 0, "duplicate": True}
+
+    try:
+        db.bulk_insert_mappings(DevelopmentTaskStepModel, [
+            {
+                "task_id": task_id,
+                "step": event.step,
+                "status": event.status,
+                "details": json.dumps(event.details, ensure_ascii=False) if event.details else None,
+                "occurred_at": event.timestamp,
+                "avatar_id": batch.avatar_id,
+                "batch_id": batch.batch_id,
+                "batch_seq": seq,
+            }
+            for seq, event in enumerate(batch.events)
+        ])
+        commit(db)
+    except IntegrityError:
+        # 同一批次的并发重发已先记录
+        db.rollback()
+        return {"task_id": task_id, "accepted": 0, "duplicate": True}
+    return {"task_id": task_id, "accepted": len(batch.events), "duplicate": False}
+
+def get_task_steps(db: Session, task_id: int) -> Optional[List[Dict[str, Any]]]:
+    """按发生时间读取任务的步骤时间线，任务不存在时为 None"""
+    if db.get(DevelopmentTaskModel, task_id) is None:
+        return None
+    db_steps = (
+        db.query(DevelopmentTaskStepModel)
+        .filter(DevelopmentTaskStepModel.task_id == task_id)
+        .order_by(DevelopmentTaskStepModel.occurred_at, DevelopmentTaskStepModel.id)
+        .all()
+    )
+    return [step_to_dict(db_step) for db_step in db_steps]
+
+def step_to_dict(db_step: DevelopmentTaskStepModel) -> Dict[str, Any]:
+    """转换为接口返回的步骤格式，details 为解析后的 JSON"""
+    return {
+        "step": db_step.step,
+        "status": db_step.status,
+        "details": json.loads(db_step.details) if db_step.details else None,
+        "occurred_at": db_step.occurred_at,
+        "avatar_id": db_step.avatar_id,
+    }
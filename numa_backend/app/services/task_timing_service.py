@@ -0,0 +1,64 @@
+"""开发任务的阶段耗时统计
+
+Avatar 确认（ack）或报告失败（nack）时上报本次执行各阶段的耗时，保存在 development_tasks.phase_timings。
+统计时取最近完成的任务，按阶段计算平均值、p50、p95 和最大值，用于判断耗时集中在哪个阶段。
+"""
+import json
+import math
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+
+# 单次统计最多包含的任务数
+MAX_TIMING_SAMPLE = 1000
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩法计算百分位数，values 需已排序"""
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[rank - 1]
+
+def _summary(phase: str, values: List[float]) -> Dict[str, Any]:
+    values = sorted(values)
+    return {
+        "phase": phase,
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "max": round(values[-1], 3),
+    }
+
+def get_phase_timing_stats(db: Session, limit: int = 100, status: Optional[str] = "done",
+                           application_id: Optional[int] = None) -> Dict[str, Any]:
+    """统计最近 limit 个上报了阶段耗时的任务
+
+    Args:
+        limit: 参与统计的任务数
+        status: 只统计该状态的任务，为空时不限
+        application_id: 只统计该应用的任务
+
+    Returns:
+        参与统计的任务数、各阶段耗时之和的分布，以及按执行顺序排列的各阶段耗时分布
+    """
+    if limit <= 0 or limit > MAX_TIMING_SAMPLE:
+        raise ValueError(f"limit must be between 1 and {MAX_TIMING_SAMPLE}")
+    query = db.query(DevelopmentTaskModel.phase_timings).filter(DevelopmentTaskModel.phase_timings.isnot(None))
+    if status:
+        query = query.filter(DevelopmentTaskModel.status == status)
+    if application_id is not None:
+        query = query.filter(DevelopmentTaskModel.application_id == application_id)
+    rows = query.order_by(DevelopmentTaskModel.completed_at.desc(), DevelopmentTaskModel.id.desc()).limit(limit).all()
+
+    # 阶段按首次出现的顺序排列，即 Avatar 执行的顺序
+    phases: Dict[str, List[float]] = {}
+    totals = []
+    for (raw,) in rows:
+        timings = json.loads(raw)
+        for phase, seconds in timings.items():
+            phases.setdefault(phase, []).append(seconds)
+        totals.append(sum(timings.values()))
+    return {
+        "tasks": len(rows),
+        "total": _summary("total", totals) if totals else None,
+        "phases": [_summary(phase, values) for phase, values in phases.items()],
+    }
@@ -0,0 +1,87 @@
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.topic_broker import topic_broker
+from app.core.unit_of_work import commit
+from app.models.topic import Topic as TopicModel, TopicMessage as TopicMessageModel
+from app.schemas.topic import TopicCreate
+
+# 开发任务下发使用的 topic
+TASKS_TOPIC = "tasks"
+
+# 记录在 Session.info 中、等待事务提交后通知订阅方的 topic
+_PENDING_KEY = "pending_topic_notifications"
+
+def get_topic(db: Session, topic_id: int):
+    return db.get(TopicModel, topic_id)
+
+def get_topic_by_name(db: Session, name: str):
+    return db.query(TopicModel).filter(TopicModel.name == name).first()
+
+def get_topics(db: Session):
+    return db.query(TopicModel).order_by(TopicModel.id).all()
+
+def create_topic(db: Session, topic: TopicCreate):
+    if get_topic_by_name(db, topic.name):
+        raise ValueError("Topic already exists")
+    db_topic = TopicModel(**topic.dict())
+    db.add(db_topic)
+    commit(db, db_topic)
+    return db_topic
+
+def get_or_create_topic(db: Session, name: str, description: Optional[str] = None):
+    """获取指定名称的 topic，不存在时创建"""
+    db_topic = get_topic_by_name(db, name)
+    if db_topic:
+        return db_topic
+    return create_topic(db, TopicCreate(name=name, description=description))
+
+def publish_message(db: Session, topic_id: int, data: Dict[str, Any]):
+    """向 topic 发布消息，事务提交后唤醒该 topic 的订阅流"""
+    if not get_topic(db, topic_id):
+        raise ValueError("Topic not found")
+    db_message = TopicMessageModel(topic_id=topic_id, data=json.dumps(data, ensure_ascii=False))
+    db.add(db_message)
+    db.info.setdefault(_PENDING_KEY, set()).add(topic_id)
+    commit(db, db_message)
+    return db_message
+
+def publish_messages(db: Session, topic_id: int, messages: List[Dict[str, Any]]):
+    """向 topic 批量发布消息（调用方已确认 topic 存在），事务提交后唤醒该 topic 的订阅流"""
+    if not messages:
+        return
+    db.bulk_insert_mappings(TopicMessageModel, [
+        {"topic_id": topic_id, "data": json.dumps(data, ensure_ascii=False)} for data in messages
+    ])
+    db.info.setdefault(_PENDING_KEY, set()).add(topic_id)
+    commit(db)
+
+def get_messages(db: Session, topic_id: int, after: int = 0, limit: int = 100):
+    """读取偏移量（消息ID）之后的消息"""
+    return (
+        db.query(TopicMessageModel)
+        .filter(TopicMessageModel.topic_id == topic_id, TopicMessageModel.id > after)
+        .order_by(TopicMessageModel.id)
+        .limit(limit)
+        .all()
+    )
+
+def message_to_dict(db_message: TopicMessageModel) -> Dict[str, Any]:
+    """转换为接口返回的消息格式，data 为解析后的 JSON"""
+    return {
+        "id": db_message.id,
+        "topic_id": db_message.topic_id,
+        "data": json.loads(db_message.data),
+        "created_at": db_message.created_at,
+        "updated_at": db_message.updated_at,
+    }
+
+@event.listens_for(Session, "after_commit")
+def _notify_subscribers(session):
+    for topic_id in session.info.pop(_PENDING_KEY, ()):
+        topic_broker.notify(topic_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notifications(session):
+    session.info.pop(_PENDING_KEY, None)
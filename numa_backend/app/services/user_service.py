@@ -1,7 +1,14 @@
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.core.unit_of_work import commit
+from app.core.pagination import apply_filters, paginate
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate
 
+# 列表接口允许的排序字段
+USER_SORT_FIELDS = ("created_at", "id", "name", "email")
+
 def create_user(db: Session, user: UserCreate):
     # Check if a user with the same email already exists
     existing_user = db.query(UserModel).filter(UserModel.email == user.email).first()
@@ -10,12 +17,14 @@ def create_user(db: Session, user: UserCreate):
     
     db_user = UserModel(**user.dict())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    commit(db, db_user)
     return db_user
 
 def get_user(db: Session, user_id: int):
-    return db.query(UserModel).filter(UserModel.id == user_id).first()
+    return db.get(UserModel, user_id)
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(UserModel).offset(skip).limit(limit).all()
\ No newline at end of file
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+              sort: Optional[str] = None, created_after: Optional[datetime] = None,
+              created_before: Optional[datetime] = None):
+    query = apply_filters(db.query(UserModel), UserModel, created_after=created_after, created_before=created_before)
+    return paginate(query, UserModel, cursor=cursor, skip=skip, limit=limit, sort=sort, sort_fields=USER_SORT_FIELDS)
\ No newline at end of file
@@ -2,7 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.database import engine, Base
-from app.models import base, requirement, solution, development, deployment, user
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.event_log_writer import event_log_writer
+from app.models import base, requirement, solution, development, deployment, user, application
 
 # Create database tables
 base.Base.metadata.create_all(bind=engine)
@@ -16,10 +18,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # 允许所有方法
     allow_headers=["*"],  # 允许所有头部
+    expose_headers=[NEXT_CURSOR_HEADER],  # 允许前端读取分页游标
 )
 
 app.include_router(api_router, prefix="/api")
 
+@app.on_event("shutdown")
+def flush_event_logs():
+    # 退出前写完队列中尚未写入的事件
+    event_log_writer.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Numa Backend"}
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""归档旧的事件日志
+
+将早于指定天数的事件从 event_logs 表移出，按月写入 gzip 压缩的 JSONL 文件，保持热表较小。
+可由 cron 定期执行。
+
+用法:
+    python scripts/archive_event_logs.py [--older-than-days 90] [--archive-dir ./archive/event_logs]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# 添加项目路径到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import SessionLocal
+# 导入全部模型，关系中按名称引用的模型才能解析
+from app.models import (  # noqa: F401
+    application, deployment, development, event_log, question, requirement, solution, solution_question, topic, user
+)
+from app.services.event_log_service import EVENT_LOG_ARCHIVE_DIR, archive_event_logs
+
+def main():
+    parser = argparse.ArgumentParser(description="归档旧的事件日志")
+    parser.add_argument("--older-than-days", type=int, default=90, help="归档多少天之前的事件")
+    parser.add_argument("--archive-dir", default=EVENT_LOG_ARCHIVE_DIR, help="归档文件目录")
+    args = parser.parse_args()
+
+    before = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    db = SessionLocal()
+    try:
+        archived = archive_event_logs(db, before, args.archive_dir)
+    finally:
+        db.close()
+    print(f"Archived {archived} event logs created before {before:%Y-%m-%d} to {args.archive_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""并发API负载下的数据库写入吞吐基准测试
+
+分别使用默认引擎和调优后的引擎（WAL、synchronous=NORMAL、busy_timeout、mmap）
+运行相同的负载：若干写线程持续创建用户，若干读线程持续拉取用户列表，统计写入吞吐。
+
+用法:
+    python scripts/benchmark_db_writes.py [--writers 8] [--readers 4] [--requests 200]
+    DATABASE_URL=postgresql://... python scripts/benchmark_db_writes.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# 添加项目路径到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from main import app
+from app.core.database import Base, create_db_engine
+from app.core.dependencies import get_db
+
+def run_load(database_url: str, tuned: bool, writers: int, readers: int, requests_per_writer: int):
+    """在指定引擎配置下运行并发负载，返回 (写入数, 失败数, 耗时秒)"""
+    engine = create_db_engine(database_url, tuned=tuned)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    writes = []
+    failures = []
+    stop_readers = threading.Event()
+
+    def writer():
+        client = TestClient(app)
+        for _ in range(requests_per_writer):
+            response = client.post(
+                "/api/v1/users/",
+                json={"name": "bench", "email": f"{uuid.uuid4()}@bench.local"}
+            )
+            (writes if response.status_code == 200 else failures).append(1)
+
+    def reader():
+        client = TestClient(app)
+        while not stop_readers.is_set():
+            client.get("/api/v1/users/", params={"limit": 50})
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stop_readers.set()
+    for thread in reader_threads:
+        thread.join()
+
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+    return len(writes), len(failures), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库写入吞吐基准测试")
+    parser.add_argument("--writers", type=int, default=8, help="并发写线程数")
+    parser.add_argument("--readers", type=int, default=4, help="并发读线程数")
+    parser.add_argument("--requests", type=int, default=200, help="每个写线程的请求数")
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    temp_dir = None
+    if not database_url:
+        temp_dir = tempfile.mkdtemp(prefix="numa_bench_")
+        database_url = f"sqlite:///{os.path.join(temp_dir, 'bench.db')}"
+
+    print(f"Database: {database_url}")
+    print(f"Writers: {args.writers}, readers: {args.readers}, requests per writer: {args.requests}")
+    for label, tuned in (("default", False), ("tuned", True)):
+        writes, failures, elapsed = run_load(database_url, tuned, args.writers, args.readers, args.requests)
+        print(f"{label:>8}: {writes} writes, {failures} failed in {elapsed:.2f}s -> {writes / elapsed:.1f} writes/s")
+
+if __name__ == "__main__":
+    main()
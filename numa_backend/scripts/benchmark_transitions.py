@@ -0,0 +1,118 @@
+"""流程流转吞吐基准测试
+
+对预先准备好的需求逐个执行完整流转：澄清需求（自动创建方案）→ 确认方案（自动创建开发任务），
+统计每秒完成的流转数，以及每次流转的提交次数和SQL语句数。
+
+用法:
+    python scripts/benchmark_transitions.py [--transitions 300]
+    DATABASE_URL=postgresql://... python scripts/benchmark_transitions.py
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# 添加项目路径到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.application import Application as ApplicationModel
+from app.models.question import Question as QuestionModel
+from app.models.requirement import Requirement as RequirementModel
+from app.models.solution import Solution as SolutionModel
+from app.models.user import User as UserModel
+from app.services.requirement_service import clarify_requirement
+from app.services.solution_service import confirm_solution
+
+def seed(SessionLocal, count: int):
+    """准备已分配、问题均已澄清的需求，返回需求ID列表"""
+    db = SessionLocal()
+    user = UserModel(name="bench", email=f"{uuid.uuid4()}@bench.local")
+    db.add(user)
+    db.flush()
+    application = ApplicationModel(
+        name=f"bench-{uuid.uuid4()}", description="bench", repository_url=f"https://example.com/{uuid.uuid4()}.git",
+        owner="bench", app_id=str(uuid.uuid4()), created_by=user.id
+    )
+    db.add(application)
+    db.flush()
+
+    requirement_ids = []
+    for i in range(count):
+        requirement = RequirementModel(
+            title=f"bench requirement {i}", description="bench", status="clarifying",
+            user_id=user.id, application_id=application.id, assigned_to=user.id
+        )
+        db.add(requirement)
+        db.flush()
+        db.add(QuestionModel(
+            content="bench question", requirement_id=requirement.id, created_by=user.id, clarified=True
+        ))
+        requirement_ids.append(requirement.id)
+    db.commit()
+    db.close()
+    return requirement_ids
+
+def run(database_url: str, transitions: int):
+    """返回 (完成的流转数, 耗时秒, 提交次数, SQL语句数)"""
+    engine = create_db_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    requirement_ids = seed(SessionLocal, transitions)
+
+    counters = {"commits": 0, "statements": 0}
+
+    def on_commit(conn):
+        counters["commits"] += 1
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counters["statements"] += 1
+
+    event.listen(engine, "commit", on_commit)
+    event.listen(engine, "before_cursor_execute", on_execute)
+
+    done = 0
+    start = time.perf_counter()
+    for requirement_id in requirement_ids:
+        db = SessionLocal()
+        try:
+            clarify_requirement(db, requirement_id, True)
+            solution = db.query(SolutionModel).filter(SolutionModel.requirement_id == requirement_id).one()
+            confirm_solution(db, solution.id, True)
+            done += 1
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - start
+
+    engine.dispose()
+    return done, elapsed, counters["commits"], counters["statements"]
+
+def main():
+    parser = argparse.ArgumentParser(description="流程流转吞吐基准测试")
+    parser.add_argument("--transitions", type=int, default=300, help="执行的流转次数")
+    args = parser.parse_args()
+
+    # 服务层的 info 日志会影响计时
+    logging.disable(logging.INFO)
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        temp_dir = tempfile.mkdtemp(prefix="numa_bench_")
+        database_url = f"sqlite:///{os.path.join(temp_dir, 'bench.db')}"
+
+    print(f"Database: {database_url}")
+    done, elapsed, commits, statements = run(database_url, args.transitions)
+    print(
+        f"{done} transitions in {elapsed:.2f}s -> {done / elapsed:.1f} transitions/s, "
+        f"{commits / done:.1f} commits and {statements / done:.1f} statements per transition"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import tempfile
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.services.event_log_service import get_event_logs_by_requirement
+from app.services.question_service import check_all_questions_clarified
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestDatabaseEngine(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_url = f"sqlite:///{os.path.join(self.temp_dir.name, 'engine.db')}"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_tuned_sqlite_engine_sets_pragmas(self):
+        engine = create_db_engine(self.database_url)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            # synchronous=NORMAL 对应 1
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)
+            self.assertGreater(conn.execute(text("PRAGMA busy_timeout")).scalar(), 0)
+        engine.dispose()
+
+    def test_untuned_sqlite_engine_keeps_defaults(self):
+        engine = create_db_engine(self.database_url, tuned=False)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "delete")
+        engine.dispose()
+
+class TestQueryPlans(unittest.TestCase):
+    """常用查询必须命中索引，防止索引或查询形态被改坏"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'plan.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def query_plan(self, run):
+        """执行服务函数，返回其发出的 SELECT 语句的查询计划"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            run()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+
+        self.assertEqual(len(statements), 1)
+        statement, parameters = statements[0]
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        return " | ".join(row[-1] for row in rows)
+
+    def test_check_all_questions_clarified_uses_index(self):
+        plan = self.query_plan(lambda: check_all_questions_clarified(self.db, 1))
+        self.assertIn("ix_questions_requirement_id_clarified", plan)
+
+    def test_event_log_timeline_uses_index(self):
+        plan = self.query_plan(lambda: get_event_logs_by_requirement(self.db, 1))
+        self.assertIn("ix_event_logs_requirement_id_created_at", plan)
+
+class TestMigrations(unittest.TestCase):
+    def test_upgrade_head_creates_indexes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database_url = f"sqlite:///{os.path.join(temp_dir, 'migrate.db')}"
+            config = Config()
+            config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+            config.set_main_option("sqlalchemy.url", database_url)
+            command.upgrade(config, "head")
+
+            engine = create_db_engine(database_url, tuned=False)
+            indexes = {index["name"] for index in inspect(engine).get_indexes("questions")}
+            indexes |= {index["name"] for index in inspect(engine).get_indexes("event_logs")}
+            engine.dispose()
+            self.assertIn("ix_questions_requirement_id_clarified", indexes)
+            self.assertIn("ix_event_logs_requirement_id_created_at", indexes)
+
+if __name__ == "__main__":
+    unittest.main()
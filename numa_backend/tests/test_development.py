@@ -7,6 +7,8 @@ import uuid
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from main import app
 from app.models.development import DevelopmentTask as DevelopmentTaskModel
@@ -290,4 +292,165 @@ def test_update_development_task_status():
     assert response.status_code == 200
     updated_task = response.json()
     
-    assert updated_task["status"] == "in_progress"
\ No newline at end of file
+    assert updated_task["status"] == "in_progress"
+
+def capture_queries(func):
+    """收集执行func期间发出的SQL语句"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+def count_queries(func):
+    """统计执行func期间发出的SQL语句数量"""
+    return len(capture_queries(func))
+
+def test_get_development_tasks_query_count_is_constant():
+    """测试开发任务列表的查询次数不随行数增长"""
+    # 先创建一个应用
+    app_data = {
+        "name": generate_unique_name(),
+        "description": "测试应用",
+        "repository_url": generate_unique_repo_url(),
+        "owner": "测试用户",
+        "app_id": generate_unique_app_id(),
+        "created_by": 1
+    }
+    app_response = client.post("/api/v1/applications/", json=app_data)
+    assert app_response.status_code == 200
+    app_id = app_response.json()["id"]
+    
+    # 创建需求
+    requirement_data = {
+        "title": "测试查询次数的需求",
+        "description": "用于测试开发任务列表的查询次数",
+        "application_id": app_id,
+        "user_id": 1
+    }
+    req_response = client.post("/api/v1/requirements/", json=requirement_data)
+    assert req_response.status_code == 200
+    requirement_id = req_response.json()["id"]
+    
+    # 创建方案
+    solution_data = {
+        "title": "测试查询次数的方案",
+        "description": "用于测试开发任务列表的查询次数",
+        "requirement_id": requirement_id,
+        "application_id": app_id,
+        "created_by": 1
+    }
+    sol_response = client.post("/api/v1/solutions/", json=solution_data)
+    assert sol_response.status_code == 200
+    solution_id = sol_response.json()["id"]
+    
+    # 创建多个开发任务
+    for i in range(3):
+        task_data = {
+            "title": f"测试查询次数 {i+1}",
+            "description": f"用于测试开发任务列表的查询次数 {i+1}",
+            "solution_id": solution_id,
+            "requirement_id": requirement_id,
+            "application_id": app_id,
+            "assigned_to": 1,
+            "status": "todo"
+        }
+        response = client.post("/api/v1/development/", json=task_data)
+        assert response.status_code == 200
+    
+    responses = {}
+    
+    def fetch(limit):
+        responses[limit] = client.get("/api/v1/development/", params={"limit": limit})
+    
+    single_row_queries = count_queries(lambda: fetch(1))
+    many_rows_queries = count_queries(lambda: fetch(100))
+    
+    assert responses[100].status_code == 200
+    assert len(responses[100].json()) >= 3
+    # 关联对象随列表一次性加载，查询次数与返回行数无关
+    assert many_rows_queries == single_row_queries
+    
+    # 嵌套的关联对象同样被填充
+    task = next(t for t in responses[100].json() if t["solution_id"] == solution_id)
+    assert task["solution"]["requirement"]["id"] == requirement_id
+    assert task["requirement"]["application"]["id"] == app_id
+    assert task["application"]["id"] == app_id
+
+def test_get_development_tasks_sparse_fieldset():
+    """测试 fields / include 只查询并返回指定的列和关联"""
+    # 先创建一个应用
+    app_data = {
+        "name": generate_unique_name(),
+        "description": "测试应用",
+        "repository_url": generate_unique_repo_url(),
+        "owner": "测试用户",
+        "app_id": generate_unique_app_id(),
+        "created_by": 1
+    }
+    app_response = client.post("/api/v1/applications/", json=app_data)
+    assert app_response.status_code == 200
+    app_id = app_response.json()["id"]
+    
+    # 创建需求
+    requirement_data = {
+        "title": "测试稀疏字段集的需求",
+        "description": "用于测试开发任务列表的稀疏字段集",
+        "application_id": app_id,
+        "user_id": 1
+    }
+    req_response = client.post("/api/v1/requirements/", json=requirement_data)
+    assert req_response.status_code == 200
+    requirement_id = req_response.json()["id"]
+    
+    # 创建方案
+    solution_data = {
+        "title": "测试稀疏字段集的方案",
+        "description": "用于测试开发任务列表的稀疏字段集",
+        "requirement_id": requirement_id,
+        "application_id": app_id,
+        "created_by": 1
+    }
+    sol_response = client.post("/api/v1/solutions/", json=solution_data)
+    assert sol_response.status_code == 200
+    solution_id = sol_response.json()["id"]
+    
+    task_data = {
+        "title": "测试稀疏字段集",
+        "description": "用于测试开发任务列表的稀疏字段集",
+        "solution_id": solution_id,
+        "requirement_id": requirement_id,
+        "application_id": app_id,
+        "assigned_to": 1,
+        "status": "todo"
+    }
+    response = client.post("/api/v1/development/", json=task_data)
+    assert response.status_code == 200
+    
+    responses = []
+    params = {"requirement_id": requirement_id, "fields": "title,status", "include": "application"}
+    statements = capture_queries(lambda: responses.append(client.get("/api/v1/development/", params=params)))
+    
+    assert responses[0].status_code == 200
+    tasks = responses[0].json()
+    assert len(tasks) == 1
+    assert set(tasks[0]) == {"id", "title", "status", "application"}
+    assert tasks[0]["application"]["id"] == app_id
+    
+    # 未请求的列与关联不会被查询
+    select_sql = " ".join(sql for sql in statements if sql.lstrip().upper().startswith("SELECT"))
+    assert "development_tasks.description" not in select_sql
+    assert "solutions" not in select_sql
+
+def test_get_development_tasks_unknown_field():
+    """测试请求不存在的字段返回400"""
+    response = client.get("/api/v1/development/", params={"fields": "title,secret"})
+    assert response.status_code == 400
+    response = client.get("/api/v1/development/", params={"include": "deployments"})
+    assert response.status_code == 400
@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.event_log import EventLog as EventLogModel
+from app.models.question import Question as QuestionModel
+from app.models.requirement import Requirement as RequirementModel
+from app.models.user import User as UserModel
+from app.services import event_log_writer
+from app.services.event_log_writer import EventLogWriter
+from app.services.question_service import answer_question
+
+class TestEventLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'events.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        user = UserModel(name="Test User", email="test@example.com")
+        db.add(user)
+        db.flush()
+        requirement = RequirementModel(title="测试需求", description="测试", user_id=user.id)
+        db.add(requirement)
+        db.flush()
+        question = QuestionModel(content="问题", requirement_id=requirement.id, created_by=user.id)
+        db.add(question)
+        db.commit()
+        self.user_id, self.requirement_id, self.question_id = user.id, requirement.id, question.id
+        db.close()
+
+    def tearDown(self):
+        event_log_writer.event_log_writer.shutdown()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def count_events(self):
+        db = self.SessionLocal()
+        count = db.query(EventLogModel).count()
+        db.close()
+        return count
+
+    def test_writer_flushes_batches(self):
+        writer = EventLogWriter(batch_size=10, flush_interval_ms=50)
+        writer.put(self.engine, [
+            {"event_type": "test", "description": f"事件 {i}", "user_id": self.user_id} for i in range(25)
+        ])
+        writer.flush()
+        writer.shutdown()
+        self.assertEqual(self.count_events(), 25)
+
+    def test_async_durability_writes_after_commit(self):
+        with mock.patch.object(event_log_writer, "EVENT_LOG_DURABILITY", "async"):
+            db = self.SessionLocal()
+            answer_question(db, self.question_id, "回答", self.user_id, self.user_id)
+            db.close()
+        event_log_writer.event_log_writer.flush()
+
+        db = self.SessionLocal()
+        events = db.query(EventLogModel).all()
+        self.assertEqual([e.event_type for e in events], ["question_answered"])
+        self.assertEqual(events[0].question_id, self.question_id)
+        self.assertIsNotNone(events[0].created_at)
+        db.close()
+
+    def test_async_durability_discards_rolled_back_events(self):
+        with mock.patch.object(event_log_writer, "EVENT_LOG_DURABILITY", "async"):
+            db = self.SessionLocal()
+            db.get(UserModel, self.user_id)
+            event_log_writer.defer_event_logs(db, [
+                {"event_type": "test", "description": "回滚", "user_id": self.user_id}
+            ])
+            db.rollback()
+            db.commit()
+            db.close()
+        event_log_writer.event_log_writer.flush()
+        self.assertEqual(self.count_events(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
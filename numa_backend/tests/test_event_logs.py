@@ -0,0 +1,98 @@
+import unittest
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.event_log import EventLog as EventLogModel
+from app.models.user import User as UserModel
+from app.services.event_log_service import (
+    archive_event_logs, get_event_log_daily_counts, get_event_logs, get_time_to_clarify
+)
+
+class TestEventLogTimeline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'timeline.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+
+        user = UserModel(name="Test User", email="test@example.com")
+        self.db.add(user)
+        self.db.flush()
+        self.user_id = user.id
+
+        day1, day2 = datetime(2025, 7, 30, 9, 0), datetime(2025, 8, 2, 9, 0)
+        self.add_event("question_created", 1, day1)
+        self.add_event("question_created", 1, day1 + timedelta(minutes=30))
+        self.add_event("question_answered", 1, day1 + timedelta(hours=1))
+        self.add_event("question_clarified", 1, day1 + timedelta(hours=2))
+        self.add_event("question_clarified", 1, day2)
+        # 问题尚未澄清的需求不参与统计
+        self.add_event("question_created", 2, day2)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def add_event(self, event_type, requirement_id, created_at):
+        self.db.add(EventLogModel(
+            event_type=event_type, description=event_type, user_id=self.user_id,
+            requirement_id=requirement_id, created_at=created_at
+        ))
+
+    def test_filter_by_event_type(self):
+        events = get_event_logs(self.db, event_type="question_clarified")
+        self.assertEqual([e.event_type for e in events], ["question_clarified"] * 2)
+
+    def test_daily_counts(self):
+        counts = [tuple(row) for row in get_event_log_daily_counts(self.db)]
+        self.assertEqual(counts, [
+            ("2025-07-30", "question_answered", 1),
+            ("2025-07-30", "question_clarified", 1),
+            ("2025-07-30", "question_created", 2),
+            ("2025-08-02", "question_clarified", 1),
+            ("2025-08-02", "question_created", 1),
+        ])
+
+    def test_time_to_clarify(self):
+        [stats] = get_time_to_clarify(self.db)
+        self.assertEqual(stats["requirement_id"], 1)
+        self.assertEqual(stats["questions"], 2)
+        self.assertEqual(stats["seconds"], timedelta(days=3).total_seconds())
+
+    def test_archive_moves_old_events_to_monthly_files(self):
+        archive_dir = os.path.join(self.temp_dir.name, "archive")
+        archived = archive_event_logs(self.db, datetime(2025, 8, 1), archive_dir, batch_size=2)
+        self.assertEqual(archived, 4)
+        self.assertEqual(self.db.query(EventLogModel).count(), 2)
+
+        with gzip.open(os.path.join(archive_dir, "event_logs-2025-07.jsonl.gz"), "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["event_type"] for row in rows], [
+            "question_created", "question_created", "question_answered", "question_clarified"
+        ])
+
+    def test_archive_script(self):
+        """在独立进程中运行归档脚本，脚本需自行注册全部模型"""
+        archive_dir = os.path.join(self.temp_dir.name, "archive")
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(self.temp_dir.name, 'timeline.db')}")
+        script = os.path.join(os.path.dirname(__file__), "..", "scripts", "archive_event_logs.py")
+        result = subprocess.run(
+            [sys.executable, script, "--older-than-days", "1", "--archive-dir", archive_dir],
+            env=env, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Archived 6 event logs", result.stdout)
+        self.assertEqual(self.db.query(EventLogModel).count(), 0)
+        self.assertEqual(sorted(os.listdir(archive_dir)), ["event_logs-2025-07.jsonl.gz", "event_logs-2025-08.jsonl.gz"])
+
+if __name__ == "__main__":
+    unittest.main()
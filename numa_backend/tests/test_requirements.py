@@ -64,6 +64,143 @@ def test_create_requirement():
     assert data["application_id"] == app_id
     assert data["status"] == "pending"  # 需求创建后的默认状态是pending
 
+def test_bulk_create_requirements():
+    """测试批量创建需求，无效记录单独报错，不影响其他记录"""
+    app_data = {
+        "name": generate_unique_name(),
+        "description": "测试应用",
+        "repository_url": generate_unique_repo_url(),
+        "owner": "测试用户",
+        "app_id": generate_unique_app_id(),
+        "created_by": 1
+    }
+    app_response = client.post("/api/v1/applications/", json=app_data)
+    assert app_response.status_code == 200
+    app_id = app_response.json()["id"]
+
+    requirements = [
+        {"title": "批量需求1", "description": "批量导入", "application_id": app_id, "user_id": 1},
+        {"title": "批量需求2", "description": "批量导入", "application_id": app_id, "user_id": 999999},
+        {"title": "批量需求3", "description": "批量导入", "application_id": 999999, "user_id": 1},
+        {"title": "批量需求4", "description": "批量导入", "user_id": 1},
+        # 字段校验失败的记录同样单独报错
+        {"description": "缺少标题", "user_id": 1},
+        {"title": "批量需求6", "description": "批量导入", "user_id": "abc"},
+    ]
+    response = client.post("/api/v1/requirements/bulk", json=requirements)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["created"] == 2
+    assert data["failed"] == 4
+    results = data["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4, 5]
+    assert results[1] == {"index": 1, "id": None, "error": "User not found"}
+    assert results[2] == {"index": 2, "id": None, "error": "Application not found"}
+    assert results[4]["id"] is None and results[4]["error"].startswith("title:")
+    assert results[5]["id"] is None and results[5]["error"].startswith("user_id:")
+
+    created = client.get(f"/api/v1/requirements/{results[0]['id']}").json()
+    assert created["title"] == "批量需求1"
+    assert created["application_id"] == app_id
+    assert created["status"] == "pending"
+    # 主键按请求顺序回填
+    assert client.get(f"/api/v1/requirements/{results[3]['id']}").json()["title"] == "批量需求4"
+
+def create_requirement_with_solution():
+    """创建应用、需求和方案，返回 (应用ID, 需求ID, 方案ID)"""
+    app_data = {
+        "name": generate_unique_name(),
+        "description": "测试应用",
+        "repository_url": generate_unique_repo_url(),
+        "owner": "测试用户",
+        "app_id": generate_unique_app_id(),
+        "created_by": 1
+    }
+    app_id = client.post("/api/v1/applications/", json=app_data).json()["id"]
+    requirement_data = {"title": "批量测试需求", "description": "批量测试", "application_id": app_id, "user_id": 1}
+    requirement_id = client.post("/api/v1/requirements/", json=requirement_data).json()["id"]
+    solution_data = {
+        "title": "批量测试方案", "description": "批量测试", "requirement_id": requirement_id,
+        "application_id": app_id, "created_by": 1
+    }
+    solution_id = client.post("/api/v1/solutions/", json=solution_data).json()["id"]
+    return app_id, requirement_id, solution_id
+
+def test_bulk_create_questions():
+    """测试批量创建问题，每个创建成功的问题记录一条 question_created 事件"""
+    _, requirement_id, _ = create_requirement_with_solution()
+
+    questions = [
+        {"content": "批量问题1", "requirement_id": requirement_id, "created_by": 1},
+        {"content": "批量问题2", "requirement_id": 999999, "created_by": 1},
+        {"content": "批量问题3", "requirement_id": requirement_id, "created_by": 999999},
+        {"requirement_id": requirement_id, "created_by": 1},
+        {"content": "批量问题5", "requirement_id": requirement_id, "created_by": 1},
+    ]
+    response = client.post("/api/v1/questions/bulk", params={"current_user_id": 1}, json=questions)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["created"] == 2
+    assert data["failed"] == 3
+    results = data["results"]
+    assert results[1]["error"] == "需求未找到"
+    assert results[2]["error"] == "用户未找到"
+    assert results[3]["error"].startswith("content:")
+
+    question_ids = [results[0]["id"], results[4]["id"]]
+    assert [client.get(f"/api/v1/questions/{question_id}").json()["content"] for question_id in question_ids] == [
+        "批量问题1", "批量问题5"
+    ]
+    events = client.get(f"/api/v1/event_logs/requirement/{requirement_id}").json()
+    created_events = [e for e in events if e["event_type"] == "question_created"]
+    assert sorted(e["question_id"] for e in created_events) == sorted(question_ids)
+    assert all(e["user_id"] == 1 for e in created_events)
+
+def test_bulk_create_questions_unknown_current_user():
+    """测试操作用户不存在时整批拒绝"""
+    response = client.post("/api/v1/questions/bulk", params={"current_user_id": 999999}, json=[])
+    assert response.status_code == 400
+
+def test_bulk_create_development_tasks():
+    """测试批量创建开发任务，创建成功的任务下发到 tasks topic"""
+    app_id, requirement_id, solution_id = create_requirement_with_solution()
+
+    base = {"description": "批量任务", "requirement_id": requirement_id, "application_id": app_id}
+    tasks = [
+        {**base, "title": "批量任务1", "solution_id": solution_id},
+        {**base, "title": "批量任务2", "solution_id": 999999},
+        {**base, "title": "批量任务3", "solution_id": solution_id, "assigned_to": 999999},
+        {**base, "title": "批量任务4"},
+        {**base, "title": "批量任务5", "solution_id": solution_id},
+    ]
+    response = client.post("/api/v1/development/bulk", json=tasks)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["created"] == 2
+    assert data["failed"] == 3
+    results = data["results"]
+    assert results[1]["error"] == "Solution not found"
+    assert results[2]["error"] == "Assigned user not found"
+    assert results[3]["error"].startswith("solution_id:")
+
+    task_ids = [results[0]["id"], results[4]["id"]]
+    assert [client.get(f"/api/v1/development/{task_id}").json()["title"] for task_id in task_ids] == [
+        "批量任务1", "批量任务5"
+    ]
+    # 读取 tasks topic 的全部消息，新任务各有一条
+    topic_id = client.get("/api/v1/topics/tasks").json()["id"]
+    dispatched, after = [], 0
+    while True:
+        messages = client.get(f"/api/v1/topics/{topic_id}/messages", params={"after": after}).json()["data"]
+        if not messages:
+            break
+        dispatched.extend(message["data"]["task_id"] for message in messages)
+        after = messages[-1]["id"]
+    assert sorted(task_id for task_id in dispatched if task_id in task_ids) == sorted(task_ids)
+
 def test_get_requirement():
     """测试获取单个需求"""
     # 先创建一个应用
@@ -139,6 +276,49 @@ def test_get_requirements():
     for i in range(3):
         assert f"测试需求列表 {i+1}" in titles
 
+def test_get_requirements_filtered():
+    """测试按应用和状态筛选需求列表"""
+    # 先创建一个应用
+    app_data = {
+        "name": generate_unique_name(),
+        "description": "测试应用",
+        "repository_url": generate_unique_repo_url(),
+        "owner": "测试用户",
+        "app_id": generate_unique_app_id(),
+        "created_by": 1
+    }
+    app_response = client.post("/api/v1/applications/", json=app_data)
+    assert app_response.status_code == 200
+    app_id = app_response.json()["id"]
+    
+    # 创建多个需求，并将其中一个标记为已接手
+    ids = []
+    for i in range(3):
+        requirement_data = {
+            "title": f"测试筛选需求 {i+1}",
+            "description": f"用于测试筛选需求列表 {i+1}",
+            "application_id": app_id,
+            "user_id": 1
+        }
+        response = client.post("/api/v1/requirements/", json=requirement_data)
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    response = client.put(f"/api/v1/requirements/{ids[0]}", json={"status": "taken"})
+    assert response.status_code == 200
+    
+    # 只返回该应用下的需求
+    response = client.get("/api/v1/requirements/", params={"application_id": app_id})
+    assert response.status_code == 200
+    assert sorted(req["id"] for req in response.json()) == ids
+    
+    # 组合状态筛选，按标题倒序
+    response = client.get(
+        "/api/v1/requirements/",
+        params={"application_id": app_id, "status": "pending", "sort": "-title"}
+    )
+    assert response.status_code == 200
+    assert [req["id"] for req in response.json()] == [ids[2], ids[1]]
+
 def test_update_requirement_status():
     """测试更新需求状态"""
     # 先创建一个应用
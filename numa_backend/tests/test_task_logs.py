@@ -0,0 +1,157 @@
+import unittest
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.core.task_log_store import TaskLogStore
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.services import async_task_log_service, task_log_service
+from app.services.task_log_service import append_task_log, compact_task_log, decode_log_body
+
+class TestTaskLogs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'logs.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        db_task = DevelopmentTaskModel(title="测试任务", description="测试", status="in_progress")
+        self.db.add(db_task)
+        self.db.commit()
+        self.task_id = db_task.id
+
+        self.store = TaskLogStore(os.path.join(self.temp_dir.name, "task_logs"), segment_bytes=16)
+        patchers = [
+            mock.patch.object(task_log_service, "task_log_store", self.store),
+            mock.patch.object(async_task_log_service, "task_log_store", self.store),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def test_reads_across_rotated_and_compressed_segments(self):
+        lines = [f"line {i:02d} of the build\n".encode() for i in range(10)]
+        offsets = [self.store.append(self.task_id, line) for line in lines]
+        log = b"".join(lines)
+        self.assertEqual(offsets, [sum(len(line) for line in lines[:i]) for i in range(10)])
+        self.assertEqual(self.store.size(self.task_id), len(log))
+        # 每行都超过段大小上限，写入后立即关闭
+        self.assertTrue(all(segment.end is not None for segment in self.store.segments(self.task_id)))
+
+        self.assertEqual(compact_task_log(self.task_id), 10)
+        self.assertTrue(all(segment.compressed for segment in self.store.segments(self.task_id)))
+        self.assertEqual(self.store.size(self.task_id), len(log))
+        self.assertEqual(self.store.read(self.task_id, 0, len(log) + 100), log)
+        self.assertEqual(self.store.read(self.task_id, 30, 50), log[30:80])
+        self.assertEqual(self.store.read(self.task_id, len(log), 10), b"")
+
+    def test_close_starts_new_segment(self):
+        store = TaskLogStore(self.store.root, segment_bytes=1024)
+        store.append(self.task_id, b"first run\n")
+        store.close(self.task_id)
+        self.assertEqual(store.append(self.task_id, b"second run\n"), 10)
+        self.assertEqual([segment.end for segment in store.segments(self.task_id)], [10, None])
+        self.assertEqual(store.read(self.task_id, 0, 100), b"first run\nsecond run\n")
+
+    def test_resent_chunk_is_ignored(self):
+        first = append_task_log(self.db, self.task_id, b"cloning\n", "stream-1", 0)
+        second = append_task_log(self.db, self.task_id, b"generating\n", "stream-1", 1)
+        resent = append_task_log(self.db, self.task_id, b"cloning\n", "stream-1", 0)
+        self.assertEqual(first, {"task_id": self.task_id, "offset": 0, "length": 8, "duplicate": False})
+        self.assertEqual(second["offset"], 8)
+        self.assertEqual(resent, dict(first, duplicate=True))
+        self.assertEqual(self.store.read(self.task_id, 0, 100), b"cloning\ngenerating\n")
+        # 新的日志流从 0 开始编号
+        self.assertFalse(append_task_log(self.db, self.task_id, b"retry\n", "stream-2", 0)["duplicate"])
+
+    def test_concurrent_resend_does_not_append_twice(self):
+        """测试重发的块在检查之后已被另一个请求记录时，不再写入日志文件"""
+        other = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        get_chunk = task_log_service._get_chunk
+        calls = []
+        def get_chunk_after_other(*args):
+            # 第一次检查时块尚未记录，随后另一个请求记录了同一块
+            calls.append(args)
+            if len(calls) == 1:
+                append_task_log(other, self.task_id, b"cloning\n", "stream-1", 0)
+                return None
+            return get_chunk(*args)
+        try:
+            with mock.patch.object(task_log_service, "_get_chunk", side_effect=get_chunk_after_other):
+                result = append_task_log(self.db, self.task_id, b"cloning\n", "stream-1", 0)
+        finally:
+            other.close()
+        self.assertEqual(result, {"task_id": self.task_id, "offset": 0, "length": 8, "duplicate": True})
+        self.assertEqual(self.store.read(self.task_id, 0, 100), b"cloning\n")
+
+    def test_failed_commit_undoes_append(self):
+        """测试写入文件后提交失败时撤销写入的内容，重发的块只写入一次"""
+        append_task_log(self.db, self.task_id, b"cloning\n", "stream-1", 0)
+        # 第一块写入后当前段未满，第二块写入后当前段关闭
+        for data in (b"ok\n", b"generating\n"):
+            with mock.patch.object(task_log_service, "commit", side_effect=RuntimeError("database is locked")):
+                with self.assertRaises(RuntimeError):
+                    append_task_log(self.db, self.task_id, data, "stream-1", 1)
+            self.assertEqual(self.store.size(self.task_id), 8)
+
+        result = append_task_log(self.db, self.task_id, b"generating\n", "stream-1", 1)
+        self.assertEqual(result, {"task_id": self.task_id, "offset": 8, "length": 11, "duplicate": False})
+        self.assertEqual(self.store.read(self.task_id, 0, 100), b"cloning\ngenerating\n")
+
+    def test_undo_append_only_at_end_of_log(self):
+        offset = self.store.append(self.task_id, b"cloning\n")
+        self.store.append(self.task_id, b"generating\n")
+        self.assertFalse(self.store.undo_append(self.task_id, offset, 8))
+        self.assertEqual(self.store.read(self.task_id, 0, 100), b"cloning\ngenerating\n")
+
+    def test_rejects_invalid_chunks(self):
+        with self.assertRaises(ValueError):
+            append_task_log(self.db, self.task_id, b"log\n", "stream-1", None)
+        with self.assertRaises(ValueError):
+            append_task_log(self.db, self.task_id, b"log\n", "stream-1", -1)
+        self.assertIsNone(append_task_log(self.db, 999999, b"log\n"))
+
+    def test_decode_log_body(self):
+        self.assertEqual(decode_log_body(gzip.compress("构建成功\n".encode()), "text/plain", "gzip"), "构建成功\n".encode())
+        self.assertEqual(decode_log_body(json.dumps({"logs": "legacy"}).encode(), "application/json", None), b"legacy\n")
+        with self.assertRaises(ValueError):
+            decode_log_body(b"not gzip", "text/plain", "gzip")
+        with self.assertRaises(ValueError):
+            decode_log_body(b"[]", "application/json", None)
+        with mock.patch.object(task_log_service, "MAX_LOG_CHUNK_BYTES", 10):
+            with self.assertRaises(ValueError):
+                decode_log_body(gzip.compress(b"x" * 100), "text/plain", "gzip")
+
+    def test_tail_wakes_on_append(self):
+        append_task_log(self.db, self.task_id, b"started\n")
+
+        async def tail():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            # 追加在另一个线程中提交，读取请求应被立即唤醒而不是等到超时
+            threading.Timer(0.2, lambda: self.store.append(self.task_id, b"done\n")
+                            or task_log_service.task_log_broker.notify(self.task_id)).start()
+            data, size = await async_task_log_service.read_task_log(self.task_id, 8, wait=10)
+            return data, size, loop.time() - started
+
+        data, size, elapsed = asyncio.run(tail())
+        self.assertEqual((data, size), (b"done\n", 13))
+        self.assertLess(elapsed, 5)
+
+        # 没有新日志时等待到超时后返回空内容；偏移量超出日志末尾时报错
+        self.assertEqual(asyncio.run(async_task_log_service.read_task_log(self.task_id, 13, wait=0.05)), (b"", 13))
+        with self.assertRaises(ValueError):
+            asyncio.run(async_task_log_service.read_task_log(self.task_id, 14))
+
+if __name__ == '__main__':
+    unittest.main()
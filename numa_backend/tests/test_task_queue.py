@@ -0,0 +1,119 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.services import task_queue_service
+from app.services.task_queue_service import (
+    LeaseConflictError, ack_task, claim_next_task, claim_task, heartbeat_task, nack_task, requeue_task
+)
+
+class TestTaskQueue(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'queue.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.db = self.SessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def create_task(self, title="测试任务"):
+        db_task = DevelopmentTaskModel(title=title, description="测试", status="todo")
+        self.db.add(db_task)
+        self.db.commit()
+        return db_task.id
+
+    def test_task_is_claimed_once(self):
+        task_id = self.create_task()
+        db_task = claim_task(self.db, task_id, "avatar-1")
+        self.assertEqual(db_task.status, "in_progress")
+        self.assertEqual(db_task.lease_owner, "avatar-1")
+        self.assertEqual(db_task.attempts, 1)
+        self.assertIsNotNone(db_task.started_at)
+
+        other = self.SessionLocal()
+        with self.assertRaises(LeaseConflictError):
+            claim_task(other, task_id, "avatar-2")
+        self.assertIsNone(claim_next_task(other, "avatar-2"))
+        other.close()
+
+        # 同一 Avatar 重复领取只续期
+        self.assertEqual(claim_task(self.db, task_id, "avatar-1").attempts, 1)
+
+    def test_claim_next_in_creation_order(self):
+        first, second = self.create_task("任务1"), self.create_task("任务2")
+        self.assertEqual(claim_next_task(self.db, "avatar-1").id, first)
+        self.assertEqual(claim_next_task(self.db, "avatar-2").id, second)
+        self.assertIsNone(claim_next_task(self.db, "avatar-3"))
+
+    def test_ack_completes_task(self):
+        task_id = self.create_task()
+        claim_task(self.db, task_id, "avatar-1")
+        with self.assertRaises(LeaseConflictError):
+            ack_task(self.db, task_id, "avatar-2")
+
+        db_task = ack_task(self.db, task_id, "avatar-1")
+        self.assertEqual(db_task.status, "done")
+        self.assertIsNotNone(db_task.completed_at)
+        self.assertIsNone(db_task.lease_expires_at)
+        # 重复确认不报错
+        self.assertEqual(ack_task(self.db, task_id, "avatar-1").status, "done")
+
+    def test_expired_lease_is_reclaimed(self):
+        task_id = self.create_task()
+        claim_task(self.db, task_id, "avatar-1", lease_seconds=60)
+        self.db.query(DevelopmentTaskModel).filter(DevelopmentTaskModel.id == task_id).update({
+            DevelopmentTaskModel.lease_expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)
+        })
+        self.db.commit()
+
+        db_task = claim_next_task(self.db, "avatar-2")
+        self.assertEqual(db_task.id, task_id)
+        self.assertEqual(db_task.lease_owner, "avatar-2")
+        self.assertEqual(db_task.attempts, 2)
+        with self.assertRaises(LeaseConflictError):
+            heartbeat_task(self.db, task_id, "avatar-1")
+        self.assertEqual(heartbeat_task(self.db, task_id, "avatar-2").lease_owner, "avatar-2")
+
+    def test_nack_backs_off_then_dead_letters(self):
+        task_id = self.create_task()
+        with patch.object(task_queue_service, "TASK_MAX_ATTEMPTS", 2):
+            claim_task(self.db, task_id, "avatar-1")
+            db_task = nack_task(self.db, task_id, "avatar-1", error="构建失败")
+            self.assertEqual(db_task.status, "todo")
+            self.assertEqual(db_task.last_error, "构建失败")
+            self.assertIsNone(db_task.lease_owner)
+            # 退避期间不可领取
+            self.assertIsNone(claim_next_task(self.db, "avatar-1"))
+            with self.assertRaises(LeaseConflictError):
+                claim_task(self.db, task_id, "avatar-1")
+
+            self.db.query(DevelopmentTaskModel).filter(DevelopmentTaskModel.id == task_id).update({
+                DevelopmentTaskModel.available_at: datetime.now(timezone.utc) - timedelta(seconds=1)
+            })
+            self.db.commit()
+            claim_task(self.db, task_id, "avatar-1")
+            db_task = nack_task(self.db, task_id, "avatar-1", error="构建失败")
+            self.assertEqual(db_task.status, "dead_letter")
+            self.assertIsNone(claim_next_task(self.db, "avatar-1"))
+
+        db_task = requeue_task(self.db, task_id)
+        self.assertEqual(db_task.status, "todo")
+        self.assertEqual(db_task.attempts, 0)
+        self.assertEqual(claim_next_task(self.db, "avatar-1").id, task_id)
+
+    def test_retry_delay_is_capped(self):
+        self.assertEqual(task_queue_service.retry_delay(1), task_queue_service.TASK_RETRY_BASE_SECONDS)
+        self.assertEqual(task_queue_service.retry_delay(2), task_queue_service.TASK_RETRY_BASE_SECONDS * 2)
+        self.assertEqual(task_queue_service.retry_delay(100), task_queue_service.TASK_RETRY_MAX_SECONDS)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.schemas.development import TaskStepBatch
+from app.services.task_step_service import MAX_STEPS_PER_BATCH, get_task_steps, record_task_steps
+
+class TestTaskSteps(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'steps.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        db_task = DevelopmentTaskModel(title="测试任务", description="测试", status="in_progress")
+        self.db.add(db_task)
+        self.db.commit()
+        self.task_id = db_task.id
+        self.start = datetime(2025, 8, 18, 10, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def batch(self, steps, batch_id=None):
+        return TaskStepBatch(avatar_id="avatar-1", batch_id=batch_id, events=[
+            {"step": step, "status": status, "details": details, "timestamp": self.start + timedelta(seconds=offset)}
+            for offset, step, status, details in steps
+        ])
+
+    def test_steps_form_timeline(self):
+        result = record_task_steps(self.db, self.task_id, self.batch([
+            (0, "getting_task_info", "in_progress", None),
+            (2, "syncing_repository", "in_progress", None),
+        ], "batch-1"))
+        self.assertEqual(result, {"task_id": self.task_id, "accepted": 2, "duplicate": False})
+        # 后发生的批次可能先到达，时间线按发生时间排序
+        record_task_steps(self.db, self.task_id, self.batch([(1, "getting_application_info", "in_progress", None)]))
+        record_task_steps(self.db, self.task_id, self.batch([(3, "failed", "failed", {"error": "Failed to sync"})]))
+
+        steps = get_task_steps(self.db, self.task_id)
+        self.assertEqual(
+            [step["step"] for step in steps],
+            ["getting_task_info", "getting_application_info", "syncing_repository", "failed"]
+        )
+        self.assertEqual(steps[-1]["details"], {"error": "Failed to sync"})
+        self.assertIsNone(steps[0]["details"])
+        self.assertEqual(steps[0]["avatar_id"], "avatar-1")
+
+    def test_resent_batch_is_ignored(self):
+        batch = self.batch([(0, "analyzing_task", "in_progress", None)], "batch-1")
+        record_task_steps(self.db, self.task_id, batch)
+        result = record_task_steps(self.db, self.task_id, batch)
+        self.assertEqual((result["accepted"], result["duplicate"]), (0, True))
+        self.assertEqual(len(get_task_steps(self.db, self.task_id)), 1)
+
+    def test_concurrent_resend_is_rejected_by_unique_index(self):
+        """测试重发的批次在检查之后、写入之前已被另一个请求记录时，由唯一索引拒绝"""
+        batch = self.batch([(0, "analyzing_task", "in_progress", None), (1, "generating_code", "in_progress", None)], "batch-1")
+        other = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+        insert = self.db.bulk_insert_mappings
+        def insert_after_other(*args, **kwargs):
+            record_task_steps(other, self.task_id, batch)
+            return insert(*args, **kwargs)
+        try:
+            with patch.object(self.db, "bulk_insert_mappings", side_effect=insert_after_other):
+                result = record_task_steps(self.db, self.task_id, batch)
+        finally:
+            other.close()
+        self.assertEqual((result["accepted"], result["duplicate"]), (0, True))
+        self.assertEqual(len(get_task_steps(self.db, self.task_id)), 2)
+
+    def test_unknown_task_and_oversized_batch(self):
+        self.assertIsNone(record_task_steps(self.db, self.task_id + 1, self.batch([(0, "analyzing_task", None, None)])))
+        self.assertIsNone(get_task_steps(self.db, self.task_id + 1))
+        with self.assertRaises(ValueError):
+            record_task_steps(self.db, self.task_id, self.batch([(0, "step", None, None)] * (MAX_STEPS_PER_BATCH + 1)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import json
+import os
+import tempfile
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.development import DevelopmentTask as DevelopmentTaskModel
+from app.schemas.development import DevelopmentTask
+from app.services.task_queue_service import ack_task, claim_task, nack_task
+from app.services.task_timing_service import get_phase_timing_stats, percentile
+
+class TestTaskTimings(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'timings.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def run_task(self, timings, success=True):
+        db_task = DevelopmentTaskModel(title="测试任务", description="测试", status="todo")
+        self.db.add(db_task)
+        self.db.commit()
+        claim_task(self.db, db_task.id, "avatar-1")
+        if success:
+            return ack_task(self.db, db_task.id, "avatar-1", timings)
+        return nack_task(self.db, db_task.id, "avatar-1", "push failed", timings=timings)
+
+    def test_ack_stores_timings_on_task(self):
+        db_task = self.run_task({"clone": 1.5, "generation": 20.0})
+        self.assertEqual(json.loads(db_task.phase_timings), {"clone": 1.5, "generation": 20.0})
+        # 没有上报耗时的重复确认不清除已保存的耗时
+        db_task = ack_task(self.db, db_task.id, "avatar-1")
+        self.assertEqual(json.loads(db_task.phase_timings), {"clone": 1.5, "generation": 20.0})
+        # 接口返回解析后的耗时
+        task = DevelopmentTask(
+            title="测试任务", description="测试", solution_id=1, requirement_id=1, application_id=1,
+            phase_timings=db_task.phase_timings
+        )
+        self.assertEqual(task.phase_timings, {"clone": 1.5, "generation": 20.0})
+
+    def test_invalid_timings_are_rejected(self):
+        for timings in ({"clone": -1.0}, {"clone": float("nan")}, {"": 1.0}):
+            with self.assertRaises(ValueError):
+                self.run_task(timings)
+
+    def test_stats_per_phase(self):
+        for i in range(1, 21):
+            self.run_task({"clone": float(i), "generation": 10.0 * i, "push": 1.0})
+        # 失败的任务默认不参与统计
+        self.assertEqual(self.run_task({"clone": 500.0}, success=False).status, "todo")
+
+        stats = get_phase_timing_stats(self.db)
+        self.assertEqual(stats["tasks"], 20)
+        self.assertEqual([phase["phase"] for phase in stats["phases"]], ["clone", "generation", "push"])
+        clone = stats["phases"][0]
+        self.assertEqual((clone["count"], clone["p50"], clone["p95"], clone["max"]), (20, 10.0, 19.0, 20.0))
+        self.assertEqual(clone["mean"], 10.5)
+        self.assertEqual(stats["total"]["p50"], 10.0 + 100.0 + 1.0)
+
+        # 只统计最近的任务
+        self.assertEqual(get_phase_timing_stats(self.db, limit=5)["phases"][0]["p50"], 18.0)
+        self.assertEqual(get_phase_timing_stats(self.db, status="todo")["phases"][0]["max"], 500.0)
+        with self.assertRaises(ValueError):
+            get_phase_timing_stats(self.db, limit=0)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([1.0], 95), 1.0)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.0)
+        self.assertEqual(percentile([float(i) for i in range(1, 101)], 95), 95.0)
+
+if __name__ == '__main__':
+    unittest.main()
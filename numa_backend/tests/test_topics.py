@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import uuid
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from main import app
+from app.core.database import Base, create_async_db_engine, create_db_engine
+from app.services.async_topic_service import iter_topic_events
+from app.services.topic_service import publish_message, get_or_create_topic
+
+client = TestClient(app)
+
+def test_task_topic_is_created_once():
+    """测试任务topic自动创建且只创建一次"""
+    first = client.get("/api/topics/tasks")
+    assert first.status_code == 200
+    assert first.json()["name"] == "tasks"
+    assert client.get("/api/v1/topics/tasks").json()["id"] == first.json()["id"]
+
+def test_read_messages_after_offset():
+    """测试按偏移量读取消息"""
+    topic = client.post("/api/v1/topics/", json={"name": f"topic-{uuid.uuid4()}"}).json()
+    offsets = []
+    for task_id in (1, 2, 3):
+        response = client.post(f"/api/v1/topics/{topic['id']}/messages", json={"data": {"task_id": task_id}})
+        assert response.status_code == 200
+        offsets.append(response.json()["id"])
+
+    messages = client.get(f"/api/topics/{topic['id']}/messages", params={"after": offsets[0]}).json()["data"]
+    assert [message["data"]["task_id"] for message in messages] == [2, 3]
+    assert [message["id"] for message in messages] == offsets[1:]
+
+def test_publish_to_missing_topic():
+    """测试向不存在的topic发布消息"""
+    response = client.post("/api/v1/topics/999999/messages", json={"data": {"task_id": 1}})
+    assert response.status_code == 400
+
+def test_stream_resumes_from_offset_and_wakes_on_publish():
+    """测试订阅流从偏移量续传，并在新消息提交后立即推送"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_url = f"sqlite:///{os.path.join(temp_dir, 'topics.db')}"
+        engine = create_db_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        async_engine = create_async_db_engine(database_url)
+
+        db = SessionLocal()
+        topic_id = get_or_create_topic(db, "tasks").id
+        first = publish_message(db, topic_id, {"task_id": 1}).id
+        publish_message(db, topic_id, {"task_id": 2})
+        db.close()
+
+        def publish_later():
+            db = SessionLocal()
+            publish_message(db, topic_id, {"task_id": 3})
+            db.close()
+
+        async def consume():
+            received = []
+
+            async def is_disconnected():
+                return False
+
+            async with sessionmaker(async_engine, class_=AsyncSession)() as session:
+                loop = asyncio.get_running_loop()
+                # 兜底查询间隔很长，只有发布通知才能及时唤醒订阅流
+                events = iter_topic_events(session, topic_id, first, is_disconnected, heartbeat=60, poll_interval=30)
+                async for chunk in events:
+                    if chunk.startswith("id:"):
+                        received.append(json.loads(chunk.split("data: ", 1)[1]))
+                        if len(received) == 1:
+                            loop.run_in_executor(None, publish_later)
+                        else:
+                            break
+                await events.aclose()
+            return received
+
+        received = asyncio.run(asyncio.wait_for(consume(), 10))
+        assert [message["data"]["task_id"] for message in received] == [2, 3]
+
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
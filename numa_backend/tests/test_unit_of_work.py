@@ -0,0 +1,86 @@
+import unittest
+import os
+import tempfile
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from main import app  # noqa: F401  注册全部模型
+from app.core.database import Base, create_db_engine
+from app.models.application import Application as ApplicationModel
+from app.models.event_log import EventLog as EventLogModel
+from app.models.question import Question as QuestionModel
+from app.models.requirement import Requirement as RequirementModel
+from app.models.solution import Solution as SolutionModel
+from app.models.user import User as UserModel
+from app.services.requirement_service import clarify_requirement
+
+class TestWorkflowTransitions(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'uow.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        user = UserModel(name="Test User", email="test@example.com")
+        db.add(user)
+        db.flush()
+        application = ApplicationModel(
+            name="test-app", description="测试应用", repository_url="https://example.com/test.git",
+            owner="测试用户", app_id="test-app", created_by=user.id
+        )
+        db.add(application)
+        db.commit()
+        self.user_id, self.application_id = user.id, application.id
+        db.close()
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def create_requirement(self, assigned_to):
+        db = self.SessionLocal()
+        requirement = RequirementModel(
+            title="测试需求", description="测试", status="clarifying", user_id=self.user_id,
+            application_id=self.application_id, assigned_to=assigned_to
+        )
+        db.add(requirement)
+        db.flush()
+        db.add(QuestionModel(content="问题", requirement_id=requirement.id, created_by=self.user_id, clarified=True))
+        db.commit()
+        requirement_id = requirement.id
+        db.close()
+        return requirement_id
+
+    def test_clarify_transition_commits_once(self):
+        requirement_id = self.create_requirement(self.user_id)
+        commits = []
+        event.listen(self.engine, "commit", lambda conn: commits.append(1))
+
+        db = self.SessionLocal()
+        requirement = clarify_requirement(db, requirement_id, True)
+        self.assertEqual(requirement.status, "confirmed")
+        self.assertEqual(db.query(SolutionModel).filter(SolutionModel.requirement_id == requirement_id).count(), 1)
+        self.assertEqual(db.query(EventLogModel).filter(EventLogModel.requirement_id == requirement_id).count(), 1)
+        db.close()
+
+        # 需求更新、方案创建和事件记录在同一事务中提交
+        self.assertEqual(len(commits), 1)
+
+    def test_failed_transition_rolls_back(self):
+        # 接手人不存在，创建方案失败
+        requirement_id = self.create_requirement(assigned_to=9999)
+
+        db = self.SessionLocal()
+        with self.assertRaises(ValueError):
+            clarify_requirement(db, requirement_id, True)
+        db.close()
+
+        db = self.SessionLocal()
+        requirement = db.get(RequirementModel, requirement_id)
+        self.assertFalse(requirement.clarified)
+        self.assertEqual(requirement.status, "clarifying")
+        self.assertEqual(db.query(SolutionModel).count(), 0)
+        db.close()
+
+if __name__ == "__main__":
+    unittest.main()
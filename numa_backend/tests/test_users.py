@@ -7,15 +7,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from main import app
 from app.core.database import Base
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, get_async_db
 
 # Create a test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingAsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 # Create tables in test database
 Base.metadata.create_all(bind=engine)
@@ -27,8 +30,13 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 # Override the get_db dependency
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 client = TestClient(app)
 
@@ -76,6 +84,76 @@ class TestUsersAPI(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["name"], "Test User")
 
+    def test_get_users_cursor_pagination(self):
+        # Create more users than fit on one page
+        for i in range(5):
+            client.post(
+                "/api/v1/users/",
+                json={"name": f"User {i}", "email": f"user{i}@example.com"}
+            )
+        
+        # Walk all pages following the next cursor header
+        names = []
+        params = {"limit": 2}
+        while True:
+            response = client.get("/api/v1/users/", params=params)
+            self.assertEqual(response.status_code, 200)
+            names.extend(user["name"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+        
+        self.assertEqual(names, [f"User {i}" for i in range(5)])
+
+    def test_get_users_invalid_cursor(self):
+        response = client.get("/api/v1/users/", params={"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_users_sorted_descending_with_cursor(self):
+        for i in range(5):
+            client.post(
+                "/api/v1/users/",
+                json={"name": f"User {i}", "email": f"user{i}@example.com"}
+            )
+        
+        names = []
+        params = {"limit": 2, "sort": "-name"}
+        while True:
+            response = client.get("/api/v1/users/", params=params)
+            self.assertEqual(response.status_code, 200)
+            names.extend(user["name"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+        
+        self.assertEqual(names, [f"User {i}" for i in reversed(range(5))])
+
+    def test_get_users_cursor_must_match_sort(self):
+        for i in range(3):
+            client.post(
+                "/api/v1/users/",
+                json={"name": f"User {i}", "email": f"user{i}@example.com"}
+            )
+        response = client.get("/api/v1/users/", params={"limit": 1, "sort": "name"})
+        cursor = response.headers.get("X-Next-Cursor")
+        
+        response = client.get("/api/v1/users/", params={"limit": 1, "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_users_unsupported_sort(self):
+        response = client.get("/api/v1/users/", params={"sort": "password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_users_created_range(self):
+        client.post("/api/v1/users/", json={"name": "Test User", "email": "test@example.com"})
+        
+        response = client.get("/api/v1/users/", params={"created_after": "2000-01-01T00:00:00"})
+        self.assertEqual(len(response.json()), 1)
+        response = client.get("/api/v1/users/", params={"created_before": "2000-01-01T00:00:00"})
+        self.assertEqual(response.json(), [])
+
     def test_get_user(self):
         # First create a user
         create_response = client.post(
@@ -1,5 +1,6 @@
 import click
 import requests
+from app.core.pagination import DATE_FORMATS, iter_pages, list_filters
 
 # API基础URL
 API_BASE_URL = "http://localhost:7301/api/v1"
@@ -33,12 +34,10 @@ def get_application_by_app_id_api(app_id):
     response.raise_for_status()
     return response.json()
 
-def list_applications_api():
-    """通过API列出所有应用"""
+def list_applications_api(page_size=100, **filters):
+    """通过API逐页列出应用，筛选条件由服务端执行"""
     url = f"{API_BASE_URL}/applications/"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return iter_pages(lambda params: requests.get(url, params=params), {"limit": page_size, **list_filters(**filters)})
 
 @click.group()
 def applications():
@@ -113,14 +112,22 @@ def get_by_app_id(app_id):
         click.echo(f"获取应用详情失败: {str(e)}")
 
 @applications.command()
-def list():
-    """列出所有应用"""
+@click.option('--page-size', default=100, help='每页拉取的记录数')
+@click.option('--status', default=None, help='按状态筛选')
+@click.option('--created-after', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之后创建的记录')
+@click.option('--created-before', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之前创建的记录')
+@click.option('--sort', default=None, help='排序字段（created_at、id、name、status），前缀 - 表示降序')
+def list(page_size, status, created_after, created_before, sort):
+    """列出应用"""
     try:
-        applications = list_applications_api()
-        if applications:
-            for app in applications:
-                click.echo(f"ID: {app['id']}, 名称: {app['name']}, 状态: {app['status']}, 应用ID: {app['app_id']}")
-        else:
+        count = 0
+        applications_iter = list_applications_api(
+            page_size, status=status, created_after=created_after, created_before=created_before, sort=sort
+        )
+        for app in applications_iter:
+            click.echo(f"ID: {app['id']}, 名称: {app['name']}, 状态: {app['status']}, 应用ID: {app['app_id']}")
+            count += 1
+        if not count:
             click.echo("暂无应用")
     except requests.exceptions.RequestException as e:
         click.echo(f"获取应用列表失败: {str(e)}")
@@ -1,6 +1,8 @@
 import click
+import codecs
 import json
 from app.core.http_client import client
+from app.core.pagination import DATE_FORMATS, iter_pages, list_filters, NEXT_CURSOR_HEADER
 
 @click.group()
 def development():
@@ -46,18 +48,106 @@ def get(task_id):
 
 @development.command()
 @click.option('--skip', default=0, help='跳过的记录数')
-@click.option('--limit', default=100, help='返回的记录数')
-def list(skip, limit):
+@click.option('--limit', default=100, help='返回的记录数（使用--all时为每页记录数）')
+@click.option('--cursor', default=None, help='上一页返回的游标，从该位置继续获取')
+@click.option('--all', 'fetch_all', is_flag=True, help='按游标逐页获取全部开发任务')
+@click.option('--status', default=None, help='按状态筛选')
+@click.option('--application-id', type=int, default=None, help='按应用ID筛选')
+@click.option('--assigned-to', type=int, default=None, help='按负责人ID筛选')
+@click.option('--requirement-id', type=int, default=None, help='按需求ID筛选')
+@click.option('--created-after', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之后创建的记录')
+@click.option('--created-before', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之前创建的记录')
+@click.option('--sort', default=None, help='排序字段（created_at、id、title、status），前缀 - 表示降序')
+@click.option('--fields', default=None, help='只返回指定的列（逗号分隔），例如 id,title,status')
+@click.option('--include', default=None, help='只返回指定的关联对象（逗号分隔，可选 solution、requirement、application）')
+def list(skip, limit, cursor, fetch_all, status, application_id, assigned_to, requirement_id, created_after, created_before, sort, fields, include):
     """获取开发任务列表"""
+    filters = list_filters(
+        status=status, application_id=application_id, assigned_to=assigned_to, requirement_id=requirement_id,
+        created_after=created_after, created_before=created_before, sort=sort,
+        fields=fields, include=include
+    )
     try:
-        response = client.get("/v1/development/", params={"skip": skip, "limit": limit})
+        if fetch_all:
+            for item in iter_pages(lambda params: client.get("/v1/development/", params=params), {"limit": limit, **filters}):
+                click.echo(json.dumps(item, indent=2, ensure_ascii=False))
+            return
+        
+        params = {"skip": skip, "limit": limit, **filters}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/v1/development/", params=params)
         if response.status_code == 200:
             tasks = response.json()
             click.echo(json.dumps(tasks, indent=2, ensure_ascii=False))
+            next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if next_cursor:
+                click.echo(f"下一页游标: {next_cursor}", err=True)
         else:
             click.echo(f"获取开发任务列表失败: {response.text}")
     except Exception as e:
         click.echo(f"发生错误: {str(e)}")
 
+@development.command()
+@click.argument('task_id', type=int)
+@click.option('--offset', default=0, help='从该字节偏移量开始读取')
+@click.option('--limit', default=64 * 1024, help='每次请求读取的最大字节数')
+@click.option('--follow', '-f', is_flag=True, help='持续输出新的日志，按 Ctrl+C 退出')
+@click.option('--wait', default=30, help='--follow 时每次请求等待新日志的最长秒数')
+def logs(task_id, offset, limit, follow, wait):
+    """查看开发任务的日志"""
+    # 按字节范围读取，多字节字符可能被拆在两次读取之间
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        while True:
+            params = {"offset": offset, "limit": limit}
+            if follow:
+                params["wait"] = wait
+            # 长轮询请求的超时时间需长于等待时间
+            response = client.get(f"/v1/development/{task_id}/logs", params=params, timeout=wait + 10)
+            if response.status_code != 200:
+                click.echo(f"获取开发任务日志失败: {response.text}")
+                return
+            click.echo(decoder.decode(response.content), nl=False)
+            offset = int(response.headers.get("X-Log-Next-Offset", offset + len(response.content)))
+            # 没有跟踪时读到日志末尾即结束
+            if not follow and offset >= int(response.headers.get("X-Log-Size", offset)):
+                break
+        click.echo(decoder.decode(b"", final=True), nl=False)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        click.echo(f"发生错误: {str(e)}")
+
+@development.command()
+@click.option('--limit', default=100, help='参与统计的最近任务数')
+@click.option('--status', default='done', help='只统计该状态的任务')
+@click.option('--application-id', type=int, default=None, help='只统计该应用的任务')
+@click.option('--json', 'as_json', is_flag=True, help='以 JSON 格式输出')
+def timings(limit, status, application_id, as_json):
+    """查看最近任务各阶段耗时的 p50 / p95"""
+    params = {"limit": limit, "status": status}
+    if application_id is not None:
+        params["application_id"] = application_id
+    try:
+        response = client.get("/v1/development/timings", params=params)
+        if response.status_code != 200:
+            click.echo(f"获取阶段耗时失败: {response.text}")
+            return
+        stats = response.json()
+        if as_json:
+            click.echo(json.dumps(stats, indent=2, ensure_ascii=False))
+            return
+        if not stats["tasks"]:
+            click.echo("没有上报阶段耗时的任务")
+            return
+        click.echo(f"最近 {stats['tasks']} 个任务的阶段耗时（秒）:")
+        # 中文表头按每个字符占两列对齐
+        click.echo(f"{'阶段':<14}{'任务数':>7}{'p50':>10}{'p95':>10}{'最大':>8}")
+        for row in stats["phases"] + [stats["total"]]:
+            click.echo(f"{row['phase']:<16}{row['count']:>10}{row['p50']:>10.2f}{row['p95']:>10.2f}{row['max']:>10.2f}")
+    except Exception as e:
+        click.echo(f"发生错误: {str(e)}")
+
 if __name__ == '__main__':
     development()
\ No newline at end of file
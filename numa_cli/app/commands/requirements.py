@@ -1,5 +1,9 @@
+import csv
+import json
+import os
 import click
 import requests
+from app.core.pagination import DATE_FORMATS, iter_pages, list_filters
 
 # API基础URL
 API_BASE_URL = "http://localhost:7301/api/v1"
@@ -27,12 +31,10 @@ def get_requirement_api(requirement_id):
     response.raise_for_status()
     return response.json()
 
-def list_requirements_api():
-    """通过API列出所有需求"""
+def list_requirements_api(page_size=100, **filters):
+    """通过API逐页列出需求，筛选条件由服务端执行"""
     url = f"{API_BASE_URL}/requirements/"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return iter_pages(lambda params: requests.get(url, params=params), {"limit": page_size, **list_filters(**filters)})
 
 def assign_requirement_api(requirement_id, assigned_to):
     """通过API分配需求"""
@@ -65,6 +67,70 @@ def update_requirement_api(requirement_id, description):
     response.raise_for_status()
     return response.json()
 
+def bulk_create_requirements_api(items):
+    """通过API批量创建需求，返回每条记录的处理结果"""
+    url = f"{API_BASE_URL}/requirements/bulk"
+    response = requests.post(url, json=items)
+    response.raise_for_status()
+    return response.json()
+
+# 导入文件中需要转换为整数的字段（CSV 中均为字符串）
+IMPORT_INT_FIELDS = ("user_id", "application_id", "assigned_to")
+
+def _normalize_row(row):
+    """去掉空值并转换整数字段
+
+    Raises:
+        ValueError: 行不是对象，或整数字段无法转换
+    """
+    if not isinstance(row, dict):
+        raise ValueError("不是 JSON 对象")
+    item = {key: value for key, value in row.items() if key and value not in (None, "")}
+    for key in IMPORT_INT_FIELDS:
+        if isinstance(item.get(key), str):
+            try:
+                item[key] = int(item[key])
+            except ValueError:
+                raise ValueError(f"{key} 不是整数: {item[key]!r}")
+    return item
+
+def _parse_row(parse, value):
+    """解析一行，返回 (需求数据, 错误原因)"""
+    try:
+        return _normalize_row(parse(value)), None
+    except ValueError as e:
+        return None, str(e)
+
+def iter_import_rows(path, file_format):
+    """逐行读取导入文件，惰性地产出 (行号, 需求数据, 错误原因)
+
+    单行无法解析时需求数据为 None 并给出原因，不影响后续行的读取。
+
+    Args:
+        path: JSONL 或 CSV 文件路径
+        file_format: jsonl 或 csv
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            # 第1行是表头
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield (line_no, *_parse_row(dict, row))
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield (line_no, *_parse_row(json.loads, line))
+
+def iter_batches(rows, batch_size):
+    """将行按批次分组，不会一次读入整个文件"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 @click.group()
 def requirements():
     """需求管理命令"""
@@ -98,14 +164,26 @@ def get(requirement_id):
         click.echo(f"获取需求详情失败: {str(e)}")
 
 @requirements.command()
-def list():
-    """列出所有需求"""
+@click.option('--page-size', default=100, help='每页拉取的记录数')
+@click.option('--status', default=None, help='按状态筛选')
+@click.option('--application-id', type=int, default=None, help='按应用ID筛选')
+@click.option('--assigned-to', type=int, default=None, help='按接手人ID筛选')
+@click.option('--created-after', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之后创建的记录')
+@click.option('--created-before', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之前创建的记录')
+@click.option('--sort', default=None, help='排序字段（created_at、id、title、status），前缀 - 表示降序')
+def list(page_size, status, application_id, assigned_to, created_after, created_before, sort):
+    """列出需求"""
     try:
-        requirements = list_requirements_api()
-        if requirements:
-            for req in requirements:
-                click.echo(f"ID: {req['id']}, 标题: {req['title']}, 状态: {req['status']}")
-        else:
+        count = 0
+        # 只请求需要展示的列，不传输描述和规范文档
+        requirements_iter = list_requirements_api(
+            page_size, status=status, application_id=application_id, assigned_to=assigned_to,
+            created_after=created_after, created_before=created_before, sort=sort, fields="title,status"
+        )
+        for req in requirements_iter:
+            click.echo(f"ID: {req['id']}, 标题: {req['title']}, 状态: {req['status']}")
+            count += 1
+        if not count:
             click.echo("暂无需求")
     except requests.exceptions.RequestException as e:
         click.echo(f"获取需求列表失败: {str(e)}")
@@ -164,4 +242,49 @@ def update(requirement_id, description):
     except requests.exceptions.RequestException as e:
         click.echo(f"更新需求失败: {str(e)}")
     except Exception as e:
-        click.echo(f"更新需求失败: {str(e)}")
\ No newline at end of file
+        click.echo(f"更新需求失败: {str(e)}")
+
+@requirements.command(name="import")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['jsonl', 'csv']), default=None,
+              help='文件格式，默认根据扩展名判断')
+@click.option('--batch-size', default=500, type=click.IntRange(1, 5000), help='每次请求提交的需求条数')
+def import_requirements(path, file_format, batch_size):
+    """从 JSONL / CSV 文件批量导入需求
+
+    每行一条需求，字段与 create 命令一致（title、description、user_id，可选 application_id 等）。
+    文件按批流式读取并提交，导入失败的行（无法解析、校验失败或所在批次提交失败）会给出行号和原因，
+    其余行继续导入。
+    """
+    if file_format is None:
+        file_format = "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+
+    created = failed = 0
+    try:
+        for batch in iter_batches(iter_import_rows(path, file_format), batch_size):
+            rows = []
+            for line_no, item, error in batch:
+                if error:
+                    click.echo(f"第 {line_no} 行导入失败: {error}")
+                    failed += 1
+                else:
+                    rows.append((line_no, item))
+            if rows:
+                try:
+                    result = bulk_create_requirements_api([item for _, item in rows])
+                except requests.exceptions.RequestException as e:
+                    # 之前的批次已经写入，只记录本批次的行，继续提交后续批次
+                    click.echo(f"第 {rows[0][0]}-{rows[-1][0]} 行提交失败: {str(e)}")
+                    failed += len(rows)
+                else:
+                    for item_result in result["results"]:
+                        if item_result["error"]:
+                            line_no = rows[item_result["index"]][0]
+                            click.echo(f"第 {line_no} 行导入失败: {item_result['error']}")
+                    created += result["created"]
+                    failed += result["failed"]
+            click.echo(f"已提交 {created + failed} 条，成功 {created} 条，失败 {failed} 条")
+    except (ValueError, csv.Error) as e:
+        click.echo(f"导入需求失败，文件格式错误: {str(e)}")
+    except Exception as e:
+        click.echo(f"导入需求失败: {str(e)}")
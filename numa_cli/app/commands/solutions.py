@@ -1,6 +1,7 @@
 import click
 import json
 from app.core.http_client import client
+from app.core.pagination import DATE_FORMATS, iter_pages, list_filters, NEXT_CURSOR_HEADER
 
 @click.group()
 def solutions():
@@ -46,14 +47,40 @@ def get(solution_id):
 
 @solutions.command()
 @click.option('--skip', default=0, help='跳过的记录数')
-@click.option('--limit', default=100, help='返回的记录数')
-def list(skip, limit):
+@click.option('--limit', default=100, help='返回的记录数（使用--all时为每页记录数）')
+@click.option('--cursor', default=None, help='上一页返回的游标，从该位置继续获取')
+@click.option('--all', 'fetch_all', is_flag=True, help='按游标逐页获取全部方案')
+@click.option('--status', default=None, help='按状态筛选')
+@click.option('--requirement-id', type=int, default=None, help='按需求ID筛选')
+@click.option('--application-id', type=int, default=None, help='按应用ID筛选')
+@click.option('--created-after', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之后创建的记录')
+@click.option('--created-before', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之前创建的记录')
+@click.option('--sort', default=None, help='排序字段（created_at、id、title、status），前缀 - 表示降序')
+@click.option('--fields', default=None, help='只返回指定的列（逗号分隔），例如 id,title,status')
+@click.option('--include', default=None, help='只返回指定的关联对象（逗号分隔，可选 requirement、application）')
+def list(skip, limit, cursor, fetch_all, status, requirement_id, application_id, created_after, created_before, sort, fields, include):
     """获取方案列表"""
+    filters = list_filters(
+        status=status, requirement_id=requirement_id, application_id=application_id,
+        created_after=created_after, created_before=created_before, sort=sort,
+        fields=fields, include=include
+    )
     try:
-        response = client.get("/v1/solutions/", params={"skip": skip, "limit": limit})
+        if fetch_all:
+            for item in iter_pages(lambda params: client.get("/v1/solutions/", params=params), {"limit": limit, **filters}):
+                click.echo(json.dumps(item, indent=2, ensure_ascii=False))
+            return
+        
+        params = {"skip": skip, "limit": limit, **filters}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/v1/solutions/", params=params)
         if response.status_code == 200:
             solutions = response.json()
             click.echo(json.dumps(solutions, indent=2, ensure_ascii=False))
+            next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if next_cursor:
+                click.echo(f"下一页游标: {next_cursor}", err=True)
         else:
             click.echo(f"获取方案列表失败: {response.text}")
     except Exception as e:
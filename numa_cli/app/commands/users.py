@@ -1,15 +1,14 @@
 import click
 import requests
+from app.core.pagination import DATE_FORMATS, iter_pages, list_filters
 
 # API基础URL
 API_BASE_URL = "http://localhost:7301/api/v1"
 
-def get_users_api():
-    """通过API获取用户列表"""
+def get_users_api(page_size=100, **filters):
+    """通过API逐页获取用户列表，筛选条件由服务端执行"""
     url = f"{API_BASE_URL}/users/"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    return iter_pages(lambda params: requests.get(url, params=params), {"limit": page_size, **list_filters(**filters)})
 
 @click.group()
 def users():
@@ -17,15 +16,20 @@ def users():
     pass
 
 @users.command()
-def list():
-    """列出所有用户"""
+@click.option('--page-size', default=100, help='每页拉取的记录数')
+@click.option('--created-after', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之后创建的记录')
+@click.option('--created-before', type=click.DateTime(DATE_FORMATS), default=None, help='只显示该时间之前创建的记录')
+@click.option('--sort', default=None, help='排序字段（created_at、id、name、email），前缀 - 表示降序')
+def list(page_size, created_after, created_before, sort):
+    """列出用户"""
     try:
-        users = get_users_api()
-        if users:
-            click.echo("用户列表:")
-            for user in users:
-                click.echo(f"  ID: {user['id']}, 姓名: {user['name']}, 邮箱: {user['email']}")
-        else:
+        count = 0
+        for user in get_users_api(page_size, created_after=created_after, created_before=created_before, sort=sort):
+            if not count:
+                click.echo("用户列表:")
+            click.echo(f"  ID: {user['id']}, 姓名: {user['name']}, 邮箱: {user['email']}")
+            count += 1
+        if not count:
             click.echo("暂无用户")
     except requests.exceptions.RequestException as e:
         click.echo(f"获取用户列表失败: {str(e)}")
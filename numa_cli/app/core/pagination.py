@@ -0,0 +1,38 @@
+from datetime import datetime
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 日期选项接受的格式
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"]
+
+def iter_pages(fetch, params=None):
+    """按游标逐页拉取列表接口，惰性地逐条产出结果
+
+    Args:
+        fetch: 接收查询参数、返回HTTP响应的函数（httpx与requests的响应均可）
+        params: 初始查询参数，limit即每页条数
+    """
+    params = dict(params or {})
+    while True:
+        response = fetch(params)
+        response.raise_for_status()
+        for item in response.json():
+            yield item
+
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+def list_filters(**filters):
+    """组装列表接口的筛选与排序参数，忽略未指定的选项
+
+    Args:
+        filters: 查询参数，值为 None 的会被丢弃，datetime 转换为 ISO 格式
+    """
+    params = {}
+    for key, value in filters.items():
+        if value is None:
+            continue
+        params[key] = value.isoformat() if isinstance(value, datetime) else value
+    return params
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import requests
+from click.testing import CliRunner
+from app.commands import requirements as requirements_module
+
+class FakeBulkAPI:
+    """模拟 /requirements/bulk：user_id 为 999 的记录报错，fail_batches 中的批次抛出请求异常"""
+
+    def __init__(self, fail_batches=()):
+        self.batches = []
+        self.fail_batches = set(fail_batches)
+
+    def __call__(self, items):
+        self.batches.append(items)
+        if len(self.batches) in self.fail_batches:
+            raise requests.exceptions.ConnectionError("connection refused")
+        results = [
+            {"index": index, "id": None, "error": "User not found"} if item["user_id"] == 999
+            else {"index": index, "id": index + 1, "error": None}
+            for index, item in enumerate(items)
+        ]
+        failed = sum(1 for result in results if result["error"])
+        return {"created": len(items) - failed, "failed": failed, "results": results}
+
+@pytest.fixture
+def bulk_api(monkeypatch):
+    api = FakeBulkAPI()
+    monkeypatch.setattr(requirements_module, "bulk_create_requirements_api", api)
+    return api
+
+def run_import(path, *args):
+    result = CliRunner().invoke(requirements_module.requirements, ["import", str(path), *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+def test_import_csv(tmp_path, bulk_api):
+    """测试导入 CSV：整数字段转换，空值去掉，后端报错的行给出行号"""
+    path = tmp_path / "requirements.csv"
+    path.write_text(
+        "title,description,user_id,application_id\n"
+        "需求1,描述1,1,2\n"
+        "需求2,描述2,999,\n",
+        encoding="utf-8"
+    )
+
+    output = run_import(path)
+
+    assert bulk_api.batches == [[
+        {"title": "需求1", "description": "描述1", "user_id": 1, "application_id": 2},
+        {"title": "需求2", "description": "描述2", "user_id": 999},
+    ]]
+    assert "第 3 行导入失败: User not found" in output
+    assert "成功 1 条，失败 1 条" in output
+
+def test_import_jsonl_reports_bad_lines_and_continues(tmp_path, bulk_api):
+    """测试导入 JSONL：无法解析的行和整数字段无效的行单独报错，其余行继续导入"""
+    path = tmp_path / "requirements.jsonl"
+    lines = [
+        json.dumps({"title": "需求1", "description": "描述", "user_id": 1}),
+        "{not json",
+        "",
+        json.dumps({"title": "需求4", "description": "描述", "user_id": "abc"}),
+        json.dumps(["不是对象"]),
+        json.dumps({"title": "需求6", "description": "描述", "user_id": "3"}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    output = run_import(path)
+
+    assert [item["title"] for item in bulk_api.batches[0]] == ["需求1", "需求6"]
+    assert bulk_api.batches[0][1]["user_id"] == 3
+    assert "第 2 行导入失败" in output
+    assert "第 4 行导入失败: user_id 不是整数: 'abc'" in output
+    assert "第 5 行导入失败: 不是 JSON 对象" in output
+    assert "成功 2 条，失败 3 条" in output
+
+def test_import_continues_after_failed_batch(tmp_path, bulk_api):
+    """测试某个批次提交失败时记录该批次的行号，继续提交后续批次"""
+    bulk_api.fail_batches = {1}
+    path = tmp_path / "requirements.jsonl"
+    path.write_text(
+        "".join(json.dumps({"title": f"需求{i}", "description": "描述", "user_id": 1}) + "\n" for i in range(1, 6)),
+        encoding="utf-8"
+    )
+
+    output = run_import(path, "--batch-size", "2")
+
+    assert len(bulk_api.batches) == 3
+    assert "第 1-2 行提交失败: connection refused" in output
+    assert "成功 3 条，失败 2 条" in output